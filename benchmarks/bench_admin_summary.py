@@ -0,0 +1,43 @@
+"""Organisation-wide summary: one grouped pass vs one summary per user.
+
+Streams the CSV for every user to a temporary file and compares it with calling
+get_summary for a sample of users, extrapolated to all of them.
+Usage: python -m benchmarks.bench_admin_summary [rows] [users]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+from views.admin_summary import write_admin_summary
+
+
+def main(rows: int = 2_000_000, users: int = 200_000, sample: int = 200) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=users)
+        tracker = TrackerService(db_path, read_only=True)
+
+        began = time.perf_counter()
+        totals = write_admin_summary(tracker, output=os.path.join(tmp, "admin.csv"))
+        elapsed = time.perf_counter() - began
+        # Measured on a second run: tracing allocations slows the pass several-fold
+        tracemalloc.start()
+        write_admin_summary(tracker, output=os.path.join(tmp, "admin.csv"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"one pass: {totals.user_count} users in {elapsed:.2f}s, peak Python memory {peak / 1024 / 1024:.1f} MB")
+
+        began = time.perf_counter()
+        for i in range(sample):
+            tracker.get_summary(f"user{i}")
+        per_user = (time.perf_counter() - began) / sample
+        print(f"per-user summaries: {per_user * 1000:.2f} ms each, ~{per_user * totals.user_count:.0f}s for all")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200_000)
@@ -0,0 +1,35 @@
+"""Cost of a repeated category chart request: render (cache miss) vs cache hit.
+
+Usage: python -m benchmarks.bench_artifact_cache [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+from utils.artifact_cache import ArtifactCache
+from views.chart import plot_category_spending
+
+
+def main(rows: int = 200_000, requests: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows)
+        tracker = TrackerService(db_path, read_only=True)
+        cache = ArtifactCache(os.path.join(tmp, "cache"))
+        with patch("views.chart.default_cache", return_value=cache), patch("builtins.print"):
+            timings = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                plot_category_spending("user0", service=tracker, output_file=os.path.join(tmp, "chart.png"))
+                timings.append(time.perf_counter() - start)
+        print(f"first request (render): {timings[0] * 1000:.0f} ms")
+        print(f"repeat requests (hit): {sum(timings[1:]) / (requests - 1) * 1000:.0f} ms avg, "
+              f"hit rate {cache.stats()['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,47 @@
+"""Measure add latency while an online backup of a large database runs.
+
+Usage: python -m benchmarks.bench_backup [rows]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.seed import seed_transactions
+from models.backup import backup_database
+from models.transaction import Transaction, TransactionModel
+
+
+def main(rows: int = 2_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, notes=True)
+        print(f"database size: {os.path.getsize(db_path) / 1024 / 1024:.0f} MB")
+        model = TransactionModel(db_name=db_path)
+        latencies = []
+        stop = threading.Event()
+
+        def writer():
+            while not stop.is_set():
+                start = time.perf_counter()
+                model.create(Transaction(amount=1.0, type="expense", category="Food",
+                                         date="2025-01-01", user_id="user0"))
+                latencies.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            result = backup_database(db_path, os.path.join(tmp, "backups"))
+        finally:
+            stop.set()
+            thread.join()
+        latencies.sort()
+        print(f"backup: {result.pages} pages in {result.seconds:.1f}s, integrity {result.integrity}")
+        print(f"{len(latencies)} adds during backup: p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,35 @@
+"""Compare balance-as-of lookups from the balance index with a history scan.
+
+Usage: python -m benchmarks.bench_balance [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from models.transaction import TransactionModel
+from services.tracker import TrackerService
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        seed_transactions(db_path, rows, users=1, years=5)
+        print(f"seeded {rows} back-dated rows in {time.perf_counter() - start:.1f}s")
+        model = TransactionModel(db_name=db_path)
+        dates = [f"{year}-{month:02d}-15" for year in range(2022, 2026) for month in range(1, 13)]
+        start = time.perf_counter()
+        model.balances_as_of("user0", dates)
+        indexed = time.perf_counter() - start
+        tracker = TrackerService(db_path)
+        start = time.perf_counter()
+        for as_of in dates[:3]:
+            tracker.get_summary("user0", "1970-01-01", as_of)
+        scanned = (time.perf_counter() - start) / 3 * len(dates)
+        print(f"{len(dates)} point balances: index {indexed * 1000:.1f} ms, get_summary scans ~{scanned:.1f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,83 @@
+"""Calendar grouping: per-row substr/strftime expressions vs the indexed generated columns.
+
+Times monthly and weekly grouping of one user's history, and a one-month
+summary, both ways, plus what the two extra indexes cost bulk inserts.
+Usage: python -m benchmarks.bench_calendar_columns [rows] [users]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from models.transaction import TransactionModel
+
+# The per-row expressions trend_series grouped by before the calendar columns
+EXPRESSION_GROUPINGS = {
+    'monthly': ("month_num", "CAST(substr(date, 1, 4) AS INTEGER) * 12 + CAST(substr(date, 6, 2) AS INTEGER)"),
+    'weekly': ("week_num",
+               "CAST(julianday(date) - ((CAST(strftime('%w', date) AS INTEGER) + 6) % 7) AS INTEGER) / 7"),
+}
+
+
+def best_of(label: str, operation, repeat: int = 3) -> float:
+    seconds = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        operation()
+        seconds.append(time.perf_counter() - began)
+    print(f"{label}: {min(seconds) * 1000:.1f} ms")
+    return min(seconds)
+
+
+def insert_batch(db_path: str, batch: list) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO transactions (amount, type, category, date, user_id) VALUES (?, ?, ?, ?, ?)",
+                         batch)
+
+
+def main(rows: int = 10_000_000, users: int = 10) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=users, years=10)
+        model = TransactionModel(db_path, read_only=True)
+        conn = sqlite3.connect(db_path)
+        conn.execute("ANALYZE")
+        month = conn.execute("SELECT MAX(substr(date, 1, 7)) FROM transactions WHERE user_id = 'user0' "
+                             "AND date < date('now', 'start of month')").fetchone()[0]
+        print(f"{rows} rows, {rows // users} for user0")
+        for period, (column, expression) in EXPRESSION_GROUPINGS.items():
+            old = best_of(f"{period} grouping by expression", lambda: conn.execute(f"""
+                SELECT {expression} AS idx, SUM(amount), COUNT(*) FROM transactions
+                INDEXED BY idx_transactions_user_date WHERE user_id = 'user0' GROUP BY idx
+            """).fetchall())
+            new = best_of(f"{period} grouping by {column}", lambda: conn.execute(f"""
+                SELECT {column}, SUM(amount), COUNT(*) FROM transactions WHERE user_id = 'user0' GROUP BY {column}
+            """).fetchall())
+            print(f"  {old / new:.1f}x faster")
+            best_of(f"{period} trend_series (window functions included)", lambda: model.trend_series("user0", period))
+        old = best_of(f"summary of {month} by date range",
+                      lambda: model.aggregate_by_currency("user0", f"{month}-01", f"{month}-31"))
+        new = best_of(f"summary of {month} by month_num", lambda: model.aggregate_by_currency("user0", month=month))
+        print(f"  {old / new:.1f}x faster")
+        conn.close()
+
+        # Write cost of the two calendar indexes
+        count = max(rows // 50, 1000)
+        batch = [(10.0, 'expense', 'Food', f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", f"user{i % users}")
+                 for i in range(count)]
+        paths = [os.path.join(tmp, name) for name in ("with.db", "without.db")]
+        for path in paths:
+            seed_transactions(path, count, users=users)
+        with sqlite3.connect(paths[1]) as conn:
+            conn.execute("DROP INDEX idx_transactions_user_month")
+            conn.execute("DROP INDEX idx_transactions_user_week")
+        with_indexes = best_of(f"insert {count} rows with calendar indexes", lambda: insert_batch(paths[0], batch), 1)
+        without = best_of(f"insert {count} rows without them", lambda: insert_batch(paths[1], batch), 1)
+        print(f"  insert overhead: {with_indexes / without - 1:.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10)
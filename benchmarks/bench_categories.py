@@ -0,0 +1,78 @@
+"""Category tree: subtree totals from the closure table vs walking the tree in Python, and renames.
+
+The seeded flat categories are rewritten into a three-level tree (10 top
+categories, 100 in the middle, 1000 leaves), then one subtree's totals are
+computed both ways, the breakdown is rolled up to level 1, and a top-level
+category is renamed and moved.
+Usage: python -m benchmarks.bench_categories [rows]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+
+
+def python_subtree_total(tracker: TrackerService, user_id: str, root: str) -> float:
+    """The recursive walk the closure table replaces: children by path, then every bucket of each."""
+    nodes = [node.path for node in tracker.categories.tree()]
+    children = {}
+    for path in nodes:
+        parent, _, _ = path.rpartition(" > ")
+        children.setdefault(parent, []).append(path)
+    buckets = {}
+    for _, _, type, category, total, _ in tracker.db.aggregate_by_currency(user_id):
+        if type == 'expense':
+            buckets[category] = buckets.get(category, 0.0) + total
+
+    def walk(path: str) -> float:
+        return buckets.get(path, 0.0) + sum(walk(child) for child in children.get(path, []))
+    return walk(root)
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=10)
+        began = time.perf_counter()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                UPDATE transactions SET category = 'Top' || (id % 10) || ' > Mid' || (id % 100)
+                                                   || ' > Leaf' || (id % 1000)
+            """)
+        print(f"rewrote {rows} rows into a 1110-node tree in {time.perf_counter() - began:.2f}s")
+        tracker = TrackerService(db_path)
+
+        began = time.perf_counter()
+        walked = python_subtree_total(tracker, "user0", "Top3")
+        print(f"python tree walk: {walked:.2f} in {time.perf_counter() - began:.3f}s")
+        began = time.perf_counter()
+        summary = tracker.get_summary("user0", category="Top3")
+        print(f"closure join:     {summary['total_expense']:.2f} in {time.perf_counter() - began:.3f}s")
+        began = time.perf_counter()
+        nodes = tracker.get_category_tree("user0")
+        print(f"every node's subtree totals: {len(nodes)} nodes in {time.perf_counter() - began:.3f}s")
+        began = time.perf_counter()
+        summary = tracker.get_summary("user0", depth=1)
+        print(f"summary rolled up to level 1: {len(summary['category_summary'])} categories "
+              f"in {time.perf_counter() - began:.3f}s")
+
+        with sqlite3.connect(db_path) as conn:
+            seq = conn.execute("SELECT MAX(seq) FROM changelog").fetchone()[0]
+        began = time.perf_counter()
+        renamed = tracker.rename_category("Top3", "Renamed")
+        print(f"rename: {renamed} nodes in {(time.perf_counter() - began) * 1000:.1f} ms")
+        began = time.perf_counter()
+        moved = tracker.move_category("Renamed", "Top4")
+        print(f"move: {moved} nodes in {(time.perf_counter() - began) * 1000:.1f} ms")
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT MAX(seq) FROM changelog").fetchone()[0] == seq, "transactions were rewritten"
+        summary = tracker.get_summary("user0", category="Top4 > Renamed")
+        print(f"moved subtree still totals {summary['total_expense']:.2f}, no transaction rewritten")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,69 @@
+"""Summaries of one heavy user from SQL vs from the memory-mapped column cache.
+
+Times loading the history as Transaction objects, the SQL summary, building
+the cache, a summary in a fresh service that maps the files, a repeated
+summary, and one after new rows are appended incrementally.
+Usage: python -m benchmarks.bench_column_cache [rows]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+from utils.column_cache import ColumnCache
+
+
+def timed(label: str, operation):
+    began = time.perf_counter()
+    result = operation()
+    print(f"{label}: {(time.perf_counter() - began) * 1000:.1f} ms")
+    return result
+
+
+def checkpoint(db_path: str) -> None:
+    """Empty the WAL, so each new read-only connection does not rebuild its index from a huge log."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def service(db_path: str, cache_dir: str) -> TrackerService:
+    tracker = TrackerService(db_path, read_only=True)
+    tracker._columns = ColumnCache(tracker.db, cache_dir)
+    return tracker
+
+
+def main(rows: int = 3_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        cache_dir = os.path.join(tmp, "columns")
+        seed_transactions(db_path, rows, users=1, years=10)
+        checkpoint(db_path)
+        tracker = service(db_path, cache_dir)
+        print(f"{rows} rows for one user")
+        timed("read_all into Transaction objects", lambda: tracker.db.read_all("user0"))
+        expected = timed("summary from SQL", lambda: tracker.get_summary("user0", workers=1))
+        timed("build column cache", lambda: tracker.build_column_cache("user0"))
+
+        fresh = service(db_path, cache_dir)
+        actual = timed("summary in a new service (maps the files)", lambda: fresh.get_summary("user0"))
+        assert actual["transaction_count"] == expected["transaction_count"]
+        timed("summary again", lambda: fresh.get_summary("user0"))
+        timed("one month from the cache", lambda: fresh.get_summary("user0", month="2024-06"))
+        timed("one month from SQL", lambda: tracker.db.aggregate_by_currency("user0", month="2024-06"))
+
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany("INSERT INTO transactions (amount, type, category, date, user_id) VALUES (?, ?, ?, ?, ?)",
+                             [(10.0, 'expense', 'Food', "2025-01-01", "user0")] * 1000)
+        checkpoint(db_path)
+        summary = timed("summary after 1000 new rows (appended)", lambda: fresh.get_summary("user0"))
+        assert summary["transaction_count"] == expected["transaction_count"] + 1000
+        print(f"  rebuilds: {fresh.columns.builds}, appends: {fresh.columns.appends}")
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(cache_dir) for name in names)
+        print(f"cache files: {size / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3_000_000)
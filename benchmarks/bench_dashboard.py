@@ -0,0 +1,37 @@
+"""Dashboards for every user: one aggregation, then panels rendered inline vs in a process pool.
+
+Usage: python -m benchmarks.bench_dashboard [rows] [users]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+from views.dashboard import generate_dashboards
+
+
+def main(rows: int = 500_000, users: int = 100) -> None:
+    end = date.today()
+    start = date(end.year - 1, end.month, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=users)
+        tracker = TrackerService(db_path, read_only=True)
+
+        began = time.perf_counter()
+        tracker.get_dashboard_data(None, start.isoformat(), end.isoformat())
+        print(f"aggregation for {users} users: {time.perf_counter() - began:.2f}s")
+
+        for label, workers in (("inline", 1), (f"pool of {os.cpu_count()}", None)):
+            began = time.perf_counter()
+            written = generate_dashboards(tracker, None, start.isoformat(), end.isoformat(),
+                                          os.path.join(tmp, label.replace(" ", "_")), workers=workers)
+            print(f"{label}: {len(written)} composite dashboards in {time.perf_counter() - began:.2f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 100)
@@ -0,0 +1,44 @@
+"""Cost of duplicate-proof imports and of finding duplicates in an existing table.
+
+Imports a statement of rows transactions with and without fingerprints, imports
+it again (every row skipped by the unique index), then runs the grouped
+duplicate scan over the whole table. Usage: python -m benchmarks.bench_dedupe [rows]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from models.transaction import Transaction, TransactionModel
+
+
+def statement(rows: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [Transaction(amount=round(rng.uniform(1, 200), 2), type="expense",
+                        category=rng.choice(["Food", "Fuel", "Rent", "Books"]),
+                        date=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", user_id="bench",
+                        external_ref=f"TX-{i}" if i % 2 else None) for i in range(rows)]
+
+
+def timed(label: str, operation) -> None:
+    began = time.perf_counter()
+    result = operation()
+    print(f"{label}: {result} in {time.perf_counter() - began:.2f}s")
+
+
+def main(rows: int = 200_000) -> None:
+    batch = statement(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = TransactionModel(db_name=os.path.join(tmp, "plain.db"))
+        timed("import without fingerprints", lambda: plain.add_transactions(batch))
+        model = TransactionModel(db_name=os.path.join(tmp, "dedupe.db"))
+        timed("import with fingerprints", lambda: model.add_transactions(batch, dedupe=True))
+        timed("same import again (inserted)", lambda: model.add_transactions(batch, dedupe=True))
+        timed("plain import again (inserted)", lambda: plain.add_transactions(batch))
+        timed("duplicate groups found by one grouped scan", lambda: len(plain.find_duplicates()))
+        timed("duplicates deleted", plain.delete_duplicates)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,34 @@
+"""Time doctor's maintenance steps on a fragmented database.
+
+Deletes the oldest third of a large database, then runs doctor with vacuum
+and analyze: the first run converts the file to incremental auto_vacuum with
+one full VACUUM. Another third is then deleted to show the routine cron run,
+which only releases the free pages.
+Usage: python -m benchmarks.bench_doctor [rows]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+from benchmarks.seed import seed_transactions
+from models.maintenance import run_doctor
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=100, notes=True)
+        for run, last_id in (("first run", rows // 3), ("cron run", 2 * rows // 3)):
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("DELETE FROM transactions WHERE id <= ?", (last_id,))
+            report = run_doctor(db_path)
+            print(f"before {run}: {report.file_size / 1024 / 1024:.0f} MB, "
+                  f"{report.freelist_ratio:.0%} free pages, problems: {report.problems()}")
+            report = run_doctor(db_path, analyze=True, vacuum=True)
+            steps = ", ".join(f"{step.step} {step.seconds:.2f}s" for step in report.steps)
+            print(f"{run}: {report.file_size / 1024 / 1024:.0f} MB, {steps}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
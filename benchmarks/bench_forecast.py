@@ -0,0 +1,44 @@
+"""Month-end forecasts: one batch over cached daily arrays vs rebuilding from rows per user.
+
+Usage: python -m benchmarks.bench_forecast [rows] [users]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+
+
+def main(rows: int = 1_000_000, users: int = 2_000, sample: int = 50) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=users)
+        tracker = TrackerService(db_path, read_only=True)
+
+        began = time.perf_counter()
+        forecasts = tracker.get_forecasts()
+        print(f"batch, cold cache: {len(forecasts)} users in {time.perf_counter() - began:.2f}s")
+        began = time.perf_counter()
+        tracker.get_forecasts()
+        print(f"batch, warm cache: {time.perf_counter() - began:.2f}s")
+        began = time.perf_counter()
+        for i in range(sample):
+            tracker.get_forecast(f"user{i}")
+        print(f"single user, warm cache: {(time.perf_counter() - began) / sample * 1000:.1f} ms")
+
+        # What every report would pay without the cache: Transaction rows for a year
+        start = (date.today() - timedelta(days=364)).isoformat()
+        began = time.perf_counter()
+        for i in range(sample):
+            tracker.db.read_all(f"user{i}", start, date.today().isoformat())
+        per_user = (time.perf_counter() - began) / sample
+        print(f"reading a year of rows: {per_user * 1000:.1f} ms per user, "
+              f"~{per_user * len(forecasts):.1f}s for all users before any fitting")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2_000)
@@ -0,0 +1,41 @@
+"""Throughput of list output for a large result set: one echo per row vs the buffered output layer.
+
+Output goes to /dev/null so only formatting and write costs are measured.
+Usage: python -m benchmarks.bench_output [rows]
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+import click
+
+from benchmarks.seed import seed_transactions
+from cli.commands import LIST_COLUMNS, transaction_line
+from models.transaction import TransactionModel
+from utils.output import emit, format_rows
+
+
+def main(rows: int = 200_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, notes=True)
+        transactions = TransactionModel(db_name=db_path, read_only=True).read_all("user0")
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            for idx, t in enumerate(transactions, start=1):
+                click.echo(f"ID: {idx}, Amount: {t.amount:.2f}, Type: {t.type}, "
+                           f"Category: {t.category}, Date: {t.date}" + (f", Note: {t.note}" if t.note else ""))
+            timings = [("per-row echo", time.perf_counter() - start)]
+            for fmt in ("text", "csv", "jsonl", "json"):
+                start = time.perf_counter()
+                records = ({column: getattr(t, column) for column in LIST_COLUMNS} for t in transactions)
+                emit(format_rows(records, LIST_COLUMNS, fmt, transaction_line))
+                timings.append((f"buffered {fmt}", time.perf_counter() - start))
+        for label, seconds in timings:
+            print(f"{label}: {len(transactions) / seconds:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
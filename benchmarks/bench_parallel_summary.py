@@ -0,0 +1,42 @@
+"""Range-sharded parallel summaries of one very large history, from 1 to N workers.
+
+Seeds a single user, then times get_summary over the whole range with 1, 2,
+4, ... workers (up to the CPU count) in a thread pool and in a process pool.
+Usage: python -m benchmarks.bench_parallel_summary [rows] [max_workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+
+
+def main(rows: int = 20_000_000, max_workers: int = 0) -> None:
+    max_workers = max_workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=1, years=10)
+        tracker = TrackerService(db_path, read_only=True)
+        counts = [1] + [n for n in (2, 4, 8, 16, 32, 64) if n < max_workers] + \
+                 ([max_workers] if max_workers > 1 else [])
+        print(f"{rows} rows for one user, {os.cpu_count()} CPUs")
+        baseline = None
+        for workers in counts:
+            for processes in ((False,) if workers == 1 else (False, True)):
+                began = time.perf_counter()
+                chunks = len(tracker.summary_chunks("user0", workers=workers))
+                summary = tracker.get_summary("user0", workers=workers) if not processes else None
+                if processes:
+                    tracker.summary_buckets("user0", workers=workers, processes=True)
+                seconds = time.perf_counter() - began
+                baseline = baseline or seconds
+                pool = "processes" if processes else "threads"
+                print(f"{workers:>3} workers ({pool}, {chunks} chunks): {seconds:.2f}s, "
+                      f"{baseline / seconds:.1f}x" + (f", balance {summary['balance']:.2f}" if summary else ""))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 0)
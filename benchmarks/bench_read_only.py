@@ -0,0 +1,53 @@
+"""Report latency under a concurrent writer: read-write opens vs read-only, mmap'd opens.
+
+Each iteration builds a fresh TrackerService like a CLI invocation does, then runs
+a monthly summary. Usage: python -m benchmarks.bench_read_only [rows]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+from benchmarks.seed import seed_transactions
+from models.transaction import Transaction, TransactionModel
+from services.tracker import TrackerService
+
+
+def measure(db_path: str, read_only: bool, iterations: int = 30) -> list:
+    month = date.today().strftime('%Y-%m')
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        TrackerService(db_path, read_only=read_only).get_summary("user0", f"{month}-01", f"{month}-31")
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=20)
+        stop = threading.Event()
+
+        def writer():
+            model = TransactionModel(db_name=db_path, synchronous="NORMAL")
+            while not stop.is_set():
+                model.create(Transaction(amount=1.0, type="expense", category="Food",
+                                         date=date.today().isoformat(), user_id="user1"))
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for label, read_only in (("read-write", False), ("read-only", True)):
+                latencies = measure(db_path, read_only)
+                print(f"{label}: p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+                      f"max {latencies[-1] * 1000:.1f} ms")
+        finally:
+            stop.set()
+            thread.join()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
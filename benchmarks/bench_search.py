@@ -0,0 +1,44 @@
+"""Compare FTS5 note search with a LIKE scan.
+
+Usage: python -m benchmarks.bench_search [rows]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from models.transaction import TransactionModel, build_search_query
+
+QUERIES = ["coffee", "starb*", '"monthly refund"', "costco fuel", "4242"]
+
+
+def like_search(db_path: str, user_id: str, text: str):
+    clauses, params = [], [user_id]
+    for term in text.replace('"', '').split():
+        clauses.append("note LIKE ?")
+        params.append(f"%{term.rstrip('*')}%")
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT id FROM transactions WHERE user_id = ? AND " + " AND ".join(clauses)
+                            + " ORDER BY date DESC LIMIT 100", params).fetchall()
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=10, notes=True)
+        model = TransactionModel(db_name=db_path)
+        for text in QUERIES:
+            start = time.perf_counter()
+            fts_hits = model.search("user0", build_search_query(text))
+            fts_time = time.perf_counter() - start
+            start = time.perf_counter()
+            like_hits = like_search(db_path, "user0", text)
+            like_time = time.perf_counter() - start
+            print(f"{text:<18} fts {fts_time * 1000:8.1f} ms ({len(fts_hits)} hits)   "
+                  f"like {like_time * 1000:8.1f} ms ({len(like_hits)} hits)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,29 @@
+"""Compare exact (SQL) and approximate (streaming sketch) stats over a large range.
+
+Usage: python -m benchmarks.bench_stats [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from services.tracker import TrackerService
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=1, years=3, notes=True)
+        tracker = TrackerService(db_path)
+        for mode in ("exact", "approximate"):
+            start = time.perf_counter()
+            stats = tracker.get_stats("user0", mode=mode)
+            elapsed = time.perf_counter() - start
+            quantiles = ", ".join(f"p{q * 100:g}={v:.2f}" for q, v in stats["quantiles"].items())
+            print(f"{mode}: {stats['count']} rows in {elapsed:.2f}s ({quantiles}, "
+                  f"top category {stats['top_categories'][0][0]!r})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
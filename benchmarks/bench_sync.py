@@ -0,0 +1,39 @@
+"""Delta sync cost as a function of database size and number of changes.
+
+Each database is copied to a peer and synced once to set the watermarks, then
+a batch of changes is made on each side and timed through one sync.
+Usage: python -m benchmarks.bench_sync [rows]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from models.sync import sync_databases
+from models.transaction import Transaction, TransactionModel
+
+
+def main(rows: int = 500_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (rows // 10, rows):
+            local = os.path.join(tmp, f"local-{size}.db")
+            peer = os.path.join(tmp, f"peer-{size}.db")
+            seed_transactions(local, size, users=10)
+            shutil.copy(local, peer)
+            began = time.perf_counter()
+            sync_databases(local, peer)
+            print(f"{size} rows, initial sync of a copied file: {time.perf_counter() - began:.2f}s")
+            for changes in (10, 1000, 10_000):
+                for path in (local, peer):
+                    TransactionModel(db_name=path).add_transactions(
+                        [Transaction(amount=1.0, type="expense", category="Food", date="2025-01-01",
+                                     user_id="user1") for _ in range(changes // 2)])
+                result = sync_databases(local, peer)
+                print(f"{size} rows, {changes} changes: pulled {result.pulled}, pushed {result.pushed} "
+                      f"in {result.seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
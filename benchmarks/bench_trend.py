@@ -0,0 +1,46 @@
+"""Time the SQL trend series against the Python loop over Transaction objects.
+
+Usage: python -m benchmarks.bench_trend [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_transactions
+from models.transaction import TransactionModel
+
+
+def python_monthly_trend(model: TransactionModel, user_id: str):
+    totals = {}
+    for t in model.read_all(user_id):
+        income, expense = totals.get(t.date[:7], (0.0, 0.0))
+        if t.type == 'income':
+            income += t.amount
+        else:
+            expense += t.amount
+        totals[t.date[:7]] = (income, expense)
+    balance, series = 0.0, []
+    for month in sorted(totals):
+        income, expense = totals[month]
+        balance += income - expense
+        series.append((month, income, expense, balance))
+    return series
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=1, years=5)
+        model = TransactionModel(db_name=db_path)
+        for period in ("daily", "weekly", "monthly"):
+            start = time.perf_counter()
+            series = model.trend_series("user0", period)
+            print(f"sql {period:<8} {len(series):>6} periods {time.perf_counter() - start:8.3f}s")
+        start = time.perf_counter()
+        series = python_monthly_trend(model, "user0")
+        print(f"python monthly  {len(series):>6} periods {time.perf_counter() - start:8.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
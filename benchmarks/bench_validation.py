@@ -0,0 +1,56 @@
+"""Compare validate_batch with calling the single-value validators row by row.
+
+Usage: python -m benchmarks.bench_validation [rows]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks.seed import CATEGORIES
+from utils.validators import (
+    ValidationError, validate_amount, validate_batch, validate_category,
+    validate_date, validate_user_id
+)
+
+
+def make_rows(rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=3 * 365)
+    return {
+        'amount': [round(rng.uniform(-10, 2000), 2) for _ in range(rows)],
+        'type': [rng.choice(('income', 'expense')) for _ in range(rows)],
+        'category': [rng.choice(CATEGORIES) for _ in range(rows)],
+        'date': [(start + timedelta(days=rng.randrange(3 * 365 + 30))).isoformat() for _ in range(rows)],
+        'user_id': [f"user{rng.randrange(100)}" for _ in range(rows)],
+    }
+
+
+def per_call(columns) -> int:
+    invalid = 0
+    for amount, category, date_str, user_id in zip(columns['amount'], columns['category'],
+                                                   columns['date'], columns['user_id']):
+        try:
+            validate_amount(amount)
+            validate_user_id(user_id)
+            validate_category(category)
+            validate_date(date_str)
+        except ValidationError:
+            invalid += 1
+    return invalid
+
+
+def main(rows: int = 1_000_000) -> None:
+    columns = make_rows(rows)
+    start = time.perf_counter()
+    invalid = per_call(columns)
+    per_call_time = time.perf_counter() - start
+    start = time.perf_counter()
+    report = validate_batch(columns)
+    batch_time = time.perf_counter() - start
+    print(f"per-call {per_call_time:7.2f}s ({invalid} invalid rows)")
+    print(f"batch    {batch_time:7.2f}s ({len(report.errors)} invalid rows)  speed-up {per_call_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
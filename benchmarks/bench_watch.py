@@ -0,0 +1,63 @@
+"""Change feed wake-up latency and idle CPU cost.
+
+A writer commits one transaction at a time and records the commit time; the feed
+reports how long each one took to arrive. Idle cost is the CPU time the feed
+uses while nothing is committed, at several poll intervals, against a database
+of rows transactions. Usage: python -m benchmarks.bench_watch [rows]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.seed import seed_transactions
+from models.journal import ChangeFeed
+from models.transaction import Transaction, TransactionModel
+
+
+def latency(db_path: str, interval: float, commits: int = 200) -> list:
+    committed = {}
+
+    def writer():
+        model = TransactionModel(db_name=db_path)
+        for i in range(commits):
+            time.sleep(0.005)
+            committed[model.create(Transaction(amount=float(i + 1), type="expense", category="Food",
+                                               date="2025-01-01", user_id="watch"))] = time.perf_counter()
+
+    feed = ChangeFeed(db_path, poll_interval=interval)
+    thread = threading.Thread(target=writer)
+    thread.start()
+    delays = []
+    for event in feed.follow(timeout=2):
+        seen = time.perf_counter()
+        delays.append(seen - committed.get(event.transaction_id, seen))
+    thread.join()
+    feed.close()
+    return sorted(delays)
+
+
+def idle_cpu(db_path: str, interval: float, seconds: float = 3.0) -> float:
+    feed = ChangeFeed(db_path, poll_interval=interval)
+    cpu = time.process_time()
+    for _ in feed.follow(timeout=seconds):
+        pass
+    used = time.process_time() - cpu
+    feed.close()
+    return used / seconds
+
+
+def main(rows: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_transactions(db_path, rows, users=20)
+        for interval in (0.01, 0.05, 0.25):
+            delays = latency(db_path, interval)
+            print(f"poll {interval * 1000:.0f} ms: {len(delays)} events, wake-up p50 "
+                  f"{delays[len(delays) // 2] * 1000:.1f} ms, p99 {delays[int(len(delays) * 0.99)] * 1000:.1f} ms, "
+                  f"idle CPU {idle_cpu(db_path, interval) * 100:.2f}% of a core")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,77 @@
+"""Multi-process write stress test: sustained inserts/s and lock failures.
+
+Every process writes to the same database file, like several containers sharing
+the ./data volume. Usage: python -m benchmarks.bench_write_contention [processes] [rows_per_process]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from models.transaction import Transaction, TransactionModel
+from services.tracker import TrackerService
+
+THREADS_PER_PROCESS = 8
+
+
+def _direct_writer(db_path: str, rows: int, results) -> None:
+    model = TransactionModel(db_name=db_path, synchronous="NORMAL")
+    failures = 0
+    for i in range(rows):
+        try:
+            model.add_transaction(Transaction(amount=1.0 + i, type="expense", category="Food",
+                                              date="2025-07-01", user_id=f"p{os.getpid()}"))
+        except Exception:
+            failures += 1
+    results.put(failures)
+
+
+def _group_writer(db_path: str, rows: int, results) -> None:
+    tracker = TrackerService(db_path, group_commit=True, synchronous="NORMAL")
+    failures = []
+
+    def worker(count: int) -> None:
+        for i in range(count):
+            try:
+                tracker.add_transaction(1.0 + i, "expense", "Food", "2025-07-01", f"p{os.getpid()}")
+            except Exception:
+                failures.append(1)
+
+    threads = [threading.Thread(target=worker, args=(rows // THREADS_PER_PROCESS,))
+               for _ in range(THREADS_PER_PROCESS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tracker.close()
+    results.put(len(failures))
+
+
+def run(mode, processes: int, rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        TransactionModel(db_name=db_path)
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=mode, args=(db_path, rows, results)) for _ in range(processes)]
+        start = time.perf_counter()
+        for p in workers:
+            p.start()
+        failures = sum(results.get() for _ in workers)
+        for p in workers:
+            p.join()
+        elapsed = time.perf_counter() - start
+        total = processes * rows
+        print(f"{mode.__name__:<15} {processes} procs x {rows} rows: {total / elapsed:9.0f} inserts/s, "
+              f"{failures} lock failures")
+
+
+def main(processes: int = 4, rows: int = 2000) -> None:
+    run(_direct_writer, processes, rows)
+    run(_group_writer, processes, rows)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
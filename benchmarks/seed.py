@@ -0,0 +1,39 @@
+"""Helpers for building large synthetic MoneyTracker databases for benchmarks."""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from models.transaction import TransactionModel
+
+MERCHANTS = ["Starbucks", "Walmart", "Amazon", "Shell", "Costco", "Target", "Uber", "Netflix", "IKEA", "Tesco"]
+MEMO_WORDS = ["coffee", "groceries", "fuel", "monthly", "refund", "gift", "lunch", "dinner", "books", "parking",
+              "downtown", "online", "store", "weekend", "office", "family", "travel", "snacks", "repair", "fee"]
+CATEGORIES = ["Food", "Rent", "Transport", "Books", "Health", "Travel", "Utilities", "Gifts", "Salary", "Bonus"]
+
+
+def random_note(rng: random.Random) -> str:
+    return f"{rng.choice(MERCHANTS)} {' '.join(rng.sample(MEMO_WORDS, 3))} #{rng.randrange(100000)}"
+
+
+def seed_transactions(db_path: str, rows: int, users: int = 1, years: int = 3, seed: int = 42,
+                      notes: bool = False) -> None:
+    """Insert rows random transactions spread over users and the last years."""
+    TransactionModel(db_name=db_path)
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=365 * years)
+    span = 365 * years
+    with sqlite3.connect(db_path) as conn:
+        batch = []
+        for _ in range(rows):
+            category = rng.choice(CATEGORIES)
+            type = 'income' if category in ("Salary", "Bonus") else 'expense'
+            batch.append((round(rng.uniform(1, 500), 2), type, category,
+                          (start + timedelta(days=rng.randrange(span))).isoformat(),
+                          f"user{rng.randrange(users)}", random_note(rng) if notes else None))
+            if len(batch) == 50_000:
+                conn.executemany("INSERT INTO transactions (amount, type, category, date, user_id, note) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", batch)
+                batch.clear()
+        conn.executemany("INSERT INTO transactions (amount, type, category, date, user_id, note) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", batch)
+        conn.commit()
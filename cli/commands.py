@@ -1,6 +1,7 @@
 import click
 from views.chart import plot_category_spending
-from views.report import display_tabular_summary
+from views.report import add_projection, display_tabular_summary, projection_text, summary_tables, write_summary
+from rich.console import Console
 from utils.pdf_exporter import export_summary_to_pdf
 # Chart visualization command
 @click.command()
@@ -9,7 +10,7 @@ from utils.pdf_exporter import export_summary_to_pdf
 @click.option('--end-date', type=str, help='End date (YYYY-MM-DD)')
 def plot(user_id, start_date=None, end_date=None):
     """Show category-wise spending chart for a user."""
-    plot_category_spending(user_id, start_date, end_date)
+    plot_category_spending(user_id, start_date, end_date, service=get_tracker(read_only=True))
 
 # Tabular report command
 @click.command()
@@ -17,7 +18,12 @@ def plot(user_id, start_date=None, end_date=None):
 @click.option('--start-date', type=str, help='Start date (YYYY-MM-DD)')
 @click.option('--end-date', type=str, help='End date (YYYY-MM-DD)')
 @click.option('--month', type=str, help='Specify month (e.g. 2025-07), takes precedence over start/end-date')
-def report(user_id, start_date=None, end_date=None, month=None):
+@click.option('--currency', type=str, default=None, help='Reporting currency (default: MONEYTRACKER_REPORT_CURRENCY)')
+@click.option('--category', type=str, default=None, help='Only this category and its subcategories, e.g. "Food > Groceries"')
+@click.option('--depth', type=click.IntRange(min=1), default=None, help='Roll the category breakdown up to this level')
+@click.option('--format', 'output_format', type=click.Choice(['table', 'csv', 'json', 'jsonl']), default='table', help='Output format')
+def report(user_id, start_date=None, end_date=None, month=None, currency=None, category=None, depth=None,
+           output_format='table'):
     """Show tabular summary report for a user."""
     # Month option logic (same as summary)
     if month:
@@ -33,7 +39,8 @@ def report(user_id, start_date=None, end_date=None, month=None):
         today = datetime.now().strftime('%Y-%m-%d')
         if end_date > today:
             end_date = today
-    display_tabular_summary(user_id, start_date, end_date)
+    display_tabular_summary(user_id, start_date, end_date, currency, output_format, get_tracker(read_only=True),
+                            category, depth, month)
 
 # PDF report export command
 @click.command()
@@ -44,7 +51,6 @@ def report(user_id, start_date=None, end_date=None, month=None):
 def report_pdf(user_id, start_date=None, end_date=None, output=None):
     """Export summary report as PDF for a user."""
     try:
-        db = get_db()
         # Validate user and dates
         validate_user_id(user_id)
         if start_date:
@@ -53,23 +59,12 @@ def report_pdf(user_id, start_date=None, end_date=None, output=None):
             validate_date(end_date)
         if start_date and end_date:
             validate_date_range(start_date, end_date)
-        transactions = db.read_all(user_id, start_date, end_date)
-        if not transactions:
+        # Converted to the report currency, like summary. The PDF is cached by
+        # this summary, so an unchanged report costs one serial grouped query.
+        summary_data = get_tracker(read_only=True).get_summary(user_id, start_date, end_date, workers=1)
+        if not summary_data['transaction_count']:
             click.echo(f"No transactions found for user {user_id}")
             return
-        total_income = sum(t.amount for t in transactions if t.type == 'income')
-        total_expense = sum(t.amount for t in transactions if t.type == 'expense')
-        balance = total_income - total_expense
-        category_summary = {}
-        for t in transactions:
-            category_summary[t.category] = category_summary.get(t.category, 0) + t.amount
-        summary_data = {
-            'transaction_count': len(transactions),
-            'total_income': total_income,
-            'total_expense': total_expense,
-            'balance': balance,
-            'category_summary': category_summary
-        }
         pdf_path = export_summary_to_pdf(summary_data, output)
         click.echo(f"PDF report exported to: {pdf_path}")
     except Exception as e:
@@ -80,19 +75,42 @@ from datetime import datetime
 from models.transaction import TransactionModel, Transaction
 from utils.logger import setup_logger
 from models.record import RecordModel
+from models.budget import BudgetModel
+from models.fx import FxRateModel
+from services.tracker import TrackerService
 from utils.validators import (
     validate_amount, validate_user_id,
     validate_category, validate_date,
-    validate_date_range,ValidationError
+    validate_date_range,ValidationError,
+    validate_month, validate_note, validate_currency, normalize_category
 )
 
+from utils.output import OUTPUT_FORMATS, emit, format_rows
+
+import itertools
 import os
 logger = setup_logger()
 
 
-def get_db():
+LIST_COLUMNS = ['id', 'date', 'type', 'category', 'amount', 'currency', 'note']
+
+def transaction_line(row: dict) -> str:
+    """One transaction in the plain text format of list."""
+    return (f"ID: {row['id']}, Amount: {row['amount']:.2f}{' ' + row['currency'] if row['currency'] else ''}, "
+            f"Type: {row['type']}, Category: {row['category']}, Date: {row['date']}"
+            + (f", Note: {row['note']}" if row['note'] else ""))
+
+def immutable_db() -> bool:
+    """MONEYTRACKER_IMMUTABLE=1 marks the database as an archived snapshot nothing writes to."""
+    return os.getenv("MONEYTRACKER_IMMUTABLE", "").lower() in ("1", "true", "yes")
+
+def get_db(read_only: bool = False):
     db_path = os.getenv("MONEYTRACKER_DB", "moneytracker.db")
-    return TransactionModel(db_name=db_path)
+    return TransactionModel(db_name=db_path, read_only=read_only, immutable=read_only and immutable_db())
+
+def get_tracker(read_only: bool = False):
+    db_path = os.getenv("MONEYTRACKER_DB", "moneytracker.db")
+    return TrackerService(db_name=db_path, read_only=read_only, immutable=read_only and immutable_db())
      
 @click.command()
 @click.option('--amount', type=float, required=True, help='Transaction amount')
@@ -100,7 +118,9 @@ def get_db():
 @click.option('--category', type=str, required=True, help='Transaction category')
 @click.option('--date', type=str, default=datetime.now().strftime('%Y-%m-%d'), help='Transaction date (YYYY-MM-DD)')
 @click.option('--user-id', type=str, default='default_user', help='User ID')
-def add(amount, type, category, date, user_id):
+@click.option('--note', type=str, default=None, help='Optional note, e.g. merchant name or memo')
+@click.option('--currency', type=str, default=None, help='ISO currency code, e.g. USD (default: MONEYTRACKER_CURRENCY)')
+def add(amount, type, category, date, user_id, note, currency):
     """Add a new income or expense transaction."""
     try:
         db = get_db()
@@ -108,18 +128,41 @@ def add(amount, type, category, date, user_id):
         # Validate date format
         validate_amount(amount)
         validate_user_id(user_id)
+        category = normalize_category(category)
         validate_category(category)
         validate_date(date)
+        validate_note(note)
+        currency = currency.upper() if currency else None
+        validate_currency(currency)
+        if currency:
+            # A row that cannot be converted would make every report of the user fail
+            try:
+                FxRateModel(db.db_name).rate(currency, date)
+            except ValueError as e:
+                raise ValidationError(f"Transaction not added: {e}")
 
         transaction = Transaction(
             amount=amount,
             type=type,
             category=category,
             date=date,
-            user_id=user_id
+            user_id=user_id,
+            note=note,
+            currency=currency
         )
         transaction_id = db.create(transaction)
         click.echo(f"Transaction added successfully with ID {transaction_id}")
+        if type == 'expense':
+            try:
+                status = BudgetModel(db.db_name).check(user_id, date[:7], category)
+            except Exception as e:
+                # The transaction is stored; only the budget warning is lost
+                click.echo(f"Warning: budget check failed: {e}")
+                logger.warning(f"Budget check after adding transaction {transaction_id} failed: {e}")
+            else:
+                if status.over_budget:
+                    click.echo(f"Warning: {category} budget for {date[:7]} exceeded: "
+                               f"{status.spent:.2f} of {status.monthly_limit:.2f}")
         logger.info(f"Added transaction: {amount} {type} in {category} for user {user_id}")
 
 
@@ -134,10 +177,12 @@ def add(amount, type, category, date, user_id):
 @click.option('--user-id', type=str, default='default_user', help='User ID')
 @click.option('--start-date', type=str, help='Start date for filtering (YYYY-MM-DD)')
 @click.option('--end-date', type=str, help='End date for filtering (YYYY-MM-DD)')
-def list(user_id, start_date, end_date):
+@click.option('--category', type=str, default=None, help='Only this category and its subcategories')
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='text', help='Output format')
+def list(user_id, start_date, end_date, category, output_format):
     """List transactions for a user, optionally filtered by date range."""
     try:
-        db = get_db()
+        db = get_db(read_only=True)
 
         # Validate date formats if provided
         validate_user_id(user_id)
@@ -148,18 +193,19 @@ def list(user_id, start_date, end_date):
         if start_date and end_date:
             validate_date_range(start_date, end_date)    
         
-        transactions = db.read_all(user_id, start_date, end_date)
-        if not transactions:
+        transactions = db.read_all(user_id, start_date, end_date, category and normalize_category(category))
+        if not transactions and output_format in ('text', 'table'):
             click.echo(f"No transactions found for user {user_id}")
             logger.info(f"No transactions found for user {user_id}")
             return
 
-        click.echo(f"\nTransactions for user {user_id}:")
-        click.echo("-" * 50)
-        for idx, t in enumerate(transactions, start=1):
-            click.echo(f"ID: {idx}, Amount: {t.amount:.2f}, Type: {t.type}, "
-                      f"Category: {t.category}, Date: {t.date}")
-        click.echo("-" * 50)
+        rows = ({column: getattr(t, column) for column in LIST_COLUMNS} for t in transactions)
+        chunks = format_rows(rows, LIST_COLUMNS, output_format, transaction_line,
+                             f"Transactions for user {user_id}", numeric=('id', 'amount'))
+        if output_format == 'text':
+            rule = "-" * 50 + "\n"
+            chunks = itertools.chain([f"\nTransactions for user {user_id}:\n", rule], chunks, [rule])
+        emit(chunks, lines=len(transactions) + 4)
         logger.info(f"Listed {len(transactions)} transactions for user {user_id}")
     except ValueError as e:
         click.echo(f"Error: {e}")
@@ -173,10 +219,16 @@ def list(user_id, start_date, end_date):
 @click.option('--start-date', type=str, help='Start date for summary (YYYY-MM-DD)')
 @click.option('--end-date', type=str, help='End date for summary (YYYY-MM-DD)')
 @click.option('--month', type=str, help='Specify month (e.g. 2025-07), takes precedence over start/end-date')
-def summary(user_id, start_date, end_date, month):
+@click.option('--currency', type=str, default=None, help='Reporting currency (default: MONEYTRACKER_REPORT_CURRENCY)')
+@click.option('--category', type=str, default=None, help='Only this category and its subcategories, e.g. "Food > Groceries"')
+@click.option('--depth', type=click.IntRange(min=1), default=None, help='Roll the category breakdown up to this level')
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='Aggregate large histories on up to N connections in parallel (default: MONEYTRACKER_SUMMARY_WORKERS)')
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='text', help='Output format')
+def summary(user_id, start_date, end_date, month, currency, category, depth, workers, output_format):
     """Display basic statistics for a user's transactions."""
     try:
-        db = get_db()
+        tracker = get_tracker(read_only=True)
 
         # Validate date formats if provided
         validate_user_id(user_id)
@@ -203,29 +255,36 @@ def summary(user_id, start_date, end_date, month):
         if start_date and end_date:
             validate_date_range(start_date, end_date)
 
-        transactions = db.read_all(user_id, start_date, end_date)
-        if not transactions:
+        # A month is matched on the integer month_num index rather than as a date range
+        summary_data = tracker.get_summary(user_id, None if month else start_date, None if month else end_date,
+                                           currency, category, depth, month, workers)
+        if not category:
+            summary_data = add_projection(tracker, user_id, summary_data, end_date)
+        if output_format not in ('text', 'table'):
+            write_summary(user_id, summary_data, output_format)
+            return
+        if summary_data['transaction_count'] == 0:
             click.echo(f"No transactions found for user {user_id}")
             logger.info(f"No transactions found for summary for user {user_id}")
             return
 
-        total_income = sum(t.amount for t in transactions if t.type == 'income')
-        total_expense = sum(t.amount for t in transactions if t.type == 'expense')
-        balance = total_income - total_expense
-        category_summary = {}
-        for t in transactions:
-            category_summary[t.category] = category_summary.get(t.category, 0) + t.amount
-
-        click.echo(f"\nSummary for user {user_id}:")
-        click.echo("-" * 50)
-        click.echo(f"Total Income: {total_income:.2f}")
-        click.echo(f"Total Expense: {total_expense:.2f}")
-        click.echo(f"Balance: {balance:.2f}")
-        click.echo("\nCategory Breakdown:")
-        for category, amount in category_summary.items():
-            click.echo(f"{category}: {amount:.2f}")
-        click.echo("-" * 50)
-        logger.info(f"Generated summary for user {user_id}: Income={total_income}, Expense={total_expense}")
+        if output_format == 'table':
+            for table in summary_tables(user_id, summary_data):
+                Console().print(table)
+        else:
+            lines = [f"\nSummary for user {user_id} ({summary_data['currency']}):",
+                     "-" * 50,
+                     f"Total Income: {summary_data['total_income']:.2f}",
+                     f"Total Expense: {summary_data['total_expense']:.2f}",
+                     f"Balance: {summary_data['balance']:.2f}"]
+            if 'projected_balance' in summary_data:
+                lines.append(f"Projected Balance ({summary_data['month_end']}): {projection_text(summary_data)}")
+            lines.append("\nCategory Breakdown:")
+            lines += [f"{category}: {amount:.2f}" for category, amount in summary_data['category_summary'].items()]
+            lines.append("-" * 50)
+            emit(["\n".join(lines) + "\n"], lines=len(lines) + 2)
+        logger.info(f"Generated summary for user {user_id}: Income={summary_data['total_income']}, "
+                    f"Expense={summary_data['total_expense']}")
     except ValueError as e:
         click.echo(f"Error: {e}")
         logger.error(f"Failed to generate summary: {e}")
@@ -239,4 +298,796 @@ def summary(user_id, start_date, end_date, month):
 
     db_path = os.getenv("MONEYTRACKER_DB", "moneytracker.db")
     return TransactionModel(db_name=db_path)
-     
\ No newline at end of file
+
+@click.command('monthly-report')
+@click.option('--user-id', type=str, help='User ID (omit together with --all-users)')
+@click.option('--all-users', is_flag=True, help='Generate the report for every user with transactions in the month')
+@click.option('--month', type=str, required=True, help='Report month (e.g. 2025-07)')
+@click.option('--output-dir', type=str, default='reports', help='Directory for the Markdown reports and charts')
+@click.option('--pdf', is_flag=True, help='Also export each report as PDF')
+@click.option('--workers', type=int, default=None, help='Chart rendering processes (default: CPU count)')
+def monthly_report(user_id, all_users, month, output_dir, pdf, workers):
+    """Render the monthly Markdown report from templates/monthly_report_template.md."""
+    from views.monthly_report import generate_monthly_report, generate_monthly_reports_for_all_users
+    try:
+        if all_users == bool(user_id):
+            raise ValidationError("Specify exactly one of --user-id or --all-users")
+        validate_month(month)
+        tracker = get_tracker(read_only=True)
+        if all_users:
+            written = generate_monthly_reports_for_all_users(tracker, month, output_dir, pdf, workers)
+            if not written:
+                click.echo(f"No transactions found for {month}")
+                return
+            click.echo(f"Generated {len(written)} monthly reports in {output_dir}")
+        else:
+            validate_user_id(user_id)
+            path = generate_monthly_report(tracker, user_id, month, output_dir, pdf, workers or 3)
+            if path is None:
+                click.echo(f"No transactions found for user {user_id} in {month}")
+                return
+            click.echo(f"Monthly report written to: {path}")
+        logger.info(f"Generated monthly report for {'all users' if all_users else user_id} ({month})")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate monthly report: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate monthly report: {e}")
+
+@click.command()
+@click.option('--user-id', type=str, help='User ID (omit together with --all-users)')
+@click.option('--all-users', is_flag=True, help='Render a dashboard for every user with transactions in the period')
+@click.option('--start-date', type=str, help='Start date (YYYY-MM-DD, default: first day of the month a year ago)')
+@click.option('--end-date', type=str, help='End date (YYYY-MM-DD, default: today)')
+@click.option('--output-dir', type=str, default='dashboards', help='Directory for the dashboard images')
+@click.option('--layout', type=click.Choice(['composite', 'separate']), default='composite',
+              help='One image with all panels, or one image per panel')
+@click.option('--format', 'image_format', type=click.Choice(['png', 'svg']), default='png', help='Image format')
+@click.option('--top', type=int, default=5, help='Number of categories in the top categories panel')
+@click.option('--workers', type=int, default=None, help='Rendering processes (default: CPU count)')
+def dashboard(user_id, all_users, start_date, end_date, output_dir, layout, image_format, top, workers):
+    """Render category, income vs expense, trend and top category panels from one aggregation."""
+    from views.dashboard import generate_dashboards
+    try:
+        if all_users == bool(user_id):
+            raise ValidationError("Specify exactly one of --user-id or --all-users")
+        if user_id:
+            validate_user_id(user_id)
+        today = datetime.now()
+        end_date = end_date or today.strftime('%Y-%m-%d')
+        start_date = start_date or f"{today.year - 1:04d}-{today.month:02d}-01"
+        validate_date(start_date)
+        validate_date(end_date)
+        validate_date_range(start_date, end_date)
+        if top < 1:
+            raise ValidationError("--top must be at least 1")
+        written = generate_dashboards(get_tracker(read_only=True), user_id, start_date, end_date,
+                                      output_dir, layout, image_format, workers, top)
+        if not written:
+            click.echo(f"No transactions found between {start_date} and {end_date}")
+            return
+        if user_id:
+            for path in written[user_id]:
+                click.echo(f"Dashboard written to: {path}")
+        else:
+            click.echo(f"Generated {len(written)} dashboards in {output_dir}")
+        logger.info(f"Generated dashboards for {'all users' if all_users else user_id} "
+                    f"({start_date} to {end_date})")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate dashboard: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate dashboard: {e}")
+
+@click.command('admin-summary')
+@click.option('--start-date', type=str, help='Start date (YYYY-MM-DD)')
+@click.option('--end-date', type=str, help='End date (YYYY-MM-DD)')
+@click.option('--top', type=int, default=3, help='Top expense categories per user')
+@click.option('--format', 'output_format', type=click.Choice(['csv', 'table', 'json', 'jsonl']), default='csv', help='Output format')
+@click.option('--output', type=str, default=None, help='Write to this file instead of stdout')
+@click.option('--shard', 'shards', type=click.Path(exists=True, dir_okay=False), multiple=True,
+              help='Another database file holding part of the data (repeatable)')
+@click.option('--workers', type=int, default=None, help='Processes aggregating shards (default: CPU count)')
+def admin_summary(start_date, end_date, top, output_format, output, shards, workers):
+    """Income, expense, balance and top categories of every user in one pass."""
+    from views.admin_summary import write_admin_summary
+    try:
+        if start_date:
+            validate_date(start_date)
+        if end_date:
+            validate_date(end_date)
+        if start_date and end_date:
+            validate_date_range(start_date, end_date)
+        if top < 1:
+            raise ValidationError("--top must be at least 1")
+        totals = write_admin_summary(get_tracker(read_only=True), start_date, end_date, top, output_format,
+                                     output, [*shards] or None, workers)
+        if output:
+            click.echo(f"Admin summary of {totals.user_count} users written to: {output}")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate admin summary: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate admin summary: {e}")
+
+@click.command()
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+@click.option('--period', type=click.Choice(['daily', 'weekly', 'monthly']), default='monthly', help='Period length')
+@click.option('--start-date', type=str, help='Start date (YYYY-MM-DD)')
+@click.option('--end-date', type=str, help='End date (YYYY-MM-DD)')
+@click.option('--window', type=int, default=None, help='Rolling average window in periods (default: 7 daily, 4 weekly, 3 monthly)')
+@click.option('--format', 'output_format', type=click.Choice(['table', 'csv', 'chart']), default='table', help='Output format')
+@click.option('--output', type=str, default=None, help='Output file for csv/chart formats')
+def trend(user_id, period, start_date, end_date, window, output_format, output):
+    """Show income, expense, net and running balance over time."""
+    from views.trend import display_trend_table, write_trend_csv, plot_trend
+    try:
+        validate_user_id(user_id)
+        if start_date:
+            validate_date(start_date)
+        if end_date:
+            validate_date(end_date)
+        if start_date and end_date:
+            validate_date_range(start_date, end_date)
+
+        rows = get_tracker(read_only=True).get_trend(user_id, period, start_date, end_date, window)
+        if not rows:
+            click.echo(f"No transactions found for user {user_id}")
+            return
+
+        title = f"{period.capitalize()} trend for user {user_id}"
+        if output_format == 'csv':
+            if output:
+                with open(output, 'w', newline='', encoding='utf-8') as f:
+                    write_trend_csv(rows, f)
+                click.echo(f"Trend CSV written to: {output}")
+            else:
+                write_trend_csv(rows)
+        elif output_format == 'chart':
+            click.echo(f"Chart saved as {plot_trend(rows, title, output)}")
+        else:
+            display_trend_table(rows, title)
+        logger.info(f"Generated {period} trend for user {user_id} ({len(rows)} periods)")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate trend: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to generate trend: {e}")
+
+@click.command()
+@click.option('--user-id', type=str, default=None, help='User ID')
+@click.option('--all-users', is_flag=True, help='Forecast every user with recent transactions')
+@click.option('--as-of', type=str, default=None, help='Forecast from this day (YYYY-MM-DD, default today)')
+@click.option('--history-days', type=int, default=None, help='Days of history to fit (default 365)')
+@click.option('--confidence', type=float, default=0.95, help='Confidence level of the band')
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='text', help='Output format')
+def forecast(user_id, all_users, as_of, history_days, confidence, output_format):
+    """Project the balance at the end of the month with a confidence band."""
+    from services.tracker import FORECAST_HISTORY_DAYS
+    from views.forecast import write_forecasts
+    try:
+        if all_users == bool(user_id):
+            raise ValidationError("Give either --user-id or --all-users")
+        if user_id:
+            validate_user_id(user_id)
+        if as_of:
+            validate_date(as_of)
+        forecasts = get_tracker(read_only=True).get_forecasts(
+            None if all_users else [user_id], as_of, history_days or FORECAST_HISTORY_DAYS, confidence)
+        write_forecasts(forecasts.values(), output_format)
+        logger.info(f"Generated month-end forecasts for {len(forecasts)} users")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to forecast balance: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to forecast balance: {e}")
+
+@click.command()
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+@click.option('--start-date', type=str, help='Start date (YYYY-MM-DD)')
+@click.option('--end-date', type=str, help='End date (YYYY-MM-DD)')
+@click.option('--month', type=str, help='Specify month (e.g. 2025-07), takes precedence over start/end-date')
+@click.option('--type', type=click.Choice(['income', 'expense']), default='expense', help='Transaction type')
+@click.option('--top', type=int, default=5, help='Number of top categories and merchants')
+@click.option('--bins', type=int, default=10, help='Histogram bins per category')
+@click.option('--mode', type=click.Choice(['auto', 'exact', 'approximate']), default='auto',
+              help='Exact SQL, streaming sketches, or pick by range size')
+def stats(user_id, start_date, end_date, month, type, top, bins, mode):
+    """Show top categories and merchants, median/p90 amounts and histograms."""
+    from views.stats import display_stats
+    try:
+        validate_user_id(user_id)
+        if month:
+            start_date, end_date = validate_month(month)
+            end_date = min(end_date, datetime.now().strftime('%Y-%m-%d'))
+        if start_date:
+            validate_date(start_date)
+        if end_date:
+            validate_date(end_date)
+        if start_date and end_date:
+            validate_date_range(start_date, end_date)
+        if top < 1 or bins < 1:
+            raise ValidationError("--top and --bins must be at least 1")
+
+        tracker = get_tracker(read_only=True)
+        result = tracker.get_stats(user_id, start_date, end_date, type, top, (0.5, 0.9), bins, mode)
+        if result['count'] == 0:
+            click.echo(f"No transactions found for user {user_id}")
+            return
+        display_stats(result, f"{type.capitalize()} statistics for user {user_id}")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to compute stats: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to compute stats: {e}")
+
+@click.command()
+@click.argument('query')
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+@click.option('--start-date', type=str, help='Start date for filtering (YYYY-MM-DD)')
+@click.option('--end-date', type=str, help='End date for filtering (YYYY-MM-DD)')
+@click.option('--limit', type=int, default=100, help='Maximum number of results')
+def search(query, user_id, start_date, end_date, limit):
+    """Search transaction notes. Use word* for prefixes and "quoted text" for phrases."""
+    try:
+        validate_user_id(user_id)
+        if start_date:
+            validate_date(start_date)
+        if end_date:
+            validate_date(end_date)
+        if start_date and end_date:
+            validate_date_range(start_date, end_date)
+
+        tracker = get_tracker(read_only=True)
+        transactions = tracker.search_transactions(user_id, query, start_date, end_date, limit)
+        if not transactions:
+            click.echo(f"No transactions matching '{query}' for user {user_id}")
+            return
+
+        click.echo(f"\nTransactions matching '{query}' for user {user_id}:")
+        click.echo("-" * 50)
+        for t in transactions:
+            click.echo(f"ID: {t.id}, Amount: {t.amount:.2f}, Type: {t.type}, "
+                       f"Category: {t.category}, Date: {t.date}, Note: {t.note}")
+        click.echo("-" * 50)
+        logger.info(f"Search '{query}' returned {len(transactions)} transactions for user {user_id}")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to search transactions: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to search transactions: {e}")
+
+@click.command('import')
+@click.argument('csv_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', type=str, default='default_user', help='User ID for rows without a user_id column')
+@click.option('--skip-invalid', is_flag=True, help='Import the valid rows even if some rows are invalid')
+@click.option('--allow-duplicates', is_flag=True, help='Insert rows even if the same rows were imported before')
+def import_csv(csv_file, user_id, skip_invalid, allow_duplicates):
+    """Bulk import transactions from a CSV file (amount,type,category,date[,user_id,note,currency,external_ref])."""
+    import csv
+    try:
+        transactions = []
+        with open(csv_file, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    amount = float(row.get('amount') or '')
+                except ValueError:
+                    amount = None
+                transactions.append(Transaction(
+                    amount=amount,
+                    type=(row.get('type') or '').strip(),
+                    category=normalize_category(row.get('category') or ''),
+                    date=(row.get('date') or '').strip(),
+                    user_id=(row.get('user_id') or user_id).strip(),
+                    note=row.get('note') or None,
+                    currency=(row.get('currency') or '').strip().upper() or None,
+                    external_ref=(row.get('external_ref') or '').strip() or None
+                ))
+        inserted, report = get_tracker().import_transactions(transactions, skip_invalid, not allow_duplicates)
+        if not report.is_valid:
+            # Row numbers are reported as CSV line numbers (the header is line 1)
+            report.errors = {index + 2: errors for index, errors in report.errors.items()}
+            click.echo(report.summary())
+        if inserted == 0 and not report.is_valid and not skip_invalid:
+            click.echo("Error: Import aborted, no rows were inserted (use --skip-invalid to import valid rows)")
+            return
+        skipped = report.total - len(report.errors) - inserted
+        click.echo(f"Imported {inserted} of {report.total} transactions"
+                   + (f", skipped {skipped} already imported" if skipped else ""))
+        logger.info(f"Imported {inserted} of {report.total} transactions from {csv_file}, {skipped} duplicates skipped")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to import transactions: {e}")
+
+@click.command()
+@click.option('--user-id', type=str, default=None, help='Only this user (default: all users)')
+@click.option('--delete', is_flag=True, help='Delete all but the oldest row of each group and fingerprint the rest')
+@click.option('--limit', type=int, default=20, help='Number of duplicate groups to print')
+def dedupe(user_id, delete, limit):
+    """Find transactions with the same user, date, type, category, amount and external reference."""
+    try:
+        tracker = get_tracker()
+        groups = tracker.find_duplicates(user_id)
+        duplicates = sum(count - 1 for *_, count, _ in groups)
+        for user, date, type, category, amount, external_ref, count, ids in groups[:limit]:
+            click.echo(f"{user} {date} {type} {category} {amount:.2f}"
+                       + (f" ref {external_ref}" if external_ref else "")
+                       + f": {count} rows (IDs {', '.join(str(i) for i in ids)})")
+        if len(groups) > limit:
+            click.echo(f"... and {len(groups) - limit} more groups")
+        click.echo(f"Found {len(groups)} duplicate groups with {duplicates} extra rows")
+        if delete:
+            deleted, fingerprinted = tracker.remove_duplicates(user_id)
+            click.echo(f"Deleted {deleted} duplicate rows; fingerprinted {fingerprinted} rows for future imports")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to de-duplicate transactions: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to de-duplicate transactions: {e}")
+
+@click.command()
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+@click.option('--as-of', type=str, default=None, help='Balance at the end of this date (YYYY-MM-DD), default today')
+def balance(user_id, as_of):
+    """Show a user's balance as of a date."""
+    try:
+        validate_user_id(user_id)
+        as_of = as_of or datetime.now().strftime('%Y-%m-%d')
+        validate_date(as_of)
+        amount = get_tracker(read_only=True).get_balance_as_of(user_id, as_of)
+        click.echo(f"Balance for user {user_id} as of {as_of}: {amount:.2f}")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to get balance: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to get balance: {e}")
+
+@click.group()
+def budget():
+    """Manage monthly category budgets."""
+    pass
+
+@budget.command('set')
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+@click.option('--category', type=str, required=True, help='Category to budget')
+@click.option('--amount', type=float, required=True, help='Monthly limit')
+def budget_set(user_id, category, amount):
+    """Set the monthly budget of a category."""
+    try:
+        validate_user_id(user_id)
+        category = normalize_category(category)
+        validate_category(category)
+        validate_amount(amount)
+        get_tracker().set_budget(user_id, category, amount)
+        click.echo(f"Budget for {category} set to {amount:.2f} per month")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to set budget: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to set budget: {e}")
+
+@budget.command('list')
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+def budget_list(user_id):
+    """List a user's budgets."""
+    try:
+        validate_user_id(user_id)
+        budgets = get_tracker().budgets.get_budgets(user_id)
+        if not budgets:
+            click.echo(f"No budgets set for user {user_id}")
+            return
+        for b in budgets:
+            click.echo(f"{b.category}: {b.monthly_limit:.2f}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to list budgets: {e}")
+
+@budget.command('status')
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+@click.option('--month', type=str, default=None, help='Month (e.g. 2025-07), default current month')
+def budget_status(user_id, month):
+    """Show spending against each budget for a month."""
+    try:
+        validate_user_id(user_id)
+        month = month or datetime.now().strftime('%Y-%m')
+        statuses = get_tracker().get_budget_status(user_id, month)
+        if not statuses:
+            click.echo(f"No budgets or spending for user {user_id} in {month}")
+            return
+        click.echo(f"\nBudget status for user {user_id} ({month}):")
+        click.echo("-" * 50)
+        for s in statuses:
+            if s.monthly_limit is None:
+                click.echo(f"{s.category}: spent {s.spent:.2f} (no budget)")
+            else:
+                flag = " OVER BUDGET" if s.over_budget else ""
+                click.echo(f"{s.category}: spent {s.spent:.2f} of {s.monthly_limit:.2f}, "
+                           f"remaining {s.remaining:.2f}{flag}")
+        click.echo("-" * 50)
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to show budget status: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to show budget status: {e}")
+
+@click.group()
+def category():
+    """Browse and reorganize the category tree ("Food > Groceries" paths)."""
+    pass
+
+@category.command('tree')
+@click.option('--user-id', type=str, default=None, help='Show subtree totals of this user (default: every node, no totals)')
+@click.option('--start-date', type=str, help='Start date for totals (YYYY-MM-DD)')
+@click.option('--end-date', type=str, help='End date for totals (YYYY-MM-DD)')
+def category_tree(user_id, start_date, end_date):
+    """Print the category tree, optionally with each subtree's totals for a user."""
+    try:
+        if start_date:
+            validate_date(start_date)
+        if end_date:
+            validate_date(end_date)
+        nodes = get_tracker(read_only=True).get_category_tree(user_id, start_date, end_date)
+        if not nodes:
+            click.echo("No categories found" + (f" for user {user_id}" if user_id else ""))
+            return
+        for node in nodes:
+            line = "  " * (node.level - 1) + node.name
+            if user_id:
+                line += f": income {node.income:.2f}, expense {node.expense:.2f} ({node.count} transactions)"
+            click.echo(line)
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to show category tree: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to show category tree: {e}")
+
+@category.command('rename')
+@click.option('--path', type=str, required=True, help='Category to rename, e.g. "Food > Groceries"')
+@click.option('--name', type=str, required=True, help='New name of its last level')
+def category_rename(path, name):
+    """Rename a category; its subcategories and past transactions follow without being rewritten."""
+    try:
+        updated = get_tracker().rename_category(path, name)
+        click.echo(f"Renamed {path} to {name} ({updated} categories updated)")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to rename category: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to rename category: {e}")
+
+@category.command('move')
+@click.option('--path', type=str, required=True, help='Category to move, e.g. "Groceries"')
+@click.option('--parent', type=str, default=None, help='New parent category (default: the top level)')
+def category_move(path, parent):
+    """Move a category and its subtree under another category."""
+    try:
+        moved = get_tracker().move_category(path, parent)
+        click.echo(f"Moved {path} under {parent or 'the top level'} ({moved} categories updated)")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to move category: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to move category: {e}")
+
+@click.group()
+def recur():
+    """Manage recurring transactions (rent, salary, subscriptions)."""
+    pass
+
+@recur.command('add')
+@click.option('--amount', type=float, required=True, help='Transaction amount')
+@click.option('--type', type=click.Choice(['income', 'expense']), required=True, help='Transaction type')
+@click.option('--category', type=str, required=True, help='Transaction category')
+@click.option('--frequency', type=click.Choice(['daily', 'weekly', 'monthly', 'cron']), default='monthly', help='Repeat frequency')
+@click.option('--interval', type=int, default=1, help='Repeat every N days/weeks/months')
+@click.option('--cron', type=str, default=None, help="Cron day schedule 'dom month dow' (with --frequency cron)")
+@click.option('--start-date', type=str, required=True, help='First occurrence (YYYY-MM-DD)')
+@click.option('--end-date', type=str, default=None, help='Last possible occurrence (YYYY-MM-DD)')
+@click.option('--note', type=str, default=None, help='Optional note')
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+def recur_add(amount, type, category, frequency, interval, cron, start_date, end_date, note, user_id):
+    """Add a recurring transaction rule."""
+    from models.recurring import RecurringRule
+    try:
+        rule = RecurringRule(user_id=user_id, amount=amount, type=type, category=category, note=note,
+                             frequency=frequency, interval=interval, cron=cron,
+                             start_date=start_date, end_date=end_date)
+        rule_id = get_tracker().add_recurring_rule(rule)
+        click.echo(f"Recurring rule added with ID {rule_id}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to add recurring rule: {e}")
+
+@recur.command('list')
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+def recur_list(user_id):
+    """List a user's recurring rules."""
+    from models.recurring import RecurringModel
+    try:
+        rules = RecurringModel(get_db().db_name).get_rules(user_id)
+        if not rules:
+            click.echo(f"No recurring rules for user {user_id}")
+            return
+        for r in rules:
+            schedule = f"cron '{r.cron}'" if r.frequency == 'cron' else f"every {r.interval} {r.frequency}"
+            click.echo(f"ID: {r.id}, Amount: {r.amount:.2f}, Type: {r.type}, Category: {r.category}, "
+                       f"Schedule: {schedule}, From: {r.start_date}, Until: {r.end_date or '-'}, "
+                       f"Materialized until: {r.materialized_until or '-'}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to list recurring rules: {e}")
+
+@recur.command('delete')
+@click.option('--user-id', type=str, default='default_user', help='User ID')
+@click.option('--rule-id', type=int, required=True, help='Rule ID')
+def recur_delete(user_id, rule_id):
+    """Delete a recurring rule (transactions already created are kept)."""
+    from models.recurring import RecurringModel
+    try:
+        if RecurringModel(get_db().db_name).delete_rule(rule_id, user_id):
+            click.echo(f"Recurring rule {rule_id} deleted")
+        else:
+            click.echo(f"No recurring rule {rule_id} for user {user_id}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to delete recurring rule: {e}")
+
+@recur.command('materialize')
+@click.option('--until', type=str, default=None, help='Create occurrences up to this date (YYYY-MM-DD), default today')
+def recur_materialize(until):
+    """Create all due recurring transactions for all users (safe to re-run)."""
+    try:
+        until = until or datetime.now().strftime('%Y-%m-%d')
+        inserted, skipped = get_tracker().materialize_recurring(until)
+        click.echo(f"Created {inserted} recurring transactions up to {until} ({skipped} already existed)")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to materialize recurring transactions: {e}")
+
+@click.group()
+def fx():
+    """Manage exchange rates used to convert summaries between currencies."""
+    pass
+
+@fx.command('load')
+@click.argument('csv_file', type=click.Path(exists=True, dir_okay=False))
+def fx_load(csv_file):
+    """Load rates from a date,currency,rate CSV (rate = value of 1 unit in MONEYTRACKER_CURRENCY)."""
+    try:
+        loaded = get_tracker().fx.load_csv(csv_file)
+        click.echo(f"Loaded {loaded} FX rates")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to load FX rates: {e}")
+
+@fx.command('rate')
+@click.option('--currency', type=str, required=True, help='Currency to convert from, e.g. USD')
+@click.option('--to', 'to_currency', type=str, default=None, help='Currency to convert to (default: MONEYTRACKER_REPORT_CURRENCY)')
+@click.option('--date', type=str, default=None, help='Rate date (YYYY-MM-DD), default today')
+def fx_rate(currency, to_currency, date):
+    """Show the conversion rate used for a currency on a date."""
+    from models.fx import REPORT_CURRENCY
+    try:
+        currency = currency.upper()
+        to_currency = (to_currency or REPORT_CURRENCY).upper()
+        validate_currency(currency)
+        validate_currency(to_currency)
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        factor = get_tracker().fx.factor(currency, to_currency, date)
+        click.echo(f"1 {currency} = {factor:.6f} {to_currency} on {date}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to read FX rate: {e}")
+
+@click.command()
+@click.option('--output-dir', type=str, default='backups', help='Directory for snapshots')
+@click.option('--keep', type=int, default=7, help='Number of snapshots to keep (older ones are deleted)')
+@click.option('--compress', is_flag=True, help='Gzip the snapshot')
+@click.option('--no-verify', is_flag=True, help='Skip PRAGMA integrity_check on the snapshot')
+@click.option('--pages', type=int, default=None, help='Pages copied per step (default 1024)')
+@click.option('--sleep', type=float, default=None, help='Seconds to pause between steps (default 0.005)')
+def backup(output_dir, keep, compress, no_verify, pages, sleep):
+    """Snapshot the live database without blocking writers."""
+    from models.backup import BACKUP_STEP_PAGES, BACKUP_STEP_SLEEP, backup_database
+    try:
+        if keep < 1:
+            raise ValidationError("--keep must be at least 1")
+        db_path = os.getenv("MONEYTRACKER_DB", "moneytracker.db")
+        result = backup_database(db_path, output_dir, keep, compress, not no_verify,
+                                 pages or BACKUP_STEP_PAGES,
+                                 BACKUP_STEP_SLEEP if sleep is None else sleep)
+        click.echo(f"Backup written to {result.path} ({result.size / 1024 / 1024:.1f} MB, "
+                   f"{result.pages} pages) in {result.seconds:.1f}s, integrity check: {result.integrity}")
+        for old in result.removed or []:
+            click.echo(f"Removed old snapshot {old}")
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to back up database: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to back up database: {e}")
+
+@click.command()
+@click.argument('peer_db', type=click.Path(exists=True, dir_okay=False))
+def sync(peer_db):
+    """Exchange changes made since the last sync with another database file."""
+    from models.sync import SyncError, sync_databases
+    try:
+        db_path = os.getenv("MONEYTRACKER_DB", "moneytracker.db")
+        result = sync_databases(db_path, peer_db)
+        click.echo(f"Synced with {peer_db}: pulled {result.pulled}, pushed {result.pushed}, "
+                   f"{result.conflicts} conflicts resolved, {result.skipped} unchanged in {result.seconds:.2f}s")
+    except SyncError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to sync database: {e}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to sync database: {e}")
+
+def save_cursor(path: str, seq: int) -> None:
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(f"{seq}\n")
+    os.replace(temporary, path)
+
+@click.command()
+@click.option('--user-id', type=str, default=None, help='Only changes to this user\'s transactions')
+@click.option('--since', type=int, default=None, help='Start after this journal position (0 replays everything; default: only new changes)')
+@click.option('--cursor-file', type=str, default=None, help='Resume from the position saved in this file and keep it updated')
+@click.option('--format', 'output_format', type=click.Choice(['jsonl', 'text']), default='jsonl', help='Output format')
+@click.option('--once', is_flag=True, help='Print the pending changes and exit')
+@click.option('--timeout', type=float, default=None, help='Exit after this many seconds without changes')
+@click.option('--interval', type=float, default=None, help='Seconds between change checks (default 0.05)')
+def watch(user_id, since, cursor_file, output_format, once, timeout, interval):
+    """Stream new, updated and deleted transactions as they are committed."""
+    import json
+    import time
+    from models.journal import WATCH_POLL_INTERVAL, ChangeFeed
+    try:
+        if user_id:
+            validate_user_id(user_id)
+        if since is None and cursor_file and os.path.exists(cursor_file):
+            with open(cursor_file, encoding="utf-8") as f:
+                since = int(f.read().strip() or 0)
+        db_path = os.getenv("MONEYTRACKER_DB", "moneytracker.db")
+        get_db()  # Creates or migrates the file so the journal exists
+        feed = ChangeFeed(db_path, since, user_id, WATCH_POLL_INTERVAL if interval is None else interval)
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to watch changes: {e}")
+        return
+    last = saved = feed.cursor
+    saved_at = time.monotonic()
+    try:
+        for event in (feed.poll() if once else feed.follow(timeout)):
+            if output_format == 'jsonl':
+                click.echo(json.dumps(event.to_dict(), ensure_ascii=False))
+            elif event.transaction is None:
+                click.echo(f"[{event.seq}] {event.op} ID: {event.transaction_id} (user {event.user_id}, deleted)")
+            else:
+                click.echo(f"[{event.seq}] {event.op} {transaction_line(event.to_dict()['transaction'])}")
+            last = event.seq
+            if cursor_file and time.monotonic() - saved_at >= 1:
+                save_cursor(cursor_file, last)
+                saved, saved_at = last, time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to watch changes: {e}")
+    finally:
+        if cursor_file and (last != saved or not os.path.exists(cursor_file)):
+            save_cursor(cursor_file, last)
+        feed.close()
+        logger.info(f"Watched changes up to journal position {last} ({feed.wakeups} wake-ups)")
+
+@click.group()
+def cache():
+    """Inspect or clear the chart and report artifact cache, and manage per-user column caches."""
+    pass
+
+@cache.command('stats')
+def cache_stats():
+    """Show the cache size and location."""
+    from utils.artifact_cache import default_cache
+    stats = default_cache().stats()
+    click.echo(f"Artifact cache {default_cache().directory}: {stats['entries']} files, "
+               f"{stats['bytes'] / 1024 / 1024:.1f} of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+
+@cache.command('clear')
+def cache_clear():
+    """Delete every cached artifact."""
+    from utils.artifact_cache import default_cache
+    try:
+        click.echo(f"Removed {default_cache().clear()} cached artifacts")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to clear artifact cache: {e}")
+
+@cache.command('columns')
+@click.option('--user-id', type=str, required=True, help='User ID')
+@click.option('--drop', is_flag=True, help="Delete the user's column files instead")
+def cache_columns(user_id, drop):
+    """Build memory-mapped column files of a user's history for fast summaries and reports."""
+    try:
+        tracker = get_tracker(read_only=True)
+        if drop:
+            dropped = tracker.drop_column_cache(user_id)
+            click.echo(f"Removed column cache of user {user_id}" if dropped else f"No column cache for user {user_id}")
+            return
+        rows = tracker.build_column_cache(user_id)
+        click.echo(f"Column cache of user {user_id}: {rows} transactions in {tracker.columns.directory}")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to update column cache: {e}")
+
+@click.command()
+@click.option('--analyze', is_flag=True, help='Rebuild planner statistics with ANALYZE')
+@click.option('--optimize', is_flag=True, help='Run PRAGMA optimize (cheap; suits every scheduled run)')
+@click.option('--vacuum', is_flag=True, help='Return free pages to the filesystem and truncate the WAL')
+@click.option('--vacuum-pages', type=int, default=None, help='Release at most this many pages per run')
+@click.option('--integrity', is_flag=True, help='Run PRAGMA quick_check')
+@click.option('--plans', 'show_plans', is_flag=True, help='Print the query plan of every checked query')
+@click.option('--quiet', is_flag=True, help='Print only problems (for cron)')
+@click.option('--strict', is_flag=True, help='Exit with status 1 when problems are found')
+def doctor(analyze, optimize, vacuum, vacuum_pages, integrity, show_plans, quiet, strict):
+    """Report database health and run ANALYZE/VACUUM maintenance."""
+    from models.maintenance import run_doctor
+    try:
+        if vacuum_pages is not None and vacuum_pages < 1:
+            raise ValidationError("--vacuum-pages must be at least 1")
+        db_path = os.getenv("MONEYTRACKER_DB", "moneytracker.db")
+        get_db()  # Creates or migrates the file so every checked table exists
+        report = run_doctor(db_path, analyze, optimize, vacuum, vacuum_pages, integrity)
+    except ValidationError as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to check database: {e}")
+        return
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        logger.error(f"Failed to check database: {e}")
+        return
+    problems = report.problems()
+    if not quiet:
+        mb = 1024 * 1024
+        click.echo(f"Database {report.path}: {report.file_size / mb:.1f} MB file, {report.wal_size / mb:.1f} MB WAL, "
+                   f"{report.page_count} pages of {report.page_size} bytes")
+        click.echo(f"Free pages: {report.freelist_count} ({report.freelist_ratio:.1%}), "
+                   f"auto_vacuum: {report.auto_vacuum}, planner statistics: {'yes' if report.has_statistics else 'no'}")
+        if report.integrity is not None:
+            click.echo(f"Integrity: {report.integrity}")
+        for index in report.indexes:
+            click.echo(f"  index {index.name} on {index.table}: {index.size / mb:.1f} MB ({index.pages} pages)")
+        for check in report.plans:
+            if check.error:
+                status = f"skipped ({check.error})"
+            elif check.flagged:
+                status = "FULL SCAN of " + ", ".join(check.full_scans)
+            else:
+                status = "full scan (expected)" if check.full_scans else "ok"
+            click.echo(f"  plan {check.name}: {status}")
+            if show_plans:
+                for line in check.plan:
+                    click.echo(f"      {line}")
+        for step in report.steps:
+            click.echo(f"Step {step.step}: {step.seconds:.3f}s" + (f" ({step.detail})" if step.detail else ""))
+    for problem in problems:
+        click.echo(f"Problem: {problem}")
+    if not problems and not quiet:
+        click.echo("No problems found")
+    if problems and strict:
+        raise SystemExit(1)
@@ -1,5 +1,5 @@
 import click
-from cli.commands import add, list, summary, plot, report, report_pdf
+from cli.commands import add, list, summary, plot, report, report_pdf, monthly_report, dashboard, admin_summary, trend, forecast, search, import_csv, dedupe, balance, budget, category, recur, fx, stats, backup, sync, watch, doctor, cache
 @click.group()
 def cli():
     """MoneyTracker: A command-line personal accounting tool."""
@@ -10,6 +10,25 @@ cli.add_command(summary)
 cli.add_command(plot)
 cli.add_command(report)
 cli.add_command(report_pdf)
+cli.add_command(monthly_report)
+cli.add_command(dashboard)
+cli.add_command(admin_summary)
+cli.add_command(trend)
+cli.add_command(forecast)
+cli.add_command(search)
+cli.add_command(import_csv)
+cli.add_command(dedupe)
+cli.add_command(balance)
+cli.add_command(budget)
+cli.add_command(category)
+cli.add_command(recur)
+cli.add_command(fx)
+cli.add_command(stats)
+cli.add_command(backup)
+cli.add_command(sync)
+cli.add_command(watch)
+cli.add_command(doctor)
+cli.add_command(cache)
 
 if __name__ == "__main__":
     cli()
\ No newline at end of file
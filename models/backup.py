@@ -0,0 +1,115 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+from models.database import connect
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Pages copied per backup step (4 MB with the default 4 KB page size) and the pause
+# between steps, during which writers get the database to themselves
+BACKUP_STEP_PAGES = 1024
+BACKUP_STEP_SLEEP = 0.005
+
+class BackupError(Exception):
+    """Raised when a snapshot cannot be written or fails verification."""
+    pass
+
+@dataclass
+class BackupResult:
+    """One written snapshot."""
+    path: str = ""
+    pages: int = 0
+    size: int = 0
+    seconds: float = 0.0
+    integrity: str = "not checked"
+    removed: Optional[List[str]] = None
+
+def snapshot_prefix(db_name: str) -> str:
+    return os.path.splitext(os.path.basename(db_name))[0] + "-"
+
+def list_snapshots(db_name: str, output_dir: str) -> List[str]:
+    """Snapshots of db_name in output_dir, oldest first (names sort by timestamp)."""
+    if not os.path.isdir(output_dir):
+        return []
+    prefix = snapshot_prefix(db_name)
+    return [os.path.join(output_dir, name) for name in sorted(os.listdir(output_dir))
+            if name.startswith(prefix) and (name.endswith(".db") or name.endswith(".db.gz"))]
+
+def check_integrity(path: str) -> str:
+    """Result of PRAGMA integrity_check on a plain snapshot file ("ok" when healthy)."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("PRAGMA integrity_check").fetchall()
+        return "; ".join(row[0] for row in rows)
+    finally:
+        conn.close()
+
+def backup_database(db_name: str, output_dir: str = "backups", keep: Optional[int] = 7,
+                    compress: bool = False, verify: bool = True, pages: int = BACKUP_STEP_PAGES,
+                    sleep: float = BACKUP_STEP_SLEEP,
+                    progress: Optional[Callable[[int, int, int], None]] = None) -> BackupResult:
+    """Snapshot a live database with the online backup API, then verify, compress and rotate.
+
+    The copy runs in steps of pages pages and sleeps between steps so concurrent
+    add traffic keeps committing. A read transaction is held on the source for the
+    whole copy, so in WAL mode the snapshot is consistent as of its start and
+    commits made meanwhile do not restart it. Only keep snapshots are retained.
+    """
+    if not os.path.exists(db_name):
+        raise BackupError(f"Database not found: {db_name}")
+    if pages < 1:
+        raise BackupError("pages must be at least 1")
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    path = os.path.join(output_dir, f"{snapshot_prefix(db_name)}{stamp}.db")
+    partial = path + ".partial"
+    result = BackupResult(path=path)
+    start = time.perf_counter()
+    source = connect(db_name)
+    target = sqlite3.connect(partial)
+    try:
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages, progress=progress, sleep=sleep)
+        source.rollback()
+        result.pages = target.execute("PRAGMA page_count").fetchone()[0]
+        # Snapshots are standalone files; keep them out of WAL mode
+        target.execute("PRAGMA journal_mode = DELETE")
+    except sqlite3.Error as e:
+        target.close()
+        os.remove(partial)
+        logger.error(f"Backup of {db_name} failed: {e}")
+        raise BackupError(f"Backup failed: {e}")
+    finally:
+        source.close()
+        target.close()
+
+    if verify:
+        result.integrity = check_integrity(partial)
+        if result.integrity != "ok":
+            os.remove(partial)
+            logger.error(f"Backup of {db_name} failed integrity check: {result.integrity}")
+            raise BackupError(f"Snapshot failed integrity check: {result.integrity}")
+    if compress:
+        with open(partial, "rb") as src, gzip.open(partial + ".gz", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(partial)
+        partial, result.path = partial + ".gz", path + ".gz"
+    os.replace(partial, result.path)
+    result.size = os.path.getsize(result.path)
+    result.seconds = time.perf_counter() - start
+
+    if keep is not None:
+        snapshots = list_snapshots(db_name, output_dir)
+        result.removed = snapshots[:max(0, len(snapshots) - keep)]
+        for old in result.removed:
+            os.remove(old)
+    logger.info(f"Backed up {db_name} to {result.path} ({result.pages} pages, {result.size} bytes) "
+                f"in {result.seconds:.2f}s, integrity: {result.integrity}")
+    return result
@@ -0,0 +1,143 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional
+from models.database import check_fx_rates, connect, fx_foreign_sql, run_with_retry
+from models.transaction import TransactionModel
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# The counters hold expenses stored without a currency; the month's expenses in
+# other currencies are added converted per (currency, date), read through
+# idx_transactions_foreign. Neither read depends on the number of
+# default-currency transactions.
+FOREIGN_SPEND_FILTER = "user_id = :user_id AND type = 'expense' AND date BETWEEN :month || '-01' AND :month || '-31'"
+CHECK_BUDGET_SQL = f"""
+    SELECT (SELECT monthly_limit FROM budgets WHERE user_id = :user_id AND category = :category),
+           COALESCE((SELECT spent FROM category_spend
+                     WHERE user_id = :user_id AND month = :month AND category = :category), 0)
+           + (SELECT COALESCE(SUM(amount), 0)
+              FROM ({fx_foreign_sql("", FOREIGN_SPEND_FILTER + " AND category = :category")}))
+"""
+BUDGET_STATUS_SQL = f"""
+    SELECT category, MAX(monthly_limit), SUM(spent) FROM (
+        SELECT category, monthly_limit, 0 AS spent FROM budgets WHERE user_id = :user_id
+        UNION ALL
+        SELECT category, NULL, spent FROM category_spend WHERE user_id = :user_id AND month = :month
+        UNION ALL
+        SELECT category, NULL, amount FROM ({fx_foreign_sql("category", FOREIGN_SPEND_FILTER, "category")})
+    )
+    GROUP BY category
+    HAVING MAX(monthly_limit) IS NOT NULL OR SUM(spent) != 0
+    ORDER BY category
+"""
+
+@dataclass
+class Budget:
+    """Monthly spending limit for one category of a user."""
+    user_id: str = ""
+    category: str = ""
+    monthly_limit: float = 0.0
+
+@dataclass
+class BudgetStatus:
+    """Spending against a budget for one (user, month, category)."""
+    category: str = ""
+    monthly_limit: Optional[float] = None
+    spent: float = 0.0
+
+    @property
+    def remaining(self) -> Optional[float]:
+        return None if self.monthly_limit is None else self.monthly_limit - self.spent
+
+    @property
+    def over_budget(self) -> bool:
+        return self.monthly_limit is not None and self.spent > self.monthly_limit
+
+class BudgetModel:
+    """Budgets table plus reads of the trigger-maintained category_spend counters."""
+    def __init__(self, db_name: str = "moneytracker.db"):
+        self.db_name = db_name
+        self._ensure_table()
+
+    def _ensure_table(self):
+        """Ensure the budgets table and the transaction schema (with spend counters) exist."""
+        TransactionModel(self.db_name)
+        try:
+            with connect(self.db_name) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS budgets (
+                        user_id TEXT NOT NULL,
+                        category TEXT NOT NULL,
+                        monthly_limit REAL NOT NULL CHECK (monthly_limit > 0),
+                        PRIMARY KEY (user_id, category)
+                    )
+                """)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error creating budgets table: {e}")
+            raise
+
+    def set_budget(self, budget: Budget) -> None:
+        """Create or replace the monthly limit of a category."""
+        def write():
+            with connect(self.db_name) as conn:
+                conn.execute("""
+                    INSERT INTO budgets (user_id, category, monthly_limit) VALUES (?, ?, ?)
+                    ON CONFLICT (user_id, category) DO UPDATE SET monthly_limit = excluded.monthly_limit
+                """, (budget.user_id, budget.category, budget.monthly_limit))
+                conn.commit()
+        try:
+            run_with_retry(write)
+            logger.info(f"Set budget {budget.monthly_limit} for {budget.category} of user {budget.user_id}")
+        except sqlite3.Error as e:
+            logger.error(f"Error setting budget: {e}")
+            raise
+
+    def delete_budget(self, user_id: str, category: str) -> bool:
+        def write() -> int:
+            with connect(self.db_name) as conn:
+                cursor = conn.execute("DELETE FROM budgets WHERE user_id = ? AND category = ?", (user_id, category))
+                conn.commit()
+                return cursor.rowcount
+        try:
+            return run_with_retry(write) > 0
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting budget: {e}")
+            raise
+
+    def get_budgets(self, user_id: str) -> List[Budget]:
+        try:
+            with connect(self.db_name) as conn:
+                rows = conn.execute("""
+                    SELECT user_id, category, monthly_limit FROM budgets
+                    WHERE user_id = ? ORDER BY category
+                """, (user_id,)).fetchall()
+                return [Budget(*row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Error reading budgets: {e}")
+            raise
+
+    def check(self, user_id: str, month: str, category: str) -> BudgetStatus:
+        """Spend and limit for one category in DEFAULT_CURRENCY, independent of the row count."""
+        try:
+            with connect(self.db_name) as conn:
+                check_fx_rates(conn, f"{month}-01", f"{month}-31", " AND user_id = ? AND category = ?",
+                               (user_id, category))
+                row = conn.execute(CHECK_BUDGET_SQL,
+                                   {"user_id": user_id, "month": month, "category": category}).fetchone()
+                return BudgetStatus(category, row[0], row[1])
+        except sqlite3.Error as e:
+            logger.error(f"Error checking budget: {e}")
+            raise
+
+    def status(self, user_id: str, month: str) -> List[BudgetStatus]:
+        """Every budgeted or spent-in category of the month, from the counters and the month's foreign rows."""
+        try:
+            with connect(self.db_name) as conn:
+                check_fx_rates(conn, f"{month}-01", f"{month}-31", " AND user_id = ?", (user_id,))
+                rows = conn.execute(BUDGET_STATUS_SQL, {"user_id": user_id, "month": month}).fetchall()
+                return [BudgetStatus(*row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Error reading budget status: {e}")
+            raise
@@ -0,0 +1,180 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional
+from models.database import (
+    CATEGORY_SEPARATOR, check_fx_rates, connect, connect_read_only, fx_grouped_sql, run_with_retry
+)
+from models.transaction import OPEN_END_DATE, OPEN_START_DATE, USER_FILTER_SQL, TransactionModel
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Per-node subtree totals of one user: the user's (category, type) sums joined
+# through the labels to every ancestor of each category, then to the nodes.
+# Amounts are converted to DEFAULT_CURRENCY once per (currency, date) bucket.
+# CROSS JOIN pins the join order, so the plan starts from the user's buckets
+# and never scans the tree, however small ANALYZE finds it.
+SUBTREE_TOTALS_SQL = f"""
+    WITH buckets AS (
+        SELECT category, type, SUM(amount) AS total, SUM(n) AS n
+        FROM ({fx_grouped_sql("category, type", "user_id = :user_id AND date BETWEEN :start_date AND :end_date",
+                              "category, type")})
+        GROUP BY category, type
+    ), totals AS (
+        SELECT cc.ancestor AS id,
+               COALESCE(SUM(CASE WHEN buckets.type = 'income' THEN buckets.total END), 0) AS income,
+               COALESCE(SUM(CASE WHEN buckets.type = 'expense' THEN buckets.total END), 0) AS expense,
+               SUM(buckets.n) AS n
+        FROM buckets
+        CROSS JOIN category_labels AS l ON l.label = buckets.category
+        CROSS JOIN category_closure AS cc ON cc.descendant = l.category_id
+        GROUP BY cc.ancestor
+    )
+    SELECT c.id, c.path, c.name, c.level, totals.income, totals.expense, totals.n
+    FROM totals CROSS JOIN categories AS c ON c.id = totals.id
+    ORDER BY c.path
+"""
+CATEGORY_TREE_SQL = "SELECT id, path, name, level FROM categories ORDER BY path"
+# Node ids of the subtree rooted at node :id, itself included
+SUBTREE_IDS_SQL = "SELECT descendant FROM category_closure WHERE ancestor = :id"
+
+
+@dataclass
+class CategoryNode:
+    """One node of the category tree, with the totals of its whole subtree when read for a user."""
+    id: int = 0
+    path: str = ""
+    name: str = ""
+    level: int = 1
+    income: float = 0.0
+    expense: float = 0.0
+    count: int = 0
+
+
+class CategoryModel:
+    """The category tree: nodes, their closure rows and the labels transactions point at.
+
+    Nodes and labels are created by triggers as transactions are written, so
+    this model only reads the tree and renames or moves nodes. Both edits touch
+    the nodes and closure rows of one subtree and leave transactions alone.
+    """
+    def __init__(self, db_name: str = "moneytracker.db", read_only: bool = False):
+        self.db_name = db_name
+        self.read_only = read_only
+        if not read_only:
+            TransactionModel(db_name)
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect_read_only(self.db_name) if self.read_only else connect(self.db_name)
+
+    def tree(self) -> List[CategoryNode]:
+        """Every node in depth-first order (paths sort parents before their children)."""
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(CATEGORY_TREE_SQL).fetchall()
+                return [CategoryNode(*row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Error reading category tree: {e}")
+            raise
+
+    def subtree_totals(self, user_id: str, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> List[CategoryNode]:
+        """Nodes the user has transactions under, each with the income, expense and count of its subtree."""
+        try:
+            with self._connect() as conn:
+                check_fx_rates(conn, start_date, end_date, USER_FILTER_SQL, (user_id,))
+                rows = conn.execute(SUBTREE_TOTALS_SQL, {"user_id": user_id, "start_date": start_date or OPEN_START_DATE,
+                                                         "end_date": end_date or OPEN_END_DATE}).fetchall()
+                logger.info(f"Read subtree totals of {len(rows)} categories for user: {user_id}")
+                return [CategoryNode(*row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Error reading category totals: {e}")
+            raise
+
+    @staticmethod
+    def _node(conn: sqlite3.Connection, path: str) -> tuple:
+        row = conn.execute("SELECT id, name, level FROM categories WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            raise ValueError(f"Category {path} not found")
+        return row
+
+    @staticmethod
+    def _repath(conn: sqlite3.Connection, node_id: int, old_path: str, new_path: str, level_change: int) -> int:
+        """Rewrite the paths (and levels) of a subtree whose root moves from old_path to new_path."""
+        params = {"id": node_id, "old": old_path, "new": new_path, "change": level_change}
+        clash = conn.execute(f"""
+            SELECT c.path FROM categories AS c
+            JOIN categories AS s ON c.path = :new || substr(s.path, length(:old) + 1)
+            WHERE s.id IN ({SUBTREE_IDS_SQL}) AND c.id NOT IN ({SUBTREE_IDS_SQL})
+            LIMIT 1
+        """, params).fetchone()
+        if clash:
+            raise ValueError(f"Category {clash[0]} already exists")
+        return conn.execute(f"""
+            UPDATE categories SET path = :new || substr(path, length(:old) + 1), level = level + :change
+            WHERE id IN ({SUBTREE_IDS_SQL})
+        """, params).rowcount
+
+    def rename(self, path: str, new_name: str) -> int:
+        """Rename the node at path; its descendants' paths follow. Returns the number of nodes updated."""
+        def write() -> int:
+            with connect(self.db_name) as conn:
+                node_id, name, _ = self._node(conn, path)
+                new_path = path[:len(path) - len(name)] + new_name
+                updated = self._repath(conn, node_id, path, new_path, 0)
+                conn.execute("UPDATE categories SET name = ? WHERE id = ?", (new_name, node_id))
+                conn.commit()
+                return updated
+        try:
+            updated = run_with_retry(write)
+            logger.info(f"Renamed category {path} to {new_name} ({updated} nodes)")
+            return updated
+        except sqlite3.Error as e:
+            logger.error(f"Error renaming category: {e}")
+            raise
+
+    def move(self, path: str, new_parent: Optional[str] = None, max_depth: Optional[int] = None) -> int:
+        """Move the node at path under new_parent (None: to the top level). Returns the number of nodes moved.
+
+        The subtree's closure rows to its old ancestors are replaced by rows to
+        the new ones; rows inside the subtree stay as they are.
+        """
+        def write() -> int:
+            with connect(self.db_name) as conn:
+                node_id, name, level = self._node(conn, path)
+                if new_parent is None:
+                    parent_id, parent_level, new_path = None, 0, name
+                else:
+                    parent_id, _, parent_level = self._node(conn, new_parent)
+                    if conn.execute("SELECT 1 FROM category_closure WHERE ancestor = ? AND descendant = ?",
+                                    (node_id, parent_id)).fetchone():
+                        raise ValueError(f"Cannot move {path} under its own subtree")
+                    new_path = new_parent + CATEGORY_SEPARATOR + name
+                level_change = parent_level + 1 - level
+                if max_depth is not None:
+                    deepest = conn.execute("""
+                        SELECT MAX(depth) FROM category_closure WHERE ancestor = ?
+                    """, (node_id,)).fetchone()[0]
+                    if parent_level + 1 + deepest > max_depth:
+                        raise ValueError(f"Category paths can have at most {max_depth} levels")
+                moved = self._repath(conn, node_id, path, new_path, level_change)
+                conn.execute(f"""
+                    DELETE FROM category_closure
+                    WHERE descendant IN ({SUBTREE_IDS_SQL}) AND ancestor NOT IN ({SUBTREE_IDS_SQL})
+                """, {"id": node_id})
+                if parent_id is not None:
+                    conn.execute("""
+                        INSERT INTO category_closure (ancestor, descendant, depth)
+                        SELECT p.ancestor, s.descendant, p.depth + s.depth + 1
+                        FROM category_closure AS p, category_closure AS s
+                        WHERE p.descendant = ? AND s.ancestor = ?
+                    """, (parent_id, node_id))
+                conn.commit()
+                return moved
+        try:
+            moved = run_with_retry(write)
+            logger.info(f"Moved category {path} under {new_parent or 'the top level'} ({moved} nodes)")
+            return moved
+        except sqlite3.Error as e:
+            logger.error(f"Error moving category: {e}")
+            raise
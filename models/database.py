@@ -1,5 +1,667 @@
 import sqlite3
 import os
+import random
+import time
+from datetime import date
+from typing import Callable, Optional, TypeVar
+from urllib.request import pathname2url
+
+T = TypeVar('T')
+
+# Seconds a connection waits on a locked database before raising "database is locked"
+DEFAULT_BUSY_TIMEOUT = float(os.getenv("MONEYTRACKER_BUSY_TIMEOUT", "30"))
+# PRAGMA synchronous level for writers: FULL (safest), NORMAL (fast, durable in WAL mode) or OFF
+DEFAULT_SYNCHRONOUS = os.getenv("MONEYTRACKER_SYNCHRONOUS", "FULL").upper()
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+# Bytes of the database file read through a memory map by read-only connections
+DEFAULT_MMAP_SIZE = int(os.getenv("MONEYTRACKER_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Stored in PRAGMA user_version by ensure_schema. Bump it whenever ensure_schema gains
+# a step, so read-only opens know an older file has to be migrated first.
+SCHEMA_VERSION = 9
+# Currency of transactions stored without one (every row written before currencies existed)
+DEFAULT_CURRENCY = os.getenv("MONEYTRACKER_CURRENCY", "CNY").upper()
+
+# Date bounds bound in place of a missing start or end of a range
+OPEN_START_DATE, OPEN_END_DATE = "0000-00-00", "9999-99-99"
+
+# Exchange rates: the value of one unit of currency in DEFAULT_CURRENCY from date on
+FX_RATES_TABLE = """
+    CREATE TABLE IF NOT EXISTS fx_rates (
+        currency TEXT NOT NULL,
+        date TEXT NOT NULL,
+        rate REAL NOT NULL CHECK (rate > 0),
+        PRIMARY KEY (currency, date)
+    ) WITHOUT ROWID
+"""
+# Value of one unit of the currency column in DEFAULT_CURRENCY on the date column,
+# at the latest rate on or before it (NULL when there is none; check with
+# FX_MISSING_SQL first). Used on rows grouped by (currency, date), so a rate is
+# looked up once per bucket, never once per transaction.
+FX_FACTOR_SQL = f"""(CASE WHEN currency = '{DEFAULT_CURRENCY.replace("'", "''")}' THEN 1.0
+                     ELSE (SELECT fx.rate FROM fx_rates AS fx
+                           WHERE fx.currency = transactions.currency AND fx.date <= transactions.date
+                           ORDER BY fx.date DESC LIMIT 1) END)"""
+# Earliest row per currency in ? .. ? (and {user_filter}) that FX_FACTOR_SQL cannot convert
+FX_MISSING_SQL = f"""
+    SELECT transactions.currency, MIN(transactions.date) FROM transactions
+    WHERE transactions.currency IS NOT NULL AND transactions.currency != '{DEFAULT_CURRENCY.replace("'", "''")}'
+      AND transactions.date >= ? AND transactions.date <= ?{{user_filter}}
+      AND NOT EXISTS (SELECT 1 FROM fx_rates AS fx
+                      WHERE fx.currency = transactions.currency AND fx.date <= transactions.date)
+    GROUP BY transactions.currency
+    ORDER BY 2 LIMIT 1
+"""
+
+# Columns added after the original table layout; applied to older databases on open.
+TRANSACTION_EXTRA_COLUMNS = {
+    'note': "TEXT",
+    'rule_id': "INTEGER",
+    'currency': "TEXT",
+    'uid': "TEXT",
+    'external_ref': "TEXT",
+    'fingerprint': "TEXT",
+}
+
+# External-content FTS5 index over transactions.note, kept in sync by triggers
+SEARCH_INDEX_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions
+    WHEN NEW.note IS NOT NULL BEGIN
+        INSERT INTO transactions_fts (rowid, note) VALUES (NEW.id, NEW.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions
+    WHEN OLD.note IS NOT NULL BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, note) VALUES ('delete', OLD.id, OLD.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF note ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, note)
+        SELECT 'delete', OLD.id, OLD.note WHERE OLD.note IS NOT NULL;
+        INSERT INTO transactions_fts (rowid, note)
+        SELECT NEW.id, NEW.note WHERE NEW.note IS NOT NULL;
+    END
+    """,
+]
+
+
+# Running-balance index: per-user net amounts summed into blocks of 1, 16, 256
+# and 4096 days (keyed by day number since 1970-01-01). Every write, back-dated
+# or not, upserts exactly one block per level, and the balance as of any day is
+# the sum of at most ~16 blocks per level, read by primary-key range seeks.
+# Only rows stored without a currency are counted: other rows are converted at
+# their own date when read, so loading rates never leaves the blocks stale.
+BALANCE_LEVELS = 4
+BALANCE_BLOCK_BITS = 4
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+DAY_NUMBER_SQL = "COALESCE(CAST(julianday({date}) - 2440587.5 AS INTEGER), 0)"
+
+BALANCE_INDEX_TABLE = """
+    CREATE TABLE balance_blocks (
+        user_id TEXT NOT NULL,
+        level INTEGER NOT NULL,
+        block INTEGER NOT NULL,
+        net REAL NOT NULL,
+        PRIMARY KEY (user_id, level, block)
+    ) WITHOUT ROWID
+"""
+
+
+def _balance_upsert(row: str, sign: str) -> str:
+    day = DAY_NUMBER_SQL.format(date=f"{row}.date")
+    delta = f"{sign}(CASE WHEN {row}.type = 'income' THEN {row}.amount ELSE -{row}.amount END)"
+    values = ", ".join(f"({row}.user_id, {level}, {day} >> {level * BALANCE_BLOCK_BITS}, {delta})"
+                       for level in range(BALANCE_LEVELS))
+    return f"""
+        INSERT INTO balance_blocks (user_id, level, block, net)
+        SELECT * FROM (VALUES {values}) WHERE {row}.currency IS NULL
+        ON CONFLICT (user_id, level, block) DO UPDATE SET net = net + excluded.net;
+    """
+
+
+BALANCE_INDEX_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS balance_blocks_ai AFTER INSERT ON transactions BEGIN"
+    + _balance_upsert("NEW", "+") + "END",
+    "CREATE TRIGGER IF NOT EXISTS balance_blocks_ad AFTER DELETE ON transactions BEGIN"
+    + _balance_upsert("OLD", "-") + "END",
+    "CREATE TRIGGER IF NOT EXISTS balance_blocks_au "
+    "AFTER UPDATE OF amount, type, date, user_id, currency ON transactions BEGIN"
+    + _balance_upsert("OLD", "-") + _balance_upsert("NEW", "+") + "END",
+]
+BALANCE_INDEX_TRIGGERS = ('balance_blocks_ai', 'balance_blocks_ad', 'balance_blocks_au')
+
+BALANCE_INDEX_BACKFILL = " UNION ALL ".join(
+    f"""
+    SELECT user_id, {level}, {DAY_NUMBER_SQL.format(date="date")} >> {level * BALANCE_BLOCK_BITS} AS block,
+           SUM(CASE WHEN type = 'income' THEN amount ELSE -amount END)
+    FROM transactions WHERE currency IS NULL GROUP BY user_id, block
+    """ for level in range(BALANCE_LEVELS))
+
+
+def day_number(date_str: str) -> int:
+    """Days since 1970-01-01 for a YYYY-MM-DD string, as DAY_NUMBER_SQL computes it."""
+    return date.fromisoformat(date_str).toordinal() - EPOCH_ORDINAL
+
+
+# Calendar keys of every transaction as integers, derived from date by SQLite.
+# ALTER TABLE can only add VIRTUAL generated columns, which cost nothing to
+# store; the indexes below hold their values, so grouping and range predicates
+# on them read the index instead of calling substr/strftime on every row.
+# week_num counts Monday-to-Sunday weeks (1970-01-01 was a Thursday, so week 0
+# starts on Monday 1969-12-29, and earlier dates fall in negative weeks; SQLite's
+# / truncates toward zero, so the remainder is subtracted first to floor it);
+# month_num is year * 12 + month - 1.
+TRANSACTION_CALENDAR_COLUMNS = {
+    'day_num': f"INTEGER GENERATED ALWAYS AS ({DAY_NUMBER_SQL.format(date='date')}) VIRTUAL",
+    'month_num': "INTEGER GENERATED ALWAYS AS "
+                 "(CAST(substr(date, 1, 4) AS INTEGER) * 12 + CAST(substr(date, 6, 2) AS INTEGER) - 1) VIRTUAL",
+    'week_num': "INTEGER GENERATED ALWAYS AS (((day_num + 3) - (((day_num + 3) % 7) + 7) % 7) / 7) VIRTUAL",
+}
+# SQL turning a week_num or month_num value back into its label
+WEEK_START_SQL = "date({key} * 7 - 3 + 2440587.5)"
+MONTH_LABEL_SQL = "printf('%04d-%02d', {key} / 12, {key} % 12 + 1)"
+CALENDAR_INDEX_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_transactions_user_month
+    ON transactions (user_id, month_num, day_num, type, category, amount, currency, date)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_transactions_user_week
+    ON transactions (user_id, week_num, day_num, type, amount, currency, date)
+    """,
+]
+
+
+def month_number(date_str: str) -> int:
+    """month_num of a YYYY-MM-DD (or YYYY-MM) string."""
+    return int(date_str[:4]) * 12 + int(date_str[5:7]) - 1
+
+
+def week_number(date_str: str) -> int:
+    """week_num of a YYYY-MM-DD string."""
+    return (day_number(date_str) + 3) // 7
+
+
+# Running expense totals per (user, month, category) for O(1) budget checks,
+# maintained by triggers in the same SQLite transaction as each write. Like
+# balance_blocks, only rows stored without a currency are counted.
+CATEGORY_SPEND_TABLE = """
+    CREATE TABLE category_spend (
+        user_id TEXT NOT NULL,
+        month TEXT NOT NULL,
+        category TEXT NOT NULL,
+        spent REAL NOT NULL,
+        PRIMARY KEY (user_id, month, category)
+    ) WITHOUT ROWID
+"""
+
+
+def _spend_upsert(row: str, sign: str) -> str:
+    return f"""
+        INSERT INTO category_spend (user_id, month, category, spent)
+        SELECT {row}.user_id, substr({row}.date, 1, 7), {row}.category, {sign}{row}.amount
+        WHERE {row}.type = 'expense' AND {row}.currency IS NULL
+        ON CONFLICT (user_id, month, category) DO UPDATE SET spent = spent + excluded.spent;
+    """
+
+
+CATEGORY_SPEND_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS category_spend_ai AFTER INSERT ON transactions BEGIN"
+    + _spend_upsert("NEW", "") + "END",
+    "CREATE TRIGGER IF NOT EXISTS category_spend_ad AFTER DELETE ON transactions BEGIN"
+    + _spend_upsert("OLD", "-") + "END",
+    "CREATE TRIGGER IF NOT EXISTS category_spend_au "
+    "AFTER UPDATE OF amount, type, category, date, user_id, currency ON transactions BEGIN"
+    + _spend_upsert("OLD", "-") + _spend_upsert("NEW", "") + "END",
+]
+CATEGORY_SPEND_TRIGGERS = ('category_spend_ai', 'category_spend_ad', 'category_spend_au')
+
+CATEGORY_SPEND_BACKFILL = """
+    INSERT INTO category_spend (user_id, month, category, spent)
+    SELECT user_id, substr(date, 1, 7), category, SUM(amount)
+    FROM transactions WHERE type = 'expense' AND currency IS NULL
+    GROUP BY user_id, substr(date, 1, 7), category
+"""
+
+
+# Category tree. A category is a path of names joined by " > ", e.g.
+# "Food > Groceries > Organic"; every prefix is a node of its own. category_closure
+# holds one row per (ancestor, descendant) pair, including each node with itself
+# at depth 0, so a subtree is one indexed range. Transactions keep the category
+# text they were written with: category_labels maps each such label to its node,
+# so renaming or moving a node rewrites the subtree's nodes and closure rows but
+# never a transaction. Labels and nodes are created by triggers on first use; a
+# new label under an old one (say "Food > Snacks" once "Food" is "Meals") is
+# placed under the node its longest known prefix label maps to.
+CATEGORY_SEPARATOR = " > "
+CATEGORY_TREE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        level INTEGER NOT NULL,
+        path TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS category_closure (
+        ancestor INTEGER NOT NULL,
+        descendant INTEGER NOT NULL,
+        depth INTEGER NOT NULL,
+        PRIMARY KEY (ancestor, descendant)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_category_closure_descendant ON category_closure (descendant, depth, ancestor)",
+    """
+    CREATE TABLE IF NOT EXISTS category_labels (
+        label TEXT PRIMARY KEY,
+        category_id INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_category_labels_category ON category_labels (category_id, label)",
+]
+
+
+def category_nodes_insert(paths: str) -> str:
+    """INSERT creating the missing nodes for every prefix of the paths produced by paths.
+
+    paths is SQL yielding one column named path. Nodes are inserted shallowest
+    first, so each node's closure trigger finds its parent already in place.
+    """
+    return f"""
+        INSERT OR IGNORE INTO categories (path, name, level)
+        WITH RECURSIVE prefix(path, name, rest, level) AS (
+            SELECT '', '', path || '{CATEGORY_SEPARATOR}', 0 FROM ({paths})
+            UNION ALL
+            SELECT CASE WHEN level = 0 THEN '' ELSE path || '{CATEGORY_SEPARATOR}' END
+                       || substr(rest, 1, instr(rest, '{CATEGORY_SEPARATOR}') - 1),
+                   substr(rest, 1, instr(rest, '{CATEGORY_SEPARATOR}') - 1),
+                   substr(rest, instr(rest, '{CATEGORY_SEPARATOR}') + {len(CATEGORY_SEPARATOR)}), level + 1
+            FROM prefix WHERE rest != ''
+        )
+        SELECT DISTINCT path, name, level FROM prefix WHERE level > 0 ORDER BY level
+    """
+
+
+def label_path(label: str) -> str:
+    """SQL for the node path of a new label: its longest prefix label's node path, then the rest of the label."""
+    return f"""COALESCE((
+        WITH RECURSIVE prefix(label, rest) AS (
+            SELECT '', {label} || '{CATEGORY_SEPARATOR}'
+            UNION ALL
+            SELECT CASE WHEN label = '' THEN '' ELSE label || '{CATEGORY_SEPARATOR}' END
+                       || substr(rest, 1, instr(rest, '{CATEGORY_SEPARATOR}') - 1),
+                   substr(rest, instr(rest, '{CATEGORY_SEPARATOR}') + {len(CATEGORY_SEPARATOR)})
+            FROM prefix WHERE rest != ''
+        )
+        SELECT c.path || substr({label}, length(p.label) + 1)
+        FROM prefix AS p JOIN category_labels AS l ON l.label = p.label JOIN categories AS c ON c.id = l.category_id
+        ORDER BY length(p.label) DESC LIMIT 1
+    ), {label})"""
+
+
+def _label_insert(row: str) -> str:
+    path = label_path(f"{row}.category")
+    return f"""
+        {category_nodes_insert(f"SELECT {path} AS path")};
+        INSERT OR IGNORE INTO category_labels (label, category_id)
+        SELECT {row}.category, id FROM categories WHERE path = {path};
+    """
+
+
+CATEGORY_TREE_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_closure_ai AFTER INSERT ON categories BEGIN
+        INSERT INTO category_closure (ancestor, descendant, depth)
+        SELECT ancestor, NEW.id, depth + 1 FROM category_closure
+        WHERE descendant = (SELECT id FROM categories WHERE path = substr(
+            NEW.path, 1, length(NEW.path) - length(NEW.name) - {len(CATEGORY_SEPARATOR)}))
+        UNION ALL SELECT NEW.id, NEW.id, 0;
+    END
+    """,
+    "CREATE TRIGGER IF NOT EXISTS category_labels_ai AFTER INSERT ON transactions "
+    "WHEN NOT EXISTS (SELECT 1 FROM category_labels WHERE label = NEW.category) BEGIN"
+    + _label_insert("NEW") + "END",
+    "CREATE TRIGGER IF NOT EXISTS category_labels_au AFTER UPDATE OF category ON transactions "
+    "WHEN NOT EXISTS (SELECT 1 FROM category_labels WHERE label = NEW.category) BEGIN"
+    + _label_insert("NEW") + "END",
+]
+CATEGORY_LABEL_TRIGGERS = ('category_labels_ai', 'category_labels_au')
+
+CATEGORY_TREE_BACKFILL = [
+    category_nodes_insert("SELECT DISTINCT category AS path FROM transactions"),
+    """
+    INSERT OR IGNORE INTO category_labels (label, category_id)
+    SELECT DISTINCT t.category, c.id FROM transactions AS t JOIN categories AS c ON c.path = t.category
+    """,
+]
+
+
+# Change log for delta sync and change feeds: every insert, update and delete of
+# a transaction appends (row_id, uid, user_id, op, changed_at, origin) with a
+# monotonically increasing seq.
+# uid identifies a row across database files; changed_at and origin are the
+# last-writer-wins stamp. While sync applies a peer's change it puts that
+# change's stamp into sync_apply, so the copy keeps its original stamp.
+CHANGE_STAMP_SQL = "COALESCE((SELECT changed_at FROM sync_apply), strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))"
+CHANGE_ORIGIN_SQL = "COALESCE((SELECT origin FROM sync_apply), (SELECT value FROM sync_meta WHERE key = 'db_id'))"
+
+CHANGELOG_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS changelog (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        uid TEXT NOT NULL,
+        row_id INTEGER,
+        user_id TEXT,
+        op TEXT NOT NULL CHECK(op IN ('insert', 'update', 'delete')),
+        changed_at TEXT NOT NULL,
+        origin TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_changelog_uid ON changelog (uid, seq)",
+    "CREATE TABLE IF NOT EXISTS sync_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS sync_apply (changed_at TEXT NOT NULL, origin TEXT NOT NULL)",
+    # Highest seq of each peer's change log already applied here
+    "CREATE TABLE IF NOT EXISTS sync_peers (peer_id TEXT PRIMARY KEY, pulled_seq INTEGER NOT NULL) WITHOUT ROWID",
+]
+
+# Rows written before the change log existed get a uid derived from their id and
+# content, so two copies of the same file agree on it and sync without duplicates
+CHANGELOG_BACKFILL = [
+    """
+    UPDATE transactions
+    SET uid = printf('legacy-%d-%s-%s-%s-%s-%.2f', id, user_id, date, type, category, amount)
+    WHERE uid IS NULL
+    """,
+    "INSERT INTO changelog (uid, row_id, user_id, op, changed_at, origin) "
+    f"SELECT uid, id, user_id, 'insert', {CHANGE_STAMP_SQL}, {CHANGE_ORIGIN_SQL} FROM transactions ORDER BY id",
+]
+
+# Added in schema version 3; entries of rows deleted before then keep NULLs
+CHANGELOG_EXTRA_COLUMNS = {
+    'row_id': "INTEGER",
+    'user_id': "TEXT",
+}
+CHANGELOG_ROW_BACKFILL = """
+    UPDATE changelog SET (row_id, user_id) = (SELECT id, user_id FROM transactions WHERE uid = changelog.uid)
+"""
+CHANGELOG_TRIGGERS = ('changelog_ai', 'changelog_au', 'changelog_ad')
+
+CHANGELOG_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS changelog_ai AFTER INSERT ON transactions BEGIN
+        UPDATE transactions SET uid = lower(hex(randomblob(16))) WHERE id = NEW.id AND NEW.uid IS NULL;
+        INSERT INTO changelog (uid, row_id, user_id, op, changed_at, origin)
+        SELECT uid, id, user_id, 'insert', {CHANGE_STAMP_SQL}, {CHANGE_ORIGIN_SQL} FROM transactions WHERE id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS changelog_au
+    AFTER UPDATE OF amount, type, category, date, user_id, note, currency ON transactions BEGIN
+        INSERT INTO changelog (uid, row_id, user_id, op, changed_at, origin)
+        VALUES (NEW.uid, NEW.id, NEW.user_id, 'update', {CHANGE_STAMP_SQL}, {CHANGE_ORIGIN_SQL});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS changelog_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO changelog (uid, row_id, user_id, op, changed_at, origin)
+        VALUES (OLD.uid, OLD.id, OLD.user_id, 'delete', {CHANGE_STAMP_SQL}, {CHANGE_ORIGIN_SQL});
+    END
+    """,
+]
+
+
+def check_fx_rates(conn: sqlite3.Connection, start_date: Optional[str], end_date: Optional[str],
+                   user_filter: str = "", params: tuple = ()) -> None:
+    """Raise ValueError, as FxRateModel.factor does, when FX_FACTOR_SQL cannot convert a row of the range.
+
+    user_filter narrows the rows further with params, e.g. " AND user_id = ?".
+    """
+    row = conn.execute(FX_MISSING_SQL.format(user_filter=user_filter),
+                       (start_date or OPEN_START_DATE, end_date or OPEN_END_DATE, *params)).fetchone()
+    if row:
+        raise ValueError(f"No FX rate for {row[0]} on or before {row[1]}; load one with 'fx load'")
+
+
+def fx_foreign_sql(columns: str, where: str, group: str = "") -> str:
+    """SQL summing the rows of transactions in other currencies that match where, in DEFAULT_CURRENCY.
+
+    Yields columns, then amount (the converted sum) and n (the row count), one
+    row per group and (currency, date) bucket. The rows are read through the
+    partial index idx_transactions_foreign.
+    """
+    select = f"{columns}, " if columns else ""
+    return f"""
+        SELECT {select}SUM(amount) * {FX_FACTOR_SQL} AS amount, COUNT(*) AS n FROM transactions
+        WHERE {where} AND currency IS NOT NULL
+        GROUP BY {group + ", " if group else ""}currency, date
+    """
+
+
+def fx_grouped_sql(columns: str, where: str, group: str = "") -> str:
+    """SQL summing the rows of transactions that match where per group, in DEFAULT_CURRENCY.
+
+    Yields columns, amount and n like fx_foreign_sql, possibly several rows per
+    group, so callers sum them again. Rows stored without a currency are summed
+    as they are; only the others are bucketed by (currency, date) for their
+    rate. where appears twice, so it may only hold named parameters.
+    """
+    select = f"{columns}, " if columns else ""
+    return f"""
+        SELECT {select}SUM(amount) AS amount, COUNT(*) AS n FROM transactions
+        WHERE {where} AND currency IS NULL{" GROUP BY " + group if group else ""}
+        UNION ALL {fx_foreign_sql(columns, where, group)}
+    """
+
+
+def fx_rows_sql(columns: str, where: str) -> str:
+    """SQL yielding columns and amount, in DEFAULT_CURRENCY, for each row of transactions that matches where.
+
+    For statistics over single amounts. The rates of the rows in other
+    currencies are looked up once per (currency, date) and joined back by that
+    pair. columns must not be called currency, date or amount; where appears
+    twice, so it may only hold named parameters.
+    """
+    return f"""
+        SELECT {columns}, CASE WHEN t.currency IS NULL THEN t.amount ELSE t.amount * r.rate END AS amount
+        FROM (SELECT {columns}, amount, currency, date FROM transactions WHERE {where}) AS t
+        LEFT JOIN (SELECT currency, date, {FX_FACTOR_SQL} AS rate FROM transactions
+                   WHERE {where} AND currency IS NOT NULL GROUP BY currency, date) AS r
+               ON r.currency = t.currency AND r.date = t.date
+    """
+
+
+def balance_blocks_query() -> str:
+    """SQL summing the blocks that exactly cover days up to :day for :user_id."""
+    ranges = []
+    for level in range(BALANCE_LEVELS):
+        shift = level * BALANCE_BLOCK_BITS
+        # Blocks of this level from the start of the enclosing parent block up to
+        # (but excluding) the block that holds :day -- except at level 0, which
+        # includes the day itself. The top level has no lower bound.
+        high = f"(:day >> {shift})" + ("" if level == 0 else " - 1")
+        condition = f"block <= {high}"
+        if level < BALANCE_LEVELS - 1:
+            condition = f"block BETWEEN ((:day >> {shift + BALANCE_BLOCK_BITS}) << {BALANCE_BLOCK_BITS}) AND {high}"
+        ranges.append(f"SELECT net FROM balance_blocks WHERE user_id = :user_id AND level = {level} AND {condition}")
+    return "SELECT COALESCE(SUM(net), 0) FROM (" + " UNION ALL ".join(ranges) + ")"
+
+
+def connect(db_name: str, busy_timeout: Optional[float] = None,
+            synchronous: Optional[str] = None) -> sqlite3.Connection:
+    """Open a connection with the configured busy timeout and durability level."""
+    conn = sqlite3.connect(db_name, timeout=DEFAULT_BUSY_TIMEOUT if busy_timeout is None else busy_timeout)
+    level = (synchronous or DEFAULT_SYNCHRONOUS).upper()
+    if level not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"synchronous must be one of {', '.join(SYNCHRONOUS_LEVELS)}")
+    conn.execute(f"PRAGMA synchronous = {level}")
+    return conn
+
+
+def connect_read_only(db_name: str, immutable: bool = False,
+                      mmap_size: Optional[int] = None) -> sqlite3.Connection:
+    """Open a read-only, memory-mapped connection for reporting.
+
+    mode=ro never takes write locks or creates the file, query_only rejects
+    writes, and mmap_size lets SQLite read pages straight from the OS page cache.
+    immutable=1 additionally skips all locking and change detection; use it only
+    for files nothing writes to any more, such as archived snapshots.
+    """
+    uri = f"file:{pathname2url(os.path.abspath(db_name))}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    conn = sqlite3.connect(uri, uri=True, timeout=DEFAULT_BUSY_TIMEOUT)
+    conn.execute(f"PRAGMA mmap_size = {int(DEFAULT_MMAP_SIZE if mmap_size is None else mmap_size)}")
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def schema_version(db_name: str) -> Optional[int]:
+    """PRAGMA user_version of an existing database file, or None if there is no file."""
+    if not os.path.exists(db_name):
+        return None
+    conn = connect_read_only(db_name)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def is_lock_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+
+def run_with_retry(operation: Callable[[], T], attempts: int = 5, base_delay: float = 0.05,
+                   max_delay: float = 2.0) -> T:
+    """Run operation, retrying "database is locked" errors with jittered exponential backoff.
+
+    The busy timeout already waits inside SQLite; this covers the cases it cannot,
+    such as a timeout expiring under heavy contention. Other errors are raised at once.
+    """
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except sqlite3.OperationalError as e:
+            if not is_lock_error(e) or attempt == attempts - 1:
+                raise
+            # Full jitter keeps competing writers from retrying in lockstep
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+    raise RuntimeError("unreachable")
+
+
+def table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict) -> None:
+    """ALTER TABLE ADD COLUMN for every column in columns that table does not have yet."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}  # includes generated columns
+    for name, ddl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Bring an existing transactions table up to the current schema.
+
+    Safe to call on every open: each step is a no-op once applied.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    # WAL lets readers run alongside a writer; the mode is stored in the file
+    if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() not in ("wal", "memory"):
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError:
+            pass  # Another connection is busy; switch on a later open
+    add_missing_columns(conn, 'transactions', TRANSACTION_EXTRA_COLUMNS)
+    if version < 9 and 'week_num' in {row[1] for row in conn.execute("PRAGMA table_xinfo(transactions)")}:
+        # Before version 9 week_num rounded dates before 1970 toward week 0; a
+        # generated column cannot be altered, so drop it and its index to re-add both
+        conn.execute("DROP INDEX IF EXISTS idx_transactions_user_week")
+        conn.execute("ALTER TABLE transactions DROP COLUMN week_num")
+    add_missing_columns(conn, 'transactions', TRANSACTION_CALENDAR_COLUMNS)
+    if version < 7:
+        # Before version 7 the counters added up every currency and the covering
+        # indexes had no currency; rebuild all of them below
+        for name in ('idx_transactions_user_date', 'idx_transactions_user_month', 'idx_transactions_user_week'):
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name in BALANCE_INDEX_TRIGGERS + CATEGORY_SPEND_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute("DROP TABLE IF EXISTS balance_blocks")
+        conn.execute("DROP TABLE IF EXISTS category_spend")
+    if version < 8:
+        # Before version 8 new labels were placed by their text, ignoring renamed prefixes
+        for name in CATEGORY_LABEL_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute(FX_RATES_TABLE)
+    # Covering index for per-user date-range scans and aggregations
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_date
+        ON transactions (user_id, date, type, category, amount, currency)
+    """)
+    # Rows in other currencies, which the counters leave out and reads convert
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_transactions_foreign
+        ON transactions (user_id, date, type, category, amount, currency) WHERE currency IS NOT NULL
+    """)
+    # A recurring rule materializes at most one transaction per date
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_rule_occurrence
+        ON transactions (rule_id, date) WHERE rule_id IS NOT NULL
+    """)
+    # Imports store a fingerprint per row; a second copy of the same row is skipped
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_fingerprint
+        ON transactions (fingerprint) WHERE fingerprint IS NOT NULL
+    """)
+    for ddl in CALENDAR_INDEX_DDL:
+        conn.execute(ddl)
+    if not table_exists(conn, 'transactions_fts'):
+        conn.execute("""
+            CREATE VIRTUAL TABLE transactions_fts USING fts5(
+                note, content = 'transactions', content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+            )
+        """)
+        conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+    for ddl in SEARCH_INDEX_DDL:
+        conn.execute(ddl)
+    if not table_exists(conn, 'balance_blocks'):
+        conn.execute(BALANCE_INDEX_TABLE)
+        conn.execute("INSERT INTO balance_blocks (user_id, level, block, net) " + BALANCE_INDEX_BACKFILL)
+    for ddl in BALANCE_INDEX_DDL:
+        conn.execute(ddl)
+    if not table_exists(conn, 'category_spend'):
+        conn.execute(CATEGORY_SPEND_TABLE)
+        conn.execute(CATEGORY_SPEND_BACKFILL)
+    for ddl in CATEGORY_SPEND_DDL:
+        conn.execute(ddl)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_uid ON transactions (uid)")
+    if not table_exists(conn, 'changelog'):
+        for ddl in CHANGELOG_TABLES:
+            conn.execute(ddl)
+        conn.execute("INSERT OR IGNORE INTO sync_meta (key, value) VALUES ('db_id', lower(hex(randomblob(8))))")
+        for ddl in CHANGELOG_BACKFILL:
+            conn.execute(ddl)
+    elif 'row_id' not in {row[1] for row in conn.execute("PRAGMA table_info(changelog)")}:
+        # Version 2 logged neither row id nor user; add both and recreate the triggers
+        add_missing_columns(conn, 'changelog', CHANGELOG_EXTRA_COLUMNS)
+        conn.execute(CHANGELOG_ROW_BACKFILL)
+        for name in CHANGELOG_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for ddl in CHANGELOG_DDL:
+        conn.execute(ddl)
+    if not table_exists(conn, 'category_closure'):
+        for ddl in CATEGORY_TREE_TABLES + CATEGORY_TREE_DDL[:1] + CATEGORY_TREE_BACKFILL:
+            conn.execute(ddl)
+    for ddl in CATEGORY_TREE_DDL:
+        conn.execute(ddl)
+    if version < SCHEMA_VERSION:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
 
 def init_database(db_name='moneytracker.db'):
     """Initialize SQLite database with transactions table."""
@@ -23,6 +685,7 @@ def init_database(db_name='moneytracker.db'):
             user_id TEXT NOT NULL
         )
     ''')
+    ensure_schema(conn)
 
     # Commit changes and close connection
     conn.commit()
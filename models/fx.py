@@ -0,0 +1,118 @@
+import csv
+import os
+import sqlite3
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from models.database import DEFAULT_CURRENCY, FX_RATES_TABLE, connect, connect_read_only, run_with_retry, table_exists
+from utils.logger import setup_logger
+from utils.validators import parse_iso_date, validate_currency
+
+logger = setup_logger()
+
+# Currency summaries and reports are converted to unless one is asked for explicitly
+REPORT_CURRENCY = os.getenv("MONEYTRACKER_REPORT_CURRENCY", DEFAULT_CURRENCY).upper()
+# {currency_filter} is " WHERE currency = ?" for one currency's rates
+GET_RATES_SQL = "SELECT currency, date, rate FROM fx_rates{currency_filter} ORDER BY currency, date"
+
+class FxRateModel:
+    """Exchange rates loaded from a local CSV file, with cached (currency, date) lookups.
+
+    A rate is the value of one unit of a currency in DEFAULT_CURRENCY on a date;
+    other pairs are crossed through it. A lookup uses the latest rate on or before
+    the date, so weekends and holidays fall back to the previous quote.
+    """
+    def __init__(self, db_name: str = "moneytracker.db", read_only: bool = False, immutable: bool = False):
+        self.db_name = db_name
+        self.read_only = read_only or immutable
+        self.immutable = immutable
+        self._series: Optional[Dict[str, Tuple[List[str], List[float]]]] = None
+        self.rate = lru_cache(maxsize=65536)(self._rate)
+        if not self.read_only:
+            self._ensure_table()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            return connect_read_only(self.db_name, self.immutable)
+        return connect(self.db_name)
+
+    def _ensure_table(self):
+        try:
+            with connect(self.db_name) as conn:
+                conn.execute(FX_RATES_TABLE)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error creating fx_rates table: {e}")
+            raise
+
+    def load_csv(self, path: str) -> int:
+        """Upsert the rates of a date,currency,rate CSV file; returns the number of rates loaded."""
+        rows = []
+        with open(path, newline='', encoding='utf-8') as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                try:
+                    currency = (row.get('currency') or '').strip().upper()
+                    day = (row.get('date') or '').strip()
+                    validate_currency(currency)
+                    parse_iso_date(day)
+                    rate = float(row.get('rate') or '')
+                    if rate <= 0:
+                        raise ValueError("rate must be positive")
+                except Exception as e:
+                    raise ValueError(f"Invalid FX rate on line {line}: {e}")
+                rows.append((currency, day, rate))
+        def write() -> int:
+            with connect(self.db_name) as conn:
+                conn.executemany("""
+                    INSERT INTO fx_rates (currency, date, rate) VALUES (?, ?, ?)
+                    ON CONFLICT (currency, date) DO UPDATE SET rate = excluded.rate
+                """, rows)
+                conn.commit()
+                return len(rows)
+        try:
+            loaded = run_with_retry(write)
+        except sqlite3.Error as e:
+            logger.error(f"Error loading FX rates: {e}")
+            raise
+        self._series = None
+        self.rate.cache_clear()
+        logger.info(f"Loaded {loaded} FX rates from {path}")
+        return loaded
+
+    def get_rates(self, currency: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        try:
+            with self._connect() as conn:
+                if not table_exists(conn, 'fx_rates'):
+                    return []
+                query = GET_RATES_SQL.format(currency_filter=" WHERE currency = ?" if currency else "")
+                return conn.execute(query, [currency] if currency else []).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading FX rates: {e}")
+            raise
+
+    def _load_series(self) -> Dict[str, Tuple[List[str], List[float]]]:
+        """Read the whole table once into per-currency sorted (dates, rates) arrays."""
+        if self._series is None:
+            series: Dict[str, Tuple[List[str], List[float]]] = {}
+            for currency, day, rate in self.get_rates():
+                dates, rates = series.setdefault(currency, ([], []))
+                dates.append(day)
+                rates.append(rate)
+            self._series = series
+        return self._series
+
+    def _rate(self, currency: str, day: str) -> float:
+        """Value of one unit of currency in DEFAULT_CURRENCY on day (cached as self.rate)."""
+        if currency == DEFAULT_CURRENCY:
+            return 1.0
+        dates, rates = self._load_series().get(currency, ((), ()))
+        position = bisect_right(dates, day) - 1
+        if position < 0:
+            raise ValueError(f"No FX rate for {currency} on or before {day}; load one with 'fx load'")
+        return rates[position]
+
+    def factor(self, from_currency: str, to_currency: str, day: str) -> float:
+        """Multiplier converting an amount from from_currency to to_currency on day."""
+        if from_currency == to_currency:
+            return 1.0
+        return self.rate(from_currency, day) / self.rate(to_currency, day)
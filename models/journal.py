@@ -0,0 +1,115 @@
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional
+from models.database import connect_read_only
+from models.transaction import Transaction
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Seconds between PRAGMA data_version checks while nothing changes
+WATCH_POLL_INTERVAL = 0.05
+# Change-log entries read per query
+WATCH_BATCH_SIZE = 500
+
+CHANGES_SQL = """
+    SELECT c.seq, c.op, c.row_id, c.uid, c.user_id, c.changed_at,
+           t.id, t.amount, t.type, t.category, t.date, t.user_id, t.note, t.currency
+    FROM changelog c LEFT JOIN transactions t ON t.uid = c.uid
+    WHERE c.seq > ? {user_filter}
+    ORDER BY c.seq LIMIT ?
+"""
+
+@dataclass
+class ChangeEvent:
+    """One journal entry; transaction is the row as it is now, or None once deleted."""
+    seq: int
+    op: str
+    transaction_id: Optional[int]
+    uid: str
+    user_id: Optional[str]
+    changed_at: str
+    transaction: Optional[Transaction] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def latest_seq(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changelog").fetchone()[0]
+
+def read_changes(conn: sqlite3.Connection, after: int, user_id: Optional[str] = None,
+                 limit: int = WATCH_BATCH_SIZE) -> List[ChangeEvent]:
+    """Up to limit journal entries with seq greater than after, oldest first."""
+    params = [after]
+    if user_id is not None:
+        params.append(user_id)
+    params.append(limit)
+    query = CHANGES_SQL.format(user_filter="AND c.user_id = ?" if user_id is not None else "")
+    events = []
+    for seq, op, row_id, uid, owner, changed_at, *row in conn.execute(query, params):
+        events.append(ChangeEvent(seq, op, row_id, uid, owner, changed_at,
+                                  Transaction(*row) if row[0] is not None else None))
+    return events
+
+class ChangeFeed:
+    """Resumable iterator over the change journal of a database.
+
+    cursor is the seq of the last entry already consumed (0 replays the whole
+    journal, None starts after the current end). Between reads the feed keeps one
+    read-only connection open and only compares PRAGMA data_version, which
+    changes when another connection commits, so an idle feed never touches the
+    journal table.
+    """
+
+    def __init__(self, db_name: str, cursor: Optional[int] = None, user_id: Optional[str] = None,
+                 poll_interval: float = WATCH_POLL_INTERVAL, batch_size: int = WATCH_BATCH_SIZE):
+        self.db_name = db_name
+        self.user_id = user_id
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._conn = connect_read_only(db_name)
+        self.cursor = latest_seq(self._conn) if cursor is None else cursor
+        self._data_version = None
+        self.wakeups = 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ChangeFeed":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def poll(self) -> List[ChangeEvent]:
+        """All entries after the cursor, advancing it; no query at all if nothing was committed."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return []
+        self._data_version = version
+        self.wakeups += 1
+        events: List[ChangeEvent] = []
+        while True:
+            batch = read_changes(self._conn, self.cursor, self.user_id, self.batch_size)
+            events.extend(batch)
+            if batch:
+                self.cursor = batch[-1].seq
+            if len(batch) < self.batch_size:
+                return events
+
+    def follow(self, timeout: Optional[float] = None) -> Iterator[ChangeEvent]:
+        """Yield entries as they are committed; stops after timeout idle seconds (None: never)."""
+        idle_since = time.monotonic()
+        while True:
+            events = self.poll()
+            if events:
+                idle_since = time.monotonic()
+                yield from events
+                continue
+            if timeout is not None and time.monotonic() - idle_since >= timeout:
+                return
+            time.sleep(self.poll_interval)
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        return self.follow()
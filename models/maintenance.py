@@ -0,0 +1,279 @@
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from models import budget, category, fx, recurring, sync, transaction
+from models.database import DEFAULT_CURRENCY, FX_MISSING_SQL, connect, connect_read_only, run_with_retry
+from models.journal import CHANGES_SQL
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar('T')
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+# Freelist share of the file above which doctor suggests a vacuum
+FREELIST_WARN_RATIO = 0.2
+
+# Every statement the models run against a database, with sample parameters,
+# checked by doctor with EXPLAIN QUERY PLAN. The SQL is the models' own
+# constants, so a plan checked here is the plan the model gets; optional filters
+# are registered in the shapes the models build. full_scan marks queries that
+# read every row by design (all-user reports, small lookup tables). Register a
+# model's new statement here when it gains one.
+QUERY_PLANS: Dict[str, Tuple[str, tuple, bool]] = {}
+
+
+def register_query_plan(name: str, sql: str, params=(), full_scan: bool = False) -> None:
+    QUERY_PLANS[name] = (sql, params, full_scan)
+
+
+_RANGE = ("2025-01-01", "2025-12-31")
+_USER_RANGE = ("user",) + _RANGE
+_NAMED_RANGE = {"user_id": "user", "start_date": "2025-01-01", "end_date": "2025-12-31"}
+register_query_plan("transactions.get_transaction", transaction.GET_TRANSACTION_SQL, (1, "user"))
+register_query_plan("transactions.read_all", transaction.READ_ALL_SQL.format(category_filter=""), _USER_RANGE)
+register_query_plan("transactions.read_all_subtree",
+                    transaction.READ_ALL_SQL.format(category_filter=transaction.CATEGORY_FILTER_SQL),
+                    _USER_RANGE + ("Food",))
+register_query_plan("transactions.aggregate_daily",
+                    transaction.AGGREGATE_DAILY_SQL.format(user_filter=transaction.NAMED_USER_FILTER_SQL),
+                    _NAMED_RANGE)
+register_query_plan("transactions.aggregate_daily_all_users", transaction.AGGREGATE_DAILY_SQL.format(user_filter=""),
+                    _NAMED_RANGE, full_scan=True)
+register_query_plan("transactions.aggregate_by_currency",
+                    transaction.AGGREGATE_BY_CURRENCY_SQL.format(month_filter="",
+                                                                 category_filter=transaction.CATEGORY_FILTER_SQL),
+                    (DEFAULT_CURRENCY,) + _USER_RANGE + ("Food", 1))
+register_query_plan("transactions.aggregate_by_month",
+                    transaction.AGGREGATE_BY_CURRENCY_SQL.format(month_filter=transaction.MONTH_FILTER_SQL,
+                                                                 category_filter=""),
+                    (DEFAULT_CURRENCY, "user", transaction.OPEN_START_DATE, transaction.OPEN_END_DATE, 24306, None))
+register_query_plan("transactions.range_profile", transaction.RANGE_PROFILE_SQL, dict(_NAMED_RANGE, limit=1000))
+register_query_plan("transactions.range_totals", transaction.RANGE_TOTALS_SQL, dict(_NAMED_RANGE, type="expense"))
+register_query_plan("transactions.top_totals", transaction.TOP_TOTALS_SQL.format(column="note"),
+                    dict(_NAMED_RANGE, type="expense", limit=5))
+register_query_plan("transactions.iter_user_totals", transaction.ITER_USER_TOTALS_SQL, _NAMED_RANGE, full_scan=True)
+register_query_plan("transactions.daily_totals",
+                    transaction.DAILY_TOTALS_SQL.format(user_filter=transaction.NAMED_USERS_FILTER_SQL),
+                    dict(_NAMED_RANGE, users='["user"]'))
+register_query_plan("transactions.daily_totals_all_users", transaction.DAILY_TOTALS_SQL.format(user_filter=""),
+                    _NAMED_RANGE, full_scan=True)
+register_query_plan("transactions.balance_as_of", transaction.BALANCE_AS_OF_SQL,
+                    {"user_id": "user", "day": 20000, "date": "2024-10-04"})
+register_query_plan("transactions.balances_for_users", transaction.BALANCES_FOR_USERS_SQL,
+                    {"users": '["user"]', "day": 20000, "date": "2024-10-04"})
+register_query_plan("transactions.fx_missing", FX_MISSING_SQL.format(user_filter=transaction.USER_FILTER_SQL),
+                    _RANGE + ("user",))
+register_query_plan("transactions.changed_users", transaction.CHANGED_USERS_SQL, {"seq": 0})
+_COLUMN_ROWS = {"seq": 0, "user_id": "user", "currency": DEFAULT_CURRENCY}
+register_query_plan("transactions.column_rows", transaction.COLUMN_ROWS_SQL, _COLUMN_ROWS)
+register_query_plan("transactions.column_rows_rewritten", transaction.COLUMN_ROWS_REWRITTEN_SQL, _COLUMN_ROWS)
+register_query_plan("transactions.column_rows_inserted", transaction.COLUMN_ROWS_INSERTED_SQL, _COLUMN_ROWS)
+register_query_plan("transactions.trend_series", transaction.trend_series_sql('daily', 7), _NAMED_RANGE)
+register_query_plan("transactions.trend_series_weekly", transaction.trend_series_sql('weekly', 4),
+                    dict(_NAMED_RANGE, first_key=2887, first_day=20209, last_key=2939, last_day=20573))
+register_query_plan("transactions.trend_series_monthly", transaction.trend_series_sql('monthly', 3),
+                    dict(_NAMED_RANGE, first_key=24300, first_day=20089, last_key=24311, last_day=20453))
+register_query_plan("transactions.search", transaction.SEARCH_SQL, ('"coffee"',) + _USER_RANGE + (100,))
+register_query_plan("transactions.find_duplicates",
+                    transaction.FIND_DUPLICATES_SQL.format(user_filter=transaction.USER_FILTER_SQL), ("user",))
+register_query_plan("transactions.delete", transaction.DELETE_TRANSACTION_SQL, (1, "user"))
+register_query_plan("budgets.check", budget.CHECK_BUDGET_SQL, {"user_id": "user", "month": "2025-01", "category": "Food"})
+register_query_plan("budgets.status", budget.BUDGET_STATUS_SQL, {"user_id": "user", "month": "2025-01"})
+register_query_plan("categories.tree", category.CATEGORY_TREE_SQL, full_scan=True)
+register_query_plan("categories.subtree_totals", category.SUBTREE_TOTALS_SQL, _NAMED_RANGE)
+register_query_plan("categories.subtree", category.SUBTREE_IDS_SQL, {"id": 1})
+register_query_plan("recurring.get_rules", recurring.GET_RULES_SQL.format(user_filter=" WHERE user_id = ?"),
+                    ("user",), full_scan=True)
+register_query_plan("fx.get_rates", fx.GET_RATES_SQL.format(currency_filter=" WHERE currency = ?"), ("USD",))
+register_query_plan("journal.read_changes", CHANGES_SQL.format(user_filter="AND c.user_id = ?"), (0, "user", 500))
+register_query_plan("sync.outgoing_changes", sync.OUTGOING_CHANGES_SQL, (0,))
+register_query_plan("sync.apply_lookup", sync.LATEST_STAMP_SQL, ("uid",))
+register_query_plan("sync.synced_row", sync.SYNCED_ROW_SQL, ("uid",))
+register_query_plan("sync.fingerprint_taken", sync.FINGERPRINT_TAKEN_SQL, ("fingerprint", "uid"))
+
+
+@dataclass
+class IndexSize:
+    name: str
+    table: str
+    pages: int
+    size: int
+
+
+@dataclass
+class PlanCheck:
+    """EXPLAIN QUERY PLAN of one registered query and the problems found in it."""
+    name: str
+    plan: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+    expected: bool = False
+    error: Optional[str] = None
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.full_scans) and not self.expected
+
+
+@dataclass
+class StepTiming:
+    step: str
+    seconds: float
+    detail: str = ""
+
+
+@dataclass
+class DoctorReport:
+    """File statistics, query-plan checks and timed maintenance steps of one database."""
+    path: str
+    file_size: int = 0
+    wal_size: int = 0
+    page_size: int = 0
+    page_count: int = 0
+    freelist_count: int = 0
+    auto_vacuum: str = "none"
+    has_statistics: bool = False
+    integrity: Optional[str] = None
+    indexes: List[IndexSize] = field(default_factory=list)
+    plans: List[PlanCheck] = field(default_factory=list)
+    steps: List[StepTiming] = field(default_factory=list)
+
+    @property
+    def freelist_ratio(self) -> float:
+        return self.freelist_count / self.page_count if self.page_count else 0.0
+
+    def problems(self) -> List[str]:
+        """Findings worth acting on; empty when the database is healthy."""
+        found = []
+        if self.integrity not in (None, "ok"):
+            found.append(f"integrity check failed: {self.integrity}")
+        if not self.has_statistics:
+            found.append("no planner statistics (run doctor --analyze)")
+        if self.freelist_ratio > FREELIST_WARN_RATIO:
+            found.append(f"{self.freelist_ratio:.0%} of the file is free pages (run doctor --vacuum)")
+        for check in self.plans:
+            if check.flagged:
+                found.append(f"{check.name} scans {', '.join(check.full_scans)}")
+        return found
+
+
+def _timed(report: DoctorReport, step: str, operation: Callable[[], T], detail: str = "") -> T:
+    started = time.perf_counter()
+    result = run_with_retry(operation)
+    report.steps.append(StepTiming(step, time.perf_counter() - started, detail))
+    logger.info(f"doctor: {step} took {report.steps[-1].seconds:.3f}s")
+    return result
+
+
+def _pragma(conn: sqlite3.Connection, name: str):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def index_sizes(conn: sqlite3.Connection) -> List[IndexSize]:
+    """Pages and bytes per index from the dbstat table, largest first; empty if SQLite lacks dbstat."""
+    try:
+        rows = conn.execute("""
+            SELECT s.name, m.tbl_name, SUM(s.pageno IS NOT NULL), SUM(s.pgsize)
+            FROM dbstat AS s JOIN sqlite_master AS m ON m.name = s.name
+            WHERE m.type = 'index'
+            GROUP BY s.name ORDER BY 4 DESC
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    return [IndexSize(*row) for row in rows]
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    """Tables a query plan reads in full, or builds a throwaway automatic index for.
+
+    Scans of subqueries and CTEs (named by CO-ROUTINE/MATERIALIZE lines) and
+    index-driven scans are not counted.
+    """
+    derived = {line.split(" ", 1)[1] for line in plan if line.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+    scans = []
+    for line in plan:
+        match = re.match(r"SCAN (\w+)$", line)
+        if match and match.group(1) not in derived:
+            scans.append(match.group(1))
+        elif "AUTOMATIC" in line and "INDEX" in line:
+            scans.append(line.split(" ")[1] + " (automatic index)")
+    return scans
+
+
+def check_query_plan(conn: sqlite3.Connection, name: str) -> PlanCheck:
+    sql, params, expected = QUERY_PLANS[name]
+    check = PlanCheck(name, expected=expected)
+    try:
+        check.plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    except sqlite3.OperationalError as e:
+        check.error = str(e)  # e.g. a table this database never created
+        return check
+    check.full_scans = full_scans(check.plan)
+    return check
+
+
+def run_doctor(db_name: str, analyze: bool = False, optimize: bool = False, vacuum: bool = False,
+               vacuum_pages: Optional[int] = None, integrity: bool = False,
+               plans: bool = True) -> DoctorReport:
+    """Inspect a database and run the requested maintenance, timing every step.
+
+    Without maintenance flags the database is only read, over a read-only
+    connection. analyze runs a full ANALYZE, optimize the cheaper PRAGMA
+    optimize. vacuum returns free pages to the filesystem with incremental
+    vacuum (at most vacuum_pages pages) and truncates the WAL; a file created
+    without auto_vacuum = INCREMENTAL is converted once by a full VACUUM. Lock
+    waits use the busy timeout and retries, so overlapping cron runs and live
+    writers only delay each other.
+    """
+    if not os.path.exists(db_name):
+        raise FileNotFoundError(f"Database not found: {db_name}")
+    report = DoctorReport(db_name)
+    writes = analyze or optimize or vacuum
+    conn = connect(db_name) if writes else connect_read_only(db_name)
+    conn.isolation_level = None  # VACUUM and ANALYZE manage their own transactions
+    try:
+        if vacuum:
+            if _pragma(conn, "auto_vacuum") != 2:
+                def convert():
+                    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    conn.execute("VACUUM")
+                _timed(report, "vacuum (full, enables incremental)", convert)
+            else:
+                free = _pragma(conn, "freelist_count")
+                pages = free if vacuum_pages is None else min(free, vacuum_pages)
+                _timed(report, "incremental vacuum",
+                       lambda: conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall(),
+                       f"{pages} pages released")
+            _timed(report, "wal checkpoint", lambda: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall())
+        if analyze:
+            _timed(report, "analyze", lambda: conn.execute("ANALYZE"))
+        if optimize:
+            _timed(report, "optimize", lambda: conn.execute("PRAGMA optimize"))
+        if integrity:
+            report.integrity = _timed(report, "quick check", lambda: "; ".join(
+                row[0] for row in conn.execute("PRAGMA quick_check")))
+
+        def read_stats():
+            report.page_size = _pragma(conn, "page_size")
+            report.page_count = _pragma(conn, "page_count")
+            report.freelist_count = _pragma(conn, "freelist_count")
+            report.auto_vacuum = AUTO_VACUUM_MODES.get(_pragma(conn, "auto_vacuum"), "unknown")
+            report.has_statistics = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is not None
+            report.indexes = index_sizes(conn)
+        _timed(report, "file statistics", read_stats)
+        if plans:
+            report.plans = _timed(report, "query plans",
+                                  lambda: [check_query_plan(conn, name) for name in QUERY_PLANS],
+                                  f"{len(QUERY_PLANS)} queries")
+    finally:
+        conn.close()
+    report.file_size = os.path.getsize(db_name)
+    wal = db_name + "-wal"
+    report.wal_size = os.path.getsize(wal) if os.path.exists(wal) else 0
+    logger.info(f"Doctor checked {db_name}: {len(report.problems())} problems")
+    return report
@@ -2,6 +2,7 @@ import sqlite3
 from dataclasses import dataclass
 from typing import Optional, List
 from utils.logger import setup_logger
+from models.database import ensure_schema
 
 logger = setup_logger()
 
@@ -14,6 +15,7 @@ class Record:
     category: str = ""
     date: str = ""
     user_id: str = ""
+    note: Optional[str] = None
 
 class RecordModel:
     def __init__(self, db_path: str = "moneytracker.db"):
@@ -34,6 +36,7 @@ class RecordModel:
                     user_id TEXT NOT NULL
                 );
             """)
+            ensure_schema(conn)
             conn.commit()
 
     def add_record(self, record: Record) -> int:
@@ -41,14 +44,15 @@ class RecordModel:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO transactions (amount, type, category, date, user_id)
-                VALUES (:amount, :type, :category, :date, :user_id)
+                INSERT INTO transactions (amount, type, category, date, user_id, note)
+                VALUES (:amount, :type, :category, :date, :user_id, :note)
             """, {
                 "amount": record.amount,
                 "type": record.type,
                 "category": record.category,
                 "date": record.date,
-                "user_id": record.user_id
+                "user_id": record.user_id,
+                "note": record.note
             })
             conn.commit()
             new_id = cursor.lastrowid
@@ -60,7 +64,7 @@ class RecordModel:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT id, amount, type, category, date, user_id
+                SELECT id, amount, type, category, date, user_id, note
                 FROM transactions
                 WHERE id = :id AND user_id = :user_id
             """, {"id": record_id, "user_id": user_id})
@@ -75,7 +79,7 @@ class RecordModel:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             query = """
-                SELECT id, amount, type, category, date, user_id
+                SELECT id, amount, type, category, date, user_id, note
                 FROM transactions
                 WHERE user_id = :user_id
             """
@@ -127,13 +131,14 @@ class RecordModel:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE transactions
-                SET amount = :amount, type = :type, category = :category, date = :date
+                SET amount = :amount, type = :type, category = :category, date = :date, note = :note
                 WHERE id = :id AND user_id = :user_id
             """, {
                 "amount": record.amount,
                 "type": record.type,
                 "category": record.category,
                 "date": record.date,
+                "note": record.note,
                 "id": record_id,
                 "user_id": user_id
             })
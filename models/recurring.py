@@ -0,0 +1,157 @@
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from models.database import connect, run_with_retry
+from models.transaction import TransactionModel
+from utils.logger import setup_logger
+from utils.recurrence import occurrences, validate_schedule
+
+logger = setup_logger()
+
+@dataclass
+class RecurringRule:
+    """A transaction template that repeats on a schedule."""
+    id: Optional[int] = None
+    user_id: str = ""
+    amount: float = 0.0
+    type: str = 'expense'
+    category: str = ""
+    note: Optional[str] = None
+    frequency: str = 'monthly'  # daily, weekly, monthly or cron
+    interval: int = 1
+    cron: Optional[str] = None
+    start_date: str = ""
+    end_date: Optional[str] = None
+    materialized_until: Optional[str] = None
+
+_RULE_COLUMNS = ("id, user_id, amount, type, category, note, frequency, interval, cron, "
+                 "start_date, end_date, materialized_until")
+# {user_filter} is " WHERE user_id = ?" for one user's rules
+GET_RULES_SQL = f"SELECT {_RULE_COLUMNS} FROM recurring_rules{{user_filter}} ORDER BY id"
+
+class RecurringModel:
+    """Recurring rules and their bulk materialization into transactions."""
+    def __init__(self, db_name: str = "moneytracker.db"):
+        self.db_name = db_name
+        self._ensure_table()
+
+    def _ensure_table(self):
+        """Ensure the recurring_rules table and the transaction schema exist."""
+        TransactionModel(self.db_name)
+        try:
+            with connect(self.db_name) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS recurring_rules (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id TEXT NOT NULL,
+                        amount REAL NOT NULL,
+                        type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+                        category TEXT NOT NULL,
+                        note TEXT,
+                        frequency TEXT NOT NULL,
+                        interval INTEGER NOT NULL DEFAULT 1,
+                        cron TEXT,
+                        start_date TEXT NOT NULL,
+                        end_date TEXT,
+                        materialized_until TEXT
+                    )
+                """)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error creating recurring_rules table: {e}")
+            raise
+
+    def add_rule(self, rule: RecurringRule) -> int:
+        """Store a rule and return its ID. The schedule (frequency, interval, cron) is checked up front."""
+        validate_schedule(rule.frequency, rule.interval, rule.cron)
+        def write() -> int:
+            with connect(self.db_name) as conn:
+                cursor = conn.execute("""
+                    INSERT INTO recurring_rules (user_id, amount, type, category, note, frequency,
+                                                 interval, cron, start_date, end_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (rule.user_id, rule.amount, rule.type, rule.category, rule.note, rule.frequency,
+                      rule.interval, rule.cron, rule.start_date, rule.end_date))
+                conn.commit()
+                return cursor.lastrowid
+        try:
+            rule.id = run_with_retry(write)
+            logger.info(f"Added recurring rule {rule.id} for user {rule.user_id}")
+            return rule.id
+        except sqlite3.Error as e:
+            logger.error(f"Error adding recurring rule: {e}")
+            raise
+
+    def get_rules(self, user_id: Optional[str] = None) -> List[RecurringRule]:
+        """All rules, or one user's rules."""
+        try:
+            with connect(self.db_name) as conn:
+                query = GET_RULES_SQL.format(user_filter=" WHERE user_id = ?" if user_id is not None else "")
+                params = [] if user_id is None else [user_id]
+                return [RecurringRule(*row) for row in conn.execute(query, params)]
+        except sqlite3.Error as e:
+            logger.error(f"Error reading recurring rules: {e}")
+            raise
+
+    def delete_rule(self, rule_id: int, user_id: str) -> bool:
+        """Delete a rule; transactions it already produced are kept."""
+        def write() -> int:
+            with connect(self.db_name) as conn:
+                cursor = conn.execute("DELETE FROM recurring_rules WHERE id = ? AND user_id = ?", (rule_id, user_id))
+                conn.commit()
+                return cursor.rowcount
+        try:
+            return run_with_retry(write) > 0
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting recurring rule: {e}")
+            raise
+
+    def materialize(self, until: str) -> Tuple[int, int]:
+        """Insert every occurrence due on or before until, for all rules, in one transaction.
+
+        Each rule resumes after its materialized_until watermark. The unique
+        (rule_id, date) index makes the insert idempotent even if the watermark is
+        lost or a run is repeated concurrently. Returns (inserted, already present).
+        """
+        last = date.fromisoformat(until)
+        rows = []
+        watermarks = []
+        for rule in self.get_rules():
+            try:
+                first = date.fromisoformat(rule.start_date)
+                if rule.materialized_until:
+                    first = max(first, date.fromisoformat(rule.materialized_until) + timedelta(days=1))
+                rule_last = min(last, date.fromisoformat(rule.end_date)) if rule.end_date else last
+                rule_rows = [(rule.amount, rule.type, rule.category, day.isoformat(), rule.user_id, rule.note, rule.id)
+                             for day in occurrences(rule.frequency, date.fromisoformat(rule.start_date), first,
+                                                    rule_last, rule.interval, rule.cron)]
+            except ValueError as e:
+                # One broken rule (e.g. stored before schedules were checked) must not block the others
+                logger.warning(f"Skipped recurring rule {rule.id} of user {rule.user_id}: {e}")
+                continue
+            rows.extend(rule_rows)
+            watermarks.append((until, rule.id, until))
+
+        def write() -> int:
+            with connect(self.db_name) as conn:
+                cursor = conn.executemany("""
+                    INSERT INTO transactions (amount, type, category, date, user_id, note, rule_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT DO NOTHING
+                """, rows)
+                inserted = cursor.rowcount if rows else 0
+                conn.executemany("""
+                    UPDATE recurring_rules SET materialized_until = ?
+                    WHERE id = ? AND (materialized_until IS NULL OR materialized_until < ?)
+                """, watermarks)
+                conn.commit()
+                return inserted
+        try:
+            inserted = run_with_retry(write)
+            logger.info(f"Materialized {inserted} recurring transactions up to {until} "
+                        f"({len(rows) - inserted} already present)")
+            return inserted, len(rows) - inserted
+        except sqlite3.Error as e:
+            logger.error(f"Error materializing recurring transactions: {e}")
+            raise
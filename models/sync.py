@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+from models.database import connect
+from models.transaction import TransactionModel
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Latest change per uid since a watermark, with the row's current state (NULLs once deleted).
+# NOT INDEXED keeps the planner on a seq range seek instead of scanning idx_changelog_uid.
+OUTGOING_CHANGES_SQL = """
+    SELECT c.uid, c.changed_at, c.origin, t.id IS NULL,
+           t.amount, t.type, t.category, t.date, t.user_id, t.note, t.currency, t.external_ref, t.fingerprint
+    FROM (SELECT uid, MAX(seq) AS seq FROM changelog NOT INDEXED WHERE seq > ? GROUP BY uid) latest
+    JOIN changelog c ON c.seq = latest.seq
+    LEFT JOIN transactions t ON t.uid = c.uid
+"""
+
+# Stamp of the latest local change to a uid
+LATEST_STAMP_SQL = "SELECT changed_at, origin FROM changelog WHERE uid = ? ORDER BY seq DESC LIMIT 1"
+
+SYNCED_ROW_SQL = """
+    SELECT amount, type, category, date, user_id, note, currency, external_ref, fingerprint
+    FROM transactions WHERE uid = ?
+"""
+
+# Another row already holds the fingerprint: the same import was made on both sides
+FINGERPRINT_TAKEN_SQL = "SELECT 1 FROM transactions WHERE fingerprint = ? AND uid != ?"
+
+UPSERT_SYNCED_SQL = """
+    INSERT INTO transactions (uid, amount, type, category, date, user_id, note, currency, external_ref, fingerprint)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (uid) DO UPDATE SET amount = excluded.amount, type = excluded.type,
+        category = excluded.category, date = excluded.date, user_id = excluded.user_id,
+        note = excluded.note, currency = excluded.currency, external_ref = excluded.external_ref,
+        fingerprint = excluded.fingerprint
+"""
+
+class SyncError(Exception):
+    """Raised when two databases cannot be synchronized."""
+    pass
+
+@dataclass
+class SyncResult:
+    """Counts of one two-way sync."""
+    pulled: int = 0
+    pushed: int = 0
+    conflicts: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+def database_id(conn: sqlite3.Connection) -> str:
+    return conn.execute("SELECT value FROM sync_meta WHERE key = 'db_id'").fetchone()[0]
+
+def pulled_seq(conn: sqlite3.Connection, peer_id: str) -> int:
+    row = conn.execute("SELECT pulled_seq FROM sync_peers WHERE peer_id = ?", (peer_id,)).fetchone()
+    return row[0] if row else 0
+
+def max_seq(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changelog").fetchone()[0]
+
+def outgoing_changes(conn: sqlite3.Connection, since: int) -> Dict[str, tuple]:
+    """uid -> (changed_at, origin, deleted, row) for every row changed after seq since."""
+    return {uid: (changed_at, origin, bool(deleted), tuple(row))
+            for uid, changed_at, origin, deleted, *row in conn.execute(OUTGOING_CHANGES_SQL, (since,))}
+
+def apply_changes(conn: sqlite3.Connection, changes: Dict[str, tuple]) -> Tuple[int, int]:
+    """Apply a peer's changes where they win last-writer-wins; returns (applied, skipped).
+
+    A change wins when its (changed_at, origin) stamp is greater than the latest
+    local stamp of the same uid, so both sides settle on the same row whatever
+    order they sync in. Changes that would not alter the row are skipped. A row
+    whose fingerprint another local row already holds is stored without it, as
+    a duplicate that dedupe finds.
+    """
+    applied = skipped = 0
+    for uid, (changed_at, origin, deleted, row) in changes.items():
+        local = conn.execute(LATEST_STAMP_SQL, (uid,)).fetchone()
+        if local is not None and tuple(local) >= (changed_at, origin):
+            skipped += 1
+            continue
+        fingerprint = row[-1]
+        if fingerprint is not None and conn.execute(FINGERPRINT_TAKEN_SQL, (fingerprint, uid)).fetchone():
+            row = row[:-1] + (None,)
+        current = conn.execute(SYNCED_ROW_SQL, (uid,)).fetchone()
+        if (current is None and deleted) or (current is not None and tuple(current) == row):
+            skipped += 1
+            continue
+        conn.execute("INSERT INTO sync_apply (changed_at, origin) VALUES (?, ?)", (changed_at, origin))
+        if deleted:
+            conn.execute("DELETE FROM transactions WHERE uid = ?", (uid,))
+        else:
+            conn.execute(UPSERT_SYNCED_SQL, (uid,) + row)
+        conn.execute("DELETE FROM sync_apply")
+        applied += 1
+    return applied, skipped
+
+def sync_databases(local_db: str, remote_db: str) -> SyncResult:
+    """Exchange the changes made since the last sync between two database files.
+
+    Each side remembers the highest change-log seq it has pulled from the other,
+    so only rows changed after that watermark are read and written: the cost is
+    proportional to the number of changes, not to the size of either file. Both
+    files are write-locked for the duration, so no concurrent change can slip
+    between reading a side's changes and advancing its watermark.
+    """
+    if not os.path.exists(remote_db):
+        raise SyncError(f"Database not found: {remote_db}")
+    if os.path.abspath(local_db) == os.path.abspath(remote_db):
+        raise SyncError("Cannot sync a database with itself")
+    # Opening the models brings both files up to the current schema
+    TransactionModel(db_name=local_db)
+    TransactionModel(db_name=remote_db)
+    start = time.perf_counter()
+    local = connect(local_db)
+    remote = connect(remote_db)
+    result = SyncResult()
+    try:
+        local.execute("BEGIN IMMEDIATE")
+        remote.execute("BEGIN IMMEDIATE")
+        local_id, remote_id = database_id(local), database_id(remote)
+        if local_id == remote_id:
+            # The files were copied from one another; give the copy its own identity
+            remote_id = remote.execute("SELECT lower(hex(randomblob(8)))").fetchone()[0]
+            remote.execute("UPDATE sync_meta SET value = ? WHERE key = 'db_id'", (remote_id,))
+            logger.info(f"{remote_db} shared the database id of {local_db}; assigned new id {remote_id}")
+        outgoing = outgoing_changes(local, pulled_seq(remote, local_id))
+        incoming = outgoing_changes(remote, pulled_seq(local, remote_id))
+        result.conflicts = len(outgoing.keys() & incoming.keys())
+        result.pulled, skipped_in = apply_changes(local, incoming)
+        result.pushed, skipped_out = apply_changes(remote, outgoing)
+        result.skipped = skipped_in + skipped_out
+        # Both files are locked, so everything up to the current seq has been exchanged
+        local.execute("INSERT OR REPLACE INTO sync_peers (peer_id, pulled_seq) VALUES (?, ?)",
+                      (remote_id, max_seq(remote)))
+        remote.execute("INSERT OR REPLACE INTO sync_peers (peer_id, pulled_seq) VALUES (?, ?)",
+                       (local_id, max_seq(local)))
+        # If the local commit fails after the remote one, the next sync simply re-pulls
+        remote.commit()
+        local.commit()
+    except sqlite3.Error as e:
+        local.rollback()
+        remote.rollback()
+        logger.error(f"Sync of {local_db} with {remote_db} failed: {e}")
+        raise SyncError(f"Sync failed: {e}")
+    finally:
+        local.close()
+        remote.close()
+    result.seconds = time.perf_counter() - start
+    logger.info(f"Synced {local_db} with {remote_db}: pulled {result.pulled}, pushed {result.pushed}, "
+                f"{result.conflicts} conflicts, {result.skipped} skipped in {result.seconds:.2f}s")
+    return result
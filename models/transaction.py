@@ -1,10 +1,246 @@
+import hashlib
+import json
+import re
 import sqlite3                     
+from contextlib import contextmanager
 from dataclasses import dataclass  
 from datetime import datetime      
-from typing import List, Optional  
+from typing import Dict, Iterator, List, Optional, Tuple
 from utils.logger import setup_logger  
+from models.database import (
+    DAY_NUMBER_SQL, DEFAULT_CURRENCY, MONTH_LABEL_SQL, OPEN_END_DATE, OPEN_START_DATE,
+    SCHEMA_VERSION, WEEK_START_SQL, balance_blocks_query, check_fx_rates, day_number, connect, connect_read_only, ensure_schema, month_number,
+    fx_foreign_sql, fx_grouped_sql, fx_rows_sql, run_with_retry, schema_version, week_number
+)
 
 logger = setup_logger()
+
+# Per trend period: (group key column, SQL label of a key, SQL consecutive integer index of a key,
+# Python key of a YYYY-MM-DD date or None). Weeks and months group on the indexed
+# calendar columns, so neither label nor index is computed per row.
+TREND_PERIODS = {
+    'daily': ("date", "{key}", DAY_NUMBER_SQL.format(date="{key}"), None),
+    'weekly': ("week_num", WEEK_START_SQL, "{key}", week_number),
+    'monthly': ("month_num", MONTH_LABEL_SQL, "{key}", month_number),
+}
+DEFAULT_TREND_WINDOWS = {'daily': 7, 'weekly': 4, 'monthly': 3}
+
+INSERT_TRANSACTION_SQL = """
+    INSERT INTO transactions (amount, type, category, date, user_id, note, currency, external_ref, fingerprint)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Rows whose fingerprint is already stored are skipped instead of raising
+INSERT_TRANSACTION_DEDUPE_SQL = INSERT_TRANSACTION_SQL + " ON CONFLICT DO NOTHING"
+# Columns that identify the same real-world transaction for import de-duplication,
+# as fingerprints() keys them
+DUPLICATE_KEY_COLUMNS = "user_id, date, type, category, printf('%.2f', amount), COALESCE(external_ref, '')"
+# An edit to a keyed column drops the fingerprint (the right side sees the old
+# row), so importing the original statement again restores the imported row
+UPDATE_TRANSACTION_SQL = """
+    UPDATE transactions
+    SET amount = :amount, type = :type, category = :category, date = :date, user_id = :user_id,
+        note = :note, currency = :currency,
+        fingerprint = CASE WHEN user_id = :user_id AND date = :date AND type = :type AND category = :category
+                                AND printf('%.2f', amount) = printf('%.2f', :amount)
+                           THEN fingerprint END
+    WHERE id = :id
+"""
+# Category labels in the subtree of the category tree node with path ?; filtering
+# with category IN (...) keeps the scan on the (user_id, date, ...) covering index
+CATEGORY_SUBTREE_SQL = """
+    SELECT l.label FROM categories AS r
+    JOIN category_closure AS cc ON cc.ancestor = r.id
+    JOIN category_labels AS l ON l.category_id = cc.descendant
+    WHERE r.path = ?
+"""
+# Current tree path of each grouped bucket's category, or of its ancestor at
+# level ? (NULL: the node itself) when the node is deeper; unknown labels keep their text
+CATEGORY_ROLLUP_JOIN = """
+    LEFT JOIN category_labels AS l ON l.label = b.category
+    LEFT JOIN categories AS n ON n.id = l.category_id
+    LEFT JOIN category_closure AS cc ON cc.descendant = n.id AND cc.depth = MAX(n.level - COALESCE(?, n.level), 0)
+    LEFT JOIN categories AS a ON a.id = cc.ancestor
+"""
+
+# Statements below are run as written and registered unchanged with doctor's
+# query-plan checks (models/maintenance.py). A missing date bound is bound as
+# OPEN_START_DATE / OPEN_END_DATE; {..._filter} placeholders take one of the
+# optional clauses or "". Amounts are reported in DEFAULT_CURRENCY, after
+# check_fx_rates, by summing fx_grouped_sql's (currency, date) buckets, except by
+# aggregate_by_currency, which keeps each currency apart.
+USER_FILTER_SQL = " AND user_id = ?"
+USERS_FILTER_SQL = " AND user_id IN (SELECT value FROM json_each(?))"
+# The same filters with named parameters, for the bucketed statements
+NAMED_USER_FILTER_SQL = " AND user_id = :user_id"
+NAMED_USERS_FILTER_SQL = " AND user_id IN (SELECT value FROM json_each(:users))"
+MONTH_FILTER_SQL = " AND month_num = ?"
+CATEGORY_FILTER_SQL = f" AND category IN ({CATEGORY_SUBTREE_SQL})"
+GET_TRANSACTION_SQL = """
+    SELECT id, amount, type, category, date, user_id, note, currency, external_ref
+    FROM transactions WHERE id = ? AND user_id = ?
+"""
+READ_ALL_SQL = """
+    SELECT id, amount, type, category, date, user_id, note, currency, external_ref
+    FROM transactions WHERE user_id = ? AND date BETWEEN ? AND ?{category_filter}
+"""
+# Rows with the duplicate key and their occurrence, numbered as fingerprints() numbers
+# an import: rows with a reference are all occurrence 1, the others count up in id
+# order, fingerprinted and unfingerprinted rows separately. Rows sharing key and
+# occurrence are copies of one purchase; equal rows of one import are not.
+DUPLICATE_OCCURRENCES_SQL = f"""
+    SELECT id, user_id, date, type, category, amount, external_ref, fingerprint,
+           CASE WHEN external_ref IS NULL
+                THEN ROW_NUMBER() OVER (PARTITION BY {DUPLICATE_KEY_COLUMNS}, fingerprint IS NULL ORDER BY id)
+                ELSE 1 END AS occurrence
+    FROM transactions WHERE 1 = 1{{user_filter}}
+"""
+FIND_DUPLICATES_SQL = f"""
+    SELECT user_id, date, type, category, amount, MAX(external_ref), COUNT(*), GROUP_CONCAT(id)
+    FROM ({DUPLICATE_OCCURRENCES_SQL})
+    GROUP BY {DUPLICATE_KEY_COLUMNS}, occurrence
+    HAVING COUNT(*) > 1
+    ORDER BY user_id, date
+"""
+# Keeps the fingerprinted row of each group, else the oldest
+DELETE_DUPLICATES_SQL = f"""
+    DELETE FROM transactions WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY {DUPLICATE_KEY_COLUMNS}, occurrence
+                                          ORDER BY fingerprint IS NULL, id) AS n
+            FROM ({DUPLICATE_OCCURRENCES_SQL})
+        ) WHERE n > 1
+    )
+"""
+AGGREGATE_DAILY_SQL = f"""
+    SELECT user_id, date, type, category, SUM(amount), SUM(n)
+    FROM ({fx_grouped_sql("user_id, date, type, category", "date >= :start_date AND date <= :end_date{user_filter}",
+                          "user_id, date, type, category")})
+    GROUP BY user_id, date, type, category ORDER BY user_id, date
+"""
+# Parameters: default currency, user, start, end, the filters', then the rollup level
+AGGREGATE_BY_CURRENCY_SQL = f"""
+    SELECT b.currency, b.date, b.type, COALESCE(a.path, b.category), SUM(b.total), SUM(b.n)
+    FROM (SELECT COALESCE(currency, ?) AS currency, date, type, category, SUM(amount) AS total, COUNT(*) AS n
+          FROM transactions WHERE user_id = ? AND date >= ? AND date <= ?{{month_filter}}{{category_filter}}
+          GROUP BY 1, date, type, category) AS b {CATEGORY_ROLLUP_JOIN}
+    GROUP BY 1, 2, 3, 4
+"""
+RANGE_PROFILE_SQL = """
+    SELECT (SELECT MIN(date) FROM transactions
+            WHERE user_id = :user_id AND date >= :start_date AND date <= :end_date),
+           (SELECT MAX(date) FROM transactions
+            WHERE user_id = :user_id AND date >= :start_date AND date <= :end_date),
+           (SELECT COUNT(*) FROM (SELECT 1 FROM transactions
+                                  WHERE user_id = :user_id AND date >= :start_date AND date <= :end_date
+                                  LIMIT :limit))
+"""
+# WHERE clause shared by the statistics queries; served by idx_transactions_user_date
+STATS_FILTER_SQL = "user_id = :user_id AND type = :type AND date >= :start_date AND date <= :end_date"
+RANGE_TOTALS_SQL = f"SELECT COALESCE(SUM(n), 0), COALESCE(SUM(amount), 0) FROM ({fx_grouped_sql('', STATS_FILTER_SQL)})"
+TOP_TOTALS_SQL = f"""
+    SELECT key, SUM(amount), SUM(n)
+    FROM ({fx_grouped_sql("{column} AS key", STATS_FILTER_SQL + " AND {column} IS NOT NULL", "{column}")})
+    GROUP BY key ORDER BY 2 DESC, 1 LIMIT :limit
+"""
+ITER_USER_TOTALS_SQL = f"""
+    SELECT user_id, type, category, SUM(amount), SUM(n)
+    FROM ({fx_grouped_sql("user_id, type, category", "date >= :start_date AND date <= :end_date",
+                          "user_id, type, category")})
+    GROUP BY user_id, type, category ORDER BY user_id, type, category
+"""
+DAILY_TOTALS_SQL = f"""
+    SELECT user_id, date, SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END),
+           SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END)
+    FROM ({fx_grouped_sql("user_id, date, type", "date >= :start_date AND date <= :end_date{user_filter}",
+                          "user_id, date, type")})
+    GROUP BY user_id, date ORDER BY user_id, date
+"""
+CHANGED_USERS_SQL = """
+    SELECT user_id FROM changelog WHERE seq > :seq
+    UNION
+    SELECT p.user_id FROM changelog AS c JOIN changelog AS p ON p.uid = c.uid
+    WHERE c.seq > :seq AND c.op = 'update'
+"""
+COLUMN_ROWS_SQL = """
+    SELECT day_num, amount, type, category, COALESCE(currency, :currency)
+    FROM transactions WHERE user_id = :user_id
+"""
+# Any update or delete since :seq that touched a row the user owns or owned
+COLUMN_ROWS_REWRITTEN_SQL = """
+    SELECT 1 FROM changelog AS c
+    WHERE c.seq > :seq AND c.op != 'insert'
+      AND (c.user_id = :user_id OR c.user_id IS NULL
+           OR EXISTS (SELECT 1 FROM changelog AS p WHERE p.uid = c.uid AND p.user_id = :user_id))
+    LIMIT 1
+"""
+COLUMN_ROWS_INSERTED_SQL = """
+    SELECT t.day_num, t.amount, t.type, t.category, COALESCE(t.currency, :currency)
+    FROM changelog AS c CROSS JOIN transactions AS t ON t.id = c.row_id
+    WHERE c.seq > :seq AND c.op = 'insert' AND c.user_id = :user_id AND t.user_id = :user_id
+"""
+SEARCH_SQL = """
+    SELECT t.id, t.amount, t.type, t.category, t.date, t.user_id, t.note, t.currency, t.external_ref
+    FROM transactions_fts
+    JOIN transactions AS t ON t.id = transactions_fts.rowid
+    WHERE transactions_fts MATCH ? AND t.user_id = ? AND t.date >= ? AND t.date <= ?
+    ORDER BY t.date DESC, t.id DESC LIMIT ?
+"""
+# Blocks cover rows without a currency up to :day; the others are converted,
+# read through the partial index idx_transactions_foreign
+BALANCE_AS_OF_SQL = f"""
+    SELECT ({balance_blocks_query()})
+           + (SELECT COALESCE(SUM(CASE WHEN type = 'income' THEN amount ELSE -amount END), 0)
+              FROM ({fx_foreign_sql("type", "user_id = :user_id AND date <= :date", "type")}))
+"""
+BALANCES_FOR_USERS_SQL = (f"SELECT users.value, ({BALANCE_AS_OF_SQL.replace(':user_id', 'users.value')}) "
+                          "FROM json_each(:users) AS users")
+DELETE_TRANSACTION_SQL = "DELETE FROM transactions WHERE id = ? AND user_id = ?"
+
+
+def trend_series_sql(period: str, window: int, start: bool = True, end: bool = True) -> str:
+    """The trend_series statement of a period and window, with or without each date bound.
+
+    Days are bounded by :start_date / :end_date; weeks and months by
+    :first_key / :first_day and :last_key / :last_day, a key range seek plus a
+    day check read from the same index.
+    """
+    column, label, index, period_key = TREND_PERIODS[period]
+    range_filter = ""
+    if period_key is None:
+        range_filter += " AND date >= :start_date" if start else ""
+        range_filter += " AND date <= :end_date" if end else ""
+    else:
+        range_filter += f" AND {column} >= :first_key AND day_num >= :first_day" if start else ""
+        range_filter += f" AND {column} <= :last_key AND day_num <= :last_day" if end else ""
+    opening = f"""
+        SELECT COALESCE(SUM(CASE WHEN type = 'income' THEN amount ELSE -amount END), 0)
+        FROM ({fx_grouped_sql("type", "user_id = :user_id AND date < :start_date", "type")})
+    """ if start else "SELECT 0"
+    buckets = fx_grouped_sql(f"{column} AS key, type", f"user_id = :user_id{range_filter}", f"{column}, type")
+    return f"""
+        WITH grouped AS (
+            SELECT key,
+                   SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) AS income,
+                   SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) AS expense,
+                   SUM(n) AS transaction_count
+            FROM ({buckets})
+            GROUP BY key
+        ), periods AS (
+            SELECT {label.format(key="key")} AS period, {index.format(key="key")} AS idx,
+                   income, expense, transaction_count
+            FROM grouped
+        )
+        SELECT period, income, expense, income - expense AS net, transaction_count,
+               ({opening}) + SUM(income - expense) OVER (ORDER BY idx ROWS UNBOUNDED PRECEDING)
+                   AS running_balance,
+               SUM(income) OVER rolling / {window}.0 AS rolling_income,
+               SUM(expense) OVER rolling / {window}.0 AS rolling_expense,
+               SUM(income - expense) OVER rolling / {window}.0 AS rolling_net
+        FROM periods
+        WINDOW rolling AS (ORDER BY idx RANGE BETWEEN {window - 1} PRECEDING AND CURRENT ROW)
+        ORDER BY idx
+    """
+
 @dataclass
 class Transaction:
     """Data class for a financial transaction."""
@@ -14,12 +250,80 @@ class Transaction:
     category: str = ""
     date: str = ""
     user_id: str = ""
+    note: Optional[str] = None
+    currency: Optional[str] = None  # None means DEFAULT_CURRENCY
+    external_ref: Optional[str] = None  # Bank or statement reference, e.g. a transaction ID
+
+def fingerprints(transactions: List[Transaction]) -> List[str]:
+    """Deterministic duplicate-detection keys for a batch of imported transactions.
+
+    The key covers user, date, type, amount, category and external reference.
+    Rows without a reference that are otherwise identical are numbered in order
+    (two equal coffees on one day are two rows), so importing the same batch
+    again reproduces the same fingerprints and every row is recognised.
+    """
+    seen: Dict[tuple, int] = {}
+    keys = []
+    for t in transactions:
+        key = (t.user_id, t.date, t.type, t.category, f"{t.amount:.2f}", t.external_ref or "")
+        occurrence = 0
+        if t.external_ref is None:
+            occurrence = seen.get(key, 0)
+            seen[key] = occurrence + 1
+        keys.append(hashlib.sha256("\x1f".join(key + (str(occurrence),)).encode("utf-8")).hexdigest()[:32])
+    return keys
+
+def build_search_query(text: str) -> str:
+    """Turn user search input into an FTS5 query.
+
+    Words are matched as tokens, a trailing * makes a word a prefix match and
+    text in double quotes is matched as a phrase. All terms must match.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+            continue
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    if not terms:
+        raise ValueError("Search query cannot be empty")
+    return " AND ".join(terms)
 
 class TransactionModel:
     """Model for handling transaction CRUD operations with SQLite."""
-    def __init__(self, db_name: str = "moneytracker.db"):
+    def __init__(self, db_name: str = "moneytracker.db", busy_timeout: Optional[float] = None,
+                 synchronous: Optional[str] = None, read_only: bool = False, immutable: bool = False):
         self.db_name = db_name
-        self._ensure_table()
+        self.busy_timeout = busy_timeout
+        self.synchronous = synchronous
+        # Read-only models skip the schema DDL unless the file predates SCHEMA_VERSION
+        self.read_only = read_only or immutable
+        self.immutable = immutable
+        if not self.read_only:
+            self._ensure_table()
+        elif not immutable:
+            version = schema_version(db_name)
+            if version is None or version < SCHEMA_VERSION:
+                logger.info(f"Migrating {db_name} to schema version {SCHEMA_VERSION} before read-only use")
+                self._ensure_table()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection using this model's busy timeout and durability settings.
+
+        Read-only models get a mode=ro, memory-mapped, query_only connection.
+        """
+        if self.read_only:
+            return connect_read_only(self.db_name, self.immutable)
+        return connect(self.db_name, self.busy_timeout, self.synchronous)
+
+    @staticmethod
+    def insert_params(transaction: Transaction, fingerprint: Optional[str] = None) -> tuple:
+        """Parameters for INSERT_TRANSACTION_SQL."""
+        return (transaction.amount, transaction.type, transaction.category, transaction.date,
+                transaction.user_id, transaction.note, transaction.currency, transaction.external_ref, fingerprint)
 
     def initialize(self):
         """初始化数据库结构（用于测试或重建表结构）"""
@@ -29,7 +333,7 @@ class TransactionModel:
     def _ensure_table(self):
         """Ensure the transactions table exists."""
         try:
-            with sqlite3.connect(self.db_name) as conn:
+            with connect(self.db_name, self.busy_timeout, self.synchronous) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS transactions (
@@ -41,6 +345,7 @@ class TransactionModel:
                         user_id TEXT NOT NULL
                     )
                 """)
+                ensure_schema(conn)
                 conn.commit()
         except Exception as e:
             logger.error(f"Error ensuring transactions table: {e}")
@@ -50,30 +355,117 @@ class TransactionModel:
         
     def add_transaction(self, transaction: Transaction) -> int:
          """Create a new transaction and return its ID."""
-         try:
-                with sqlite3.connect(self.db_name) as conn:
-                        cursor= conn.cursor()
-                        cursor.execute("""
-                            INSERT INTO transactions (amount, type, category, date, user_id)
-                            VALUES (?, ?, ?, ?, ?)
-                            """, (transaction.amount, transaction.type, transaction.category, transaction.date, transaction.user_id))
+         def insert() -> int:
+                with self._connect() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute(INSERT_TRANSACTION_SQL, self.insert_params(transaction))
                         conn.commit()
-                        transaction.id = cursor.lastrowid
-                        logger.info(f"Transaction added with ID: {transaction.id}")
-                        return transaction.id
+                        return cursor.lastrowid
+         try:
+                transaction.id = run_with_retry(insert)
+                logger.info(f"Transaction added with ID: {transaction.id}")
+                return transaction.id
          except sqlite3.Error as e:
                 logger.error(f"Error adding transaction: {e}")
                 raise
 
+    def add_transactions(self, transactions: List[Transaction], dedupe: bool = False) -> int:
+        """Insert many transactions with one executemany in a single commit; returns the row count.
+
+        With dedupe each row is stored with its fingerprint, and rows whose
+        fingerprint already exists are skipped by the unique index, so the
+        returned count excludes them.
+        """
+        if dedupe:
+            rows = [self.insert_params(t, key) for t, key in zip(transactions, fingerprints(transactions))]
+        else:
+            rows = [self.insert_params(t) for t in transactions]
+        sql = INSERT_TRANSACTION_DEDUPE_SQL if dedupe else INSERT_TRANSACTION_SQL
+        def insert() -> int:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(sql, rows)
+                conn.commit()
+                return cursor.rowcount
+        try:
+            inserted = run_with_retry(insert)
+            if dedupe:
+                logger.info(f"Bulk inserted {inserted} transactions, skipped {len(rows) - inserted} duplicates")
+            else:
+                logger.info(f"Bulk inserted {inserted} transactions")
+            return inserted
+        except sqlite3.Error as e:
+            logger.error(f"Error bulk inserting transactions: {e}")
+            raise
+
+    def find_duplicates(self, user_id: Optional[str] = None) -> List[tuple]:
+        """Groups of rows with the same duplicate key and occurrence, found by one grouped scan.
+
+        Returns (user_id, date, type, category, amount, external_ref, count, ids)
+        per group, ids ascending.
+        """
+        try:
+            with self._connect() as conn:
+                query = FIND_DUPLICATES_SQL.format(user_filter=USER_FILTER_SQL if user_id else "")
+                rows = conn.execute(query, [user_id] if user_id else []).fetchall()
+                groups = [row[:7] + (sorted(int(i) for i in row[7].split(",")),) for row in rows]
+                logger.info(f"Found {len(groups)} duplicate groups for user: {user_id or 'all users'}")
+                return groups
+        except sqlite3.Error as e:
+            logger.error(f"Error finding duplicates: {e}")
+            raise
+
+    def delete_duplicates(self, user_id: Optional[str] = None) -> int:
+        """Delete every row of a duplicate group but one; returns the deleted count.
+
+        The fingerprinted row of a group is kept, otherwise the oldest.
+        """
+        def write() -> int:
+            with self._connect() as conn:
+                cursor = conn.execute(DELETE_DUPLICATES_SQL.format(user_filter=USER_FILTER_SQL if user_id else ""),
+                                      [user_id] if user_id else [])
+                conn.commit()
+                return cursor.rowcount
+        try:
+            deleted = run_with_retry(write)
+            logger.info(f"Deleted {deleted} duplicate transactions for user: {user_id or 'all users'}")
+            return deleted
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting duplicates: {e}")
+            raise
+
+    def backfill_fingerprints(self, user_id: Optional[str] = None) -> int:
+        """Fingerprint rows stored without one, so later imports recognise them; returns the count.
+
+        Rows whose fingerprint is already taken by another row are duplicates of it
+        and keep NULL.
+        """
+        def write() -> int:
+            with self._connect() as conn:
+                rows = conn.execute(f"""
+                    SELECT id, amount, type, category, date, user_id, NULL, NULL, external_ref
+                    FROM transactions WHERE fingerprint IS NULL {"AND user_id = ?" if user_id else ""}
+                    ORDER BY id
+                """, [user_id] if user_id else []).fetchall()
+                transactions = [Transaction(*row) for row in rows]
+                cursor = conn.executemany("UPDATE OR IGNORE transactions SET fingerprint = ? WHERE id = ?",
+                                          zip(fingerprints(transactions), (t.id for t in transactions)))
+                conn.commit()
+                return cursor.rowcount
+        try:
+            updated = run_with_retry(write)
+            logger.info(f"Fingerprinted {updated} transactions for user: {user_id or 'all users'}")
+            return updated
+        except sqlite3.Error as e:
+            logger.error(f"Error fingerprinting transactions: {e}")
+            raise
+
     def get_transaction(self, transaction_id: int, user_id: str) -> Optional[Transaction]:
         """Read a transaction by ID for a specific user."""
         try:
-             with sqlite3.connect(self.db_name) as conn:
+             with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                   SELECT id, amount, type, category, date, user_id
-                   FROM transactions WHERE id = ? AND user_id = ?
-                """, (transaction_id, user_id))
+                cursor.execute(GET_TRANSACTION_SQL, (transaction_id, user_id))
                 result = cursor.fetchone()
                 if result:
                      logger.info(f"Read transaction with ID: {transaction_id}")
@@ -84,18 +476,18 @@ class TransactionModel:
             logger.error(f"Error reading transaction: {e}")
             raise
 
-    def read_all(self,user_id:str,start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Transaction]:
-        """Read all transactions for a specific user, optionally filtered by date range."""
+    def read_all(self,user_id:str,start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 category: Optional[str] = None) -> List[Transaction]:
+        """Read all transactions for a specific user, optionally filtered by date range and category subtree."""
         try:
-            with sqlite3.connect(self.db_name) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                query = "SELECT id, amount, type, category, date, user_id FROM transactions WHERE user_id = ?"
-                params = [user_id]
-
-                if start_date and end_date:
-                    query += " AND date BETWEEN ? AND ?"
-                    params.extend([start_date, end_date])
-                cursor.execute(query, params)
+                # The range only applies with both ends given
+                params = [user_id] + ([start_date, end_date] if start_date and end_date
+                                      else [OPEN_START_DATE, OPEN_END_DATE])
+                if category:
+                    params.append(category)
+                cursor.execute(READ_ALL_SQL.format(category_filter=CATEGORY_FILTER_SQL if category else ""), params)
                 results = cursor.fetchall()
                 transactions = [Transaction(*row) for row in results]
                 logger.info(f"Read {len(transactions)} transactions for user: {user_id}")
@@ -104,40 +496,435 @@ class TransactionModel:
             logger.error(f"Error reading transactions: {e}")
             raise
 
-    def update(self, transaction: Transaction) -> bool:
-        """Update an existing transaction."""
+    def aggregate_daily(self, user_id: Optional[str] = None, start_date: Optional[str] = None,
+                        end_date: Optional[str] = None) -> List[tuple]:
+        """Aggregate amounts per (user, date, type, category) in a single grouped query.
+
+        Returns rows of (user_id, date, type, category, total, count). When user_id
+        is None every user in the range is aggregated in the same pass.
+        """
         try:
-            with sqlite3.connect(self.db_name) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE transactions
-                    SET amount = ?, type = ?, category = ?, date = ?, user_id = ?
-                    WHERE id = ?
-                """, (transaction.amount, transaction.type, transaction.category,
-                      transaction.date, transaction.user_id, transaction.id))
+                params = {"start_date": start_date or OPEN_START_DATE, "end_date": end_date or OPEN_END_DATE,
+                          "user_id": user_id}
+                if user_id is not None:
+                    check_fx_rates(conn, start_date, end_date, USER_FILTER_SQL, (user_id,))
+                else:
+                    check_fx_rates(conn, start_date, end_date)
+                user_filter = NAMED_USER_FILTER_SQL if user_id is not None else ""
+                cursor.execute(AGGREGATE_DAILY_SQL.format(user_filter=user_filter), params)
+                rows = cursor.fetchall()
+                logger.info(f"Aggregated {len(rows)} daily groups for user: {user_id or 'all users'}")
+                return rows
+        except sqlite3.Error as e:
+            logger.error(f"Error aggregating transactions: {e}")
+            raise
+
+    def aggregate_by_currency(self, user_id: str, start_date: Optional[str] = None,
+                              end_date: Optional[str] = None, category: Optional[str] = None,
+                              depth: Optional[int] = None, month: Optional[str] = None) -> List[tuple]:
+        """Amounts per (currency, date, type, category), ready for date-bucketed FX conversion.
+
+        Returns rows of (currency, date, type, category, total, count); rows stored
+        without a currency are reported in DEFAULT_CURRENCY. category limits the rows
+        to that node's subtree and month (YYYY-MM) to one calendar month, matched on
+        the integer month_num index. Categories are reported by their current tree path,
+        rolled up to their ancestor at level depth when given. The grouped buckets
+        are mapped to the tree, not the rows, so this costs one label lookup per
+        distinct category and date.
+        """
+        try:
+            with self._connect() as conn:
+                params = [DEFAULT_CURRENCY, user_id, start_date or OPEN_START_DATE, end_date or OPEN_END_DATE]
+                if month:
+                    params.append(month_number(month))
+                if category:
+                    params.append(category)
+                params.append(depth)
+                query = AGGREGATE_BY_CURRENCY_SQL.format(month_filter=MONTH_FILTER_SQL if month else "",
+                                                         category_filter=CATEGORY_FILTER_SQL if category else "")
+                rows = conn.execute(query, params).fetchall()
+                logger.info(f"Aggregated {len(rows)} currency groups for user: {user_id}")
+                return rows
+        except sqlite3.Error as e:
+            logger.error(f"Error aggregating transactions by currency: {e}")
+            raise
+
+    def range_profile(self, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      limit: int = 1_000_000) -> Tuple[Optional[str], Optional[str], int]:
+        """(first date, last date, row count) of a user's transactions in a range.
+
+        The dates are two index seeks and the count stops at limit, so sizing up
+        even a huge history costs at most limit index entries.
+        """
+        params = {"user_id": user_id, "start_date": start_date or OPEN_START_DATE,
+                  "end_date": end_date or OPEN_END_DATE, "limit": limit}
+        try:
+            with self._connect() as conn:
+                return conn.execute(RANGE_PROFILE_SQL, params).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error sizing transaction range: {e}")
+            raise
+
+    @staticmethod
+    def _stats_filter(user_id: str, type: str, start_date: Optional[str],
+                      end_date: Optional[str]) -> Tuple[str, Dict]:
+        """STATS_FILTER_SQL and its parameters."""
+        return STATS_FILTER_SQL, {"user_id": user_id, "type": type, "start_date": start_date or OPEN_START_DATE,
+                                  "end_date": end_date or OPEN_END_DATE}
+
+    @staticmethod
+    def _check_stats_rates(conn: sqlite3.Connection, params: Dict) -> None:
+        """check_fx_rates over the rows STATS_FILTER_SQL selects with params."""
+        check_fx_rates(conn, params["start_date"], params["end_date"], " AND user_id = ? AND type = ?",
+                       (params["user_id"], params["type"]))
+
+    def range_totals(self, user_id: str, type: str = 'expense', start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Tuple[int, float]:
+        """(count, total amount) of the range, from the covering index only."""
+        where, params = self._stats_filter(user_id, type, start_date, end_date)
+        try:
+            with self._connect() as conn:
+                self._check_stats_rates(conn, params)
+                count, total = conn.execute(RANGE_TOTALS_SQL, params).fetchone()
+                return count, total
+        except sqlite3.Error as e:
+            logger.error(f"Error counting transactions: {e}")
+            raise
+
+    def top_totals(self, user_id: str, column: str, type: str = 'expense', start_date: Optional[str] = None,
+                   end_date: Optional[str] = None, limit: int = 5) -> List[Tuple[str, float, int]]:
+        """Largest (key, total, count) groups of column ('category', or 'note' for merchants)."""
+        if column not in ('category', 'note'):
+            raise ValueError(f"Unsupported column: {column}")
+        where, params = self._stats_filter(user_id, type, start_date, end_date)
+        try:
+            with self._connect() as conn:
+                self._check_stats_rates(conn, params)
+                return conn.execute(TOP_TOTALS_SQL.format(column=column), dict(params, limit=limit)).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading top {column} totals: {e}")
+            raise
+
+    def amount_quantiles(self, user_id: str, quantiles: List[float], type: str = 'expense',
+                         start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[float, float]:
+        """Exact quantiles: the converted amount at 0-based rank floor(q * (n - 1)), via ROW_NUMBER()."""
+        count, _ = self.range_totals(user_id, type, start_date, end_date)
+        if not count:
+            return {}
+        ranks = {q: int(q * (count - 1)) + 1 for q in quantiles}
+        where, params = self._stats_filter(user_id, type, start_date, end_date)
+        try:
+            with self._connect() as conn:
+                values = dict(conn.execute(f"""
+                    SELECT rn, amount FROM (
+                        SELECT amount, ROW_NUMBER() OVER (ORDER BY amount) AS rn
+                        FROM ({fx_rows_sql("id", where)})
+                    ) WHERE rn IN (SELECT value FROM json_each(:ranks))
+                """, dict(params, ranks=json.dumps(list(ranks.values())))).fetchall())
+                return {q: values[rank] for q, rank in ranks.items()}
+        except sqlite3.Error as e:
+            logger.error(f"Error computing quantiles: {e}")
+            raise
+
+    def category_histograms(self, user_id: str, bins: int = 10, type: str = 'expense',
+                            start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> Dict[str, List[Tuple[float, float, int]]]:
+        """Exact equal-width (low, high, count) histograms between each category's min and max."""
+        where, params = self._stats_filter(user_id, type, start_date, end_date)
+        try:
+            with self._connect() as conn:
+                self._check_stats_rates(conn, params)
+                rows = conn.execute(f"""
+                    SELECT category, lo, hi,
+                           CASE WHEN hi = lo THEN 0
+                                ELSE MIN(:last_bin, CAST((amount - lo) / ((hi - lo) / :bins) AS INTEGER)) END AS bin,
+                           COUNT(*)
+                    FROM (
+                        SELECT category, amount,
+                               MIN(amount) OVER (PARTITION BY category) AS lo,
+                               MAX(amount) OVER (PARTITION BY category) AS hi
+                        FROM ({fx_rows_sql("category", where)})
+                    )
+                    GROUP BY category, bin
+                    ORDER BY category, bin
+                """, dict(params, last_bin=bins - 1, bins=float(bins))).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error computing histograms: {e}")
+            raise
+        histograms: Dict[str, List[Tuple[float, float, int]]] = {}
+        for category, lo, hi, position, count in rows:
+            if category not in histograms:
+                width = (hi - lo) / bins
+                histograms[category] = [(lo + i * width, lo + (i + 1) * width, 0) for i in range(bins)]
+            low, high, _ = histograms[category][position]
+            histograms[category][position] = (low, high, count)
+        return histograms
+
+    def iter_amounts(self, user_id: str, type: str = 'expense', start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], float]]:
+        """Stream (category, note, amount) rows of the range without materializing them."""
+        where, params = self._stats_filter(user_id, type, start_date, end_date)
+        conn = self._connect()
+        try:
+            self._check_stats_rates(conn, params)
+            cursor = conn.execute(fx_rows_sql("category, note", where), params)
+            while True:
+                rows = cursor.fetchmany(10_000)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def iter_user_totals(self, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> Iterator[Tuple[str, str, str, float, int]]:
+        """Stream (user_id, type, category, total, count) for every user, ordered by user.
+
+        One GROUP BY pass over the table, fetched in batches so hundreds of
+        thousands of users never sit in memory at once.
+        """
+        conn = self._connect()
+        try:
+            check_fx_rates(conn, start_date, end_date)
+            cursor = conn.execute(ITER_USER_TOTALS_SQL, {"start_date": start_date or OPEN_START_DATE,
+                                                         "end_date": end_date or OPEN_END_DATE})
+            while True:
+                rows = cursor.fetchmany(10_000)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def daily_totals(self, user_ids: Optional[List[str]] = None, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Iterator[Tuple[str, str, float, float]]:
+        """Stream (user_id, date, income, expense) per user and day, ordered by user and date.
+
+        user_ids None covers every user in one pass over the covering index;
+        a list is passed as one JSON parameter, however many users it holds.
+        """
+        params = {"start_date": start_date or OPEN_START_DATE, "end_date": end_date or OPEN_END_DATE,
+                  "users": json.dumps(user_ids) if user_ids is not None else None}
+        conn = self._connect()
+        try:
+            if user_ids is not None:
+                check_fx_rates(conn, start_date, end_date, USERS_FILTER_SQL, (params["users"],))
+            else:
+                check_fx_rates(conn, start_date, end_date)
+            user_filter = NAMED_USERS_FILTER_SQL if user_ids is not None else ""
+            cursor = conn.execute(DAILY_TOTALS_SQL.format(user_filter=user_filter), params)
+            while True:
+                rows = cursor.fetchmany(10_000)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def latest_seq(self) -> int:
+        """The latest change-log seq; it moves on with every committed write to transactions."""
+        try:
+            with self._connect() as conn:
+                return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changelog").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Error reading the change log: {e}")
+            raise
+
+    def changed_users(self, after_seq: Optional[int]) -> Tuple[int, Optional[set]]:
+        """(latest change-log seq, users whose transactions changed after after_seq).
+
+        Updates also report every earlier owner of the row, so moving a
+        transaction to another user invalidates both. The set is None when an
+        entry has no user (deletes logged before schema version 3).
+        """
+        try:
+            with self._connect() as conn:
+                latest = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changelog").fetchone()[0]
+                if after_seq is None or after_seq >= latest:
+                    return latest, set()
+                users = {row[0] for row in conn.execute(CHANGED_USERS_SQL, {"seq": after_seq})}
+                return latest, None if None in users else users
+        except sqlite3.Error as e:
+            logger.error(f"Error reading changed users: {e}")
+            raise
+
+    @contextmanager
+    def column_rows(self, user_id: str, after_seq: Optional[int] = None) -> Iterator[Tuple[int, Optional[Iterator]]]:
+        """Yield (latest change-log seq, rows) for a user's column cache, read in one transaction.
+
+        Rows are (day_num, amount, type, category, currency) in batches of up to
+        100000. Without after_seq they cover every transaction of the user; with it,
+        only those inserted since, looked up by the row ids in the change log.
+        rows is None when the user's transactions were updated or deleted after
+        after_seq (or the log is behind it, as in a restored file): the cache
+        must then be rebuilt.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            latest = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changelog").fetchone()[0]
+            params = {"user_id": user_id, "seq": after_seq, "currency": DEFAULT_CURRENCY}
+            if after_seq is None:
+                cursor = conn.execute(COLUMN_ROWS_SQL, params)
+            elif after_seq > latest or conn.execute(COLUMN_ROWS_REWRITTEN_SQL, params).fetchone():
+                cursor = None
+            else:
+                cursor = conn.execute(COLUMN_ROWS_INSERTED_SQL, params)
+            yield latest, None if cursor is None else iter(lambda: cursor.fetchmany(100_000), [])
+        except sqlite3.Error as e:
+            logger.error(f"Error reading column cache rows: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def category_paths(self, labels: List[str], depth: Optional[int] = None,
+                       category: Optional[str] = None) -> Dict[str, str]:
+        """The tree path aggregate_by_currency reports each category label under.
+
+        Paths are rolled up to level depth when given, labels without a node keep
+        their text, and with category only labels in that node's subtree are returned.
+        """
+        query = f"""
+            SELECT b.category, COALESCE(a.path, b.category)
+            FROM (SELECT value AS category FROM json_each(?)) AS b {CATEGORY_ROLLUP_JOIN}
+        """
+        params = [json.dumps(labels), depth]
+        if category:
+            query += f" WHERE b.category IN ({CATEGORY_SUBTREE_SQL})"
+            params.append(category)
+        try:
+            with self._connect() as conn:
+                return dict(conn.execute(query, params).fetchall())
+        except sqlite3.Error as e:
+            logger.error(f"Error reading category paths: {e}")
+            raise
+
+    def trend_series(self, user_id: str, period: str = 'daily', start_date: Optional[str] = None,
+                     end_date: Optional[str] = None, window: Optional[int] = None) -> List[Dict]:
+        """Per-period income, expense, net, running balance and rolling averages.
+
+        Everything is computed inside SQLite: periods are grouped in one pass over the
+        (user_id, date) index, or the (user_id, week_num) and (user_id, month_num)
+        indexes, and the running balance and rolling averages come from window functions. Rolling windows span calendar periods, so periods without
+        transactions count as zero. The running balance starts from the balance
+        accumulated before start_date.
+        """
+        if period not in TREND_PERIODS:
+            raise ValueError(f"Period must be one of {', '.join(TREND_PERIODS)}")
+        period_key = TREND_PERIODS[period][3]
+        window = int(window or DEFAULT_TREND_WINDOWS[period])
+        if window < 1:
+            raise ValueError("Window must be at least 1")
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                params: Dict = {"user_id": user_id, "start_date": start_date, "end_date": end_date}
+                if period_key is not None and start_date:
+                    params.update(first_key=period_key(start_date), first_day=day_number(start_date))
+                if period_key is not None and end_date:
+                    params.update(last_key=period_key(end_date), last_day=day_number(end_date))
+                # The opening balance covers the days before start_date too
+                check_fx_rates(conn, None, end_date, USER_FILTER_SQL, (user_id,))
+                query = trend_series_sql(period, window, bool(start_date), bool(end_date))
+                rows = [dict(row) for row in conn.execute(query, params)]
+                logger.info(f"Computed {len(rows)} {period} trend periods for user: {user_id}")
+                return rows
+        except sqlite3.Error as e:
+            logger.error(f"Error computing trend: {e}")
+            raise
+
+    def search(self, user_id: str, query: str, start_date: Optional[str] = None,
+               end_date: Optional[str] = None, limit: int = 100) -> List[Transaction]:
+        """Full-text search over notes through the FTS5 index, newest matches first.
+
+        query uses FTS5 syntax; see build_search_query for turning user input into it.
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(SEARCH_SQL, (query, user_id, start_date or OPEN_START_DATE,
+                                            end_date or OPEN_END_DATE, limit))
+                transactions = [Transaction(*row) for row in cursor.fetchall()]
+                logger.info(f"Search matched {len(transactions)} transactions for user: {user_id}")
+                return transactions
+        except sqlite3.Error as e:
+            logger.error(f"Error searching transactions: {e}")
+            raise
+
+    def balance_as_of(self, user_id: str, as_of: str) -> float:
+        """Balance (income minus expense) of all transactions dated on or before as_of, in DEFAULT_CURRENCY.
+
+        Rows stored without a currency are served from the balance_blocks index in
+        O(log n) instead of scanning history; only rows in other currencies are
+        read, converted once per (currency, date) at that date's rate.
+        """
+        return self.balances_as_of(user_id, [as_of])[as_of]
+
+    def balances_as_of(self, user_id: str, dates: List[str]) -> Dict[str, float]:
+        """Balances for several dates over one connection."""
+        try:
+            with self._connect() as conn:
+                if dates:
+                    check_fx_rates(conn, None, max(dates), USER_FILTER_SQL, (user_id,))
+                balances = {}
+                for as_of in dates:
+                    params = {"user_id": user_id, "day": day_number(as_of), "date": as_of}
+                    balances[as_of] = conn.execute(BALANCE_AS_OF_SQL, params).fetchone()[0]
+                logger.info(f"Read {len(balances)} point balances for user: {user_id}")
+                return balances
+        except sqlite3.Error as e:
+            logger.error(f"Error reading balance: {e}")
+            raise
+
+    def balances_for_users(self, user_ids: List[str], as_of: str) -> Dict[str, float]:
+        """Balance as of as_of for many users in one statement, one index lookup per user."""
+        users = json.dumps(user_ids)
+        try:
+            with self._connect() as conn:
+                check_fx_rates(conn, None, as_of, USERS_FILTER_SQL, (users,))
+                return dict(conn.execute(BALANCES_FOR_USERS_SQL,
+                                         {"users": users, "day": day_number(as_of), "date": as_of}))
+        except sqlite3.Error as e:
+            logger.error(f"Error reading balances: {e}")
+            raise
+
+    def update(self, transaction: Transaction) -> bool:
+        """Update an existing transaction; changing a field import dedupe keys on forgets its fingerprint."""
+        def write() -> int:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(UPDATE_TRANSACTION_SQL, {
+                    "amount": transaction.amount, "type": transaction.type, "category": transaction.category,
+                    "date": transaction.date, "user_id": transaction.user_id, "note": transaction.note,
+                    "currency": transaction.currency, "id": transaction.id})
                 conn.commit()
-                if cursor.rowcount > 0:
-                    logger.info(f"Updated transaction with ID {transaction.id}")
-                    return True
-                logger.warning(f"No transaction found with ID {transaction.id}")
-                return False
+                return cursor.rowcount
+        try:
+            if run_with_retry(write) > 0:
+                logger.info(f"Updated transaction with ID {transaction.id}")
+                return True
+            logger.warning(f"No transaction found with ID {transaction.id}")
+            return False
         except sqlite3.Error as e:
             logger.error(f"Error updating transaction: {e}")
             raise    
 
     def delete(self, transaction_id: int, user_id: str) -> bool:
         """Delete a transaction by ID for a specific user."""
-        try:
-            with sqlite3.connect(self.db_name) as conn:
+        def write() -> int:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("DELETE FROM transactions WHERE id = ? AND user_id = ?",
-                              (transaction_id, user_id))
+                cursor.execute(DELETE_TRANSACTION_SQL, (transaction_id, user_id))
                 conn.commit()
-                if cursor.rowcount > 0:
-                    logger.info(f"Deleted transaction with ID {transaction_id}")
-                    return True
-                logger.warning(f"No transaction found with ID {transaction_id} for user {user_id}")
-                return False
+                return cursor.rowcount
+        try:
+            if run_with_retry(write) > 0:
+                logger.info(f"Deleted transaction with ID {transaction_id}")
+                return True
+            logger.warning(f"No transaction found with ID {transaction_id} for user {user_id}")
+            return False
         except sqlite3.Error as e:
             logger.error(f"Error deleting transaction: {e}")
             raise
@@ -0,0 +1,146 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple, Union
+
+from models.database import run_with_retry
+from models.transaction import INSERT_TRANSACTION_SQL, Transaction, TransactionModel
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Coalesces concurrent inserts into shared SQLite transactions.
+
+    Calls to add_transaction from any thread are queued; a single writer thread
+    waits up to `window` seconds after the first queued row for more rows (at most
+    `max_batch`), then inserts them in one BEGIN IMMEDIATE ... COMMIT. Rows are
+    written in submission order, so IDs increase in the order calls were made,
+    and a call returns only after the transaction holding its row has committed.
+    Durability follows the model's `synchronous` setting.
+    """
+
+    def __init__(self, model: TransactionModel, window: float = 0.005, max_batch: int = 500):
+        self.model = model
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        # Held while checking _closed and queueing, so nothing is queued behind _STOP
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="moneytracker-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, transaction: Transaction) -> "Future[int]":
+        """Queue a transaction; the returned future resolves to its ID once committed."""
+        future: "Future[int]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("GroupCommitWriter is closed")
+            self._queue.put((transaction, future))
+        return future
+
+    def add_transaction(self, transaction: Transaction) -> int:
+        """Insert a transaction through the queue and wait for its commit."""
+        return self.submit(transaction).result()
+
+    def close(self) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _collect(self, first) -> Tuple[List[tuple], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]) -> List[Union[int, Exception]]:
+        """Insert the batch in one transaction; returns each row's ID, or the error that rejected it.
+
+        Every row runs under its own SAVEPOINT, so a row that violates a constraint
+        is rolled back alone and only its caller sees the error. Lock errors
+        abort the whole transaction and are retried.
+        """
+        def write() -> List[Union[int, Exception]]:
+            results = []
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for transaction, _ in batch:
+                    conn.execute("SAVEPOINT row")
+                    try:
+                        results.append(conn.execute(INSERT_TRANSACTION_SQL,
+                                                    self.model.insert_params(transaction)).lastrowid)
+                    except (sqlite3.IntegrityError, sqlite3.InterfaceError) as e:
+                        conn.execute("ROLLBACK TO row")
+                        results.append(e)
+                    conn.execute("RELEASE row")
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            return results
+        return run_with_retry(write)
+
+    def _run(self) -> None:
+        conn = self.model._connect()
+        conn.isolation_level = None  # transactions are managed explicitly
+        try:
+            stopping = False
+            while not stopping:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                batch, stopping = self._collect(first)
+                try:
+                    results = self._write(conn, batch)
+                except Exception as e:
+                    logger.error(f"Group commit of {len(batch)} transactions failed: {e}")
+                    for _, future in batch:
+                        future.set_exception(e)
+                    continue
+                for (transaction, future), result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Group commit rejected a transaction for user {transaction.user_id}: {result}")
+                        future.set_exception(result)
+                    else:
+                        transaction.id = result
+                        future.set_result(result)
+                logger.debug(f"Group committed {len(batch)} transactions")
+        finally:
+            conn.close()
+            self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        """Fail whatever is still queued once the writer stops, so no caller waits forever."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("GroupCommitWriter is closed"))
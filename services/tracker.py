@@ -1,16 +1,161 @@
-from typing import List, Optional, Dict
-from models.transaction import Transaction, TransactionModel
+import heapq
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Dict, Tuple
+from models.budget import Budget, BudgetModel, BudgetStatus
+from models.category import CategoryModel, CategoryNode
+from models.database import EPOCH_ORDINAL, day_number
+from models.fx import REPORT_CURRENCY, FxRateModel
+from models.recurring import RecurringModel, RecurringRule
+from models.transaction import Transaction, TransactionModel, build_search_query
+from utils.column_cache import TYPE_CODES, ColumnCache, UserColumns
 from utils.logger import setup_logger
-from datetime import datetime
+from utils.forecast import DailySeriesCache, day_range, forecast_totals, month_end
+from utils.sketches import QuantileSketch, SpaceSaving
+from utils.validators import (
+    CATEGORY_MAX_DEPTH, BatchValidationReport, normalize_category, parse_iso_date, validate_amount,
+    validate_batch, validate_category, validate_currency, validate_month, validate_note, validate_user_id
+)
+from datetime import date, datetime, timedelta
+import numpy as np
+import os
 
 logger = setup_logger()
 
+# get_stats switches from exact SQL to streaming sketches above this many transactions
+STATS_EXACT_LIMIT = int(os.getenv("MONEYTRACKER_STATS_EXACT_LIMIT", "200000"))
+STATS_SKETCH_CAPACITY = 200
+STATS_RELATIVE_ACCURACY = 0.01
+# Days of daily history behind a month-end forecast
+FORECAST_HISTORY_DAYS = int(os.getenv("MONEYTRACKER_FORECAST_HISTORY_DAYS", "365"))
+# Summaries over more rows than this are split into date sub-ranges of about this
+# many rows each, aggregated concurrently on up to SUMMARY_WORKERS connections
+PARALLEL_CHUNK_ROWS = int(os.getenv("MONEYTRACKER_PARALLEL_CHUNK_ROWS", "500000"))
+SUMMARY_WORKERS = int(os.getenv("MONEYTRACKER_SUMMARY_WORKERS", str(os.cpu_count() or 1)))
+
+
+def fold_user_totals(rows: Iterable[tuple]) -> Iterator[Dict]:
+    """Fold (user_id, type, category, total, count) rows, ordered by user, into one dict per user."""
+    current = None
+    for user_id, type, category, total, count in rows:
+        if current is None or current['user_id'] != user_id:
+            if current is not None:
+                yield current
+            current = {'user_id': user_id, 'total_income': 0.0, 'total_expense': 0.0,
+                       'transaction_count': 0, 'expense_by_category': {}}
+        current['transaction_count'] += count
+        if type == 'income':
+            current['total_income'] += total
+        else:
+            current['total_expense'] += total
+            current['expense_by_category'][category] = current['expense_by_category'].get(category, 0) + total
+    if current is not None:
+        yield current
+
+
+class AdminTotals:
+    """Running totals over the per-user summaries of iter_user_summaries."""
+
+    def __init__(self):
+        self.user_count = 0
+        self.transaction_count = 0
+        self.total_income = 0.0
+        self.total_expense = 0.0
+        self.expense_by_category: Dict[str, float] = {}
+
+    def add(self, user: Dict) -> None:
+        self.user_count += 1
+        self.transaction_count += user['transaction_count']
+        self.total_income += user['total_income']
+        self.total_expense += user['total_expense']
+        for category, amount in user['expense_by_category'].items():
+            self.expense_by_category[category] = self.expense_by_category.get(category, 0) + amount
+
+    def as_dict(self, top: int = 3) -> Dict:
+        return {'user_count': self.user_count, 'transaction_count': self.transaction_count,
+                'total_income': self.total_income, 'total_expense': self.total_expense,
+                'balance': self.total_income - self.total_expense,
+                'top_categories': heapq.nlargest(top, self.expense_by_category.items(), key=lambda item: item[1])}
+
+
+def shard_user_totals(db_name: str, start_date: Optional[str], end_date: Optional[str]) -> List[Dict]:
+    """Per-user totals of one shard file; module-level so it can run in a worker process."""
+    model = TransactionModel(db_name, read_only=True)
+    return list(fold_user_totals(model.iter_user_totals(start_date, end_date)))
+
+def split_date_range(first: str, last: str, chunks: int) -> List[Tuple[str, str]]:
+    """Split first..last (inclusive) into up to chunks contiguous sub-ranges of equal days."""
+    start = date.fromisoformat(first)
+    days = (date.fromisoformat(last) - start).days + 1
+    bounds = sorted({days * i // chunks for i in range(chunks + 1)})
+    return [((start + timedelta(days=lo)).isoformat(), (start + timedelta(days=hi - 1)).isoformat())
+            for lo, hi in zip(bounds, bounds[1:])]
+
+
+def aggregate_chunk(db_name: str, immutable: bool, user_id: str, start_date: str, end_date: str,
+                    category: Optional[str], depth: Optional[int], month: Optional[str]) -> List[tuple]:
+    """aggregate_by_currency of one sub-range on its own read-only connection; module-level for process pools."""
+    model = TransactionModel(db_name, read_only=True, immutable=immutable)
+    return model.aggregate_by_currency(user_id, start_date, end_date, category, depth, month)
+
+
 class TrackerService:
     """Service layer for handling business logic related to transactions."""
-    def __init__(self, db_name: str = "moneytracker.db"):
-        self.db = TransactionModel(db_name)
+    def __init__(self, db_name: str = "moneytracker.db", group_commit: bool = False,
+                 busy_timeout: Optional[float] = None, synchronous: Optional[str] = None,
+                 read_only: bool = False, immutable: bool = False):
+        self.db = TransactionModel(db_name, busy_timeout=busy_timeout, synchronous=synchronous,
+                                   read_only=read_only, immutable=immutable)
+        # With group_commit, concurrent add_transaction calls share SQLite transactions
+        self.writer = None
+        self._budgets = None
+        self._categories = None
+        self._fx = None
+        self._daily_series = None
+        self._columns = None
+        if group_commit:
+            from models.write_queue import GroupCommitWriter
+            self.writer = GroupCommitWriter(self.db)
+
+    @property
+    def budgets(self) -> BudgetModel:
+        if self._budgets is None:
+            self._budgets = BudgetModel(self.db.db_name)
+        return self._budgets
+
+    @property
+    def categories(self) -> CategoryModel:
+        if self._categories is None:
+            self._categories = CategoryModel(self.db.db_name, read_only=self.db.read_only)
+        return self._categories
+
+    @property
+    def fx(self) -> FxRateModel:
+        """Shared rate table, so cached (currency, date) lookups outlive a single summary."""
+        if self._fx is None:
+            self._fx = FxRateModel(self.db.db_name, read_only=self.db.read_only, immutable=self.db.immutable)
+        return self._fx
+
+    @property
+    def daily_series(self) -> DailySeriesCache:
+        """Per-user daily arrays shared by forecasts on this service."""
+        if self._daily_series is None:
+            self._daily_series = DailySeriesCache(self.db)
+        return self._daily_series
+
+    @property
+    def columns(self) -> ColumnCache:
+        """Memory-mapped per-user column files, used by summaries of the users that have one."""
+        if self._columns is None:
+            self._columns = ColumnCache(self.db)
+        return self._columns
 
-    def add_transaction(self, amount: float, type: str, category: str, date: str, user_id: str) -> int:
+    def close(self) -> None:
+        """Flush and stop the group-commit writer, if any."""
+        if self.writer is not None:
+            self.writer.close()
+
+    def add_transaction(self, amount: float, type: str, category: str, date: str, user_id: str,
+                        note: Optional[str] = None, currency: Optional[str] = None) -> int:
         """Add a new transaction and return its ID."""
         try:
             # Validate inputs
@@ -20,16 +165,23 @@ class TrackerService:
                 raise ValueError("Type must be 'income' or 'expense'")
             if not category:
                 raise ValueError("Category cannot be empty")
-            datetime.strptime(date, '%Y-%m-%d')  # Validate date format
+            category = normalize_category(category)
+            parse_iso_date(date)  # Validate date format
+            validate_currency(currency)
 
             transaction = Transaction(
                 amount=amount,
                 type=type,
                 category=category,
                 date=date,
-                user_id=user_id
+                user_id=user_id,
+                note=note,
+                currency=currency
             )
-            transaction_id = self.db.create(transaction)
+            if self.writer is not None:
+                transaction_id = self.writer.add_transaction(transaction)
+            else:
+                transaction_id = self.db.create(transaction)
             logger.info(f"TrackerService: Added transaction ID {transaction_id} for user {user_id}")
             return transaction_id
         except ValueError as e:
@@ -39,6 +191,53 @@ class TrackerService:
             logger.error(f"TrackerService: Unexpected error adding transaction - {e}")
             raise
 
+    def import_transactions(self, transactions: List[Transaction], skip_invalid: bool = False,
+                            dedupe: bool = False) -> Tuple[int, BatchValidationReport]:
+        """Validate a batch in one pass and bulk insert it.
+
+        Nothing is inserted when any row is invalid, unless skip_invalid is set, in
+        which case only the valid rows are. With dedupe, rows already imported
+        before (same fingerprint) are skipped. Returns (inserted count, validation report).
+        """
+        try:
+            report = validate_batch(transactions)
+            if not report.is_valid and not skip_invalid:
+                logger.warning(f"TrackerService: Import rejected - {len(report.errors)} invalid rows")
+                return 0, report
+            valid = [t for i, t in enumerate(transactions) if i not in report.errors]
+            inserted = self.db.add_transactions(valid, dedupe) if valid else 0
+            logger.info(f"TrackerService: Imported {inserted} of {report.total} transactions")
+            return inserted, report
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error importing transactions - {e}")
+            raise
+
+    def find_duplicates(self, user_id: Optional[str] = None) -> List[tuple]:
+        """Groups of transactions that share user, date, type, category, amount and external reference."""
+        try:
+            if user_id is not None:
+                validate_user_id(user_id)
+            return self.db.find_duplicates(user_id)
+        except Exception as e:
+            logger.error(f"TrackerService: Failed to find duplicates - {e}")
+            raise
+
+    def remove_duplicates(self, user_id: Optional[str] = None) -> Tuple[int, int]:
+        """Keep the oldest row of each duplicate group, then fingerprint the remaining rows.
+
+        Returns (deleted, fingerprinted); afterwards imports skip rows matching existing ones.
+        """
+        try:
+            if user_id is not None:
+                validate_user_id(user_id)
+            deleted = self.db.delete_duplicates(user_id)
+            fingerprinted = self.db.backfill_fingerprints(user_id)
+            logger.info(f"TrackerService: Removed {deleted} duplicates, fingerprinted {fingerprinted} rows")
+            return deleted, fingerprinted
+        except Exception as e:
+            logger.error(f"TrackerService: Failed to remove duplicates - {e}")
+            raise
+
     def list_transactions(self, user_id: str, start_date: Optional[str] = None, 
                          end_date: Optional[str] = None) -> List[Transaction]:
         """Retrieve transactions for a user, optionally filtered by date range."""
@@ -59,36 +258,651 @@ class TrackerService:
             logger.error(f"TrackerService: Unexpected error listing transactions - {e}")
             raise
 
-    def get_summary(self, user_id: str, start_date: Optional[str] = None, 
-                    end_date: Optional[str] = None) -> Dict:
-        """Generate summary statistics for a user's transactions."""
+    def search_transactions(self, user_id: str, text: str, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None, limit: int = 100) -> List[Transaction]:
+        """Search transaction notes; supports prefix* terms and "quoted phrases"."""
+        try:
+            if start_date:
+                datetime.strptime(start_date, '%Y-%m-%d')
+            if end_date:
+                datetime.strptime(end_date, '%Y-%m-%d')
+            transactions = self.db.search(user_id, build_search_query(text), start_date, end_date, limit)
+            logger.info(f"TrackerService: Search '{text}' matched {len(transactions)} transactions for user {user_id}")
+            return transactions
+        except ValueError as e:
+            logger.error(f"TrackerService: Failed to search transactions - {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error searching transactions - {e}")
+            raise
+
+    def summary_chunks(self, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       workers: Optional[int] = None) -> List[Tuple[str, str]]:
+        """Date sub-ranges to aggregate a user's range in: one per PARALLEL_CHUNK_ROWS rows, at most workers.
+
+        The row count is an index count capped at workers * PARALLEL_CHUNK_ROWS,
+        and the range is cut into equal spans of days between the user's first
+        and last transaction in it. A single chunk means "aggregate serially".
+        """
+        workers = SUMMARY_WORKERS if workers is None else workers
+        if workers < 2 or self.db.db_name == ":memory:":
+            return [(start_date, end_date)]
+        first, last, rows = self.db.range_profile(user_id, start_date, end_date, workers * PARALLEL_CHUNK_ROWS)
+        chunks = min(workers, rows // PARALLEL_CHUNK_ROWS)
+        if chunks < 2:
+            return [(start_date, end_date)]
+        return split_date_range(first, last, chunks)
+
+    def summary_buckets(self, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                        category: Optional[str] = None, depth: Optional[int] = None, month: Optional[str] = None,
+                        workers: Optional[int] = None, processes: bool = False) -> List[tuple]:
+        """The aggregate_by_currency buckets of a summary, computed range-sharded in parallel when large.
+
+        Users with a column cache are aggregated from it instead, in this process.
+        Each chunk runs on its own read-only connection in a thread pool (SQLite
+        releases the GIL while it aggregates) or, with processes, a process pool.
+        Buckets are keyed by date, so the chunks' buckets never overlap and the
+        partial results are simply concatenated. Chunks read separate snapshots,
+        so when the change log moved on while they ran (a write was committed
+        mid-summary), the summary is aggregated again serially, in one snapshot.
+        Immutable files cannot change and skip the check.
+        """
+        range_start, range_end = start_date, end_date
+        if month:
+            first_day, last_day = validate_month(month)
+            range_start, range_end = max(start_date or first_day, first_day), min(end_date or last_day, last_day)
+        cached = self._cached_columns(user_id)
+        if cached is not None:
+            return self.column_buckets(cached, range_start, range_end, category, depth)
+        chunks = self.summary_chunks(user_id, range_start, range_end, workers)
+        if len(chunks) == 1:
+            return self.db.aggregate_by_currency(user_id, start_date, end_date, category, depth, month)
+        seq = None if self.db.immutable else self.db.latest_seq()
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool(max_workers=len(chunks)) as executor:
+            parts = executor.map(aggregate_chunk, *zip(*[
+                (self.db.db_name, self.db.immutable, user_id, first, last, category, depth, month)
+                for first, last in chunks]))
+            buckets = [bucket for part in parts for bucket in part]
+        if seq is not None and self.db.latest_seq() != seq:
+            logger.info(f"TrackerService: Transactions changed during the parallel summary of user {user_id}; "
+                        f"aggregating serially")
+            return self.db.aggregate_by_currency(user_id, start_date, end_date, category, depth, month)
+        logger.info(f"TrackerService: Aggregated {len(chunks)} date ranges in parallel for user {user_id}")
+        return buckets
+
+    def _cached_columns(self, user_id: str) -> Optional[UserColumns]:
+        """The user's refreshed column cache; None without one or when it cannot be read or written."""
+        try:
+            return self.columns.get(user_id)
+        except OSError as e:
+            logger.warning(f"TrackerService: Column cache of user {user_id} unavailable, using SQL - {e}")
+            return None
+
+    def column_buckets(self, cached: UserColumns, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       category: Optional[str] = None, depth: Optional[int] = None) -> List[tuple]:
+        """The buckets aggregate_by_currency would return, grouped from a user's column cache.
+
+        Labels are mapped to their current tree paths (and the category subtree)
+        with one query over the cache's label dictionary, so renames and moves
+        never make a cache stale.
+        """
+        paths = self.db.category_paths(cached.categories, depth, category)
+        codes = [code for code, label in enumerate(cached.categories) if label in paths] if category else None
+        buckets, dates = {}, {}
+        for currency, day, type, code, total, count in cached.buckets(
+                day_number(start_date) if start_date else None, day_number(end_date) if end_date else None, codes):
+            if day not in dates:
+                dates[day] = date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+            label = cached.categories[code]
+            key = (cached.currencies[currency], dates[day], TYPE_CODES[type], paths.get(label, label))
+            bucket_total, bucket_count = buckets.get(key, (0.0, 0))
+            buckets[key] = (bucket_total + total, bucket_count + count)
+        return [key + value for key, value in buckets.items()]
+
+    def build_column_cache(self, user_id: str) -> int:
+        """Write (or rewrite) the user's column cache; returns the number of transactions in it."""
+        return len(self.columns.build(user_id))
+
+    def drop_column_cache(self, user_id: str) -> bool:
+        return self.columns.drop(user_id)
+
+    def get_summary(self, user_id: str, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None, currency: Optional[str] = None,
+                    category: Optional[str] = None, depth: Optional[int] = None,
+                    month: Optional[str] = None, workers: Optional[int] = None) -> Dict:
+        """Generate summary statistics for a user's transactions in a reporting currency.
+
+        Amounts are summed in SQL per (currency, date, type, category) and each bucket
+        is converted once with the rate of its date, never row by row. category
+        limits the summary to one subtree of the category tree and depth rolls
+        the breakdown up to that level. month (YYYY-MM) selects one calendar month.
+        Large ranges are aggregated on up to workers connections at once (see
+        summary_buckets); workers=1 keeps it on this service's connection. Users
+        with a column cache are summarized from its memory-mapped arrays.
+        """
         try:
             # Validate date formats if provided
             if start_date:
                 datetime.strptime(start_date, '%Y-%m-%d')
             if end_date:
                 datetime.strptime(end_date, '%Y-%m-%d')
+            if month:
+                validate_month(month)
+            currency = (currency or REPORT_CURRENCY).upper()
+            validate_currency(currency)
+            if category:
+                category = normalize_category(category)
+            if depth is not None and depth < 1:
+                raise ValueError("Depth must be at least 1")
 
-            transactions = self.db.read_all(user_id, start_date, end_date)
-            total_income = sum(t.amount for t in transactions if t.type == 'income')
-            total_expense = sum(t.amount for t in transactions if t.type == 'expense')
-            balance = total_income - total_expense
+            total_income = 0.0
+            total_expense = 0.0
             category_summary = {}
-            for t in transactions:
-                category_summary[t.category] = category_summary.get(t.category, 0) + t.amount
+            expense_by_category = {}
+            transaction_count = 0
+            for bucket_currency, date, type, category, total, count in \
+                    self.summary_buckets(user_id, start_date, end_date, category, depth, month, workers):
+                if bucket_currency != currency:
+                    total *= self.fx.factor(bucket_currency, currency, date)
+                if type == 'income':
+                    total_income += total
+                elif type == 'expense':
+                    total_expense += total
+                    expense_by_category[category] = expense_by_category.get(category, 0) + total
+                category_summary[category] = category_summary.get(category, 0) + total
+                transaction_count += count
+            balance = total_income - total_expense
 
             summary = {
                 'total_income': total_income,
                 'total_expense': total_expense,
                 'balance': balance,
                 'category_summary': category_summary,
-                'transaction_count': len(transactions)
+                'expense_by_category': expense_by_category,
+                'transaction_count': transaction_count,
+                'currency': currency
             }
-            logger.info(f"TrackerService: Generated summary for user {user_id}: Income={total_income}, Expense={total_expense}")
+            logger.info(f"TrackerService: Generated summary for user {user_id}: Income={total_income}, Expense={total_expense} {currency}")
             return summary
         except ValueError as e:
-            logger.error(f"TrackerService: Failed to generate summary - Invalid date format: {e}")
+            logger.error(f"TrackerService: Failed to generate summary - {e}")
             raise
         except Exception as e:
             logger.error(f"TrackerService: Unexpected error generating summary - {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def get_category_tree(self, user_id: Optional[str] = None, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> List[CategoryNode]:
+        """The category tree; for a user, only the nodes they spent or earned under, with subtree totals."""
+        if user_id is None:
+            return self.categories.tree()
+        validate_user_id(user_id)
+        return self.categories.subtree_totals(user_id, start_date, end_date)
+
+    def rename_category(self, path: str, new_name: str) -> int:
+        """Rename a category tree node; returns how many nodes (it and its descendants) changed path."""
+        path, new_name = normalize_category(path), new_name.strip()
+        if '>' in new_name:
+            raise ValueError("Use move to change a category's parent")
+        validate_category(new_name)
+        updated = self.categories.rename(path, new_name)
+        logger.info(f"TrackerService: Renamed category {path} to {new_name}")
+        return updated
+
+    def move_category(self, path: str, new_parent: Optional[str] = None) -> int:
+        """Move a category tree node under new_parent, or to the top level; returns how many nodes moved."""
+        path = normalize_category(path)
+        new_parent = normalize_category(new_parent) if new_parent else None
+        moved = self.categories.move(path, new_parent, CATEGORY_MAX_DEPTH)
+        logger.info(f"TrackerService: Moved category {path} under {new_parent or 'the top level'}")
+        return moved
+
+    def set_budget(self, user_id: str, category: str, monthly_limit: float) -> None:
+        """Create or replace a category's monthly budget."""
+        if monthly_limit <= 0:
+            raise ValueError("Budget must be positive")
+        if not category:
+            raise ValueError("Category cannot be empty")
+        self.budgets.set_budget(Budget(user_id, category, monthly_limit))
+        logger.info(f"TrackerService: Set {category} budget to {monthly_limit} for user {user_id}")
+
+    def check_budget(self, user_id: str, date: str, category: str) -> BudgetStatus:
+        """Budget status of category for the month of date, in constant time."""
+        return self.budgets.check(user_id, date[:7], category)
+
+    def get_budget_status(self, user_id: str, month: str) -> List[BudgetStatus]:
+        """Spend against every budget (and unbudgeted spend) in month, from the running counters."""
+        try:
+            validate_month(month)
+            statuses = self.budgets.status(user_id, month)
+            logger.info(f"TrackerService: Read budget status for user {user_id} ({month})")
+            return statuses
+        except Exception as e:
+            logger.error(f"TrackerService: Failed to read budget status - {e}")
+            raise
+
+    def add_recurring_rule(self, rule: RecurringRule) -> int:
+        """Validate and store a recurring rule; returns its ID."""
+        try:
+            validate_amount(rule.amount)
+            rule.category = normalize_category(rule.category)
+            validate_category(rule.category)
+            validate_user_id(rule.user_id)
+            validate_note(rule.note)
+            if rule.type not in ['income', 'expense']:
+                raise ValueError("Type must be 'income' or 'expense'")
+            parse_iso_date(rule.start_date)
+            if rule.end_date and parse_iso_date(rule.end_date) < parse_iso_date(rule.start_date):
+                raise ValueError("End date cannot be before start date")
+            rule_id = RecurringModel(self.db.db_name).add_rule(rule)
+            logger.info(f"TrackerService: Added {rule.frequency} recurring rule {rule_id} for user {rule.user_id}")
+            return rule_id
+        except Exception as e:
+            logger.error(f"TrackerService: Failed to add recurring rule - {e}")
+            raise
+
+    def materialize_recurring(self, until: str) -> Tuple[int, int]:
+        """Expand all due recurring occurrences up to until; returns (inserted, skipped)."""
+        try:
+            parse_iso_date(until)
+            return RecurringModel(self.db.db_name).materialize(until)
+        except Exception as e:
+            logger.error(f"TrackerService: Failed to materialize recurring transactions - {e}")
+            raise
+
+    def get_balance_as_of(self, user_id: str, as_of: str) -> float:
+        """Return the user's balance at the end of as_of (YYYY-MM-DD) in logarithmic time."""
+        try:
+            parse_iso_date(as_of)
+            balance = self.db.balance_as_of(user_id, as_of)
+            logger.info(f"TrackerService: Balance for user {user_id} as of {as_of}: {balance}")
+            return balance
+        except ValueError as e:
+            logger.error(f"TrackerService: Failed to get balance - Invalid date format: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error getting balance - {e}")
+            raise
+
+    def get_forecasts(self, user_ids: Optional[List[str]] = None, as_of: Optional[str] = None,
+                      history_days: int = FORECAST_HISTORY_DAYS, confidence: float = 0.95) -> Dict[str, Dict]:
+        """Projected balance at the end of as_of's month for many users in one batch.
+
+        Daily income and expense of the history_days up to as_of come from the
+        shared DailySeriesCache and are fitted with a linear trend plus weekday
+        seasonality, all users in one vectorized solve (users whose history starts
+        later are solved together with the others starting on the same day).
+        Each forecast holds the balance as of as_of, the projected income, expense
+        and balance for the rest of the month and the confidence band around the
+        balance. user_ids None forecasts every user with transactions in the window.
+        Amounts are in DEFAULT_CURRENCY, like balance.
+        """
+        try:
+            day = parse_iso_date(as_of) if as_of else date.today()
+            if history_days < 7:
+                raise ValueError("History must cover at least 7 days")
+            if not 0 < confidence < 1:
+                raise ValueError("Confidence must be between 0 and 1")
+            first = day - timedelta(days=history_days - 1)
+            series = self.daily_series.get(user_ids, first, day)
+            users = [*series]
+            balances = self.db.balances_for_users(users, day.isoformat()) if users else {}
+            end = month_end(day)
+            future = day_range(day + timedelta(days=1), end)
+            days = day_range(first, day)
+            income = np.array([series[u][0] for u in users]).reshape(len(users), len(days))
+            expense = np.array([series[u][1] for u in users]).reshape(len(users), len(days))
+            # Days before a user's first transaction in the window are not history
+            active = (income != 0) | (expense != 0)
+            starts = np.where(active.any(axis=1), active.argmax(axis=1), 0)
+            forecasts = {}
+            for start in np.unique(starts):
+                rows = np.flatnonzero(starts == start)
+                fitted = forecast_totals(days[start:], income[rows, start:], expense[rows, start:], future, confidence)
+                for i, row in enumerate(rows):
+                    balance = float(balances.get(users[row], 0.0))
+                    projected = balance + fitted['net'][i]
+                    forecasts[users[row]] = {
+                        'user_id': users[row],
+                        'as_of': day.isoformat(),
+                        'month_end': end.isoformat(),
+                        'days_ahead': len(future),
+                        'history_days': len(days) - int(start),
+                        'balance': balance,
+                        'projected_income': float(fitted['income'][i]),
+                        'projected_expense': float(fitted['expense'][i]),
+                        'projected_balance': float(projected),
+                        'lower': float(projected - fitted['margin'][i]),
+                        'upper': float(projected + fitted['margin'][i]),
+                        'confidence': confidence,
+                    }
+            logger.info(f"TrackerService: Forecast month-end balance for {len(forecasts)} users as of {day}")
+            return {user_id: forecasts[user_id] for user_id in users}
+        except ValueError as e:
+            logger.error(f"TrackerService: Failed to forecast balances - {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error forecasting balances - {e}")
+            raise
+
+    def get_forecast(self, user_id: str, as_of: Optional[str] = None,
+                     history_days: int = FORECAST_HISTORY_DAYS, confidence: float = 0.95) -> Dict:
+        """Month-end balance forecast of one user; see get_forecasts."""
+        return self.get_forecasts([user_id], as_of, history_days, confidence)[user_id]
+
+    def get_trend(self, user_id: str, period: str = 'daily', start_date: Optional[str] = None,
+                  end_date: Optional[str] = None, window: Optional[int] = None) -> List[Dict]:
+        """Return the per-period trend series (income, expense, net, running balance, rolling averages)."""
+        try:
+            if start_date:
+                datetime.strptime(start_date, '%Y-%m-%d')
+            if end_date:
+                datetime.strptime(end_date, '%Y-%m-%d')
+            rows = self.db.trend_series(user_id, period, start_date, end_date, window)
+            logger.info(f"TrackerService: Generated {period} trend for user {user_id} ({len(rows)} periods)")
+            return rows
+        except ValueError as e:
+            logger.error(f"TrackerService: Failed to generate trend - {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error generating trend - {e}")
+            raise
+
+    def get_stats(self, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  type: str = 'expense', top: int = 5, quantiles: Tuple[float, ...] = (0.5, 0.9),
+                  bins: int = 10, mode: str = 'auto') -> Dict:
+        """Top categories and merchants (notes), amount quantiles and per-category histograms.
+
+        mode 'exact' answers with SQL aggregates and window functions, 'approximate'
+        with one streaming pass through bounded-memory sketches, and 'auto' picks
+        exact when the range holds at most STATS_EXACT_LIMIT transactions. In
+        approximate mode top totals overestimate by at most error_bounds['top'] and
+        quantiles are within error_bounds['quantile_relative'] of the exact value.
+        """
+        try:
+            if start_date:
+                datetime.strptime(start_date, '%Y-%m-%d')
+            if end_date:
+                datetime.strptime(end_date, '%Y-%m-%d')
+            if type not in ['income', 'expense']:
+                raise ValueError("Type must be 'income' or 'expense'")
+            if mode not in ('auto', 'exact', 'approximate'):
+                raise ValueError("Mode must be 'auto', 'exact' or 'approximate'")
+            if any(not 0 <= q <= 1 for q in quantiles):
+                raise ValueError("Quantiles must be between 0 and 1")
+            count, total = self.db.range_totals(user_id, type, start_date, end_date)
+            if mode == 'auto':
+                mode = 'exact' if count <= STATS_EXACT_LIMIT else 'approximate'
+            stats = {'mode': mode, 'count': count, 'total': total}
+            if mode == 'exact':
+                stats.update(
+                    top_categories=[(c, t) for c, t, _ in
+                                    self.db.top_totals(user_id, 'category', type, start_date, end_date, top)],
+                    top_merchants=[(n, t) for n, t, _ in
+                                   self.db.top_totals(user_id, 'note', type, start_date, end_date, top)],
+                    quantiles=self.db.amount_quantiles(user_id, list(quantiles), type, start_date, end_date),
+                    histograms=self.db.category_histograms(user_id, bins, type, start_date, end_date),
+                    error_bounds={'top': 0.0, 'quantile_relative': 0.0})
+            else:
+                categories = SpaceSaving(STATS_SKETCH_CAPACITY)
+                merchants = SpaceSaving(STATS_SKETCH_CAPACITY)
+                amounts = QuantileSketch(STATS_RELATIVE_ACCURACY)
+                by_category: Dict[str, QuantileSketch] = {}
+                for category, note, amount in self.db.iter_amounts(user_id, type, start_date, end_date):
+                    categories.add(category, amount)
+                    if note is not None:
+                        merchants.add(note, amount)
+                    amounts.add(amount)
+                    sketch = by_category.get(category)
+                    if sketch is None:
+                        sketch = by_category[category] = QuantileSketch(STATS_RELATIVE_ACCURACY)
+                    sketch.add(amount)
+                stats.update(
+                    top_categories=[(c, t) for c, t, _ in categories.top(top)],
+                    top_merchants=[(n, t) for n, t, _ in merchants.top(top)],
+                    quantiles={q: amounts.quantile(q) for q in quantiles} if amounts.count else {},
+                    histograms={c: by_category[c].histogram(bins) for c in sorted(by_category)},
+                    error_bounds={'top': max(categories.max_error, merchants.max_error),
+                                  'quantile_relative': STATS_RELATIVE_ACCURACY})
+            logger.info(f"TrackerService: Computed {mode} stats for user {user_id} over {count} transactions")
+            return stats
+        except ValueError as e:
+            logger.error(f"TrackerService: Failed to compute stats - {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error computing stats - {e}")
+            raise
+
+    def iter_user_summaries(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                            top: int = 3, shards: Optional[List[str]] = None,
+                            workers: Optional[int] = None) -> Iterator[Dict]:
+        """Income, expense, balance and top expense categories of every user, ordered by user.
+
+        The whole table is aggregated by one GROUP BY pass and streamed, so the
+        number of users is not bounded by memory. shards lists further database
+        files holding other parts of the data: each is aggregated in its own worker
+        process and the sorted per-user streams are merged, adding up users that
+        appear in more than one file.
+        """
+        try:
+            if start_date:
+                datetime.strptime(start_date, '%Y-%m-%d')
+            if end_date:
+                datetime.strptime(end_date, '%Y-%m-%d')
+            if shards:
+                files = [self.db.db_name] + [path for path in shards if path != self.db.db_name]
+                if workers == 1:
+                    parts = [shard_user_totals(path, start_date, end_date) for path in files]
+                else:
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        parts = list(executor.map(shard_user_totals, files,
+                                                  [start_date] * len(files), [end_date] * len(files)))
+                logger.info(f"TrackerService: Aggregated {len(files)} shards for the admin summary")
+                users = self._merge_user_totals(heapq.merge(*parts, key=lambda u: u['user_id']))
+            else:
+                users = fold_user_totals(self.db.iter_user_totals(start_date, end_date))
+            for user in users:
+                user['balance'] = user['total_income'] - user['total_expense']
+                user['top_categories'] = heapq.nlargest(top, user['expense_by_category'].items(),
+                                                        key=lambda item: item[1])
+                yield user
+        except ValueError as e:
+            logger.error(f"TrackerService: Failed to build admin summary - {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error building admin summary - {e}")
+            raise
+
+    @staticmethod
+    def _merge_user_totals(users: Iterable[Dict]) -> Iterator[Dict]:
+        """Combine consecutive per-user totals of the same user (from different shards)."""
+        current = None
+        for user in users:
+            if current is not None and current['user_id'] == user['user_id']:
+                current['total_income'] += user['total_income']
+                current['total_expense'] += user['total_expense']
+                current['transaction_count'] += user['transaction_count']
+                for category, amount in user['expense_by_category'].items():
+                    current['expense_by_category'][category] = current['expense_by_category'].get(category, 0) + amount
+                continue
+            if current is not None:
+                yield current
+            current = user
+        if current is not None:
+            yield current
+
+    def get_admin_summary(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          top: int = 3, shards: Optional[List[str]] = None,
+                          workers: Optional[int] = None) -> Dict:
+        """Per-user summaries plus the totals over all users, collected in memory.
+
+        Use iter_user_summaries with AdminTotals to stream very large user counts instead.
+        """
+        users = []
+        totals = AdminTotals()
+        for user in self.iter_user_summaries(start_date, end_date, top, shards, workers):
+            users.append(user)
+            totals.add(user)
+        logger.info(f"TrackerService: Built admin summary for {totals.user_count} users")
+        return {'users': users, 'totals': totals.as_dict(top)}
+
+    def get_monthly_report_data(self, user_id: str, month: str) -> Dict:
+        """Compute every field of the monthly report template for one user in one aggregation pass."""
+        try:
+            start_date, end_date = validate_month(month)
+            rows = self.db.aggregate_daily(user_id, start_date, end_date)
+            report = self._build_monthly_report(user_id, month, rows)
+            logger.info(f"TrackerService: Built monthly report data for user {user_id} ({month})")
+            return report
+        except Exception as e:
+            logger.error(f"TrackerService: Failed to build monthly report - {e}")
+            raise
+
+    def get_monthly_report_data_all_users(self, month: str) -> Dict[str, Dict]:
+        """Compute monthly report data for every user with transactions in the month.
+
+        All users are aggregated by one grouped query; the rows arrive ordered by
+        user so they are split into per-user reports without re-querying.
+        """
+        try:
+            start_date, end_date = validate_month(month)
+            rows = self.db.aggregate_daily(None, start_date, end_date)
+            rows_by_user: Dict[str, List[tuple]] = {}
+            for row in rows:
+                rows_by_user.setdefault(row[0], []).append(row)
+            reports = {
+                user_id: self._build_monthly_report(user_id, month, user_rows)
+                for user_id, user_rows in rows_by_user.items()
+            }
+            logger.info(f"TrackerService: Built monthly report data for {len(reports)} users ({month})")
+            return reports
+        except Exception as e:
+            logger.error(f"TrackerService: Failed to build monthly reports - {e}")
+            raise
+
+    def get_dashboard_data(self, user_id: Optional[str], start_date: str, end_date: str,
+                           top: int = 5) -> Dict[str, Dict]:
+        """Shared aggregate bundle of every dashboard panel, per user.
+
+        One grouped query covers the period (every user when user_id is None); each
+        bundle holds only plain lists and numbers so it can be pickled to the
+        rendering workers, which all draw from it instead of querying again.
+        """
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+            if start > end:
+                raise ValueError("Start date must not be after end date")
+            periods = []
+            year, month = start.year, start.month
+            while (year, month) <= (end.year, end.month):
+                periods.append(f"{year:04d}-{month:02d}")
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            rows_by_user: Dict[str, List[tuple]] = {}
+            for row in self.db.aggregate_daily(user_id, start_date, end_date):
+                rows_by_user.setdefault(row[0], []).append(row)
+            bundles = {uid: self._build_dashboard(uid, start_date, end_date, periods, rows, top)
+                       for uid, rows in rows_by_user.items()}
+            logger.info(f"TrackerService: Built dashboard data for {len(bundles)} users "
+                        f"({start_date} to {end_date})")
+            return bundles
+        except ValueError as e:
+            logger.error(f"TrackerService: Failed to build dashboard data - {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TrackerService: Unexpected error building dashboard data - {e}")
+            raise
+
+    @staticmethod
+    def _build_dashboard(user_id: str, start_date: str, end_date: str, periods: List[str],
+                         rows: List[tuple], top: int) -> Dict:
+        """Fold (user_id, date, type, category, total, count) rows into dashboard panel data."""
+        total_income = 0.0
+        total_expense = 0.0
+        transaction_count = 0
+        expense_by_category: Dict[str, float] = {}
+        monthly_income = dict.fromkeys(periods, 0.0)
+        monthly_expense = dict.fromkeys(periods, 0.0)
+        for _, date, type, category, total, count in rows:
+            transaction_count += count
+            if type == 'income':
+                total_income += total
+                monthly_income[date[:7]] += total
+            else:
+                total_expense += total
+                expense_by_category[category] = expense_by_category.get(category, 0) + total
+                monthly_expense[date[:7]] += total
+        categories = sorted(expense_by_category.items(), key=lambda item: item[1], reverse=True)
+        return {
+            'user_id': user_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_income': total_income,
+            'total_expense': total_expense,
+            'balance': total_income - total_expense,
+            'transaction_count': transaction_count,
+            'categories': categories,
+            'top_categories': categories[:top],
+            'trend': {
+                'periods': periods,
+                'income': [monthly_income[p] for p in periods],
+                'expense': [monthly_expense[p] for p in periods],
+            },
+        }
+
+    @staticmethod
+    def _build_monthly_report(user_id: str, month: str, rows: List[tuple]) -> Dict:
+        """Fold (user_id, date, type, category, total, count) rows into report fields."""
+        total_income = 0.0
+        total_expense = 0.0
+        transaction_count = 0
+        category_summary: Dict[str, float] = {}
+        expense_by_category: Dict[str, float] = {}
+        daily_income: Dict[str, float] = {}
+        daily_expense: Dict[str, float] = {}
+        for _, date, type, category, total, count in rows:
+            transaction_count += count
+            category_summary[category] = category_summary.get(category, 0) + total
+            if type == 'income':
+                total_income += total
+                daily_income[date] = daily_income.get(date, 0) + total
+            else:
+                total_expense += total
+                expense_by_category[category] = expense_by_category.get(category, 0) + total
+                daily_expense[date] = daily_expense.get(date, 0) + total
+
+        category_table = [
+            (category, amount, amount / total_expense * 100 if total_expense else 0.0)
+            for category, amount in sorted(expense_by_category.items(), key=lambda item: item[1], reverse=True)
+        ]
+        highest_category = category_table[0][:2] if category_table else None
+        highest_day = max(daily_expense.items(), key=lambda item: item[1]) if daily_expense else None
+        dates = sorted(set(daily_income) | set(daily_expense))
+
+        suggestions = []
+        if total_expense > total_income:
+            suggestions.append("Expenses exceeded income this month; review discretionary spending.")
+        if category_table and category_table[0][2] >= 50:
+            suggestions.append(f"'{category_table[0][0]}' accounts for over half of all spending.")
+        if not suggestions:
+            suggestions.append("Spending is within income this month.")
+
+        return {
+            'user_id': user_id,
+            'month': month,
+            'transaction_count': transaction_count,
+            'total_income': total_income,
+            'total_expense': total_expense,
+            'balance': total_income - total_expense,
+            'category_summary': category_summary,
+            'category_table': category_table,
+            'highest_category': highest_category,
+            'highest_day': highest_day,
+            'trend': {
+                'dates': dates,
+                'income': [daily_income.get(d, 0.0) for d in dates],
+                'expense': [daily_expense.get(d, 0.0) for d in dates],
+            },
+            'suggestions': suggestions,
+        }
@@ -0,0 +1,61 @@
+import csv
+import io
+import pytest
+from click.testing import CliRunner
+from cli.commands import admin_summary
+from models.transaction import Transaction
+from services.tracker import TrackerService
+
+def seed(path, rows):
+    service = TrackerService(path)
+    service.db.add_transactions([Transaction(amount=amount, type=type, category=category, date=date, user_id=user)
+                                 for user, amount, type, category, date in rows])
+    return service
+
+@pytest.fixture
+def tracker(tmp_path):
+    return seed(str(tmp_path / "admin.db"), [
+        ("alice", 3000.0, "income", "Salary", "2025-07-01"),
+        ("alice", 300.0, "expense", "Rent", "2025-07-02"),
+        ("alice", 120.0, "expense", "Food", "2025-07-03"),
+        ("alice", 10.0, "expense", "Books", "2025-07-04"),
+        ("bob", 40.0, "expense", "Books", "2025-07-10"),
+        ("bob", 99.0, "expense", "Books", "2025-06-10"),
+        ("carol", 500.0, "income", "Bonus", "2025-07-15"),
+    ])
+
+def test_admin_summary_covers_every_user_in_one_pass(tracker):
+    result = tracker.get_admin_summary("2025-07-01", "2025-07-31", top=2)
+    users = {u["user_id"]: u for u in result["users"]}
+    assert [u["user_id"] for u in result["users"]] == ["alice", "bob", "carol"]
+    assert users["alice"]["balance"] == 2570.0
+    assert users["alice"]["top_categories"] == [("Rent", 300.0), ("Food", 120.0)]
+    assert users["bob"]["transaction_count"] == 1
+    assert result["totals"]["user_count"] == 3
+    assert result["totals"]["total_expense"] == 470.0
+    assert result["totals"]["top_categories"] == [("Rent", 300.0), ("Food", 120.0)]
+
+def test_shards_are_merged_by_user(tracker, tmp_path):
+    shard = str(tmp_path / "shard.db")
+    seed(shard, [("bob", 60.0, "expense", "Food", "2025-07-11"), ("dave", 5.0, "expense", "Food", "2025-07-12")])
+    result = tracker.get_admin_summary("2025-07-01", "2025-07-31", shards=[shard], workers=1)
+    users = {u["user_id"]: u for u in result["users"]}
+    assert sorted(users) == ["alice", "bob", "carol", "dave"]
+    assert users["bob"]["total_expense"] == 100.0
+    assert users["bob"]["top_categories"][0] == ("Food", 60.0)
+    parallel = tracker.get_admin_summary("2025-07-01", "2025-07-31", shards=[shard], workers=2)
+    assert parallel == result
+
+def test_admin_summary_command_streams_csv(tracker, tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(admin_summary, ["--start-date", "2025-07-01", "--end-date", "2025-07-31"],
+                           env={"MONEYTRACKER_DB": tracker.db.db_name})
+    rows = list(csv.DictReader(io.StringIO(result.output)))
+    assert [r["user_id"] for r in rows] == ["alice", "bob", "carol", "TOTAL"]
+    assert rows[0]["top_categories"] == "Rent 300.00; Food 120.00; Books 10.00"
+    assert float(rows[-1]["balance"]) == 3030.0
+    output = tmp_path / "admin.jsonl"
+    result = runner.invoke(admin_summary, ["--format", "jsonl", "--output", str(output)],
+                           env={"MONEYTRACKER_DB": tracker.db.db_name})
+    assert "Admin summary of 3 users written to" in result.output
+    assert len(output.read_text().splitlines()) == 4
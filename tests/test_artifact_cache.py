@@ -0,0 +1,82 @@
+import os
+from click.testing import CliRunner
+from unittest.mock import patch
+from cli.commands import report_pdf
+from models.transaction import TransactionModel
+from services.tracker import TrackerService
+from utils.artifact_cache import ArtifactCache
+from utils.pdf_exporter import export_summary_to_pdf
+from views.chart import plot_category_spending
+
+def write_bytes(size):
+    def render(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+    return render
+
+def test_hit_returns_existing_file_and_key_covers_data_and_options(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=10_000)
+    renders = []
+    def render(path):
+        renders.append(path)
+        write_bytes(10)(path)
+    first, hit = cache.get_or_render("chart", {"Food": 1.0}, {"title": "a"}, ".png", render)
+    assert not hit and os.path.exists(first)
+    again, hit = cache.get_or_render("chart", {"Food": 1.0}, {"title": "a"}, ".png", render)
+    assert hit and again == first and len(renders) == 1
+    cache.get_or_render("chart", {"Food": 2.0}, {"title": "a"}, ".png", render)
+    cache.get_or_render("chart", {"Food": 1.0}, {"title": "b"}, ".png", render)
+    assert len(renders) == 3
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3 and cache.stats()["entries"] == 3
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=250)
+    paths = []
+    for i in range(3):
+        path, _ = cache.get_or_render("pdf", i, {}, ".pdf", write_bytes(100))
+        os.utime(path, (1000 + i, 1000 + i))
+        paths.append(path)
+    assert not os.path.exists(paths[0]) and cache.evictions == 1
+    cache.get_or_render("pdf", 1, {}, ".pdf", write_bytes(100))  # hit refreshes entry 1
+    cache.get_or_render("pdf", 3, {}, ".pdf", write_bytes(100))
+    assert os.path.exists(paths[1]) and not os.path.exists(paths[2])
+
+def test_unchanged_chart_and_pdf_are_not_rendered_again(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    tracker = TrackerService(str(tmp_path / "chart.db"))
+    tracker.add_transaction(30.0, "expense", "Food", "2025-07-01", "u1")
+    charts = [str(tmp_path / f"chart{i}.png") for i in range(3)]
+    with patch("views.chart.default_cache", return_value=cache), \
+         patch("utils.pdf_exporter.default_cache", return_value=cache), \
+         patch("matplotlib.pyplot.show") as show:
+        plot_category_spending("u1", service=tracker, output_file=charts[0])
+        plot_category_spending("u1", service=tracker, output_file=charts[1])
+        # The saved charts are copies, shown on the hit too
+        assert open(charts[0], "rb").read() == open(charts[1], "rb").read()
+        assert show.call_count == 2
+        cache.clear()
+        assert os.path.exists(charts[1])
+        summary = tracker.get_summary("u1")
+        export_summary_to_pdf(summary, str(tmp_path / "a.pdf"))
+        export_summary_to_pdf(summary, str(tmp_path / "b.pdf"))
+        assert cache.hits == 2 and cache.misses == 2
+        assert (tmp_path / "a.pdf").read_bytes() == (tmp_path / "b.pdf").read_bytes()
+        tracker.add_transaction(5.0, "expense", "Books", "2025-07-02", "u1")
+        plot_category_spending("u1", service=tracker, output_file=charts[2])
+        assert cache.misses == 3
+
+def test_unchanged_report_pdf_costs_one_aggregate_query(tmp_path, monkeypatch):
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    db = str(tmp_path / "report.db")
+    TrackerService(db).add_transaction(30.0, "expense", "Food", "2025-07-01", "u1")
+    monkeypatch.setenv("MONEYTRACKER_DB", db)
+    aggregate = TransactionModel.aggregate_by_currency
+    with patch("utils.pdf_exporter.default_cache", return_value=cache), \
+         patch.object(TransactionModel, "read_all", side_effect=AssertionError("rows read")), \
+         patch.object(TransactionModel, "aggregate_by_currency", autospec=True, side_effect=aggregate) as grouped:
+        for name in ("a.pdf", "b.pdf"):
+            result = CliRunner().invoke(report_pdf, ["--user-id", "u1", "--output", str(tmp_path / name)])
+            assert result.exit_code == 0, result.output
+    assert grouped.call_count == 2
+    assert cache.misses == 1 and cache.hits == 1
+    assert (tmp_path / "a.pdf").read_bytes() == (tmp_path / "b.pdf").read_bytes()
@@ -0,0 +1,69 @@
+import gzip
+import sqlite3
+import threading
+import pytest
+from click.testing import CliRunner
+from cli.commands import backup
+from models.backup import BackupError, backup_database, list_snapshots
+from models.transaction import Transaction, TransactionModel
+
+@pytest.fixture
+def db(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "money.db"))
+    db.add_transactions([Transaction(amount=float(i + 1), type="expense", category="Food", date="2025-01-01",
+                                     user_id="u1", note="x" * 150) for i in range(2000)])
+    return db
+
+def count_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+def test_snapshot_is_verified_and_complete(db, tmp_path):
+    result = backup_database(db.db_name, str(tmp_path / "backups"), pages=5)
+    assert result.integrity == "ok" and result.pages > 5
+    assert count_rows(result.path) == 2000
+
+def test_writers_keep_committing_during_backup(db, tmp_path):
+    stop = threading.Event()
+    committed = []
+    def writer():
+        model = TransactionModel(db_name=db.db_name)
+        while not stop.is_set():
+            committed.append(model.create(Transaction(amount=1.0, type="income", category="Salary",
+                                                      date="2025-01-02", user_id="u2")))
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        result = backup_database(db.db_name, str(tmp_path / "backups"), pages=1, sleep=0.002)
+    finally:
+        stop.set()
+        thread.join()
+    assert committed, "writer was blocked for the whole backup"
+    # The snapshot is consistent as of the moment the copy started
+    snapshot_rows = count_rows(result.path)
+    assert 2000 <= snapshot_rows <= 2000 + len(committed)
+    assert count_rows(db.db_name) == 2000 + len(committed)
+
+def test_compression_and_rotation(db, tmp_path):
+    output_dir = str(tmp_path / "backups")
+    for _ in range(4):
+        result = backup_database(db.db_name, output_dir, keep=2, compress=True)
+    snapshots = list_snapshots(db.db_name, output_dir)
+    assert len(snapshots) == 2 and snapshots[-1] == result.path
+    assert result.path.endswith(".db.gz") and len(result.removed) == 1
+    restored = tmp_path / "restored.db"
+    with gzip.open(result.path) as src:
+        restored.write_bytes(src.read())
+    assert count_rows(str(restored)) == 2000
+
+def test_missing_database(tmp_path):
+    with pytest.raises(BackupError):
+        backup_database(str(tmp_path / "nope.db"), str(tmp_path / "backups"))
+
+def test_backup_command(db, tmp_path):
+    output_dir = str(tmp_path / "backups")
+    result = CliRunner().invoke(backup, ["--output-dir", output_dir, "--keep", "3"],
+                                env={"MONEYTRACKER_DB": db.db_name})
+    assert result.exit_code == 0
+    assert "Backup written to" in result.output and "integrity check: ok" in result.output
+    assert len(list_snapshots(db.db_name, output_dir)) == 1
@@ -0,0 +1,51 @@
+import random
+import sqlite3
+import pytest
+from click.testing import CliRunner
+from cli.commands import balance
+from models.transaction import Transaction, TransactionModel
+
+def brute_force_balance(db, user_id, as_of):
+    return sum(t.amount if t.type == "income" else -t.amount
+               for t in db.read_all(user_id) if t.date <= as_of)
+
+@pytest.fixture
+def db(tmp_path):
+    return TransactionModel(db_name=str(tmp_path / "balance.db"))
+
+def test_balance_follows_back_dated_inserts_updates_and_deletes(db):
+    rng = random.Random(7)
+    ids = []
+    for _ in range(60):
+        ids.append(db.create(Transaction(
+            amount=float(rng.randint(1, 100)), type=rng.choice(["income", "expense"]), category="Misc",
+            date=f"2025-0{rng.randint(1, 6)}-{rng.randint(10, 28)}", user_id=rng.choice(["u1", "u2"]))))
+    for transaction_id in ids[:10]:
+        t = db.get_transaction(transaction_id, "u1") or db.get_transaction(transaction_id, "u2")
+        t.date, t.type, t.user_id = "2025-01-05", "income", "u1"
+        db.update(t)
+    for transaction_id in ids[10:20]:
+        db.delete(transaction_id, "u1")
+        db.delete(transaction_id, "u2")
+    for user_id in ("u1", "u2"):
+        for as_of in ("2024-12-31", "2025-01-05", "2025-03-15", "2025-06-30"):
+            assert db.balance_as_of(user_id, as_of) == pytest.approx(brute_force_balance(db, user_id, as_of))
+
+def test_balance_index_backfilled_for_existing_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL NOT NULL,
+                        type TEXT NOT NULL, category TEXT NOT NULL, date TEXT NOT NULL, user_id TEXT NOT NULL)""")
+        conn.executemany("INSERT INTO transactions (amount, type, category, date, user_id) VALUES (?, ?, 'X', ?, 'u1')",
+                         [(100, "income", "2025-01-01"), (30, "expense", "2025-01-02"), (5, "expense", "2025-01-02")])
+    db = TransactionModel(db_name=path)
+    assert db.balances_as_of("u1", ["2024-12-31", "2025-01-01", "2025-01-03"]) == {
+        "2024-12-31": 0.0, "2025-01-01": 100.0, "2025-01-03": 65.0}
+
+def test_balance_command(db):
+    db.create(Transaction(amount=250.0, type="income", category="Salary", date="2025-07-01", user_id="u1"))
+    db.create(Transaction(amount=40.0, type="expense", category="Food", date="2025-07-02", user_id="u1"))
+    result = CliRunner().invoke(balance, ["--user-id", "u1", "--as-of", "2025-07-01"],
+                                env={"MONEYTRACKER_DB": db.db_name})
+    assert result.exit_code == 0
+    assert "Balance for user u1 as of 2025-07-01: 250.00" in result.output
@@ -0,0 +1,53 @@
+import pytest
+from click.testing import CliRunner
+from cli.commands import add, budget
+from models.budget import Budget, BudgetModel
+from models.transaction import Transaction, TransactionModel
+
+@pytest.fixture
+def db(tmp_path):
+    return TransactionModel(db_name=str(tmp_path / "budget.db"))
+
+def expense(amount, category="Food", date="2025-07-05", user_id="u1"):
+    return Transaction(amount=amount, type="expense", category=category, date=date, user_id=user_id)
+
+def test_spend_counters_follow_insert_update_delete(db):
+    budgets = BudgetModel(db.db_name)
+    budgets.set_budget(Budget("u1", "Food", 100.0))
+    first = db.create(expense(60.0))
+    db.create(expense(30.0))
+    db.create(Transaction(amount=500.0, type="income", category="Food", date="2025-07-05", user_id="u1"))
+    assert budgets.check("u1", "2025-07", "Food").spent == 90.0
+
+    moved = db.get_transaction(first, "u1")
+    moved.date = "2025-08-01"
+    db.update(moved)
+    assert budgets.check("u1", "2025-07", "Food").spent == 30.0
+    assert budgets.check("u1", "2025-08", "Food").spent == 60.0
+
+    db.delete(first, "u1")
+    assert budgets.check("u1", "2025-08", "Food").spent == 0.0
+
+def test_status_lists_budgets_and_unbudgeted_spend(db):
+    budgets = BudgetModel(db.db_name)
+    budgets.set_budget(Budget("u1", "Food", 50.0))
+    budgets.set_budget(Budget("u1", "Books", 20.0))
+    db.create(expense(80.0))
+    db.create(expense(15.0, category="Taxi"))
+    statuses = {s.category: s for s in budgets.status("u1", "2025-07")}
+    assert statuses["Food"].over_budget and statuses["Food"].remaining == -30.0
+    assert statuses["Books"].spent == 0.0 and not statuses["Books"].over_budget
+    assert statuses["Taxi"].monthly_limit is None and statuses["Taxi"].spent == 15.0
+
+def test_add_warns_when_budget_exceeded(db):
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": db.db_name}
+    result = runner.invoke(budget, ["set", "--user-id", "u1", "--category", "Food", "--amount", "100"], env=env)
+    assert "Budget for Food set to 100.00 per month" in result.output
+    args = ["--type", "expense", "--category", "Food", "--date", "2025-07-05", "--user-id", "u1"]
+    result = runner.invoke(add, ["--amount", "70"] + args, env=env)
+    assert "Warning" not in result.output
+    result = runner.invoke(add, ["--amount", "40"] + args, env=env)
+    assert "Warning: Food budget for 2025-07 exceeded: 110.00 of 100.00" in result.output
+    result = runner.invoke(budget, ["status", "--user-id", "u1", "--month", "2025-07"], env=env)
+    assert "Food: spent 110.00 of 100.00, remaining -10.00 OVER BUDGET" in result.output
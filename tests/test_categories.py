@@ -0,0 +1,93 @@
+import sqlite3
+import pytest
+from click.testing import CliRunner
+from cli.commands import category, list, summary
+from models.transaction import Transaction
+from services.tracker import TrackerService
+from utils.validators import ValidationError, normalize_category, validate_category
+
+CATEGORIES = {"Food > Groceries > Organic": 8.0, "Food > Groceries": 20.0, "Food > Dining": 30.0,
+              "Food": 5.0, "Rent": 100.0}
+
+@pytest.fixture
+def tracker(tmp_path):
+    service = TrackerService(str(tmp_path / "categories.db"))
+    service.db.add_transactions([Transaction(amount=amount, type="expense", category=path, date="2025-07-01",
+                                             user_id="alice") for path, amount in CATEGORIES.items()]
+                                + [Transaction(amount=500.0, type="income", category="Salary", date="2025-07-01",
+                                               user_id="alice")])
+    return service
+
+def closure(db_name):
+    with sqlite3.connect(db_name) as conn:
+        return sorted(conn.execute("""
+            SELECT a.path, d.path, cc.depth FROM category_closure AS cc
+            JOIN categories AS a ON a.id = cc.ancestor JOIN categories AS d ON d.id = cc.descendant
+        """).fetchall())
+
+def test_paths_are_normalized_and_validated_per_level():
+    assert normalize_category(" Food>Groceries >Organic ") == "Food > Groceries > Organic"
+    validate_category("Food > Groceries")
+    with pytest.raises(ValidationError, match="between 1 and 20"):
+        validate_category("Food > " + "x" * 21)
+    with pytest.raises(ValidationError, match="separated by"):
+        validate_category("Food>Groceries")
+    with pytest.raises(ValidationError, match="at most 5 levels"):
+        validate_category(" > ".join("abcdef"))
+
+def test_subtree_filters_rollups_and_renames_without_rewriting_rows(tracker):
+    assert tracker.get_summary("alice", category="Food")["total_expense"] == pytest.approx(63.0)
+    assert tracker.get_summary("alice", category="Food > Groceries")["category_summary"] == {
+        "Food > Groceries > Organic": 8.0, "Food > Groceries": 20.0}
+    assert tracker.get_summary("alice", depth=1)["category_summary"] == {"Food": 63.0, "Rent": 100.0, "Salary": 500.0}
+    totals = {node.path: (node.expense, node.count) for node in tracker.get_category_tree("alice")}
+    assert totals["Food"] == (63.0, 4) and totals["Food > Groceries"] == (28.0, 2)
+
+    with sqlite3.connect(tracker.db.db_name) as conn:
+        seq = conn.execute("SELECT MAX(seq) FROM changelog").fetchone()[0]
+    assert tracker.rename_category("Food", "Meals") == 4
+    assert tracker.move_category("Meals > Groceries") == 2
+    with sqlite3.connect(tracker.db.db_name) as conn:
+        assert conn.execute("SELECT MAX(seq) FROM changelog").fetchone()[0] == seq
+    assert [node.path for node in tracker.get_category_tree()] == [
+        "Groceries", "Groceries > Organic", "Meals", "Meals > Dining", "Rent", "Salary"]
+    assert ("Groceries", "Groceries > Organic", 1) in closure(tracker.db.db_name)
+    assert not [row for row in closure(tracker.db.db_name) if row[0] == "Meals" and "Groceries" in row[1]]
+    assert tracker.get_summary("alice", category="Meals")["total_expense"] == pytest.approx(35.0)
+    assert tracker.get_summary("alice", depth=1)["category_summary"]["Groceries"] == pytest.approx(28.0)
+
+    with pytest.raises(ValueError, match="own subtree"):
+        tracker.move_category("Meals", "Meals > Dining")
+    with pytest.raises(ValueError, match="already exists"):
+        tracker.rename_category("Groceries", "Rent")
+    tracker.move_category("Groceries", "Meals")
+    tracker.add_transaction(2.0, "expense", "Meals>Groceries", "2025-07-02", "alice")
+    assert tracker.get_summary("alice", category="Meals")["total_expense"] == pytest.approx(65.0)
+    assert closure(tracker.db.db_name) == sorted(
+        [(path, path, 0) for path in ("Meals", "Meals > Dining", "Meals > Groceries",
+                                      "Meals > Groceries > Organic", "Rent", "Salary")]
+        + [("Meals", "Meals > Dining", 1), ("Meals", "Meals > Groceries", 1),
+           ("Meals", "Meals > Groceries > Organic", 2), ("Meals > Groceries", "Meals > Groceries > Organic", 1)])
+
+def test_new_labels_under_renamed_prefixes_join_the_renamed_node(tracker):
+    tracker.rename_category("Food", "Meals")
+    tracker.db.add_transactions([Transaction(amount=3.0, type="expense", category=path, date="2025-07-02",
+                                             user_id="alice") for path in ("Food > Snacks", "Food > Groceries > Bulk")])
+    paths = [node.path for node in tracker.get_category_tree()]
+    assert "Food" not in paths and "Meals > Snacks" in paths and "Meals > Groceries > Bulk" in paths
+    assert tracker.get_summary("alice", category="Meals")["total_expense"] == pytest.approx(69.0)
+    assert tracker.get_summary("alice", category="Meals > Groceries")["total_expense"] == pytest.approx(31.0)
+
+def test_category_commands(tracker):
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": tracker.db.db_name}
+    result = runner.invoke(list, ["--user-id", "alice", "--category", "Food>Groceries", "--format", "csv"], env=env)
+    assert len(result.output.splitlines()) == 3
+    result = runner.invoke(summary, ["--user-id", "alice", "--category", "Food", "--depth", "2"], env=env)
+    assert "Food > Groceries: 28.00" in result.output and "Rent" not in result.output
+    result = runner.invoke(category, ["rename", "--path", "Food > Dining", "--name", "Restaurants"], env=env)
+    assert "1 categories updated" in result.output
+    result = runner.invoke(category, ["move", "--path", "Food", "--parent", "Food > Groceries"], env=env)
+    assert "Error: Cannot move Food under its own subtree" in result.output
+    result = runner.invoke(category, ["tree", "--user-id", "alice"], env=env)
+    assert "  Restaurants: income 0.00, expense 30.00 (1 transactions)" in result.output.splitlines()
@@ -16,7 +16,8 @@ class TestChart:
             "total_income": 1000.0,
             "total_expense": 500.0,
             "balance": 500.0,
-            "category_summary": {"Food": 200.0, "Rent": 300.0}
+            "category_summary": {"Food": 200.0, "Rent": 300.0},
+            "expense_by_category": {"Food": 200.0, "Rent": 300.0}
         }
 
         # Mock list_transactions returns Transaction objects
@@ -0,0 +1,78 @@
+import sqlite3
+import numpy as np
+import pytest
+from click.testing import CliRunner
+from cli.commands import cache, summary
+from models.transaction import Transaction
+from services.tracker import TrackerService
+from utils.column_cache import ColumnCache
+
+def with_columns(service, tmp_path):
+    service._columns = ColumnCache(service.db, str(tmp_path / "columns"))
+    return service
+
+@pytest.fixture
+def tracker(tmp_path):
+    service = with_columns(TrackerService(str(tmp_path / "columns.db")), tmp_path)
+    service.db.add_transactions([Transaction(amount=float(i % 40 + 1), type="income" if i % 6 == 0 else "expense",
+                                             category=("Food > Groceries", "Food > Dining", "Rent", "Salary")[i % 4],
+                                             date=f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                                             user_id=("heavy", "light")[i % 9 == 0],
+                                             currency=("USD" if i % 5 == 0 else None)) for i in range(900)])
+    rates = tmp_path / "rates.csv"
+    rates.write_text("date,currency,rate\n2024-01-01,USD,7.0\n")
+    service.fx.load_csv(str(rates))
+    return service
+
+FILTERS = [{}, {"start_date": "2024-03-05", "end_date": "2024-08-20"}, {"month": "2024-05"},
+           {"category": "Food"}, {"depth": 1}, {"category": "Food", "depth": 1}, {"currency": "USD"}]
+
+def assert_same_summary(cached, plain, **filters):
+    expected = plain.get_summary("heavy", **filters)
+    actual = cached.get_summary("heavy", **filters)
+    assert actual["transaction_count"] == expected["transaction_count"]
+    assert actual["category_summary"] == pytest.approx(expected["category_summary"])
+    assert actual["balance"] == pytest.approx(expected["balance"])
+
+def test_summaries_from_mapped_columns_match_sql(tracker, tmp_path):
+    plain = TrackerService(tracker.db.db_name)
+    assert tracker.build_column_cache("heavy") == 800
+    reopened = with_columns(TrackerService(tracker.db.db_name, read_only=True), tmp_path)
+    for filters in FILTERS:
+        assert_same_summary(reopened, plain, **filters)
+    assert isinstance(reopened.columns.loaded["heavy"].columns["amount"], np.memmap)
+    assert reopened.columns.builds == reopened.columns.appends == 0
+    assert reopened.columns.get("light") is None
+
+def test_new_rows_are_appended_and_rewrites_rebuild(tracker):
+    plain = TrackerService(tracker.db.db_name)
+    tracker.build_column_cache("heavy")
+    tracker.add_transaction(12.5, "expense", "Food>Snacks", "2024-12-30", "heavy")
+    tracker.add_transaction(99.0, "expense", "Rent", "2024-12-30", "light")
+    assert_same_summary(tracker, plain)
+    assert (tracker.columns.builds, tracker.columns.appends) == (1, 1)
+    tracker.add_transaction(1.0, "expense", "Rent", "2024-12-31", "light")
+    assert len(tracker.columns.get("heavy")) == 801 and tracker.columns.appends == 1
+
+    tracker.rename_category("Food", "Meals")
+    assert_same_summary(tracker, plain, category="Meals", depth=2)
+    assert tracker.columns.builds == 1
+    with sqlite3.connect(tracker.db.db_name) as conn:
+        conn.execute("UPDATE transactions SET user_id = 'light' WHERE id = (SELECT MIN(id) FROM transactions "
+                     "WHERE user_id = 'heavy')")
+    assert_same_summary(tracker, plain)
+    assert tracker.columns.builds == 2 and len(tracker.columns.get("heavy")) == 800
+
+def test_cache_columns_command(tracker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": tracker.db.db_name}
+    result = runner.invoke(cache, ["columns", "--user-id", "heavy"], env=env)
+    assert "Column cache of user heavy: 800 transactions" in result.output
+    assert (tmp_path / ".cache" / "columns").is_dir()
+    result = runner.invoke(summary, ["--user-id", "heavy", "--format", "json"], env=env)
+    assert '"transaction_count": 800' in result.output
+    result = runner.invoke(cache, ["columns", "--user-id", "heavy", "--drop"], env=env)
+    assert "Removed column cache of user heavy" in result.output
+    result = runner.invoke(cache, ["columns", "--user-id", "heavy", "--drop"], env=env)
+    assert "No column cache for user heavy" in result.output
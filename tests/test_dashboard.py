@@ -0,0 +1,66 @@
+import os
+import pytest
+from click.testing import CliRunner
+from cli.commands import dashboard
+from models.transaction import Transaction
+from services.tracker import TrackerService
+from views.dashboard import generate_dashboards
+
+@pytest.fixture
+def tracker(tmp_path):
+    service = TrackerService(str(tmp_path / "dashboard.db"))
+    rows = [
+        (3000.0, "income", "Salary", "2025-05-01", "alice"),
+        (120.0, "expense", "Food", "2025-05-02", "alice"),
+        (300.0, "expense", "Rent", "2025-07-03", "alice"),
+        (80.0, "expense", "Food", "2025-07-04", "alice"),
+        (10.0, "expense", "Books", "2025-07-05", "alice"),
+        (40.0, "expense", "Books", "2025-07-10", "bob"),
+    ]
+    for amount, type, category, date, user_id in rows:
+        service.db.create(Transaction(amount=amount, type=type, category=category, date=date, user_id=user_id))
+    return service
+
+def test_dashboard_data_shares_one_bundle(tracker):
+    bundles = tracker.get_dashboard_data(None, "2025-05-01", "2025-07-31", top=2)
+    assert sorted(bundles) == ["alice", "bob"]
+    alice = bundles["alice"]
+    assert alice["transaction_count"] == 5
+    assert alice["total_income"] == 3000.0
+    assert alice["total_expense"] == 510.0
+    assert alice["categories"] == [("Rent", 300.0), ("Food", 200.0), ("Books", 10.0)]
+    assert alice["top_categories"] == [("Rent", 300.0), ("Food", 200.0)]
+    assert alice["trend"] == {"periods": ["2025-05", "2025-06", "2025-07"],
+                              "income": [3000.0, 0.0, 0.0], "expense": [120.0, 0.0, 390.0]}
+
+def test_dashboard_data_rejects_reversed_range(tracker):
+    with pytest.raises(ValueError):
+        tracker.get_dashboard_data("alice", "2025-07-31", "2025-05-01")
+
+def test_composite_and_separate_layouts(tracker, tmp_path):
+    composite = generate_dashboards(tracker, "alice", "2025-05-01", "2025-07-31", str(tmp_path / "c"), workers=1)
+    assert composite == {"alice": [str(tmp_path / "c" / "dashboard_alice_2025-05-01_2025-07-31.png")]}
+    assert os.path.getsize(composite["alice"][0]) > 0
+    separate = generate_dashboards(tracker, "alice", "2025-05-01", "2025-07-31", str(tmp_path / "s"),
+                                   layout="separate", fmt="svg", workers=1)
+    assert [os.path.basename(p).rsplit("_", 1)[1] for p in separate["alice"]] == \
+        ["category.svg", "pie.svg", "trend.svg", "top.svg"]
+    assert all(os.path.exists(p) for p in separate["alice"])
+
+def test_all_users_render_in_worker_processes(tracker, tmp_path):
+    written = generate_dashboards(tracker, None, "2025-05-01", "2025-07-31", str(tmp_path), workers=2)
+    assert sorted(written) == ["alice", "bob"]
+    assert all(os.path.exists(p) for paths in written.values() for p in paths)
+
+def test_dashboard_command(tracker, tmp_path):
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": tracker.db.db_name}
+    result = runner.invoke(dashboard, ["--start-date", "2025-05-01"], env=env)
+    assert "Specify exactly one of --user-id or --all-users" in result.output
+    result = runner.invoke(dashboard, ["--user-id", "bob", "--start-date", "2025-07-01", "--end-date", "2025-07-31",
+                                       "--output-dir", str(tmp_path / "out"), "--workers", "1"], env=env)
+    assert "Dashboard written to:" in result.output
+    assert os.path.exists(tmp_path / "out" / "dashboard_bob_2025-07-01_2025-07-31.png")
+    result = runner.invoke(dashboard, ["--user-id", "carol", "--start-date", "2025-07-01",
+                                       "--end-date", "2025-07-31", "--output-dir", str(tmp_path / "out")], env=env)
+    assert "No transactions found" in result.output
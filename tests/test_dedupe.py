@@ -0,0 +1,74 @@
+import sqlite3
+from click.testing import CliRunner
+from cli.commands import dedupe, import_csv
+from models.transaction import Transaction, TransactionModel, fingerprints
+
+STATEMENT = ("amount,type,category,date,external_ref\n"
+             "4.5,expense,Coffee,2025-07-01,\n"
+             "4.5,expense,Coffee,2025-07-01,\n"
+             "60,expense,Fuel,2025-07-02,TX-1\n"
+             "60,expense,Fuel,2025-07-02,TX-2\n")
+
+def coffee(**fields):
+    return Transaction(**{"amount": 4.5, "type": "expense", "category": "Coffee", "date": "2025-07-01",
+                          "user_id": "u1", **fields})
+
+def test_fingerprints_number_identical_rows_and_respect_references():
+    keys = fingerprints([coffee(), coffee(), coffee(external_ref="A"), coffee(external_ref="A")])
+    assert keys[0] != keys[1]  # Two equal coffees are two purchases
+    assert keys[2] == keys[3]  # The same bank reference is the same purchase
+    assert fingerprints([coffee(), coffee()]) == keys[:2]
+
+def test_reimport_skips_existing_rows(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "d.db"))
+    rows = [coffee(), coffee(), coffee(amount=9.0)]
+    assert db.add_transactions(rows, dedupe=True) == 3
+    assert db.add_transactions(rows + [coffee(amount=1.0)], dedupe=True) == 1
+    assert len(db.read_all("u1")) == 4
+
+def test_reimport_after_an_edit_restores_the_original_row(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "d.db"))
+    rows = [coffee(), coffee(amount=9.0, note="Beans")]
+    db.add_transactions(rows, dedupe=True)
+    edited, noted = sorted(db.read_all("u1"), key=lambda t: t.amount)
+    edited.amount = 5.0
+    noted.note = "Roasted beans"  # Not part of the key, so still recognised
+    db.update(edited)
+    db.update(noted)
+    assert db.add_transactions(rows, dedupe=True) == 1
+    assert sorted(t.amount for t in db.read_all("u1")) == [4.5, 5.0, 9.0]
+
+def test_import_command_reports_skipped_rows(tmp_path):
+    db_path = str(tmp_path / "import.db")
+    csv_path = tmp_path / "statement.csv"
+    csv_path.write_text(STATEMENT)
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": db_path}
+    result = runner.invoke(import_csv, [str(csv_path), "--user-id", "u1"], env=env)
+    assert "Imported 4 of 4 transactions" in result.output
+    result = runner.invoke(import_csv, [str(csv_path), "--user-id", "u1"], env=env)
+    assert "Imported 0 of 4 transactions, skipped 4 already imported" in result.output
+    assert {t.external_ref for t in TransactionModel(db_name=db_path).read_all("u1")} == {None, "TX-1", "TX-2"}
+    result = runner.invoke(import_csv, [str(csv_path), "--user-id", "u1", "--allow-duplicates"], env=env)
+    assert "Imported 4 of 4 transactions" in result.output
+
+def test_dedupe_finds_and_deletes_existing_duplicates(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "d.db"))
+    statement = [coffee(), coffee(), coffee(external_ref="R1")]
+    db.add_transactions(statement, dedupe=True)
+    assert db.find_duplicates() == []  # Equal coffees of one import are two purchases
+    db.add_transactions(statement)
+    for t in [coffee(user_id="u2"), coffee(amount=2.0)]:
+        db.create(t)
+    groups = db.find_duplicates()
+    assert sorted((g[0], g[6], g[7], g[5]) for g in groups) == [("u1", 2, [1, 4], None), ("u1", 2, [2, 5], None),
+                                                               ("u1", 2, [3, 6], "R1")]
+    runner = CliRunner()
+    result = runner.invoke(dedupe, ["--delete"], env={"MONEYTRACKER_DB": db.db_name})
+    assert "Found 3 duplicate groups with 3 extra rows" in result.output
+    assert "Deleted 3 duplicate rows; fingerprinted 2 rows" in result.output
+    assert sorted(t.id for t in db.read_all("u1")) == [1, 2, 3, 8]
+    # Existing rows now carry fingerprints, so importing them again is a no-op
+    assert db.add_transactions(statement + [coffee(amount=2.0)], dedupe=True) == 0
+    with sqlite3.connect(db.db_name) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM transactions WHERE fingerprint IS NULL").fetchone()[0] == 0
@@ -0,0 +1,56 @@
+import sqlite3
+import pytest
+from click.testing import CliRunner
+from cli.commands import doctor
+from models import maintenance
+from models.maintenance import check_query_plan, full_scans, run_doctor
+from models.transaction import Transaction
+from services.tracker import TrackerService
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "doctor.db")
+    service = TrackerService(path)
+    service.db.add_transactions([Transaction(amount=float(i), type="expense", category="Food",
+                                             date=f"2025-07-{i % 28 + 1:02d}", user_id=f"user{i % 10}",
+                                             note="x" * 500) for i in range(2000)])
+    return path
+
+def test_analyze_and_vacuum_are_timed_and_fix_the_findings(db_path):
+    report = run_doctor(db_path)
+    assert "no planner statistics (run doctor --analyze)" in report.problems()
+    assert all(not check.flagged and check.error is None for check in report.plans
+               if check.name.startswith("transactions."))
+    assert any(index.name == "idx_transactions_user_date" for index in report.indexes)
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM transactions WHERE user_id != 'user0'")
+    assert run_doctor(db_path).freelist_count > 0
+
+    report = run_doctor(db_path, analyze=True, vacuum=True)
+    assert [step.step for step in report.steps][:3] == [
+        "vacuum (full, enables incremental)", "wal checkpoint", "analyze"]
+    assert report.auto_vacuum == "incremental" and report.freelist_count == 0
+    assert report.problems() == []
+
+def test_full_table_scans_are_flagged(db_path, monkeypatch):
+    assert full_scans(["CO-ROUTINE p", "SCAN transactions", "SCAN p",
+                       "SCAN transactions USING COVERING INDEX idx_transactions_user_date",
+                       "SEARCH t USING AUTOMATIC COVERING INDEX (uid=?)"]) == [
+        "transactions", "t (automatic index)"]
+    monkeypatch.setitem(maintenance.QUERY_PLANS, "test.by_note",
+                        ("SELECT id FROM transactions WHERE note = ?", ("x",), False))
+    with sqlite3.connect(db_path) as conn:
+        check = check_query_plan(conn, "test.by_note")
+    assert check.flagged and check.full_scans == ["transactions"]
+
+def test_doctor_command_exits_non_zero_on_problems_with_strict(db_path):
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": db_path}
+    result = runner.invoke(doctor, ["--quiet", "--strict"], env=env)
+    assert result.exit_code == 1
+    assert result.output.strip() == "Problem: no planner statistics (run doctor --analyze)"
+    result = runner.invoke(doctor, ["--analyze", "--optimize", "--integrity", "--strict"], env=env)
+    assert result.exit_code == 0
+    assert "Integrity: ok" in result.output and "Step analyze:" in result.output
+    assert "No problems found" in result.output
@@ -0,0 +1,70 @@
+import json
+from datetime import date, timedelta
+import pytest
+import views.report
+from click.testing import CliRunner
+from cli.commands import forecast, summary
+from models.transaction import Transaction
+from services.tracker import TrackerService
+
+AS_OF = date(2025, 6, 15)
+
+def daily_expense(day):
+    return 20.0 + (30.0 if day.weekday() == 5 else 0.0)
+
+@pytest.fixture
+def tracker(tmp_path):
+    service = TrackerService(str(tmp_path / "forecast.db"))
+    rows = [Transaction(amount=1000.0, type="income", category="Salary", date="2025-01-01", user_id="alice")]
+    for offset in range(120):
+        day = AS_OF - timedelta(days=offset)
+        rows.append(Transaction(amount=daily_expense(day), type="expense", category="Food",
+                                date=day.isoformat(), user_id="alice"))
+        rows.append(Transaction(amount=5.0 + offset % 3, type="expense", category="Food",
+                                date=day.isoformat(), user_id="bob"))
+    service.db.add_transactions(rows)
+    return service
+
+def test_weekly_pattern_is_projected_to_month_end(tracker):
+    result = tracker.get_forecast("alice", AS_OF.isoformat(), history_days=120)
+    future = [AS_OF + timedelta(days=i) for i in range(1, 16)]
+    spent = sum(daily_expense(AS_OF - timedelta(days=i)) for i in range(120))
+    assert result["month_end"] == "2025-06-30" and result["days_ahead"] == 15
+    assert result["balance"] == pytest.approx(1000.0 - spent)
+    assert result["projected_expense"] == pytest.approx(sum(daily_expense(day) for day in future))
+    assert result["projected_balance"] == pytest.approx(result["balance"] - result["projected_expense"])
+    assert result["upper"] - result["lower"] < 1.0  # the pattern is exact, so the band is narrow
+
+def test_batch_matches_single_user_and_cache_reloads_only_changes(tracker):
+    everyone = tracker.get_forecasts(as_of=AS_OF.isoformat(), history_days=120)
+    assert sorted(everyone) == ["alice", "bob"]
+    assert everyone["bob"]["upper"] > everyone["bob"]["projected_balance"] > everyone["bob"]["lower"]
+    for user_id in everyone:
+        single = TrackerService(tracker.db.db_name).get_forecast(user_id, AS_OF.isoformat(), history_days=120)
+        assert single == pytest.approx(everyone[user_id])
+
+    loads = tracker.daily_series.loads
+    assert tracker.get_forecasts(as_of=AS_OF.isoformat(), history_days=120) == everyone
+    assert tracker.daily_series.loads == loads
+    tracker.add_transaction(500.0, "expense", "Rent", AS_OF.isoformat(), "bob")
+    updated = tracker.get_forecasts(as_of=AS_OF.isoformat(), history_days=120)
+    assert tracker.daily_series.loads == loads + 1
+    assert updated["alice"] == everyone["alice"]
+    assert updated["bob"]["balance"] == pytest.approx(everyone["bob"]["balance"] - 500.0)
+
+def test_forecast_and_summary_commands(tracker, monkeypatch):
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": tracker.db.db_name}
+    result = runner.invoke(forecast, ["--all-users", "--as-of", AS_OF.isoformat(), "--format", "jsonl"], env=env)
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert [row["user_id"] for row in rows] == ["alice", "bob"]
+    result = runner.invoke(forecast, ["--as-of", AS_OF.isoformat()], env=env)
+    assert "Error: Give either --user-id or --all-users" in result.output
+
+    monkeypatch.setattr(views.report, "date", type("FixedDate", (date,), {"today": staticmethod(lambda: AS_OF)}))
+    monkeypatch.setattr(TrackerService, "get_forecast",
+                        lambda self, user_id: self.get_forecasts([user_id], AS_OF.isoformat())[user_id])
+    result = runner.invoke(summary, ["--user-id", "alice"], env=env)
+    assert "Projected Balance (2025-06-30):" in result.output
+    result = runner.invoke(summary, ["--user-id", "alice", "--month", "2025-05"], env=env)
+    assert "Projected Balance" not in result.output
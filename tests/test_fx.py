@@ -0,0 +1,153 @@
+import sqlite3
+import pytest
+from click.testing import CliRunner
+from unittest.mock import patch
+from cli.commands import add, fx, report_pdf, summary
+from models.transaction import Transaction
+from services.tracker import TrackerService
+
+RATES = "date,currency,rate\n2025-01-02,USD,7.0\n2025-01-06,USD,7.5\n2025-01-02,EUR,8.0\n"
+
+@pytest.fixture
+def tracker(tmp_path):
+    rates = tmp_path / "rates.csv"
+    rates.write_text(RATES)
+    tracker = TrackerService(str(tmp_path / "fx.db"))
+    tracker.fx.load_csv(str(rates))
+    return tracker
+
+def test_summary_converts_each_date_bucket(tracker):
+    db = tracker.db
+    db.create(Transaction(amount=1000.0, type="income", category="Salary", date="2025-01-03", user_id="u1", currency="USD"))
+    # A weekend uses the last quote before it, the following Monday the new one
+    db.create(Transaction(amount=10.0, type="expense", category="Food", date="2025-01-05", user_id="u1", currency="USD"))
+    db.create(Transaction(amount=10.0, type="expense", category="Food", date="2025-01-06", user_id="u1", currency="USD"))
+    db.create(Transaction(amount=100.0, type="expense", category="Food", date="2025-01-06", user_id="u1"))
+
+    cny = tracker.get_summary("u1")
+    assert cny["currency"] == "CNY" and cny["transaction_count"] == 4
+    assert cny["total_income"] == pytest.approx(7000.0)
+    assert cny["total_expense"] == pytest.approx(70.0 + 75.0 + 100.0)
+
+    eur = tracker.get_summary("u1", currency="EUR")
+    assert eur["total_income"] == pytest.approx(7000.0 / 8.0)
+    assert eur["category_summary"]["Food"] == pytest.approx(245.0 / 8.0)
+
+def test_missing_rate_is_an_error(tracker):
+    tracker.db.create(Transaction(amount=5.0, type="expense", category="Food", date="2024-12-31",
+                                  user_id="u1", currency="USD"))
+    with pytest.raises(ValueError, match="No FX rate for USD on or before 2024-12-31"):
+        tracker.get_summary("u1")
+
+def test_balances_budgets_and_reports_convert_other_currencies(tracker):
+    db = tracker.db
+    db.create(Transaction(amount=1000.0, type="income", category="Salary", date="2025-01-03", user_id="u1"))
+    db.create(Transaction(amount=10.0, type="expense", category="Food", date="2025-01-05", user_id="u1", currency="USD"))
+    moved = db.create(Transaction(amount=10.0, type="expense", category="Food", date="2025-01-06", user_id="u1",
+                                  currency="USD"))
+    db.create(Transaction(amount=100.0, type="expense", category="Food", date="2025-01-06", user_id="u1"))
+    tracker.set_budget("u1", "Food", 500.0)
+
+    assert tracker.get_balance_as_of("u1", "2025-01-05") == pytest.approx(930.0)
+    assert tracker.get_balance_as_of("u1", "2025-01-31") == pytest.approx(755.0)
+    assert tracker.check_budget("u1", "2025-01-10", "Food").spent == pytest.approx(245.0)
+    assert [(s.category, s.spent) for s in tracker.get_budget_status("u1", "2025-01")] == [("Food", pytest.approx(245.0))]
+    assert tracker.get_monthly_report_data("u1", "2025-01")["total_expense"] == pytest.approx(245.0)
+    assert tracker.get_trend("u1", "monthly")[0]["expense"] == pytest.approx(245.0)
+    assert tracker.get_stats("u1", mode="exact")["total"] == pytest.approx(245.0)
+    assert tracker.get_admin_summary()["totals"]["total_expense"] == pytest.approx(245.0)
+    food = next(node for node in tracker.get_category_tree("u1") if node.path == "Food")
+    assert food.expense == pytest.approx(245.0)
+    assert tracker.get_forecast("u1", "2025-01-31")["balance"] == pytest.approx(755.0)
+
+    # Moving a row into the default currency moves it into the counters
+    row = db.get_transaction(moved, "u1")
+    row.currency = None
+    db.update(row)
+    assert tracker.get_balance_as_of("u1", "2025-01-31") == pytest.approx(820.0)
+    assert tracker.check_budget("u1", "2025-01-10", "Food").spent == pytest.approx(180.0)
+
+def test_rows_sharing_a_date_bucket_are_each_converted(tracker):
+    db = tracker.db
+    for amount, currency in [(10.0, "USD"), (20.0, "USD"), (30.0, "CNY"), (40.0, None)]:
+        db.create(Transaction(amount=amount, type="expense", category="Food", date="2025-01-06", user_id="u1",
+                              currency=currency))
+
+    assert db.range_totals("u1") == (4, pytest.approx(75.0 + 150.0 + 30.0 + 40.0))
+    assert sorted(amount for _, _, amount in db.iter_amounts("u1")) == pytest.approx([30.0, 40.0, 75.0, 150.0])
+    assert db.amount_quantiles("u1", [0.0, 1.0]) == {0.0: pytest.approx(30.0), 1.0: pytest.approx(150.0)}
+    assert sum(count for _, _, count in db.category_histograms("u1", bins=4)["Food"]) == 4
+
+def test_report_pdf_converts_other_currencies(tracker, tmp_path):
+    db = tracker.db
+    db.create(Transaction(amount=100.0, type="expense", category="Food", date="2025-01-03", user_id="u1"))
+    db.create(Transaction(amount=100.0, type="expense", category="Food", date="2025-01-03", user_id="u1",
+                          currency="USD"))
+    with patch("cli.commands.export_summary_to_pdf", return_value="r.pdf") as export:
+        result = CliRunner().invoke(report_pdf, ["--user-id", "u1", "--output", str(tmp_path / "r.pdf")],
+                                    env={"MONEYTRACKER_DB": db.db_name})
+    assert "PDF report exported to: r.pdf" in result.output
+    summary_data = export.call_args[0][0]
+    assert summary_data["total_expense"] == pytest.approx(800.0) and summary_data["currency"] == "CNY"
+
+def test_balance_without_a_rate_is_an_error(tracker):
+    tracker.db.create(Transaction(amount=5.0, type="expense", category="Food", date="2024-12-31",
+                                  user_id="u1", currency="USD"))
+    with pytest.raises(ValueError, match="No FX rate for USD on or before 2024-12-31"):
+        tracker.get_balance_as_of("u1", "2025-01-31")
+    with pytest.raises(ValueError, match="No FX rate for USD"):
+        tracker.get_budget_status("u1", "2024-12")
+
+def test_older_counters_are_rebuilt_without_other_currencies(tracker):
+    tracker.db.create(Transaction(amount=10.0, type="expense", category="Food", date="2025-01-06",
+                                  user_id="u1", currency="USD"))
+    # Version 6 counted every currency as entered
+    with sqlite3.connect(tracker.db.db_name) as conn:
+        conn.execute("UPDATE balance_blocks SET net = net - 10")
+        conn.execute("INSERT INTO category_spend VALUES ('u1', '2025-01', 'Food', 10)")
+        conn.execute("PRAGMA user_version = 6")
+    reopened = TrackerService(tracker.db.db_name)
+    assert reopened.get_balance_as_of("u1", "2025-01-31") == pytest.approx(-75.0)
+    assert reopened.check_budget("u1", "2025-01-10", "Food").spent == pytest.approx(75.0)
+
+def test_loading_rates_refreshes_cached_lookups(tracker, tmp_path):
+    assert tracker.fx.factor("USD", "CNY", "2025-01-10") == 7.5
+    newer = tmp_path / "newer.csv"
+    newer.write_text("date,currency,rate\n2025-01-08,USD,7.2\n")
+    tracker.fx.load_csv(str(newer))
+    assert tracker.fx.factor("USD", "CNY", "2025-01-10") == 7.2
+
+def test_currency_commands(tmp_path):
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": str(tmp_path / "fx.db")}
+    rates = tmp_path / "rates.csv"
+    rates.write_text(RATES)
+    assert "Loaded 3 FX rates" in runner.invoke(fx, ["load", str(rates)], env=env).output
+    assert "1 USD = 7.500000 CNY on 2025-01-07" in runner.invoke(
+        fx, ["rate", "--currency", "usd", "--date", "2025-01-07"], env=env).output
+    result = runner.invoke(add, ["--amount", "20", "--type", "expense", "--category", "Books",
+                                 "--date", "2025-01-06", "--user-id", "u1", "--currency", "EUR"], env=env)
+    assert "Transaction added successfully" in result.output
+    result = runner.invoke(summary, ["--user-id", "u1", "--currency", "USD"], env=env)
+    assert "Summary for user u1 (USD)" in result.output
+    assert "Total Expense: 21.33" in result.output
+    result = runner.invoke(add, ["--amount", "20", "--type", "expense", "--category", "Books",
+                                 "--user-id", "u1", "--currency", "dollars"], env=env)
+    assert "Currency must be a 3-letter ISO code" in result.output
+    # Without a rate the row is refused, so the user's reports keep working
+    result = runner.invoke(add, ["--amount", "5", "--type", "expense", "--category", "Books",
+                                 "--date", "2025-01-01", "--user-id", "u1", "--currency", "USD"], env=env)
+    assert result.output == ("Error: Transaction not added: No FX rate for USD on or before 2025-01-01; "
+                             "load one with 'fx load'\n")
+    assert "Total Expense: 21.33" in runner.invoke(summary, ["--user-id", "u1", "--currency", "USD"], env=env).output
+
+def test_add_warns_when_the_budget_check_fails(tmp_path):
+    db_path = str(tmp_path / "fx.db")
+    tracker = TrackerService(db_path)
+    # A row stored without a rate, e.g. before add checked for one
+    tracker.db.create(Transaction(amount=5.0, type="expense", category="Books", date="2025-01-03", user_id="u1",
+                                  currency="USD"))
+    result = CliRunner().invoke(add, ["--amount", "20", "--type", "expense", "--category", "Books",
+                                      "--date", "2025-01-06", "--user-id", "u1"], env={"MONEYTRACKER_DB": db_path})
+    assert "Transaction added successfully" in result.output
+    assert "Warning: budget check failed: No FX rate for USD" in result.output and "Error" not in result.output
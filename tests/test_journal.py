@@ -0,0 +1,83 @@
+import json
+import sqlite3
+import threading
+import time
+from click.testing import CliRunner
+from cli.commands import watch
+from models.journal import ChangeFeed
+from models.transaction import Transaction, TransactionModel
+
+def expense(amount, user_id="alice"):
+    return Transaction(amount=amount, type="expense", category="Food", date="2025-07-01", user_id=user_id)
+
+def test_feed_streams_inserts_updates_and_deletes(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "feed.db"))
+    with ChangeFeed(db.db_name) as feed:
+        assert feed.poll() == []
+        tid = db.create(expense(10.0))
+        db.create(expense(5.0, user_id="bob"))
+        db.update(Transaction(id=tid, amount=12.0, type="expense", category="Food", date="2025-07-01",
+                              user_id="alice"))
+        db.delete(tid, "alice")
+        events = feed.poll()
+    assert [(e.op, e.user_id) for e in events] == [("insert", "alice"), ("insert", "bob"),
+                                                  ("update", "alice"), ("delete", "alice")]
+    assert events[0].transaction is None and events[0].transaction_id == tid  # Deleted since
+    assert events[1].transaction.amount == 5.0
+    assert [e.seq for e in events] == sorted(e.seq for e in events)
+
+def test_idle_feed_does_not_query_and_resumes_from_cursor(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "feed.db"))
+    db.create(expense(1.0))
+    with ChangeFeed(db.db_name, cursor=0, user_id="alice") as feed:
+        assert len(feed.poll()) == 1
+        for _ in range(5):
+            assert feed.poll() == []
+        assert feed.wakeups == 1
+        cursor = feed.cursor
+    db.create(expense(2.0, user_id="bob"))
+    db.create(expense(3.0))
+    with ChangeFeed(db.db_name, cursor=cursor, user_id="alice") as feed:
+        assert [e.transaction.amount for e in feed.poll()] == [3.0]
+
+def test_follow_wakes_up_on_commit(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "feed.db"))
+    feed = ChangeFeed(db.db_name, poll_interval=0.01)
+    writer = threading.Timer(0.1, lambda: db.create(expense(7.0)))
+    writer.start()
+    started = time.monotonic()
+    try:
+        event = next(feed.follow(timeout=5))
+    finally:
+        writer.join()
+        feed.close()
+    assert event.transaction.amount == 7.0
+    assert time.monotonic() - started < 2
+
+def test_watch_command_saves_cursor(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "feed.db"))
+    db.create(expense(10.0))
+    cursor_file = str(tmp_path / "cursor")
+    env = {"MONEYTRACKER_DB": db.db_name}
+    runner = CliRunner()
+    result = runner.invoke(watch, ["--since", "0", "--once", "--cursor-file", cursor_file], env=env)
+    assert json.loads(result.output.strip())["transaction"]["amount"] == 10.0
+    db.create(expense(20.0))
+    result = runner.invoke(watch, ["--once", "--cursor-file", cursor_file, "--format", "text"], env=env)
+    assert "insert ID:" in result.output and "Amount: 20.00" in result.output
+    assert "10.00" not in result.output
+
+def test_version_two_journal_is_migrated(tmp_path):
+    path = str(tmp_path / "v2.db")
+    TransactionModel(db_name=path).create(expense(4.0))
+    with sqlite3.connect(path) as conn:
+        # Recreate the version 2 layout: no row_id/user_id in the journal
+        conn.execute("DROP TRIGGER changelog_ai")
+        conn.execute("ALTER TABLE changelog DROP COLUMN row_id")
+        conn.execute("ALTER TABLE changelog DROP COLUMN user_id")
+        conn.execute("PRAGMA user_version = 2")
+    db = TransactionModel(db_name=path)
+    db.create(expense(6.0))
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT row_id, user_id FROM changelog ORDER BY seq").fetchall() == \
+            [(1, "alice"), (2, "alice")]
@@ -0,0 +1,62 @@
+import os
+import pytest
+from click.testing import CliRunner
+from cli.commands import monthly_report
+from models.transaction import Transaction
+from services.tracker import TrackerService
+from utils.template import CompiledTemplate
+from views.monthly_report import generate_monthly_report, generate_monthly_reports_for_all_users
+
+@pytest.fixture
+def tracker(tmp_path):
+    service = TrackerService(str(tmp_path / "report.db"))
+    rows = [
+        (3000.0, "income", "Salary", "2025-07-01", "alice"),
+        (120.0, "expense", "Food", "2025-07-02", "alice"),
+        (80.0, "expense", "Food", "2025-07-03", "alice"),
+        (300.0, "expense", "Rent", "2025-07-03", "alice"),
+        (50.0, "expense", "Food", "2025-08-01", "alice"),
+        (40.0, "expense", "Books", "2025-07-10", "bob"),
+    ]
+    for amount, type, category, date, user_id in rows:
+        service.db.create(Transaction(amount=amount, type=type, category=category, date=date, user_id=user_id))
+    return service
+
+def test_template_renders_loops_and_variables():
+    template = CompiledTemplate("# {{ title }}\n{% for name, value in rows %}\n| {{ name }} | {{ value }} |\n{% endfor %}\nend")
+    output = template.render({"title": "T", "rows": [("a", 1), ("b", 2)]})
+    assert output == "# T\n| a | 1 |\n| b | 2 |\nend"
+
+def test_monthly_report_data_single_pass(tracker):
+    data = tracker.get_monthly_report_data("alice", "2025-07")
+    assert data["transaction_count"] == 4
+    assert data["total_income"] == 3000.0
+    assert data["total_expense"] == 500.0
+    assert data["category_table"][0] == ("Rent", 300.0, 60.0)
+    assert data["highest_category"] == ("Rent", 300.0)
+    assert data["highest_day"] == ("2025-07-03", 380.0)
+    assert data["trend"]["dates"] == ["2025-07-01", "2025-07-02", "2025-07-03"]
+
+def test_generate_monthly_report_writes_markdown_and_charts(tracker, tmp_path):
+    output_dir = tmp_path / "reports"
+    path = generate_monthly_report(tracker, "alice", "2025-07", str(output_dir), pdf=True, workers=1)
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    assert "- **Total Expense:** ¥500.00" in content
+    assert "| Rent | 300.00 | 60.0% |" in content
+    assert "Highest expense category: Rent (¥300.00)" in content
+    assert "{{" not in content and "{%" not in content
+    for suffix in ("category", "pie", "trend"):
+        assert os.path.exists(output_dir / f"alice_2025-07_{suffix}.png")
+    assert os.path.exists(output_dir / "monthly_report_alice_2025-07.pdf")
+
+def test_generate_monthly_reports_for_all_users(tracker, tmp_path):
+    written = generate_monthly_reports_for_all_users(tracker, "2025-07", str(tmp_path), workers=2)
+    assert sorted(written) == ["alice", "bob"]
+    assert all(os.path.exists(path) for path in written.values())
+
+def test_monthly_report_command_requires_one_target(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(monthly_report, ["--month", "2025-07"], env={"MONEYTRACKER_DB": str(tmp_path / "x.db")})
+    assert result.exit_code == 0
+    assert "Error: Specify exactly one of --user-id or --all-users" in result.output
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+import pytest
+from click.testing import CliRunner
+from cli.commands import list as list_command, report, summary
+from models.transaction import Transaction, TransactionModel
+from utils.output import emit, format_rows
+
+@pytest.fixture
+def env(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "output.db"))
+    db.create(Transaction(amount=5.0, type="expense", category="Food", date="2025-07-01", user_id="other"))
+    db.create(Transaction(amount=100.5, type="expense", category="Food", date="2025-07-02", user_id="u1",
+                          note="Lunch, with \"friends\""))
+    db.create(Transaction(amount=200.0, type="income", category="Salary", date="2025-07-03", user_id="u1"))
+    return {"MONEYTRACKER_DB": db.db_name}
+
+def invoke(command, args, env):
+    result = CliRunner().invoke(command, args, env=env)
+    assert result.exit_code == 0, result.output
+    return result.output
+
+def test_list_shows_real_ids(env):
+    output = invoke(list_command, ["--user-id", "u1"], env)
+    assert "ID: 2, Amount: 100.50" in output and "ID: 3, Amount: 200.00" in output
+
+def test_list_machine_formats(env):
+    rows = list(csv.DictReader(io.StringIO(invoke(list_command, ["--user-id", "u1", "--format", "csv"], env))))
+    assert [r["id"] for r in rows] == ["2", "3"] and rows[0]["note"] == 'Lunch, with "friends"'
+    parsed = json.loads(invoke(list_command, ["--user-id", "u1", "--format", "json"], env))
+    assert [r["amount"] for r in parsed] == [100.5, 200.0]
+    lines = invoke(list_command, ["--user-id", "u1", "--format", "jsonl"], env).splitlines()
+    assert [json.loads(line)["category"] for line in lines] == ["Food", "Salary"]
+    assert json.loads(invoke(list_command, ["--user-id", "nobody", "--format", "json"], env)) == []
+    table = invoke(list_command, ["--user-id", "u1", "--format", "table"], env)
+    assert "Transactions for user u1" in table and "100.50" in table
+
+def test_summary_and_report_formats(env):
+    data = json.loads(invoke(summary, ["--user-id", "u1", "--format", "json"], env))
+    assert data["balance"] == 99.5 and data["category_summary"] == {"Food": 100.5, "Salary": 200.0}
+    rows = list(csv.DictReader(io.StringIO(invoke(report, ["--user-id", "u1", "--format", "csv"], env))))
+    assert {"section": "total", "name": "balance", "value": "99.5"} in rows
+    assert {"section": "category", "name": "Salary", "value": "200.0"} in rows
+    assert "Category Breakdown" in invoke(summary, ["--user-id", "u1", "--format", "table"], env)
+
+def test_emit_batches_writes():
+    rows = ({"n": i} for i in range(50_000))
+    with patch("utils.output.click.echo") as echo:
+        emit(format_rows(rows, ["n"], "jsonl"))
+    assert 1 < echo.call_count < 50
+    written = "".join(call.args[0] for call in echo.call_args_list)
+    assert written.count("\n") == 50_000
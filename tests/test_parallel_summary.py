@@ -0,0 +1,59 @@
+import sqlite3
+import pytest
+from click.testing import CliRunner
+import services.tracker
+from cli.commands import summary
+from models.transaction import Transaction
+from services.tracker import TrackerService, split_date_range
+
+@pytest.fixture
+def tracker(tmp_path):
+    service = TrackerService(str(tmp_path / "parallel.db"))
+    service.db.add_transactions([Transaction(amount=float(i % 50 + 1), type="income" if i % 7 == 0 else "expense",
+                                             category=("Food", "Rent", "Salary")[i % 3],
+                                             date=f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", user_id="biz",
+                                             currency=("USD" if i % 5 == 0 else None)) for i in range(600)])
+    rates = tmp_path / "rates.csv"
+    rates.write_text("date,currency,rate\n2024-01-01,USD,7.0\n")
+    service.fx.load_csv(str(rates))
+    return service
+
+def test_split_date_range_covers_every_day_once():
+    chunks = split_date_range("2024-01-01", "2024-12-31", 4)
+    assert chunks[0][0] == "2024-01-01" and chunks[-1][1] == "2024-12-31" and len(chunks) == 4
+    assert all(a[1] < b[0] for a, b in zip(chunks, chunks[1:]))
+    assert split_date_range("2024-01-01", "2024-01-02", 8) == [("2024-01-01", "2024-01-01"), ("2024-01-02", "2024-01-02")]
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_parallel_summary_matches_serial(tracker, monkeypatch, processes):
+    serial = tracker.get_summary("biz", workers=1)
+    monkeypatch.setattr(services.tracker, "PARALLEL_CHUNK_ROWS", 100)
+    assert len(tracker.summary_chunks("biz", workers=4)) == 4
+    assert len(tracker.summary_chunks("biz", "2024-03-01", "2024-03-31", workers=4)) == 1  # 50 rows
+    buckets = tracker.summary_buckets("biz", workers=4, processes=processes)
+    assert sorted(buckets) == sorted(tracker.db.aggregate_by_currency("biz"))
+    parallel = tracker.get_summary("biz", workers=4)
+    assert parallel["category_summary"] == pytest.approx(serial["category_summary"])
+    assert parallel["balance"] == pytest.approx(serial["balance"]) and parallel["transaction_count"] == 600
+    assert tracker.get_summary("biz", month="2024-05", workers=4)["transaction_count"] == 50
+
+def test_write_during_parallel_summary_falls_back_to_one_snapshot(tracker, monkeypatch):
+    monkeypatch.setattr(services.tracker, "PARALLEL_CHUNK_ROWS", 100)
+    aggregate_chunk = services.tracker.aggregate_chunk
+    def move_row_mid_summary(db_name, immutable, user_id, first, *args):
+        part = aggregate_chunk(db_name, immutable, user_id, first, *args)
+        if first == "2024-01-01":  # The first chunk has counted a January row; move it into the last chunk
+            with sqlite3.connect(db_name) as conn:
+                conn.execute("UPDATE transactions SET date = '2024-12-20' WHERE id = 1")
+        return part
+    monkeypatch.setattr(services.tracker, "aggregate_chunk", move_row_mid_summary)
+    buckets = tracker.summary_buckets("biz", workers=4)
+    assert sorted(buckets) == sorted(tracker.db.aggregate_by_currency("biz"))
+    assert sum(bucket[5] for bucket in buckets) == 600
+
+def test_summary_workers_option(tracker, monkeypatch):
+    monkeypatch.setattr(services.tracker, "PARALLEL_CHUNK_ROWS", 100)
+    env = {"MONEYTRACKER_DB": tracker.db.db_name}
+    parallel = CliRunner().invoke(summary, ["--user-id", "biz", "--workers", "3", "--format", "csv"], env=env)
+    serial = CliRunner().invoke(summary, ["--user-id", "biz", "--workers", "1", "--format", "csv"], env=env)
+    assert parallel.output == serial.output and "total,transaction_count,600" in parallel.output
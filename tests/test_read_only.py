@@ -0,0 +1,57 @@
+import os
+import sqlite3
+import time
+import pytest
+from click.testing import CliRunner
+from cli.commands import list as list_command, summary
+from models.backup import backup_database
+from models.database import SCHEMA_VERSION, schema_version
+from models.transaction import Transaction, TransactionModel
+
+@pytest.fixture
+def db(tmp_path):
+    db = TransactionModel(db_name=str(tmp_path / "ro.db"))
+    db.create(Transaction(amount=12.5, type="expense", category="Food", date="2025-03-01", user_id="u1"))
+    return db
+
+def test_read_only_model_reads_but_cannot_write(db):
+    reader = TransactionModel(db.db_name, read_only=True)
+    assert [t.amount for t in reader.read_all("u1")] == [12.5]
+    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+        reader.create(Transaction(amount=1.0, type="income", category="X", date="2025-03-02", user_id="u1"))
+    with reader._connect() as conn:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] > 0
+
+def test_read_only_open_migrates_an_old_file_once(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL NOT NULL,
+                        type TEXT NOT NULL, category TEXT NOT NULL, date TEXT NOT NULL, user_id TEXT NOT NULL)""")
+        conn.execute("INSERT INTO transactions (amount, type, category, date, user_id) "
+                     "VALUES (5, 'expense', 'Food', '2025-01-01', 'u1')")
+    assert schema_version(path) == 0
+    reader = TransactionModel(path, read_only=True)
+    assert schema_version(path) == SCHEMA_VERSION
+    assert reader.read_all("u1")[0].note is None
+
+def test_reads_are_not_blocked_by_a_writer(db):
+    writer = sqlite3.connect(db.db_name)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO transactions (amount, type, category, date, user_id) "
+                   "VALUES (1, 'income', 'Salary', '2025-03-02', 'u1')")
+    try:
+        start = time.perf_counter()
+        result = CliRunner().invoke(summary, ["--user-id", "u1"], env={"MONEYTRACKER_DB": db.db_name})
+        assert time.perf_counter() - start < 5
+        assert "Total Expense: 12.50" in result.output and "Total Income: 0.00" in result.output
+    finally:
+        writer.rollback()
+        writer.close()
+
+def test_list_from_an_immutable_snapshot(db, tmp_path):
+    snapshot = backup_database(db.db_name, str(tmp_path / "backups")).path
+    os.chmod(snapshot, 0o444)
+    result = CliRunner().invoke(list_command, ["--user-id", "u1"],
+                                env={"MONEYTRACKER_DB": snapshot, "MONEYTRACKER_IMMUTABLE": "1"})
+    assert "Amount: 12.50" in result.output
@@ -0,0 +1,85 @@
+import sqlite3
+from datetime import date
+import pytest
+from click.testing import CliRunner
+from cli.commands import recur
+from models.recurring import RecurringModel, RecurringRule
+from models.transaction import TransactionModel
+from services.tracker import TrackerService
+from utils.recurrence import RecurrenceError, occurrences
+
+def dates(*args, **kwargs):
+    return [d.isoformat() for d in occurrences(*args, **kwargs)]
+
+def test_monthly_occurrences_clamp_to_month_end():
+    assert dates("monthly", date(2024, 1, 31), date(2024, 1, 1), date(2024, 4, 30)) == [
+        "2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"]
+    assert dates("monthly", date(2024, 1, 15), date(2024, 5, 1), date(2024, 12, 31), interval=3) == [
+        "2024-07-15", "2024-10-15"]
+
+def test_weekly_and_cron_occurrences():
+    assert dates("weekly", date(2025, 1, 6), date(2025, 1, 10), date(2025, 2, 10), interval=2) == [
+        "2025-01-20", "2025-02-03"]
+    # 1st and 15th of every month
+    assert dates("cron", date(2025, 1, 1), date(2025, 1, 1), date(2025, 2, 20), cron="1,15 * *") == [
+        "2025-01-01", "2025-01-15", "2025-02-01", "2025-02-15"]
+    # Fridays in March, 5-field form
+    assert dates("cron", date(2025, 1, 1), date(2025, 1, 1), date(2025, 12, 31), cron="0 9 * 3 5") == [
+        "2025-03-07", "2025-03-14", "2025-03-21", "2025-03-28"]
+    with pytest.raises(RecurrenceError):
+        dates("cron", date(2025, 1, 1), date(2025, 1, 1), date(2025, 1, 2), cron="32 * *")
+
+def test_materialize_is_idempotent(tmp_path):
+    path = str(tmp_path / "recurring.db")
+    tracker = TrackerService(path)
+    tracker.add_recurring_rule(RecurringRule(user_id="u1", amount=1200.0, type="expense", category="Rent",
+                                             frequency="monthly", start_date="2025-01-01", end_date="2025-06-30"))
+    assert tracker.materialize_recurring("2025-03-31") == (3, 0)
+    assert tracker.materialize_recurring("2025-03-31") == (0, 0)
+    assert tracker.materialize_recurring("2025-12-31") == (3, 0)
+
+    # Losing the watermark must not produce duplicates
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE recurring_rules SET materialized_until = NULL")
+    assert tracker.materialize_recurring("2025-12-31") == (0, 6)
+    rent = [t for t in TransactionModel(path).read_all("u1") if t.category == "Rent"]
+    assert len(rent) == 6
+    assert tracker.get_balance_as_of("u1", "2025-12-31") == -7200.0
+
+def test_invalid_rule_rejected(tmp_path):
+    tracker = TrackerService(str(tmp_path / "recurring.db"))
+    with pytest.raises(Exception):
+        tracker.add_recurring_rule(RecurringRule(user_id="u1", amount=-5.0, type="expense", category="Rent",
+                                                 start_date="2025-01-01"))
+    with pytest.raises(RecurrenceError):
+        tracker.add_recurring_rule(RecurringRule(user_id="u1", amount=5.0, type="expense", category="Gym",
+                                                 frequency="cron", cron="every day", start_date="2025-01-01"))
+    assert RecurringModel(tracker.db.db_name).get_rules() == []
+
+def test_recur_commands(tmp_path):
+    runner = CliRunner()
+    env = {"MONEYTRACKER_DB": str(tmp_path / "recurring.db")}
+    result = runner.invoke(recur, ["add", "--user-id", "u1", "--amount", "5000", "--type", "income",
+                                   "--category", "Salary", "--frequency", "cron", "--cron", "25 * *",
+                                   "--start-date", "2025-01-01"], env=env)
+    assert "Recurring rule added with ID 1" in result.output
+    result = runner.invoke(recur, ["materialize", "--until", "2025-03-31"], env=env)
+    assert "Created 3 recurring transactions up to 2025-03-31 (0 already existed)" in result.output
+    result = runner.invoke(recur, ["list", "--user-id", "u1"], env=env)
+    assert "Schedule: cron '25 * *'" in result.output and "Materialized until: 2025-03-31" in result.output
+    result = runner.invoke(recur, ["delete", "--user-id", "u1", "--rule-id", "1"], env=env)
+    assert "Recurring rule 1 deleted" in result.output
+
+def test_bad_schedules_are_rejected_and_stored_ones_skipped(tmp_path):
+    tracker = TrackerService(str(tmp_path / "recurring.db"))
+    for frequency, interval in (("monthly", 0), ("yearly", 1)):
+        with pytest.raises(RecurrenceError):
+            tracker.add_recurring_rule(RecurringRule(user_id="u1", amount=5.0, type="expense", category="Gym",
+                                                     frequency=frequency, interval=interval, start_date="2025-01-01"))
+    tracker.add_recurring_rule(RecurringRule(user_id="u2", amount=9.0, type="expense", category="Food>Coffee",
+                                             frequency="monthly", start_date="2025-01-01"))
+    with sqlite3.connect(tracker.db.db_name) as conn:  # A rule stored before schedules were checked
+        conn.execute("INSERT INTO recurring_rules (user_id, amount, type, category, frequency, interval, start_date) "
+                     "VALUES ('u1', 5.0, 'expense', 'Gym', 'monthly', 0, '2025-01-01')")
+    assert tracker.materialize_recurring("2025-03-31") == (3, 0)
+    assert {t.category for t in TransactionModel(tracker.db.db_name).read_all("u2")} == {"Food > Coffee"}
@@ -8,23 +8,20 @@ def runner():
     return CliRunner()
 
 @pytest.fixture
-def sample_transactions():
-    return [
-        MagicMock(amount=1000, type='income', category='Salary'),
-        MagicMock(amount=300, type='expense', category='Food'),
-        MagicMock(amount=200, type='expense', category='Transport'),
-    ]
+def sample_summary():
+    return {'transaction_count': 3, 'total_income': 1000.0, 'total_expense': 500.0, 'balance': 500.0,
+            'category_summary': {'Salary': 1000.0, 'Food': 300.0, 'Transport': 200.0}, 'currency': 'CNY'}
 
-@patch("cli.commands.get_db")
+@patch("cli.commands.get_tracker")
 @patch("cli.commands.export_summary_to_pdf")
 @patch("cli.commands.validate_user_id")
 @patch("cli.commands.validate_date")
 @patch("cli.commands.validate_date_range")
-def test_report_pdf_success(mock_validate_range, mock_validate_date, mock_validate_user, mock_export_pdf, mock_get_db, runner, sample_transactions):
+def test_report_pdf_success(mock_validate_range, mock_validate_date, mock_validate_user, mock_export_pdf, mock_get_tracker, runner, sample_summary):
     # 模拟数据库返回交易数据
-    mock_db = MagicMock()
-    mock_db.read_all.return_value = sample_transactions
-    mock_get_db.return_value = mock_db
+    mock_tracker = MagicMock()
+    mock_tracker.get_summary.return_value = sample_summary
+    mock_get_tracker.return_value = mock_tracker
 
     # 模拟导出函数返回路径
     mock_export_pdf.return_value = "output.pdf"
@@ -44,15 +41,15 @@ def test_report_pdf_success(mock_validate_range, mock_validate_date, mock_valida
     mock_validate_date.assert_any_call("2025-01-01")
     mock_validate_date.assert_any_call("2025-01-31")
     mock_validate_range.assert_called_once_with("2025-01-01", "2025-01-31")
-    mock_db.read_all.assert_called_once()
-    mock_export_pdf.assert_called_once()
+    mock_tracker.get_summary.assert_called_once_with("user123", "2025-01-01", "2025-01-31", workers=1)
+    mock_export_pdf.assert_called_once_with(sample_summary, "output.pdf")
 
-@patch("cli.commands.get_db")
+@patch("cli.commands.get_tracker")
 @patch("cli.commands.validate_user_id")
-def test_report_pdf_no_transactions(mock_validate_user, mock_get_db, runner):
-    mock_db = MagicMock()
-    mock_db.read_all.return_value = []
-    mock_get_db.return_value = mock_db
+def test_report_pdf_no_transactions(mock_validate_user, mock_get_tracker, runner):
+    mock_tracker = MagicMock()
+    mock_tracker.get_summary.return_value = {'transaction_count': 0}
+    mock_get_tracker.return_value = mock_tracker
 
     result = runner.invoke(report_pdf, [
         "--user-id", "user123"
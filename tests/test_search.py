@@ -0,0 +1,61 @@
+import sqlite3
+import pytest
+from click.testing import CliRunner
+from cli.commands import search
+from models.transaction import Transaction, TransactionModel, build_search_query
+
+@pytest.fixture
+def db(tmp_path):
+    model = TransactionModel(db_name=str(tmp_path / "search.db"))
+    rows = [
+        (12.5, "Food", "2025-07-01", "u1", "Starbucks coffee downtown"),
+        (48.0, "Food", "2025-07-05", "u1", "Whole Foods groceries"),
+        (9.0, "Food", "2025-07-09", "u1", "coffee beans from Starbucks"),
+        (60.0, "Transport", "2025-07-10", "u1", None),
+        (15.0, "Food", "2025-07-02", "u2", "Starbucks coffee downtown"),
+    ]
+    for amount, category, date, user_id, note in rows:
+        model.create(Transaction(amount=amount, type="expense", category=category,
+                                 date=date, user_id=user_id, note=note))
+    return model
+
+def test_build_search_query():
+    assert build_search_query('star* "whole foods" coffee') == '"star"* AND "whole foods" AND "coffee"'
+    with pytest.raises(ValueError):
+        build_search_query('  ')
+
+def test_search_prefix_and_user_filter(db):
+    results = db.search("u1", build_search_query("starb*"))
+    assert sorted(t.date for t in results) == ["2025-07-01", "2025-07-09"]
+    assert all(t.user_id == "u1" for t in results)
+
+def test_search_phrase_and_date_filter(db):
+    assert [t.note for t in db.search("u1", build_search_query('"starbucks coffee"'))] == ["Starbucks coffee downtown"]
+    results = db.search("u1", build_search_query("coffee"), start_date="2025-07-05", end_date="2025-07-31")
+    assert [t.date for t in results] == ["2025-07-09"]
+
+def test_search_index_follows_update_and_delete(db):
+    transaction = db.search("u1", build_search_query("groceries"))[0]
+    transaction.note = "farmers market"
+    db.update(transaction)
+    assert db.search("u1", build_search_query("groceries")) == []
+    assert len(db.search("u1", build_search_query("farmers"))) == 1
+    db.delete(transaction.id, "u1")
+    assert db.search("u1", build_search_query("farmers")) == []
+    with sqlite3.connect(db.db_name) as conn:
+        conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('integrity-check')")
+
+def test_note_column_added_to_existing_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL NOT NULL,
+                        type TEXT NOT NULL, category TEXT NOT NULL, date TEXT NOT NULL, user_id TEXT NOT NULL)""")
+        conn.execute("INSERT INTO transactions (amount, type, category, date, user_id) "
+                     "VALUES (5, 'expense', 'Food', '2025-07-01', 'u1')")
+    model = TransactionModel(db_name=path)
+    assert model.read_all("u1")[0].note is None
+
+def test_search_command(db):
+    result = CliRunner().invoke(search, ["whole*", "--user-id", "u1"], env={"MONEYTRACKER_DB": db.db_name})
+    assert result.exit_code == 0
+    assert "Note: Whole Foods groceries" in result.output
@@ -0,0 +1,90 @@
+import random
+import pytest
+from click.testing import CliRunner
+from cli.commands import stats
+from models.transaction import Transaction, TransactionModel
+from services.tracker import TrackerService
+from utils.sketches import QuantileSketch, SpaceSaving
+
+def test_space_saving_error_bound():
+    rng = random.Random(1)
+    sketch = SpaceSaving(capacity=50)
+    truth = {}
+    for _ in range(20_000):
+        key = f"m{int(rng.paretovariate(1.1))}"
+        weight = rng.uniform(1, 100)
+        sketch.add(key, weight)
+        truth[key] = truth.get(key, 0.0) + weight
+    bound = sketch.total / 50
+    assert sketch.max_error == pytest.approx(bound)
+    for key, estimate, error in sketch.top(50):
+        assert estimate - error <= truth[key] + 1e-6
+        assert truth[key] <= estimate + 1e-6
+        assert estimate - truth[key] <= bound + 1e-6
+    reported = {key for key, _, _ in sketch.top(50)}
+    assert all(key in reported for key, weight in truth.items() if weight > bound)
+
+def test_quantile_sketch_relative_error_bound():
+    rng = random.Random(2)
+    values = [round(rng.lognormvariate(3, 1.5), 2) + 0.01 for _ in range(50_000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    values.sort()
+    for q in (0, 0.01, 0.25, 0.5, 0.9, 0.99, 1):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+    assert sketch.min == values[0] and sketch.max == values[-1]
+    assert sum(count for _, _, count in sketch.histogram(10)) == len(values)
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = TrackerService(str(tmp_path / "stats.db"))
+    rng = random.Random(3)
+    merchants = ["Costa", "Tesco", "Uber", "Amazon", "Shell"]
+    tracker.db.add_transactions([
+        Transaction(amount=round(rng.uniform(1, 200), 2), type="expense",
+                    category=rng.choice(["Food", "Transport", "Shopping"]),
+                    date=f"2025-0{rng.randint(1, 6)}-{rng.randint(10, 28)}", user_id="u1",
+                    note=rng.choice(merchants))
+        for _ in range(3000)])
+    return tracker
+
+def test_exact_and_approximate_stats_agree_within_bounds(tracker):
+    exact = tracker.get_stats("u1", "2025-02-01", "2025-05-31", mode="exact")
+    approx = tracker.get_stats("u1", "2025-02-01", "2025-05-31", mode="approximate")
+    assert exact["mode"] == "exact" and approx["mode"] == "approximate"
+    assert exact["count"] == approx["count"] > 0
+
+    amounts = sorted(t.amount for t in tracker.db.read_all("u1", "2025-02-01", "2025-05-31")
+                     if t.type == "expense")
+    for q in (0.5, 0.9):
+        assert exact["quantiles"][q] == amounts[int(q * (len(amounts) - 1))]
+        assert approx["quantiles"][q] == pytest.approx(exact["quantiles"][q], rel=0.01)
+
+    # Five merchants fit in the sketch, so its totals are exact too
+    assert [name for name, _ in approx["top_merchants"]] == [name for name, _ in exact["top_merchants"]]
+    for (_, a), (_, e) in zip(approx["top_merchants"], exact["top_merchants"]):
+        assert a == pytest.approx(e)
+
+    assert exact["histograms"].keys() == approx["histograms"].keys()
+    for category, bins in exact["histograms"].items():
+        assert len(bins) == 10
+        assert sum(c for _, _, c in bins) == sum(c for _, _, c in approx["histograms"][category])
+
+def test_auto_mode_switches_on_range_size(tracker, monkeypatch):
+    import services.tracker as tracker_module
+    assert tracker.get_stats("u1")["mode"] == "exact"
+    monkeypatch.setattr(tracker_module, "STATS_EXACT_LIMIT", 100)
+    assert tracker.get_stats("u1")["mode"] == "approximate"
+
+def test_stats_command(tmp_path):
+    db = TransactionModel(str(tmp_path / "stats.db"))
+    for amount, note in ((10.0, "Costa"), (30.0, "Costa"), (50.0, "Tesco")):
+        db.create(Transaction(amount=amount, type="expense", category="Food", date="2025-03-03",
+                              user_id="u1", note=note))
+    result = CliRunner().invoke(stats, ["--user-id", "u1", "--month", "2025-03"],
+                                env={"MONEYTRACKER_DB": db.db_name})
+    assert result.exit_code == 0
+    assert "3 transactions, total 90.00 (exact)" in result.output
+    assert "Tesco" in result.output and "median" in result.output and "Food amounts" in result.output
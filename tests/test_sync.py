@@ -0,0 +1,114 @@
+import shutil
+import sqlite3
+import time
+import pytest
+from click.testing import CliRunner
+from cli.commands import sync
+from models.sync import SyncError, sync_databases
+from models.transaction import Transaction, TransactionModel
+
+def rows(path):
+    with sqlite3.connect(path) as conn:
+        return sorted(conn.execute("SELECT uid, amount, type, category, date, user_id, note FROM transactions"))
+
+def expense(amount, date="2025-07-01", category="Food"):
+    return Transaction(amount=amount, type="expense", category=category, date=date, user_id="alice")
+
+@pytest.fixture
+def pair(tmp_path):
+    return TransactionModel(db_name=str(tmp_path / "laptop.db")), TransactionModel(db_name=str(tmp_path / "server.db"))
+
+def test_changes_are_logged_with_increasing_seq(pair):
+    laptop, _ = pair
+    tid = laptop.create(expense(10.0))
+    laptop.update(Transaction(id=tid, amount=12.0, type="expense", category="Food", date="2025-07-01",
+                              user_id="alice"))
+    laptop.delete(tid, "alice")
+    with sqlite3.connect(laptop.db_name) as conn:
+        log = conn.execute("SELECT seq, uid, op FROM changelog ORDER BY seq").fetchall()
+    assert [op for _, _, op in log] == ["insert", "update", "delete"]
+    assert len({uid for _, uid, _ in log}) == 1 and log[0][0] < log[1][0] < log[2][0]
+
+def test_two_way_sync_converges_and_only_sends_deltas(pair):
+    laptop, server = pair
+    laptop.create(expense(10.0))
+    server.create(expense(20.0, category="Rent"))
+    result = sync_databases(laptop.db_name, server.db_name)
+    assert (result.pulled, result.pushed, result.conflicts) == (1, 1, 0)
+    assert rows(laptop.db_name) == rows(server.db_name)
+    assert len(rows(laptop.db_name)) == 2
+
+    again = sync_databases(laptop.db_name, server.db_name)
+    assert (again.pulled, again.pushed, again.skipped) == (0, 0, 0)
+
+    server.delete(server.read_all("alice")[0].id, "alice")
+    result = sync_databases(laptop.db_name, server.db_name)
+    assert (result.pulled, result.pushed) == (1, 0)
+    assert rows(laptop.db_name) == rows(server.db_name)
+
+def test_conflicts_resolve_to_last_writer_on_both_sides(pair):
+    laptop, server = pair
+    laptop.create(expense(10.0))
+    sync_databases(laptop.db_name, server.db_name)
+    laptop_row, server_row = laptop.read_all("alice")[0], server.read_all("alice")[0]
+    laptop_row.amount = 11.0
+    laptop.update(laptop_row)
+    time.sleep(0.01)
+    server_row.amount = 99.0
+    server.update(server_row)  # Later stamp wins
+    result = sync_databases(laptop.db_name, server.db_name)
+    assert result.conflicts == 1
+    assert [t.amount for t in laptop.read_all("alice")] == [99.0]
+    assert rows(laptop.db_name) == rows(server.db_name)
+    # Syncing in the other direction reaches the same state
+    sync_databases(server.db_name, laptop.db_name)
+    assert [t.amount for t in server.read_all("alice")] == [99.0]
+
+def test_copied_file_syncs_without_duplicates(pair, tmp_path):
+    laptop, _ = pair
+    laptop.create(expense(10.0))
+    copy = str(tmp_path / "copy.db")
+    shutil.copy(laptop.db_name, copy)
+    TransactionModel(db_name=copy).create(expense(5.0, date="2025-07-02"))
+    sync_databases(laptop.db_name, copy)
+    assert len(rows(laptop.db_name)) == 2
+    assert rows(laptop.db_name) == rows(copy)
+
+def test_imported_rows_keep_references_and_fingerprints(pair):
+    laptop, server = pair
+    statement = [expense(4.5), expense(4.5), Transaction(amount=60.0, type="expense", category="Fuel",
+                                                         date="2025-07-02", user_id="alice", external_ref="TX-1")]
+    laptop.add_transactions(statement, dedupe=True)
+    server.add_transactions(statement[:1], dedupe=True)  # The same statement, partly imported on the server too
+    sync_databases(laptop.db_name, server.db_name)
+    with sqlite3.connect(server.db_name) as conn:
+        stored = conn.execute("SELECT external_ref, fingerprint IS NOT NULL AS f FROM transactions "
+                              "ORDER BY external_ref, f DESC").fetchall()
+    assert stored == [(None, 1), (None, 1), (None, 0), ("TX-1", 1)]
+    # The copy imported on both sides is a duplicate, and re-importing on the server adds nothing
+    assert len(server.find_duplicates()) == 1
+    assert server.add_transactions(statement, dedupe=True) == 0
+
+def test_rows_written_before_the_change_log_get_content_uids(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL NOT NULL,
+                        type TEXT NOT NULL, category TEXT NOT NULL, date TEXT NOT NULL, user_id TEXT NOT NULL)""")
+        conn.execute("INSERT INTO transactions (amount, type, category, date, user_id) "
+                     "VALUES (3.5, 'expense', 'Food', '2025-01-01', 'bob')")
+    TransactionModel(db_name=path)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT uid FROM transactions").fetchone()[0] == "legacy-1-bob-2025-01-01-expense-Food-3.50"
+        assert conn.execute("SELECT op FROM changelog").fetchall() == [("insert",)]
+
+def test_sync_rejects_same_file(pair):
+    laptop, _ = pair
+    with pytest.raises(SyncError):
+        sync_databases(laptop.db_name, laptop.db_name)
+
+def test_sync_command(pair):
+    laptop, server = pair
+    server.create(expense(20.0))
+    result = CliRunner().invoke(sync, [server.db_name], env={"MONEYTRACKER_DB": laptop.db_name})
+    assert "pulled 1, pushed 0" in result.output
+    assert len(laptop.read_all("alice")) == 1
@@ -0,0 +1,101 @@
+import sqlite3
+import pytest
+from click.testing import CliRunner
+from cli.commands import summary, trend
+from models.database import SCHEMA_VERSION, day_number, month_number, week_number
+from models.transaction import Transaction, TransactionModel
+
+@pytest.fixture
+def db(tmp_path):
+    model = TransactionModel(db_name=str(tmp_path / "trend.db"))
+    rows = [
+        (1000.0, "income", "Salary", "2024-12-31"),
+        (70.0, "expense", "Food", "2025-01-01"),
+        (30.0, "expense", "Food", "2025-01-03"),
+        (500.0, "income", "Salary", "2025-01-08"),
+        (140.0, "expense", "Rent", "2025-02-15"),
+        (60.0, "expense", "Food", "2025-04-02"),
+    ]
+    for amount, type, category, date in rows:
+        model.create(Transaction(amount=amount, type=type, category=category, date=date, user_id="u1"))
+    model.create(Transaction(amount=999.0, type="expense", category="Other", date="2025-01-01", user_id="u2"))
+    return model
+
+def test_daily_trend_running_balance_includes_opening(db):
+    rows = db.trend_series("u1", "daily", "2025-01-01", "2025-01-31")
+    assert [r["period"] for r in rows] == ["2025-01-01", "2025-01-03", "2025-01-08"]
+    assert [r["running_balance"] for r in rows] == [930.0, 900.0, 1400.0]
+    # 7-day window spans calendar days: 01-08 only sees 01-03 (and itself)
+    assert rows[1]["rolling_expense"] == pytest.approx(100.0 / 7)
+    assert rows[2]["rolling_expense"] == pytest.approx(30.0 / 7)
+
+def test_monthly_trend_rolling_window(db):
+    rows = db.trend_series("u1", "monthly", "2025-01-01", "2025-12-31", window=3)
+    assert [r["period"] for r in rows] == ["2025-01", "2025-02", "2025-04"]
+    assert rows[0]["net"] == 400.0
+    assert rows[2]["running_balance"] == pytest.approx(1200.0)
+    # April's 3-month window covers Feb-Apr; March is empty and counts as zero
+    assert rows[2]["rolling_expense"] == pytest.approx(200.0 / 3)
+
+def test_weekly_trend_groups_by_monday(db):
+    rows = db.trend_series("u1", "weekly", "2025-01-01", "2025-01-31")
+    assert [r["period"] for r in rows] == ["2024-12-30", "2025-01-06"]
+    assert rows[0]["expense"] == 100.0
+
+def test_trend_rejects_unknown_period(db):
+    with pytest.raises(ValueError):
+        db.trend_series("u1", "yearly")
+
+def test_trend_command_csv(db):
+    result = CliRunner().invoke(trend, ["--user-id", "u1", "--period", "monthly", "--format", "csv"],
+                                env={"MONEYTRACKER_DB": db.db_name})
+    assert result.exit_code == 0
+    lines = result.output.strip().splitlines()
+    assert lines[0].startswith("period,income,expense,net,running_balance")
+    assert lines[1].startswith("2024-12,1000.0,0")
+    assert len(lines) == 5
+
+def test_calendar_columns_are_added_to_older_files_and_match_python(db, tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL NOT NULL,
+                                       type TEXT NOT NULL, category TEXT NOT NULL, date TEXT NOT NULL,
+                                       user_id TEXT NOT NULL)
+        """)
+        conn.executemany("INSERT INTO transactions (amount, type, category, date, user_id) "
+                         "VALUES (5.0, 'expense', 'Food', ?, 'u1')",
+                         [("2024-02-29",), ("1969-12-28",), ("1969-12-29",), ("1969-12-21",)])
+    for model in (TransactionModel(db_name=path), db):
+        with sqlite3.connect(model.db_name) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(transactions)")}
+            assert {"idx_transactions_user_month", "idx_transactions_user_week"} <= indexes
+            for date, day, week, month in conn.execute("SELECT date, day_num, week_num, month_num FROM transactions"):
+                assert (day, week, month) == (day_number(date), week_number(date), month_number(date))
+
+def test_summary_month_uses_the_month_index(db):
+    result = CliRunner().invoke(summary, ["--user-id", "u1", "--month", "2025-01"], env={"MONEYTRACKER_DB": db.db_name})
+    assert "Total Income: 500.00" in result.output and "Total Expense: 100.00" in result.output
+    with sqlite3.connect(db.db_name) as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT SUM(amount) FROM transactions "
+                            "WHERE user_id = 'u1' AND month_num = ?", (month_number("2025-01"),)).fetchall()
+    assert "idx_transactions_user_month" in plan[0][3]
+
+def test_weeks_before_1970_start_on_monday(tmp_path):
+    model = TransactionModel(db_name=str(tmp_path / "old_weeks.db"))
+    with sqlite3.connect(model.db_name) as conn:
+        # A version 8 file, whose week_num truncated toward zero
+        conn.execute("DROP INDEX idx_transactions_user_week")
+        conn.execute("ALTER TABLE transactions DROP COLUMN week_num")
+        conn.execute("ALTER TABLE transactions ADD COLUMN week_num INTEGER "
+                     "GENERATED ALWAYS AS ((day_num + 3) / 7) VIRTUAL")
+        conn.execute("PRAGMA user_version = 8")
+    for date in ("1969-12-24", "1969-12-28", "1969-12-29", "1970-01-04"):
+        model.create(Transaction(amount=10.0, type="expense", category="Food", date=date, user_id="u1"))
+    model = TransactionModel(db_name=model.db_name)
+    assert week_number("1969-12-28") == -1
+    rows = model.trend_series("u1", "weekly", "1969-12-01", "1970-01-31")
+    assert [(r["period"], r["expense"]) for r in rows] == [("1969-12-22", 20.0), ("1969-12-29", 20.0)]
+    with sqlite3.connect(model.db_name) as conn:
+        assert "idx_transactions_user_week" in {row[1] for row in conn.execute("PRAGMA index_list(transactions)")}
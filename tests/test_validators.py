@@ -0,0 +1,54 @@
+from datetime import date
+import pytest
+from click.testing import CliRunner
+from cli.commands import import_csv
+from models.transaction import Transaction, TransactionModel
+from utils.validators import parse_iso_date, validate_batch
+
+def test_parse_iso_date_is_strict():
+    assert parse_iso_date("2025-07-01") == date(2025, 7, 1)
+    for bad in ("2025-7-1", "20250701", "2025-02-30", "2025/07/01"):
+        with pytest.raises(ValueError):
+            parse_iso_date(bad)
+
+def test_validate_batch_rows_report_errors_by_index():
+    records = [
+        {"amount": 10.0, "type": "expense", "category": "Food", "date": "2025-07-01", "user_id": "u1"},
+        {"amount": -5.0, "type": "expense", "category": "Food", "date": "2025-07-01", "user_id": "u1"},
+        {"amount": 10.0, "type": "gift", "category": "", "date": "2025-13-01", "user_id": "u1"},
+        {"amount": 10.0, "type": "income", "category": "Salary", "date": "2025-08-01", "user_id": "x" * 31},
+    ]
+    report = validate_batch(records, today=date(2025, 7, 31))
+    assert report.total == 4
+    assert report.invalid_rows == [1, 2, 3]
+    assert report.errors[1] == [("amount", "Amount must be a positive number")]
+    assert {name for name, _ in report.errors[2]} == {"type", "category", "date"}
+    assert ("date", "Date cannot be in the future.") in report.errors[3]
+    assert "3 of 4 rows invalid" in report.summary()
+
+def test_validate_batch_accepts_columns_and_objects():
+    columns = {"amount": [1.0, 2.0], "type": ["income", "expense"], "category": ["A", "B"],
+               "date": ["2025-07-01", "bad"], "user_id": ["u1", "u1"]}
+    assert validate_batch(columns, today=date(2025, 7, 31)).invalid_rows == [1]
+    objects = [Transaction(amount=1.0, type="income", category="A", date="2025-07-01", user_id="u1", note="n" * 201)]
+    assert validate_batch(objects, today=date(2025, 7, 31)).errors[0] == [
+        ("note", "Note must be at most 200 characters long.")]
+
+def test_import_command(tmp_path):
+    db_path = str(tmp_path / "import.db")
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("amount,type,category,date,note\n"
+                        "12.5,expense,Food,2025-07-01,lunch\n"
+                        "abc,expense,Food,2025-07-02,\n"
+                        "3000,income,Salary,2025-07-03,\n")
+    runner = CliRunner()
+    result = runner.invoke(import_csv, [str(csv_path), "--user-id", "u1"], env={"MONEYTRACKER_DB": db_path})
+    assert "amount: Amount must be a number (1 rows: 3)" in result.output
+    assert "Import aborted" in result.output
+    assert TransactionModel(db_name=db_path).read_all("u1") == []
+
+    result = runner.invoke(import_csv, [str(csv_path), "--user-id", "u1", "--skip-invalid"],
+                           env={"MONEYTRACKER_DB": db_path})
+    assert "Imported 2 of 3 transactions" in result.output
+    rows = TransactionModel(db_name=db_path).read_all("u1")
+    assert sorted(t.amount for t in rows) == [12.5, 3000.0]
@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+import pytest
+from models.database import run_with_retry
+from models.transaction import Transaction, TransactionModel
+from models.write_queue import GroupCommitWriter
+from services.tracker import TrackerService
+
+def make_transaction(i, user_id="u1"):
+    return Transaction(amount=float(i + 1), type="expense", category="Food", date="2025-07-01", user_id=user_id)
+
+def test_group_commit_preserves_submission_order(tmp_path):
+    model = TransactionModel(db_name=str(tmp_path / "queue.db"))
+    with GroupCommitWriter(model, window=0.05) as writer:
+        futures = [writer.submit(make_transaction(i)) for i in range(20)]
+        ids = [f.result(timeout=5) for f in futures]
+    assert ids == sorted(ids)
+    rows = model.read_all("u1")
+    assert [t.amount for t in sorted(rows, key=lambda t: t.id)] == [float(i + 1) for i in range(20)]
+
+def test_group_commit_rejects_only_the_failing_row(tmp_path):
+    model = TransactionModel(db_name=str(tmp_path / "queue.db"))
+    bad = Transaction(amount=None, type="expense", category="Food", date="2025-07-01", user_id="u2")
+    with GroupCommitWriter(model, window=0.05) as writer:
+        futures = [writer.submit(make_transaction(0)), writer.submit(bad), writer.submit(make_transaction(1))]
+        with pytest.raises(sqlite3.IntegrityError):
+            futures[1].result(timeout=5)
+        assert futures[0].result(timeout=5) < futures[2].result(timeout=5)
+    assert sorted(t.amount for t in model.read_all("u1")) == [1.0, 2.0]
+    assert model.read_all("u2") == []
+
+def test_group_commit_with_concurrent_threads(tmp_path):
+    tracker = TrackerService(str(tmp_path / "threads.db"), group_commit=True)
+    errors = []
+    def worker(n):
+        try:
+            for i in range(25):
+                tracker.add_transaction(1.0 + i, "expense", "Food", "2025-07-01", f"user{n}")
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tracker.close()
+    assert errors == []
+    with sqlite3.connect(tracker.db.db_name) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 200
+
+def test_submits_racing_close_never_hang(tmp_path):
+    model = TransactionModel(db_name=str(tmp_path / "queue.db"))
+    writer = GroupCommitWriter(model, window=0.001)
+    futures, refused = [], []
+    def submit_many():
+        for i in range(200):
+            try:
+                futures.append(writer.submit(make_transaction(i)))
+            except RuntimeError:
+                refused.append(i)
+    threads = [threading.Thread(target=submit_many) for _ in range(4)]
+    for t in threads:
+        t.start()
+    writer.close()
+    for t in threads:
+        t.join()
+    # Every queued row was either committed before the writer stopped or failed, none is left waiting
+    committed = [f for f in futures if f.exception(timeout=5) is None]
+    assert len(committed) == len(model.read_all("u1")) and len(futures) + len(refused) == 800
+    with pytest.raises(RuntimeError, match="closed"):
+        writer.submit(make_transaction(0))
+
+def test_run_with_retry_retries_lock_errors_only():
+    calls = []
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "ok"
+    assert run_with_retry(flaky, base_delay=0.001) == "ok"
+    assert len(calls) == 3
+
+    def broken():
+        raise sqlite3.OperationalError("no such table: nope")
+    with pytest.raises(sqlite3.OperationalError):
+        run_with_retry(broken, base_delay=0.001)
+
+def test_add_waits_for_lock_instead_of_failing(tmp_path):
+    path = str(tmp_path / "locked.db")
+    model = TransactionModel(db_name=path, busy_timeout=5)
+    blocker = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(0.3, lambda: blocker.execute("COMMIT"))
+    timer.start()
+    assert model.add_transaction(make_transaction(0)) == 1
+    timer.join()
+    blocker.close()
@@ -0,0 +1,121 @@
+# utils/artifact_cache.py
+"""Content-addressed cache of rendered charts and reports.
+
+An artifact's key is a SHA-256 of its kind, the aggregated data it is drawn from
+and its render options, so an unchanged chart is served from disk without
+rendering it again. Files are evicted least recently used first once the cache
+grows past its size limit.
+"""
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+DEFAULT_CACHE_DIR = os.getenv("MONEYTRACKER_CACHE_DIR", os.path.join(".cache", "artifacts"))
+DEFAULT_CACHE_MAX_BYTES = int(float(os.getenv("MONEYTRACKER_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+
+class ArtifactCache:
+    """Files keyed by content hash, with LRU eviction by size and hit/miss counters."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, data: Any, options: Dict) -> str:
+        """Stable hash of everything that determines the rendered bytes."""
+        payload = json.dumps({"kind": kind, "data": data, "options": options},
+                             sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_or_render(self, kind: str, data: Any, options: Dict, suffix: str,
+                      render: Callable[[str], Any]) -> Tuple[str, bool]:
+        """Return (path, hit): the cached file for the key, rendering it with render(path) on a miss.
+
+        Rendering goes to a temporary name that is renamed into place, so
+        concurrent processes never see a half-written artifact.
+        """
+        path = os.path.join(self.directory, f"{kind}-{self.key(kind, data, options)[:40]}{suffix}")
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # Mark as recently used
+            except OSError:
+                pass
+            with self._lock:
+                self.hits += 1
+            logger.info(f"Artifact cache hit for {kind}: {path}")
+            return path, True
+        with self._lock:
+            self.misses += 1
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}"
+        render(temporary)
+        if not os.path.exists(temporary):
+            # Renderer wrote nothing (e.g. a stubbed backend); nothing to cache
+            return path, False
+        os.replace(temporary, path)
+        logger.info(f"Artifact cache miss for {kind}, rendered {path}")
+        self.evict(keep=path)
+        return path, False
+
+    def evict(self, keep: str = "") -> int:
+        """Delete least recently used files until the cache fits in max_bytes; returns the count."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def clear(self) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss/eviction counters of this process plus the current size on disk."""
+        files = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        size = sum(os.path.getsize(os.path.join(self.directory, name)) for name in files)
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(files), "bytes": size, "max_bytes": self.max_bytes}
+
+
+@lru_cache(maxsize=None)
+def default_cache() -> ArtifactCache:
+    """Process-wide cache, so counters accumulate across requests in a long-running server."""
+    return ArtifactCache()
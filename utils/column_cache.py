@@ -0,0 +1,234 @@
+# utils/column_cache.py
+"""Per-user columnar copies of the transactions table, memory-mapped from .npy files.
+
+A user's cache is one .npy file per column (day number, amount, type, and
+category and currency codes) plus a JSON file with the code dictionaries and
+the change-log position it is current to. Opening it maps the files with
+np.load(mmap_mode='r'), so a new process reads a heavy history without copying
+it out of SQLite or into Python objects. Before each use the change log is
+checked: new rows for the user are appended, and any update or delete of the
+user's rows rebuilds the cache from scratch.
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+DEFAULT_COLUMN_CACHE_DIR = os.getenv("MONEYTRACKER_COLUMN_CACHE_DIR", os.path.join(".cache", "columns"))
+# Bump when the file layout changes so older caches are rebuilt
+COLUMN_CACHE_VERSION = 1
+COLUMN_DTYPES = {'day': np.int32, 'amount': np.float64, 'type': np.int8, 'category': np.int32, 'currency': np.int16}
+TYPE_CODES = ('income', 'expense')
+
+
+@dataclass
+class UserColumns:
+    """One user's transactions as parallel arrays, with the labels their codes stand for.
+
+    The arrays were written at change-log position generation and are current
+    as of seq; entries between the two did not touch the user.
+    """
+    seq: int
+    generation: int
+    columns: Dict[str, np.ndarray]
+    categories: List[str]
+    currencies: List[str]
+
+    def __len__(self) -> int:
+        return len(self.columns['day'])
+
+    def buckets(self, first_day: Optional[int] = None, last_day: Optional[int] = None,
+                category_codes: Optional[List[int]] = None) -> List[Tuple[int, int, int, int, float, int]]:
+        """(currency code, day, type code, category code, total, count) per group of rows.
+
+        Only rows from first_day through last_day with a category in
+        category_codes (None: any) are counted. The four keys are packed into one
+        int64 per row, so the grouping is a single sort of the selected rows.
+        """
+        day, amount, type, category, currency = (self.columns[name] for name in COLUMN_DTYPES)
+        mask = np.ones(len(day), dtype=bool)
+        if first_day is not None:
+            mask &= day >= first_day
+        if last_day is not None:
+            mask &= day <= last_day
+        if category_codes is not None:
+            allowed = np.zeros(len(self.categories), dtype=bool)
+            allowed[category_codes] = True
+            mask &= allowed[category]
+        if not mask.all():
+            day, amount, type, category, currency = (column[mask] for column in (day, amount, type, category, currency))
+        if not len(day):
+            return []
+        low = int(day.min())
+        span = int(day.max()) - low + 1
+        keys = ((currency.astype(np.int64) * len(TYPE_CODES) + type) * len(self.categories) + category) * span \
+            + (day - low)
+        keys, groups = np.unique(keys, return_inverse=True)
+        totals = np.bincount(groups, weights=amount)
+        counts = np.bincount(groups)
+        days, keys = keys % span + low, keys // span
+        categories, keys = keys % len(self.categories), keys // len(self.categories)
+        types, currencies = keys % len(TYPE_CODES), keys // len(TYPE_CODES)
+        return list(zip(currencies.tolist(), days.tolist(), types.tolist(), categories.tolist(),
+                        totals.tolist(), counts.tolist()))
+
+
+class ColumnCache:
+    """Column files of the users they were built for, kept current from the change log.
+
+    Files live under directory in a folder per database file. Only users
+    given to build() get a cache; get() returns None for the others, so callers
+    fall back to SQL. Refreshes write a new generation of files and then swap
+    the JSON file in, so readers in other processes see either version whole.
+    """
+
+    def __init__(self, model, directory: str = DEFAULT_COLUMN_CACHE_DIR):
+        self.model = model
+        database = os.path.abspath(model.db_name)
+        self.directory = os.path.join(directory, hashlib.sha256(database.encode("utf-8")).hexdigest()[:16])
+        self.enabled = model.db_name != ":memory:"
+        self.loaded: Dict[str, UserColumns] = {}
+        self.builds = 0
+        self.appends = 0
+        self._lock = threading.Lock()
+
+    def _path(self, user_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:24] + suffix)
+
+    def exists(self, user_id: str) -> bool:
+        return self.enabled and os.path.exists(self._path(user_id, ".json"))
+
+    def _meta(self, user_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(user_id, ".json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == COLUMN_CACHE_VERSION and meta.get("user_id") == user_id else {}
+
+    def _open(self, user_id: str, meta: Dict) -> Optional[UserColumns]:
+        """Map the files meta points at; None when they are missing or damaged."""
+        try:
+            mode = 'r' if meta["rows"] else None  # Empty files cannot be mapped
+            columns = {name: np.load(self._path(user_id, f".{meta['generation']}.{name}.npy"), mmap_mode=mode)
+                       for name in COLUMN_DTYPES}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Rebuilding unreadable column cache of user {user_id}: {e}")
+            return None
+        return UserColumns(meta["seq"], meta["generation"], columns, meta["categories"], meta["currencies"])
+
+    def _write(self, user_id: str, columns: UserColumns, arrays: bool = True) -> None:
+        """Write the arrays (unless only seq moved on), then swap the JSON file in."""
+        os.makedirs(self.directory, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        for name, column in columns.columns.items() if arrays else ():
+            path = self._path(user_id, f".{columns.generation}.{name}.npy")
+            np.save(path + suffix + ".npy", column)
+            os.replace(path + suffix + ".npy", path)
+        meta_path = self._path(user_id, ".json")
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump({"version": COLUMN_CACHE_VERSION, "user_id": user_id, "seq": columns.seq,
+                       "generation": columns.generation, "rows": len(columns),
+                       "categories": columns.categories, "currencies": columns.currencies}, f)
+        os.replace(meta_path + suffix, meta_path)
+        if arrays:
+            # Older generations; a process that still has them mapped keeps reading them
+            self._remove_files(user_id, keep=f".{columns.generation}.")
+
+    def _remove_files(self, user_id: str, keep: Optional[str] = None) -> None:
+        prefix = os.path.basename(self._path(user_id, "."))
+        current = os.path.basename(self._path(user_id, keep)) if keep else None
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(".npy") and ".tmp" not in name \
+                    and not (current and name.startswith(current)):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _encode(batches, categories: List[str], currencies: List[str]) -> Dict[str, np.ndarray]:
+        """Columns of (day_num, amount, type, category, currency) row batches; new labels extend the lists."""
+        codes = {label: code for code, label in enumerate(categories)}
+        currency_codes = {label: code for code, label in enumerate(currencies)}
+        parts = {name: [] for name in COLUMN_DTYPES}
+        for rows in batches:
+            day, amount, type, category, currency = zip(*rows)
+            parts['day'].append(np.array(day, dtype=COLUMN_DTYPES['day']))
+            parts['amount'].append(np.array(amount, dtype=COLUMN_DTYPES['amount']))
+            parts['type'].append(np.array([TYPE_CODES.index(value) for value in type], dtype=COLUMN_DTYPES['type']))
+            for labels, lookup, values, name in ((categories, codes, category, 'category'),
+                                                 (currencies, currency_codes, currency, 'currency')):
+                for label in sorted(set(values) - lookup.keys()):
+                    lookup[label] = len(labels)
+                    labels.append(label)
+                parts[name].append(np.array([lookup[value] for value in values], dtype=COLUMN_DTYPES[name]))
+        return {name: np.concatenate(arrays) if arrays else np.empty(0, dtype=COLUMN_DTYPES[name])
+                for name, arrays in parts.items()}
+
+    def build(self, user_id: str) -> UserColumns:
+        """Read every transaction of the user and write the cache from scratch."""
+        if not self.enabled:
+            raise ValueError("Column caches need a database file")
+        categories, currencies = [], []
+        with self.model.column_rows(user_id) as (seq, batches):
+            columns = UserColumns(seq, seq, self._encode(batches, categories, currencies), categories, currencies)
+        self._write(user_id, columns)
+        with self._lock:
+            self.builds += 1
+            self.loaded[user_id] = columns
+        logger.info(f"Built column cache of {len(columns)} transactions for user {user_id}")
+        return columns
+
+    def get(self, user_id: str) -> Optional[UserColumns]:
+        """The user's columns, current as of the latest change, or None when the user has no cache."""
+        meta = self._meta(user_id) if self.enabled else None
+        if meta is None:
+            self.loaded.pop(user_id, None)
+            return None
+        columns = self.loaded.get(user_id)
+        if columns is None or columns.generation != meta.get("generation"):
+            columns = self._open(user_id, meta) if meta else None
+            if columns is None:
+                return self.build(user_id)
+        seq = max(columns.seq, meta["seq"])  # Same generation, so the same rows either way
+        with self.model.column_rows(user_id, seq) as (latest, batches):
+            if batches is None:
+                added = None
+            elif latest != seq:
+                categories, currencies = list(columns.categories), list(columns.currencies)
+                added = self._encode(batches, categories, currencies)
+        if batches is None:
+            return self.build(user_id)
+        if latest == seq:
+            columns.seq = seq
+        elif len(added['day']):
+            columns = UserColumns(latest, latest, {name: np.concatenate([columns.columns[name], added[name]])
+                                                   for name in COLUMN_DTYPES}, categories, currencies)
+            self._write(user_id, columns)
+            with self._lock:
+                self.appends += 1
+            logger.info(f"Appended {len(added['day'])} transactions to the column cache of user {user_id}")
+        else:
+            columns.seq = latest
+            self._write(user_id, columns, arrays=False)
+        with self._lock:
+            self.loaded[user_id] = columns
+        return columns
+
+    def drop(self, user_id: str) -> bool:
+        """Delete the user's cache; False if there was none."""
+        self.loaded.pop(user_id, None)
+        if not self.exists(user_id):
+            return False
+        os.remove(self._path(user_id, ".json"))
+        self._remove_files(user_id)
+        return True
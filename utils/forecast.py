@@ -0,0 +1,140 @@
+# utils/forecast.py
+"""Vectorized trend-plus-weekday forecasts of daily income and expense for many users at once."""
+from datetime import date, timedelta
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models.database import EPOCH_ORDINAL
+
+# Users with fewer days of history than this are forecast from their daily mean only
+MIN_SEASONAL_HISTORY = 28
+
+
+def design_matrix(days: np.ndarray, origin: int, seasonal: bool = True) -> np.ndarray:
+    """Regressors per day: intercept, linear trend (per year from origin) and six weekday offsets.
+
+    days are day numbers since 1970-01-01, a Thursday, so (day + 3) % 7 is the
+    weekday with Monday as 0; Monday is the base level of the weekday terms.
+    """
+    if not seasonal:
+        return np.ones((len(days), 1))
+    matrix = np.zeros((len(days), 8))
+    matrix[:, 0] = 1.0
+    matrix[:, 1] = (days - origin) / 365.25
+    matrix[:, 2:] = ((days + 3) % 7)[:, None] == np.arange(1, 7)
+    return matrix
+
+
+def forecast_totals(days: np.ndarray, income: np.ndarray, expense: np.ndarray, future_days: np.ndarray,
+                    confidence: float = 0.95) -> Dict[str, np.ndarray]:
+    """Projected income, expense and net summed over future_days, for every row (user) at once.
+
+    income and expense are (users, len(days)) daily totals. One least-squares
+    solve fits all users against the same design matrix. The band is the
+    normal interval of the summed net: residual variance of each user's daily
+    net times (days ahead + leverage of the summed future regressors), which
+    covers both day-to-day noise and uncertainty in the fitted trend.
+    """
+    users = income.shape[0]
+    seasonal = len(days) >= MIN_SEASONAL_HISTORY
+    origin = int(days[-1])
+    history = design_matrix(days, origin, seasonal)
+    future = design_matrix(future_days, origin, seasonal).sum(axis=0)
+    observed = np.vstack([income, expense]).T
+    coefficients = np.linalg.lstsq(history, observed, rcond=None)[0]
+    residuals = observed - history @ coefficients
+    net_residuals = residuals[:, :users] - residuals[:, users:]
+    variance = (net_residuals ** 2).sum(axis=0) / max(len(days) - history.shape[1], 1)
+    leverage = future @ np.linalg.pinv(history.T @ history) @ future
+    totals = np.maximum(future @ coefficients, 0.0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return {
+        'income': totals[:users],
+        'expense': totals[users:],
+        'net': totals[:users] - totals[users:],
+        'margin': z * np.sqrt(variance * (len(future_days) + leverage)),
+    }
+
+
+def month_end(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def day_range(first: date, last: date) -> np.ndarray:
+    """Day numbers since 1970-01-01 from first through last."""
+    return np.arange(first.toordinal() - EPOCH_ORDINAL, last.toordinal() - EPOCH_ORDINAL + 1)
+
+
+class DailySeriesCache:
+    """Per-user daily income and expense arrays over a trailing window, kept current from the change log.
+
+    The change log records the user of every write, so after the first load
+    only users whose transactions changed are read again; when nothing changed
+    a lookup costs one MAX(seq) query. A new window (another day or history
+    length) starts over.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.window: Optional[Tuple[date, date]] = None
+        self.seq: Optional[int] = None
+        self.series: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.complete = False  # series holds every user with transactions in the window
+        self.stale: set = set()
+        self.loads = 0
+
+    def _refresh(self, first: date, last: date) -> None:
+        if self.window != (first, last):
+            self.window, self.seq, self.complete = (first, last), None, False
+            self.series.clear()
+            self.stale.clear()
+        self.seq, changed = self.model.changed_users(self.seq)
+        if changed is None:
+            self.series.clear()
+            self.complete = False
+            return
+        for user_id in changed:
+            self.series.pop(user_id, None)
+        if self.complete:
+            self.stale |= changed
+
+    def _load(self, user_ids: Optional[List[str]]) -> List[str]:
+        """Read the window for user_ids (None: every user) into series; returns the users found."""
+        first, last = self.window
+        length = (last - first).days + 1
+        found = []
+        current, income, expense = None, None, None
+        for user_id, day, day_income, day_expense in self.model.daily_totals(
+                user_ids, first.isoformat(), last.isoformat()):
+            if user_id != current:
+                current = user_id
+                income, expense = np.zeros(length), np.zeros(length)
+                self.series[user_id] = (income, expense)
+                found.append(user_id)
+            offset = (date.fromisoformat(day) - first).days
+            income[offset] = day_income
+            expense[offset] = day_expense
+        self.loads += 1
+        return found
+
+    def get(self, user_ids: Optional[Iterable[str]], first: date,
+            last: date) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Daily arrays from first through last for user_ids, or for every user active in the window."""
+        self._refresh(first, last)
+        if user_ids is None:
+            if not self.complete:
+                self.series.clear()
+                self._load(None)
+                self.complete = True
+            elif self.stale:
+                self._load(sorted(self.stale))
+            self.stale.clear()
+            return dict(self.series)
+        user_ids = [*dict.fromkeys(user_ids)]
+        missing = [user_id for user_id in user_ids if user_id not in self.series]
+        if missing:
+            self._load(missing)
+        length = (last - first).days + 1
+        return {user_id: self.series.get(user_id) or (np.zeros(length), np.zeros(length)) for user_id in user_ids}
@@ -0,0 +1,118 @@
+# utils/output.py
+"""Buffered, optionally paged output of result rows as text, rich tables, CSV, JSON or JSON Lines."""
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+OUTPUT_FORMATS = ('text', 'table', 'csv', 'json', 'jsonl')
+# Bytes collected before each write to the terminal
+BUFFER_SIZE = 64 * 1024
+# Rows per chunk when encoding CSV and per rich table when no page height is known
+CHUNK_ROWS = 1000
+
+
+def use_pager(lines: Optional[int]) -> bool:
+    """Page when stdout is a terminal and the output is taller than it (MONEYTRACKER_PAGER=0 disables)."""
+    if os.getenv("MONEYTRACKER_PAGER", "1").lower() in ("0", "false", "no"):
+        return False
+    if lines is None or not sys.stdout.isatty():
+        return False
+    return lines > shutil.get_terminal_size().lines
+
+
+def emit(chunks: Iterable[str], lines: Optional[int] = None) -> None:
+    """Write text chunks through the pager or in BUFFER_SIZE batches with one flush at the end.
+
+    chunks may be a lazy generator: with a pager only what the reader scrolls to is produced.
+    """
+    if use_pager(lines):
+        click.echo_via_pager(chunks)
+        return
+    buffer: List[str] = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= BUFFER_SIZE:
+            click.echo("".join(buffer), nl=False)
+            buffer.clear()
+            size = 0
+    if buffer:
+        click.echo("".join(buffer), nl=False)
+
+
+def _csv_chunks(rows: Iterable[Dict], columns: List[str]) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([row.get(column) for column in columns])
+        if count % CHUNK_ROWS == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue()
+
+
+def _json_chunks(rows: Iterable[Dict]) -> Iterator[str]:
+    separator = "[\n"
+    for row in rows:
+        yield separator + json.dumps(row, ensure_ascii=False)
+        separator = ",\n"
+    yield "[]\n" if separator == "[\n" else "\n]\n"
+
+
+def _table_chunks(rows: Iterable[Dict], columns: List[str], title: Optional[str],
+                  numeric: Iterable[str] = ()) -> Iterator[str]:
+    """Render rows as rich tables of one screen each, only when the consumer asks for them."""
+    page_rows = max(shutil.get_terminal_size().lines - 6, 10) if sys.stdout.isatty() else CHUNK_ROWS
+    width = shutil.get_terminal_size().columns
+    numeric = set(numeric)
+    page: List[Dict] = []
+
+    def render(page_title: Optional[str]) -> str:
+        table = Table(title=page_title, show_header=True, header_style="bold magenta")
+        for column in columns:
+            table.add_column(column, justify="right" if column in numeric else "left",
+                             style="green" if column in numeric else "cyan")
+        for row in page:
+            table.add_row(*("" if row.get(c) is None else
+                            f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns))
+        console = Console(file=io.StringIO(), width=width, force_terminal=sys.stdout.isatty())
+        console.print(table)
+        return console.file.getvalue()
+
+    first = True
+    for row in rows:
+        page.append(row)
+        if len(page) == page_rows:
+            yield render(title if first else None)
+            page.clear()
+            first = False
+    if page or first:
+        yield render(title if first else None)
+
+
+def format_rows(rows: Iterable[Dict], columns: List[str], fmt: str,
+                text_line: Optional[Callable[[Dict], str]] = None, title: Optional[str] = None,
+                numeric: Iterable[str] = ()) -> Iterator[str]:
+    """Lazily encode dict rows in one of OUTPUT_FORMATS ('text' needs text_line)."""
+    if fmt == 'text':
+        return (text_line(row) + "\n" for row in rows)
+    if fmt == 'csv':
+        return _csv_chunks(rows, columns)
+    if fmt == 'json':
+        return _json_chunks(rows)
+    if fmt == 'jsonl':
+        return (json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    if fmt == 'table':
+        return _table_chunks(rows, columns, title, numeric)
+    raise ValueError(f"Format must be one of {', '.join(OUTPUT_FORMATS)}")
@@ -2,16 +2,34 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from typing import Dict, Optional
 import os
+import shutil
+from utils.artifact_cache import default_cache
 
-def export_summary_to_pdf(summary_data: Dict, output_path: Optional[str] = None):
+# Bump when the layout changes so cached PDFs are re-rendered
+PDF_VERSION = 2
+
+def export_summary_to_pdf(summary_data: Dict, output_path: Optional[str] = None, use_cache: bool = True):
     """
     Generate a PDF report for transaction summary using reportlab.
     :param summary_data: dict with keys: transaction_count, total_income, total_expense, balance, category_summary
+        and optionally currency
     :param output_path: output PDF file path
+    :param use_cache: copy an identical PDF from the artifact cache instead of rendering it again
     """
     if output_path is None:
         output_path = os.path.join(os.getcwd(), "transaction_summary.pdf")
-    c = canvas.Canvas(output_path, pagesize=letter)
+    if not use_cache:
+        return _render_summary_pdf(summary_data, output_path)
+    fields = ('transaction_count', 'total_income', 'total_expense', 'balance', 'category_summary', 'currency')
+    cached, _ = default_cache().get_or_render(
+        'summary_pdf', {key: summary_data.get(key) for key in fields}, {'version': PDF_VERSION}, '.pdf',
+        lambda path: _render_summary_pdf(summary_data, path))
+    if os.path.abspath(cached) != os.path.abspath(output_path):
+        shutil.copyfile(cached, output_path)
+    return output_path
+
+def _render_summary_pdf(summary_data: Dict, output_path: str) -> str:
+    c = canvas.Canvas(output_path, pagesize=letter, invariant=1)
     width, height = letter
     y = height - 50
     c.setFont("Helvetica-Bold", 16)
@@ -20,6 +38,9 @@ def export_summary_to_pdf(summary_data: Dict, output_path: Optional[str] = None)
     c.setFont("Helvetica", 12)
     c.drawString(50, y, f"Total Transactions: {summary_data.get('transaction_count', 0)}")
     y -= 20
+    if summary_data.get('currency'):
+        c.drawString(50, y, f"Currency: {summary_data['currency']}")
+        y -= 20
     c.drawString(50, y, f"Total Income: {summary_data.get('total_income', 0):.2f}")
     y -= 20
     c.drawString(50, y, f"Total Expense: {summary_data.get('total_expense', 0):.2f}")
@@ -0,0 +1,112 @@
+# utils/recurrence.py
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Iterator, Optional, Set
+
+FREQUENCIES = ('daily', 'weekly', 'monthly', 'cron')
+
+class RecurrenceError(ValueError):
+    """Raised for an invalid frequency, interval or cron expression."""
+    pass
+
+def _parse_cron_field(field: str, low: int, high: int) -> Optional[Set[int]]:
+    """Expand one cron field into the set of allowed values; None means '*'."""
+    if field == '*':
+        return None
+    values: Set[int] = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise RecurrenceError(f"Invalid cron step: {step_text}")
+        if part == '*':
+            first, last = low, high
+        elif '-' in part:
+            first, last = (int(p) for p in part.split('-', 1))
+        else:
+            first = last = int(part)
+        if first < low or last > high or first > last:
+            raise RecurrenceError(f"Cron value out of range {low}-{high}: {part}")
+        values.update(range(first, last + 1, step))
+    return values
+
+class CronSchedule:
+    """Day-level cron schedule: 'day-of-month month day-of-week'.
+
+    The standard 5-field form is accepted too; its minute and hour fields are
+    ignored because transactions are dated, not timed. As in cron, when both
+    day-of-month and day-of-week are restricted a day matching either is due.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) == 5:
+            fields = fields[2:]
+        if len(fields) != 3:
+            raise RecurrenceError("Cron expression must have 3 (dom month dow) or 5 fields")
+        try:
+            self.days = _parse_cron_field(fields[0], 1, 31)
+            self.months = _parse_cron_field(fields[1], 1, 12)
+            weekdays = _parse_cron_field(fields[2], 0, 7)
+        except ValueError as e:
+            raise RecurrenceError(f"Invalid cron expression '{expression}': {e}")
+        # cron counts Sunday as 0 or 7; date.weekday() counts Monday as 0
+        self.weekdays = None if weekdays is None else {(d - 1) % 7 for d in weekdays}
+
+    def matches(self, day: date) -> bool:
+        if self.months is not None and day.month not in self.months:
+            return False
+        if self.days is None and self.weekdays is None:
+            return True
+        if self.days is not None and self.weekdays is not None:
+            return day.day in self.days or day.weekday() in self.weekdays
+        if self.days is not None:
+            return day.day in self.days
+        return day.weekday() in self.weekdays
+
+def validate_schedule(frequency: str, interval: int = 1, cron: Optional[str] = None) -> None:
+    """Raise RecurrenceError unless the frequency, interval and (for cron rules) expression are usable."""
+    if frequency not in FREQUENCIES:
+        raise RecurrenceError(f"Frequency must be one of {', '.join(FREQUENCIES)}")
+    if interval < 1:
+        raise RecurrenceError("Interval must be at least 1")
+    if frequency == 'cron':
+        CronSchedule(cron or '')
+
+def occurrences(frequency: str, start: date, first: date, last: date, interval: int = 1,
+                cron: Optional[str] = None) -> Iterator[date]:
+    """Yield the due dates of a schedule anchored at start that fall within [first, last]."""
+    validate_schedule(frequency, interval, cron)
+    first = max(first, start)
+    if first > last:
+        return
+    if frequency == 'cron':
+        schedule = CronSchedule(cron or '')
+        day = first
+        while day <= last:
+            if schedule.matches(day):
+                yield day
+            day += timedelta(days=1)
+    elif frequency in ('daily', 'weekly'):
+        step = interval * (7 if frequency == 'weekly' else 1)
+        # Jump straight to the first occurrence on or after first
+        skipped = -(-(first - start).days // step)
+        day = start + timedelta(days=skipped * step)
+        while day <= last:
+            yield day
+            day += timedelta(days=step)
+    else:
+        months = (first.year - start.year) * 12 + first.month - start.month
+        n = max(0, months - months % interval)
+        while True:
+            year, month = divmod(start.month - 1 + n, 12)
+            year += start.year
+            # Anchors on the 29th-31st fall on the last day of shorter months
+            day = date(year, month + 1, min(start.day, monthrange(year, month + 1)[1]))
+            if day > last:
+                return
+            if day >= first:
+                yield day
+            n += interval
@@ -0,0 +1,147 @@
+# utils/sketches.py
+"""Single-pass, bounded-memory summaries for statistics over very large ranges."""
+import heapq
+import math
+from typing import Dict, Hashable, List, Tuple
+
+
+class SpaceSaving:
+    """Weighted heavy hitters (Metwally et al.) with a fixed number of counters.
+
+    After adding a total weight N, every reported estimate satisfies
+    estimate - error <= true weight <= estimate with error <= N / capacity, and
+    every key whose true weight exceeds N / capacity is reported.
+    """
+
+    def __init__(self, capacity: int = 100):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0.0
+        self.counters: Dict[Hashable, List[float]] = {}  # key -> [estimate, error]
+        self._heap: List[Tuple[float, Hashable]] = []  # lazily updated (estimate, key) entries
+
+    def add(self, key: Hashable, weight: float = 1.0) -> None:
+        self.total += weight
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[key] = [weight, 0.0]
+        else:
+            # Replace the smallest counter; the new key inherits its count as error
+            smallest, evicted = self._pop_smallest()
+            del self.counters[evicted]
+            counter = self.counters[key] = [smallest + weight, smallest]
+        heapq.heappush(self._heap, (counter[0], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c[0], k) for k, c in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_smallest(self) -> Tuple[float, Hashable]:
+        while True:
+            estimate, key = heapq.heappop(self._heap)
+            counter = self.counters.get(key)
+            if counter is not None and counter[0] == estimate:
+                return estimate, key
+
+    @property
+    def max_error(self) -> float:
+        """Upper bound on the overestimate of any reported key."""
+        return self.total / self.capacity
+
+    def top(self, n: int) -> List[Tuple[Hashable, float, float]]:
+        """The n largest (key, estimate, error) entries, largest first."""
+        ranked = sorted(self.counters.items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, estimate, error) for key, (estimate, error) in ranked[:n]]
+
+
+class QuantileSketch:
+    """Quantiles and histograms of positive amounts with a guaranteed relative error.
+
+    Values fall into logarithmic buckets whose bounds grow by a factor gamma, as
+    in DDSketch, so every quantile is returned within relative_accuracy of the
+    exact value at the same rank. Memory is one counter per occupied bucket: about
+    930 buckets span 0.01 to 1,000,000 at 1% accuracy, and beyond max_buckets the
+    lowest buckets are merged, which only coarsens the smallest quantiles.
+    Sketches of the same accuracy can be merged.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        lowest = sorted(self.buckets)[:len(self.buckets) - self.max_buckets + 1]
+        self.buckets[lowest[-1]] += sum(self.buckets.pop(index) for index in lowest[:-1])
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _value(self, index: int) -> float:
+        # Midpoint of (gamma^(i-1), gamma^i] in relative terms
+        return min(max(2 * self.gamma ** index / (self.gamma + 1), self.min), self.max)
+
+    def quantile(self, q: float) -> float:
+        """Value at 0-based rank floor(q * (count - 1)) of the sorted amounts."""
+        if not self.count:
+            raise ValueError("Quantile of an empty sketch")
+        rank = math.floor(q * (self.count - 1))
+        if rank < self.zero_count:
+            return self.min
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self._value(index)
+        return self.max
+
+    def histogram(self, bins: int) -> List[Tuple[float, float, int]]:
+        """Equal-width (low, high, count) bins between the exact min and max.
+
+        Counts are exact except for values within relative_accuracy of a bin edge.
+        """
+        if not self.count:
+            return []
+        width = (self.max - self.min) / bins
+        counts = [0] * bins
+        counts[0] += self.zero_count
+        for index, count in self.buckets.items():
+            position = 0 if width == 0 else int((self._value(index) - self.min) / width)
+            counts[min(position, bins - 1)] += count
+        return [(self.min + i * width, self.min + (i + 1) * width, counts[i]) for i in range(bins)]
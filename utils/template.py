@@ -0,0 +1,95 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List
+
+# Supports the subset of Jinja syntax used by templates/: {{ name }}, {{ a.b }}
+# and {% for x, y in items %} ... {% endfor %} blocks (which may nest).
+_TOKEN_RE = re.compile(r"({{.*?}}|{%.*?%})", re.S)
+_FOR_RE = re.compile(r"^for\s+([\w\s,]+?)\s+in\s+([\w.]+)$")
+
+
+class TemplateError(Exception):
+    """Raised when a template cannot be compiled or rendered."""
+    pass
+
+
+def _lookup(context: Dict[str, Any], expr: str) -> Any:
+    name, *attrs = expr.split(".")
+    if name not in context:
+        raise TemplateError(f"Undefined template variable: {name}")
+    value = context[name]
+    for attr in attrs:
+        value = value[attr] if isinstance(value, dict) else getattr(value, attr)
+    return value
+
+
+class CompiledTemplate:
+    """A template parsed once into a node tree that can be rendered many times."""
+
+    def __init__(self, source: str):
+        self.nodes = self._parse(source)
+
+    @staticmethod
+    def _parse(source: str) -> List:
+        root: List = []
+        stack = [root]
+        trim_newline = False
+        for token in _TOKEN_RE.split(source):
+            if not token:
+                continue
+            if token.startswith("{%"):
+                statement = token[2:-2].strip()
+                match = _FOR_RE.match(statement)
+                if match:
+                    names = [n.strip() for n in match.group(1).split(",")]
+                    body: List = []
+                    stack[-1].append(("for", names, match.group(2), body))
+                    stack.append(body)
+                elif statement == "endfor":
+                    if len(stack) == 1:
+                        raise TemplateError("Unexpected {% endfor %}")
+                    stack.pop()
+                else:
+                    raise TemplateError(f"Unsupported template statement: {statement}")
+                # Like Jinja's trim_blocks: drop the newline that follows a block tag
+                trim_newline = True
+                continue
+            if trim_newline and token.startswith("\n"):
+                token = token[1:]
+            trim_newline = False
+            if token.startswith("{{"):
+                stack[-1].append(("var", token[2:-2].strip()))
+            elif token:
+                stack[-1].append(("text", token))
+        if len(stack) != 1:
+            raise TemplateError("Unclosed {% for %} block")
+        return root
+
+    def render(self, context: Dict[str, Any]) -> str:
+        parts: List[str] = []
+        self._render_nodes(self.nodes, context, parts)
+        return "".join(parts)
+
+    def _render_nodes(self, nodes: List, context: Dict[str, Any], parts: List[str]) -> None:
+        for node in nodes:
+            kind = node[0]
+            if kind == "text":
+                parts.append(node[1])
+            elif kind == "var":
+                parts.append(str(_lookup(context, node[1])))
+            else:
+                _, names, iterable, body = node
+                for item in _lookup(context, iterable):
+                    values = item if len(names) > 1 else (item,)
+                    if len(values) != len(names):
+                        raise TemplateError(f"Cannot unpack {len(values)} values into {', '.join(names)}")
+                    loop_context = dict(context)
+                    loop_context.update(zip(names, values))
+                    self._render_nodes(body, loop_context, parts)
+
+
+@lru_cache(maxsize=None)
+def load_template(path: str) -> CompiledTemplate:
+    """Read and compile a template file; repeated calls reuse the compiled template."""
+    with open(path, encoding="utf-8") as f:
+        return CompiledTemplate(f.read())
@@ -1,5 +1,11 @@
 # utils/validators.py
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from models.database import CATEGORY_SEPARATOR
+
+# Deepest category path accepted, e.g. "Food > Groceries > Organic" is 3 levels
+CATEGORY_MAX_DEPTH = 5
 
 class ValidationError(Exception):
     """Custom validation error."""
@@ -15,9 +21,39 @@ def validate_user_id(user_id: str):
     if not (1 <= len(user_id) <= 30):
         raise ValidationError("User ID must be between 1 and 30 characters long.")
 
+def normalize_category(category: str) -> str:
+    """Canonical form of a category path: levels split on '>' and joined by " > "."""
+    return CATEGORY_SEPARATOR.join(part.strip() for part in category.split('>'))
+
+def category_error(category: str) -> Optional[str]:
+    """The validation message for a category path, or None when it is valid.
+
+    Each level of a normalized path is 1 to 20 characters long.
+    """
+    if 1 <= len(category) <= 20 and '>' not in category:
+        return None
+    parts = category.split(CATEGORY_SEPARATOR)
+    if len(parts) > CATEGORY_MAX_DEPTH:
+        return f"Category paths can have at most {CATEGORY_MAX_DEPTH} levels."
+    for part in parts:
+        if not (1 <= len(part) <= 20):
+            return "Category must be between 1 and 20 characters long."
+        if '>' in part or part != part.strip():
+            return f"Category levels must be separated by '{CATEGORY_SEPARATOR}'."
+    return None
+
 def validate_category(category: str):
-    if not (1 <= len(category) <= 20):
-        raise ValidationError("Category must be between 1 and 20 characters long.")
+    error = category_error(category)
+    if error:
+        raise ValidationError(error)
+
+def validate_note(note: str):
+    if note is not None and len(note) > 200:
+        raise ValidationError("Note must be at most 200 characters long.")
+
+def validate_currency(currency: str):
+    if currency is not None and not (len(currency) == 3 and currency.isalpha() and currency.isupper()):
+        raise ValidationError("Currency must be a 3-letter ISO code such as CNY or USD.")
 
 def validate_date(date_str: str):
     try:
@@ -35,3 +71,114 @@ def validate_date_range(start: str, end: str):
             raise ValidationError("Start date cannot be after end date")
     except ValueError:
         raise ValidationError("Invalid date format. Expected YYYY-MM-DD.")
+
+def validate_month(month: str):
+    """Validate a YYYY-MM month and return its (first_day, last_day) date strings."""
+    try:
+        if len(month) != 7:
+            raise ValueError(month)
+        dt = datetime.strptime(month, "%Y-%m")
+    except (TypeError, ValueError):
+        raise ValidationError("Invalid month format, should be YYYY-MM")
+    from calendar import monthrange
+    last_day = monthrange(dt.year, dt.month)[1]
+    return f"{month}-01", f"{month}-{last_day:02d}"
+
+def parse_iso_date(date_str: str) -> date:
+    """Parse a strict YYYY-MM-DD string; much cheaper than datetime.strptime.
+
+    Raises ValueError for anything else, including non zero-padded dates.
+    """
+    if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        raise ValueError(f"Invalid date: {date_str!r}")
+    return date.fromisoformat(date_str)
+
+BATCH_FIELDS = ('amount', 'type', 'category', 'date', 'user_id', 'note', 'currency')
+
+@dataclass
+class BatchValidationReport:
+    """Result of validate_batch: the row count and the errors found, keyed by row index."""
+    total: int = 0
+    errors: Dict[int, List[Tuple[str, str]]] = field(default_factory=dict)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def invalid_rows(self) -> List[int]:
+        return sorted(self.errors)
+
+    def summary(self, max_rows: int = 5) -> str:
+        """One line per distinct message with its count and the first offending rows."""
+        by_message: Dict[str, List[int]] = {}
+        for index in sorted(self.errors):
+            for name, message in self.errors[index]:
+                by_message.setdefault(f"{name}: {message}", []).append(index)
+        lines = [f"{len(self.errors)} of {self.total} rows invalid"]
+        for message, rows in by_message.items():
+            shown = ", ".join(str(i) for i in rows[:max_rows]) + (", ..." if len(rows) > max_rows else "")
+            lines.append(f"  {message} ({len(rows)} rows: {shown})")
+        return "\n".join(lines)
+
+def _iter_batch_rows(records) -> Iterable[tuple]:
+    """Yield BATCH_FIELDS tuples from columns, mappings or objects with attributes."""
+    if isinstance(records, dict):
+        size = len(next(iter(records.values()), []))
+        columns = [records.get(name) or [None] * size for name in BATCH_FIELDS]
+        return zip(*columns)
+    return (
+        tuple(record.get(name) for name in BATCH_FIELDS) if isinstance(record, dict)
+        else tuple(getattr(record, name, None) for name in BATCH_FIELDS)
+        for record in records
+    )
+
+def validate_batch(records: Union[Dict[str, list], Iterable], today: Optional[date] = None) -> BatchValidationReport:
+    """Validate many transactions in one pass with the rules of the single-value validators.
+
+    records is either a dict of columns (amount, type, category, date, user_id and
+    optionally note and currency) or an iterable of dicts / Transaction-like objects. "Today" is
+    computed once, dates must be strict YYYY-MM-DD and each distinct date string is
+    parsed only once.
+    """
+    today_str = (today or date.today()).isoformat()
+    date_errors: Dict[str, Optional[str]] = {}
+    report = BatchValidationReport()
+    errors = report.errors
+    index = -1
+    for index, (amount, type, category, date_str, user_id, note, currency) in enumerate(_iter_batch_rows(records)):
+        row_errors = []
+        try:
+            if amount <= 0:
+                row_errors.append(('amount', "Amount must be a positive number"))
+            elif amount > 1_000_000:
+                row_errors.append(('amount', "Amount must be less than or equal to 1,000,000."))
+        except TypeError:
+            row_errors.append(('amount', "Amount must be a number"))
+        if type not in ('income', 'expense'):
+            row_errors.append(('type', "Type must be 'income' or 'expense'"))
+        if not category or len(category) > 20 or '>' in category:
+            category_message = category_error(category or '')
+            if category_message:
+                row_errors.append(('category', category_message))
+        if not user_id or len(user_id) > 30:
+            row_errors.append(('user_id', "User ID must be between 1 and 30 characters long."))
+        if note is not None and len(note) > 200:
+            row_errors.append(('note', "Note must be at most 200 characters long."))
+        if currency is not None and not (len(currency) == 3 and currency.isalpha() and currency.isupper()):
+            row_errors.append(('currency', "Currency must be a 3-letter ISO code such as CNY or USD."))
+        if date_str in date_errors:
+            date_error = date_errors[date_str]
+        else:
+            try:
+                parse_iso_date(date_str)
+                date_error = "Date cannot be in the future." if date_str > today_str else None
+            except (TypeError, ValueError):
+                date_error = "Invalid date format. Expected YYYY-MM-DD."
+            date_errors[date_str] = date_error
+        if date_error:
+            row_errors.append(('date', date_error))
+        if row_errors:
+            errors[index] = row_errors
+    report.total = index + 1
+    return report
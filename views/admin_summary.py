@@ -0,0 +1,52 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from services.tracker import AdminTotals, TrackerService
+from utils.logger import setup_logger
+from utils.output import emit, format_rows
+
+logger = setup_logger()
+
+ADMIN_COLUMNS = ['user_id', 'transactions', 'income', 'expense', 'balance', 'top_categories']
+TOTAL_ROW_ID = 'TOTAL'
+
+
+def admin_row(summary: Dict) -> Dict:
+    """One output row; top categories are flattened to "Food 120.00; Rent 80.00"."""
+    return {
+        'user_id': summary['user_id'],
+        'transactions': summary['transaction_count'],
+        'income': summary['total_income'],
+        'expense': summary['total_expense'],
+        'balance': summary['balance'],
+        'top_categories': "; ".join(f"{category} {amount:.2f}" for category, amount in summary['top_categories']),
+    }
+
+
+def admin_rows(users: Iterable[Dict], totals: AdminTotals, top: int) -> Iterator[Dict]:
+    """Rows of every user as they stream in, then a TOTAL row over all of them."""
+    for user in users:
+        totals.add(user)
+        yield admin_row(user)
+    yield admin_row(dict(totals.as_dict(top), user_id=TOTAL_ROW_ID))
+
+
+def write_admin_summary(tracker: TrackerService, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                        top: int = 3, output_format: str = 'csv', output: Optional[str] = None,
+                        shards: Optional[List[str]] = None, workers: Optional[int] = None) -> AdminTotals:
+    """Stream the per-user admin summary to output (a file path) or stdout; returns the totals.
+
+    Rows are encoded and written in chunks while the grouped query is still
+    being read, so memory stays flat however many users there are.
+    """
+    totals = AdminTotals()
+    users = tracker.iter_user_summaries(start_date, end_date, top, shards, workers)
+    title = f"Admin summary ({start_date or 'start'} to {end_date or 'today'})"
+    chunks = format_rows(admin_rows(users, totals, top), ADMIN_COLUMNS, output_format, title=title,
+                         numeric=('transactions', 'income', 'expense', 'balance'))
+    if output:
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    else:
+        emit(chunks)
+    logger.info(f"Wrote admin summary for {totals.user_count} users ({output_format})")
+    return totals
@@ -1,30 +1,38 @@
 __all__ = ["plot_category_spending"]
+import os
+import shutil
 import matplotlib.pyplot as plt
 from services.tracker import TrackerService
+from utils.artifact_cache import default_cache
 from utils.logger import setup_logger
 from typing import Optional
 from datetime import datetime
 
 logger = setup_logger()
-tracker = TrackerService()
+tracker = TrackerService(read_only=True)
+# Bump when the drawing code changes so cached charts are re-rendered
+CHART_VERSION = 1
 
-def plot_category_spending(user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None, plt_module=None) -> None:
-    """Generate a bar chart for category-wise spending using matplotlib."""
+def plot_category_spending(user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None, plt_module=None,
+                           service: Optional[TrackerService] = None, output_file: Optional[str] = None) -> None:
+    """Generate a bar chart for category-wise spending using matplotlib.
+
+    The chart is saved to output_file (default: a timestamped PNG in the working
+    directory) and shown. An identical chart drawn before is copied out of the
+    artifact cache instead, so evicting the cache never removes a saved chart.
+    """
     try:
         if plt_module is None:
             import matplotlib.pyplot as plt_module
         # Get summary data from TrackerService
-        summary_data = tracker.get_summary(user_id, start_date, end_date)
+        summary_data = (service or tracker).get_summary(user_id, start_date, end_date)
         if summary_data['transaction_count'] == 0:
             logger.info(f"No transactions found for user {user_id} to plot")
             print(f"No transactions found for user {user_id}")
             return
 
-        # Extract category-wise expenses (filter out income)
-        category_expenses = {
-            category: amount for category, amount in summary_data['category_summary'].items()
-            if any(t.type == 'expense' and t.category == category for t in tracker.list_transactions(user_id, start_date, end_date))
-        }
+        # Category-wise expenses come from the same aggregate query as the summary
+        category_expenses = summary_data['expense_by_category']
 
         if not category_expenses:
             logger.info(f"No expense transactions found for user {user_id} to plot")
@@ -34,21 +42,35 @@ def plot_category_spending(user_id: str, start_date: Optional[str] = None, end_d
         # Prepare data for plotting
         categories = list(category_expenses.keys())
         amounts = list(category_expenses.values())
+        title = f'Category-Wise Spending for User {user_id}'
 
-        # Create bar chart
-        plt_module.figure(figsize=(10, 6))
-        plt_module.bar(categories, amounts, color='skyblue')
-        plt_module.xlabel('Category')
-        plt_module.ylabel('Amount Spent')
-        plt_module.title(f'Category-Wise Spending for User {user_id}')
-        plt_module.xticks(rotation=45, ha='right')
-        plt_module.tight_layout()
+        def render(path):
+            # Create bar chart
+            plt_module.figure(figsize=(10, 6))
+            plt_module.bar(categories, amounts, color='skyblue')
+            plt_module.xlabel('Category')
+            plt_module.ylabel('Amount Spent')
+            plt_module.title(title)
+            plt_module.xticks(rotation=45, ha='right')
+            plt_module.tight_layout()
+            plt_module.savefig(path)
 
-        # Save and display the plot
-        output_file = f"category_spending_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        plt_module.savefig(output_file)
-        logger.info(f"Saved category spending chart to {output_file}")
+        # Unchanged data reuses the chart rendered last time
+        cached, hit = default_cache().get_or_render(
+            'category_spending', sorted(category_expenses.items()),
+            {'title': title, 'figsize': [10, 6], 'version': CHART_VERSION}, '.png', render)
+        if output_file is None:
+            output_file = f"category_spending_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        if os.path.exists(cached):
+            shutil.copyfile(cached, output_file)
+        if hit:
+            # Nothing was drawn; display the saved chart instead
+            plt_module.figure(figsize=(10, 6))
+            plt_module.imshow(plt_module.imread(output_file))
+            plt_module.axis('off')
         plt_module.show()
+        plt_module.close()
+        logger.info(f"Category spending chart for user {user_id}: {output_file} (cache {'hit' if hit else 'miss'})")
         print(f"Chart saved as {output_file}")
 
     except ValueError as e:
@@ -0,0 +1,64 @@
+import os
+from typing import Dict, List, Optional
+
+from services.tracker import TrackerService
+from utils.logger import setup_logger
+from views.renderers import (render_category_bar, render_dashboard, render_executor, render_income_expense_pie,
+                             render_top_categories, render_trend_line)
+
+logger = setup_logger()
+
+DASHBOARD_LAYOUTS = ('composite', 'separate')
+DASHBOARD_FORMATS = ('png', 'svg')
+
+
+def _panel_jobs(bundle: Dict, prefix: str, fmt: str) -> List[tuple]:
+    """Return (renderer, args) for each dashboard panel written to its own file."""
+    user_id = bundle['user_id']
+    trend = bundle['trend']
+    return [
+        (render_category_bar,
+         ([c for c, _ in bundle['categories']], [a for _, a in bundle['categories']],
+          f"Spending by Category for User {user_id}", f"{prefix}_category.{fmt}")),
+        (render_income_expense_pie,
+         (bundle['total_income'], bundle['total_expense'], f"Income vs Expense for User {user_id}",
+          f"{prefix}_pie.{fmt}")),
+        (render_trend_line,
+         (trend['periods'], [('Income', trend['income']), ('Expense', trend['expense'])],
+          f"Monthly Trend for User {user_id}", f"{prefix}_trend.{fmt}")),
+        (render_top_categories,
+         ([c for c, _ in bundle['top_categories']], [a for _, a in bundle['top_categories']],
+          f"Top Categories for User {user_id}", f"{prefix}_top.{fmt}")),
+    ]
+
+
+def generate_dashboards(tracker: TrackerService, user_id: Optional[str], start_date: str, end_date: str,
+                        output_dir: str = "dashboards", layout: str = 'composite', fmt: str = 'png',
+                        workers: Optional[int] = None, top: int = 5) -> Dict[str, List[str]]:
+    """Render the dashboard of one user, or of every user when user_id is None.
+
+    The aggregates come from a single grouped query and every panel is drawn from
+    that bundle by the process pool, so no worker touches the database. Returns
+    the written file paths per user; users without transactions are skipped.
+    """
+    if layout not in DASHBOARD_LAYOUTS:
+        raise ValueError(f"Layout must be one of {', '.join(DASHBOARD_LAYOUTS)}")
+    if fmt not in DASHBOARD_FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(DASHBOARD_FORMATS)}")
+    bundles = tracker.get_dashboard_data(user_id, start_date, end_date, top)
+    if not bundles:
+        logger.info(f"No transactions found for {user_id or 'any user'} between {start_date} and {end_date}")
+        return {}
+    os.makedirs(output_dir, exist_ok=True)
+    with render_executor(workers) as executor:
+        pending = {}
+        for uid, bundle in bundles.items():
+            prefix = os.path.join(output_dir, f"dashboard_{uid}_{start_date}_{end_date}")
+            if layout == 'composite':
+                title = f"Dashboard for User {uid} ({start_date} to {end_date})"
+                pending[uid] = [executor.submit(render_dashboard, bundle, title, f"{prefix}.{fmt}")]
+            else:
+                pending[uid] = [executor.submit(renderer, *args) for renderer, args in _panel_jobs(bundle, prefix, fmt)]
+        written = {uid: [future.result() for future in futures] for uid, futures in pending.items()}
+    logger.info(f"Rendered {layout} dashboards for {len(written)} users in {output_dir}")
+    return written
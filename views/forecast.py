@@ -0,0 +1,20 @@
+from typing import Dict, Iterable
+from utils.output import emit, format_rows
+
+FORECAST_COLUMNS = ['user_id', 'as_of', 'month_end', 'balance', 'projected_income', 'projected_expense',
+                    'projected_balance', 'lower', 'upper']
+
+
+def forecast_line(forecast: Dict) -> str:
+    return (f"{forecast['user_id']}: {forecast['projected_balance']:.2f} at {forecast['month_end']} "
+            f"({forecast['confidence']:.0%} band {forecast['lower']:.2f} to {forecast['upper']:.2f}; "
+            f"balance {forecast['balance']:.2f} on {forecast['as_of']}, "
+            f"+{forecast['projected_income']:.2f} / -{forecast['projected_expense']:.2f} expected)")
+
+
+def write_forecasts(forecasts: Iterable[Dict], output_format: str = 'text') -> None:
+    """Write forecasts in any of the shared output formats."""
+    emit(format_rows(forecasts, FORECAST_COLUMNS, output_format, text_line=forecast_line,
+                     title="Month-end balance forecast",
+                     numeric=('balance', 'projected_income', 'projected_expense', 'projected_balance',
+                              'lower', 'upper')))
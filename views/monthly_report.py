@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
+
+from services.tracker import TrackerService
+from utils.logger import setup_logger
+from utils.pdf_exporter import export_summary_to_pdf
+from utils.template import load_template
+from views.renderers import render_category_bar, render_executor, render_income_expense_pie, render_trend_line
+
+logger = setup_logger()
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "templates", "monthly_report_template.md")
+
+
+def _chart_jobs(data: Dict, output_dir: str) -> List[tuple]:
+    """Return (template field, renderer, args) for the three charts of a report."""
+    prefix = os.path.join(output_dir, f"{data['user_id']}_{data['month']}")
+    categories = [row[0] for row in data['category_table']]
+    amounts = [row[1] for row in data['category_table']]
+    trend = data['trend']
+    return [
+        ('category_chart_path', render_category_bar,
+         (categories, amounts, f"Category-Wise Spending for User {data['user_id']}", f"{prefix}_category.png")),
+        ('pie_chart_path', render_income_expense_pie,
+         (data['total_income'], data['total_expense'], f"Income vs Expense ({data['month']})", f"{prefix}_pie.png")),
+        ('trend_chart_path', render_trend_line,
+         (trend['dates'], [('Income', trend['income']), ('Expense', trend['expense'])],
+          f"Daily Trend ({data['month']})", f"{prefix}_trend.png")),
+    ]
+
+
+def _template_context(data: Dict, chart_paths: Dict[str, str]) -> Dict:
+    """Format report data into the strings the template prints."""
+    highest_category = data['highest_category']
+    highest_day = data['highest_day']
+    context = {
+        'month': data['month'],
+        'user_id': data['user_id'],
+        'transaction_count': data['transaction_count'],
+        'total_income': f"{data['total_income']:.2f}",
+        'total_expense': f"{data['total_expense']:.2f}",
+        'balance': f"{data['balance']:.2f}",
+        'category_table': [
+            (category, f"{amount:.2f}", f"{percent:.1f}%")
+            for category, amount, percent in data['category_table']
+        ],
+        'highest_category': f"{highest_category[0]} (¥{highest_category[1]:.2f})" if highest_category else "N/A",
+        'highest_day': f"{highest_day[0]} (¥{highest_day[1]:.2f})" if highest_day else "N/A",
+        'suggestions': " ".join(data['suggestions']),
+    }
+    context.update(chart_paths)
+    return context
+
+
+def _write_reports(reports: Dict[str, Dict], output_dir: str, pdf: bool, executor: Executor) -> Dict[str, str]:
+    """Render all charts through executor, then fill the compiled template once per report."""
+    os.makedirs(output_dir, exist_ok=True)
+    template = load_template(TEMPLATE_PATH)
+    pending = {
+        user_id: [(field, executor.submit(renderer, *args)) for field, renderer, args in _chart_jobs(data, output_dir)]
+        for user_id, data in reports.items()
+    }
+    written = {}
+    for user_id, data in reports.items():
+        # Charts sit next to the Markdown file, so link them by file name
+        chart_paths = {field: os.path.basename(future.result()) for field, future in pending[user_id]}
+        report_path = os.path.join(output_dir, f"monthly_report_{user_id}_{data['month']}.md")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(template.render(_template_context(data, chart_paths)))
+        if pdf:
+            export_summary_to_pdf(data, os.path.splitext(report_path)[0] + ".pdf")
+        written[user_id] = report_path
+        logger.info(f"Wrote monthly report for user {user_id} to {report_path}")
+    return written
+
+
+def generate_monthly_report(tracker: TrackerService, user_id: str, month: str, output_dir: str = "reports",
+                            pdf: bool = False, workers: Optional[int] = 3) -> Optional[str]:
+    """Write the monthly Markdown (and optionally PDF) report for one user.
+
+    Returns the Markdown path, or None when the user has no transactions in the month.
+    """
+    data = tracker.get_monthly_report_data(user_id, month)
+    if data['transaction_count'] == 0:
+        logger.info(f"No transactions found for user {user_id} in {month}")
+        return None
+    with render_executor(workers) as executor:
+        return _write_reports({user_id: data}, output_dir, pdf, executor)[user_id]
+
+
+def generate_monthly_reports_for_all_users(tracker: TrackerService, month: str, output_dir: str = "reports",
+                                           pdf: bool = False, workers: Optional[int] = None) -> Dict[str, str]:
+    """Write the monthly report of every user with transactions in month in a single run.
+
+    One grouped query feeds all reports and a single process pool renders every chart.
+    """
+    reports = tracker.get_monthly_report_data_all_users(month)
+    if not reports:
+        logger.info(f"No transactions found for any user in {month}")
+        return {}
+    with render_executor(workers) as executor:
+        return _write_reports(reports, output_dir, pdf, executor)
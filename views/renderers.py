@@ -0,0 +1,139 @@
+"""Chart renderers that only take plain data and an output path.
+
+They are module-level functions so they can be shipped to worker processes,
+and they draw on the non-interactive Agg backend so no display is needed.
+"""
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import matplotlib
+matplotlib.use("Agg")
+
+
+class InlineExecutor(Executor):
+    """Runs submitted jobs immediately; used when only one worker is requested."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def render_executor(workers: Optional[int]) -> Executor:
+    """Process pool for rendering jobs (CPU count when workers is None), or inline for one worker."""
+    if workers == 1:
+        return InlineExecutor()
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def draw_category_bar(ax, categories: Sequence[str], amounts: Sequence[float], title: str) -> None:
+    ax.bar(list(categories), list(amounts), color='skyblue')
+    ax.set_xlabel('Category')
+    ax.set_ylabel('Amount Spent')
+    ax.set_title(title)
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_ha('right')
+
+
+def draw_income_expense_pie(ax, total_income: float, total_expense: float, title: str) -> None:
+    values = [total_income, total_expense]
+    if sum(values) > 0:
+        ax.pie(values, labels=['Income', 'Expense'], colors=['mediumseagreen', 'salmon'],
+               autopct='%1.1f%%', startangle=90)
+    ax.set_title(title)
+    ax.axis('equal')
+
+
+def draw_trend_line(ax, dates: Sequence[str], series: List[tuple], title: str) -> None:
+    for label, values in series:
+        ax.plot(list(dates), list(values), marker='o', label=label)
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Amount')
+    ax.set_title(title)
+    if series:
+        ax.legend()
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_ha('right')
+
+
+def draw_top_categories(ax, categories: Sequence[str], amounts: Sequence[float], title: str) -> None:
+    """Horizontal bars, largest on top, labelled with each category's share of the total."""
+    total = sum(amounts) or 1.0
+    positions = range(len(categories))
+    ax.barh(list(positions), list(amounts), color='slateblue')
+    ax.set_yticks(list(positions))
+    ax.set_yticklabels(list(categories))
+    ax.invert_yaxis()
+    for position, amount in zip(positions, amounts):
+        ax.text(amount, position, f" {amount / total:.0%}", va='center')
+    ax.set_xlabel('Amount Spent')
+    ax.set_title(title)
+
+
+def render_category_bar(categories: Sequence[str], amounts: Sequence[float], title: str, output_path: str) -> str:
+    """Render a category-wise spending bar chart to output_path."""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    draw_category_bar(ax, categories, amounts, title)
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    return output_path
+
+
+def render_income_expense_pie(total_income: float, total_expense: float, title: str, output_path: str) -> str:
+    """Render an income vs expense pie chart to output_path."""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(6, 6))
+    draw_income_expense_pie(ax, total_income, total_expense, title)
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    return output_path
+
+
+def render_trend_line(dates: Sequence[str], series: List[tuple], title: str, output_path: str) -> str:
+    """Render one line per (label, values) pair in series against dates."""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    draw_trend_line(ax, dates, series, title)
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    return output_path
+
+
+def render_top_categories(categories: Sequence[str], amounts: Sequence[float], title: str, output_path: str) -> str:
+    """Render the top spending categories as horizontal bars to output_path."""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 5))
+    draw_top_categories(ax, categories, amounts, title)
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    return output_path
+
+
+def render_dashboard(bundle: Dict, title: str, output_path: str) -> str:
+    """Render the four dashboard panels of an aggregate bundle into one 2x2 figure."""
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(2, 2, figsize=(16, 11))
+    categories = [name for name, _ in bundle['categories']]
+    amounts = [amount for _, amount in bundle['categories']]
+    trend = bundle['trend']
+    draw_category_bar(axes[0][0], categories, amounts, "Spending by Category")
+    draw_income_expense_pie(axes[0][1], bundle['total_income'], bundle['total_expense'], "Income vs Expense")
+    draw_trend_line(axes[1][0], trend['periods'],
+                    [('Income', trend['income']), ('Expense', trend['expense'])], "Monthly Trend")
+    draw_top_categories(axes[1][1], [name for name, _ in bundle['top_categories']],
+                        [amount for _, amount in bundle['top_categories']], "Top Categories")
+    fig.suptitle(title, fontsize=16)
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    return output_path
@@ -2,39 +2,109 @@ from rich.console import Console
 from rich.table import Table
 from services.tracker import TrackerService
 from utils.logger import setup_logger
-from typing import Optional
+from utils.output import emit, format_rows
+from datetime import date
+from models.database import DEFAULT_CURRENCY
+from typing import Dict, List, Optional
+import json
 
 logger = setup_logger()
 console = Console()
-tracker = TrackerService()
+tracker = TrackerService(read_only=True)
 
-def display_tabular_summary(user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> None:
-    """Display a tabular summary of transactions in the terminal using rich."""
+SUMMARY_COLUMNS = ['section', 'name', 'value']
+PROJECTION_KEYS = ('month_end', 'projected_balance', 'projected_lower', 'projected_upper')
+
+def add_projection(service: TrackerService, user_id: str, summary_data: Dict,
+                   end_date: Optional[str] = None) -> Dict:
+    """Add the projected month-end balance to a summary that runs up to today.
+
+    Forecasts use stored amounts, so they are only added to summaries in
+    DEFAULT_CURRENCY. A failed forecast leaves the summary as it was.
+    """
+    if (not summary_data.get('transaction_count') or summary_data.get('currency') != DEFAULT_CURRENCY
+            or (end_date and end_date < date.today().isoformat())):
+        return summary_data
+    try:
+        forecast = service.get_forecast(user_id)
+    except Exception as e:
+        logger.warning(f"Skipped month-end projection for user {user_id}: {e}")
+        return summary_data
+    summary_data.update(month_end=forecast['month_end'], projected_balance=forecast['projected_balance'],
+                        projected_lower=forecast['lower'], projected_upper=forecast['upper'])
+    return summary_data
+
+def projection_text(summary_data: Dict) -> str:
+    return (f"{summary_data['projected_balance']:.2f} "
+            f"({summary_data['projected_lower']:.2f} to {summary_data['projected_upper']:.2f})")
+
+def summary_rows(summary_data: Dict) -> List[Dict]:
+    """Flatten a summary into (section, name, value) rows for CSV and JSON Lines."""
+    rows = [{'section': 'total', 'name': key, 'value': summary_data[key]}
+            for key in ('total_income', 'total_expense', 'balance', 'transaction_count', 'currency')
+            if key in summary_data]
+    rows += [{'section': 'category', 'name': category, 'value': amount}
+             for category, amount in summary_data['category_summary'].items()]
+    rows += [{'section': 'forecast', 'name': key, 'value': summary_data[key]}
+             for key in PROJECTION_KEYS if key in summary_data]
+    return rows
+
+def summary_tables(user_id: str, summary_data: Dict) -> List[Table]:
+    """The rich summary and category breakdown tables."""
+    title = f"Summary for User {user_id}"
+    if summary_data.get('currency'):
+        title += f" ({summary_data['currency']})"
+    summary_table = Table(title=title, show_header=True, header_style="bold magenta")
+    summary_table.add_column("Metric", style="cyan")
+    summary_table.add_column("Value", justify="right", style="green")
+    summary_table.add_row("Total Income", f"{summary_data['total_income']:.2f}")
+    summary_table.add_row("Total Expense", f"{summary_data['total_expense']:.2f}")
+    summary_table.add_row("Balance", f"{summary_data['balance']:.2f}")
+    summary_table.add_row("Transaction Count", str(summary_data['transaction_count']))
+    if 'projected_balance' in summary_data:
+        summary_table.add_row(f"Projected Balance ({summary_data['month_end']})", projection_text(summary_data))
+
+    category_table = Table(title="Category Breakdown", show_header=True, header_style="bold magenta")
+    category_table.add_column("Category", style="cyan")
+    category_table.add_column("Amount", justify="right", style="green")
+    for category, amount in summary_data['category_summary'].items():
+        category_table.add_row(category, f"{amount:.2f}")
+    return [summary_table, category_table]
+
+def write_summary(user_id: str, summary_data: Dict, output_format: str) -> None:
+    """Write a summary as csv, json or jsonl through the shared output layer."""
+    if output_format == 'json':
+        emit([json.dumps(dict(summary_data, user_id=user_id), ensure_ascii=False, indent=2) + "\n"])
+    else:
+        emit(format_rows(summary_rows(summary_data), SUMMARY_COLUMNS, output_format))
+
+def display_tabular_summary(user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                            currency: Optional[str] = None, output_format: str = 'table',
+                            service: Optional[TrackerService] = None, category: Optional[str] = None,
+                            depth: Optional[int] = None, month: Optional[str] = None) -> None:
+    """Display a tabular summary of transactions in the terminal using rich.
+
+    output_format 'csv', 'json' or 'jsonl' writes the same data machine-readably.
+    category limits the summary to a category subtree; depth rolls the breakdown up.
+    With month (YYYY-MM), start_date and end_date only decide whether a projection is shown.
+    """
     try:
         # Get summary data from TrackerService
-        summary_data = tracker.get_summary(user_id, start_date, end_date)
+        service = service or tracker
+        summary_data = service.get_summary(user_id, None if month else start_date, None if month else end_date,
+                                           currency, category, depth, month)
+        if not category:
+            summary_data = add_projection(service, user_id, summary_data, end_date)
+        if output_format != 'table':
+            write_summary(user_id, summary_data, output_format)
+            return
         if summary_data['transaction_count'] == 0:
             console.print(f"[yellow]No transactions found for user {user_id}[/yellow]")
             logger.info(f"No transactions found for user {user_id} to display in tabular summary")
             return
 
-        # Create summary table
-        summary_table = Table(title=f"Summary for User {user_id}", show_header=True, header_style="bold magenta")
-        summary_table.add_column("Metric", style="cyan")
-        summary_table.add_column("Value", justify="right", style="green")
-        summary_table.add_row("Total Income", f"{summary_data['total_income']:.2f}")
-        summary_table.add_row("Total Expense", f"{summary_data['total_expense']:.2f}")
-        summary_table.add_row("Balance", f"{summary_data['balance']:.2f}")
-        summary_table.add_row("Transaction Count", str(summary_data['transaction_count']))
-
-        # Create category breakdown table
-        category_table = Table(title="Category Breakdown", show_header=True, header_style="bold magenta")
-        category_table.add_column("Category", style="cyan")
-        category_table.add_column("Amount", justify="right", style="green")
-        for category, amount in summary_data['category_summary'].items():
-            category_table.add_row(category, f"{amount:.2f}")
-
         # Display tables
+        summary_table, category_table = summary_tables(user_id, summary_data)
         console.print(summary_table)
         console.print("\n")  # Add spacing between tables
         console.print(category_table)
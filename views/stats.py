@@ -0,0 +1,49 @@
+from typing import Dict
+
+from rich.console import Console
+from rich.table import Table
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+console = Console()
+
+BAR_WIDTH = 30
+
+
+def display_stats(stats: Dict, title: str) -> None:
+    """Print top lists, quantiles and per-category histograms as rich tables."""
+    approximate = stats['mode'] == 'approximate'
+    mark = "~" if approximate else ""
+    console.print(f"[bold]{title}[/bold]: {stats['count']} transactions, total {stats['total']:.2f} "
+                  f"({stats['mode']})")
+    if approximate:
+        bounds = stats['error_bounds']
+        console.print(f"Top totals overestimate by at most {bounds['top']:.2f}; "
+                      f"quantiles are within {bounds['quantile_relative']:.0%} of the exact value")
+
+    for heading, key in (("Top categories", 'top_categories'), ("Top merchants", 'top_merchants')):
+        table = Table(title=heading, show_header=True, header_style="bold magenta")
+        table.add_column("Name", style="cyan")
+        table.add_column("Total", justify="right", style="green")
+        for name, total in stats[key]:
+            table.add_row(name, f"{mark}{total:.2f}")
+        console.print(table)
+
+    table = Table(title="Transaction size", show_header=True, header_style="bold magenta")
+    table.add_column("Quantile", style="cyan")
+    table.add_column("Amount", justify="right", style="green")
+    for q, value in stats['quantiles'].items():
+        table.add_row("median" if q == 0.5 else f"p{q * 100:g}", f"{mark}{value:.2f}")
+    console.print(table)
+
+    for category, bins in stats['histograms'].items():
+        table = Table(title=f"{category} amounts", show_header=True, header_style="bold magenta")
+        table.add_column("Range", style="cyan")
+        table.add_column("Count", justify="right", style="green")
+        table.add_column("")
+        peak = max((count for _, _, count in bins), default=0) or 1
+        for low, high, count in bins:
+            table.add_row(f"{low:.2f} - {high:.2f}", f"{mark}{count}", "#" * round(count / peak * BAR_WIDTH))
+        console.print(table)
+    logger.info(f"Displayed {stats['mode']} stats ({stats['count']} transactions)")
@@ -0,0 +1,47 @@
+import csv
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, TextIO
+
+from rich.console import Console
+from rich.table import Table
+
+from utils.logger import setup_logger
+from views.renderers import render_trend_line
+
+logger = setup_logger()
+console = Console()
+
+TREND_COLUMNS = ["period", "income", "expense", "net", "running_balance",
+                 "rolling_income", "rolling_expense", "rolling_net", "transaction_count"]
+
+
+def display_trend_table(rows: List[Dict], title: str) -> None:
+    """Print the trend series as a rich table."""
+    table = Table(title=title, show_header=True, header_style="bold magenta")
+    table.add_column("Period", style="cyan")
+    for name in ("Income", "Expense", "Net", "Balance", "Avg Income", "Avg Expense", "Avg Net"):
+        table.add_column(name, justify="right", style="green")
+    for row in rows:
+        table.add_row(row["period"], *(f"{row[key]:.2f}" for key in TREND_COLUMNS[1:-1]))
+    console.print(table)
+
+
+def write_trend_csv(rows: List[Dict], stream: Optional[TextIO] = None) -> None:
+    """Write the trend series as CSV to stream (stdout by default)."""
+    writer = csv.DictWriter(stream or sys.stdout, fieldnames=TREND_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def plot_trend(rows: List[Dict], title: str, output_file: Optional[str] = None) -> str:
+    """Save a line chart of expense, income and running balance over the periods."""
+    if output_file is None:
+        output_file = f"trend_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+    periods = [row["period"] for row in rows]
+    series = [(label, [row[key] for row in rows]) for label, key in (
+        ("Income", "income"), ("Expense", "expense"),
+        ("Rolling Expense", "rolling_expense"), ("Running Balance", "running_balance"))]
+    render_trend_line(periods, series, title, output_file)
+    logger.info(f"Saved trend chart to {output_file}")
+    return output_file